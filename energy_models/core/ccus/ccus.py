@@ -47,6 +47,21 @@ class CCUS(BaseStream):
                 f'{Carbon.name} (Mt)']
     ccs_list = [CarbonCapture.name, CarbonStorage.name]
 
+    # Columns of the co2_emissions_ccus output
+    CARBON_STORAGE = f'{CarbonStorage.name} (Mt)'
+    CARBON_CAPTURE_FROM_CC_TECHNOS = f'{CarbonCapture.name} (Mt) from CC technos'
+    CARBON_CAPTURE_TO_BE_STORED = f'{CarbonCapture.name} to be stored (Mt)'
+    SOLID_CARBON_TO_BE_STORED = f'{Carbon.name} to be stored (Mt)'
+    SOLID_CARBON_STORAGE = f'Solid {Carbon.name} storage (Mt)'
+    CARBON_STORAGE_LIMITED_BY_CAPTURE = f'{CarbonStorage.name} Limited by capture (Mt)'
+    CO2_EMISSIONS_COLUMNS = [CARBON_STORAGE, CARBON_CAPTURE_FROM_CC_TECHNOS, CARBON_CAPTURE_TO_BE_STORED,
+                             SOLID_CARBON_TO_BE_STORED, SOLID_CARBON_STORAGE, CARBON_STORAGE_LIMITED_BY_CAPTURE]
+    # Fields of the CO2 emissions state : the output columns and the active limits of the carbon storage
+    # (1.0 if the storage is the limit, 0.0 if the carbon to be stored is the limit)
+    LIMIT_IS_STORAGE = 'limit_is_storage'
+    LIMIT_IS_SOLID_STORAGE = 'limit_is_solid_storage'
+    CO2_EMISSIONS_STATE_FIELDS = CO2_EMISSIONS_COLUMNS + [LIMIT_IS_STORAGE, LIMIT_IS_SOLID_STORAGE]
+
     def __init__(self, name):
         '''
         Constructor 
@@ -58,11 +73,9 @@ class CCUS(BaseStream):
         self.carbonstorage_constraint_ref = None
         self.energy_prices = None
         self.all_resource_demand = None
-        self.co2_production = None
-        self.co2_consumption = None
-        self.emissions_by_energy = None
         self.carbon_storage_constraint = None
-        self.total_co2_emissions = pd.DataFrame()
+        self.co2_emissions_state = None
+        self.total_co2_emissions = None
         self.total_co2_emissions_Gt = None
         self.co2_for_food = None
         self.scaling_factor_energy_production = None
@@ -70,6 +83,12 @@ class CCUS(BaseStream):
         self.co2_emissions_needed_by_energy_mix = None
         self.carbon_capture_from_energy_mix = None
         self.total_carbon_storage_by_invest = None
+        # unscaled input columns used by the CO2 emissions, None if the stream or the column is missing
+        self.carbon_storage_production = None
+        self.carbon_capture_production = None
+        self.carbon_storage_cc_consumption = None
+        self.carbon_storage_cc_consumption_woratio = None
+        self.solid_carbon_storage = None
 
     def configure(self, inputs_dict):
         '''
@@ -97,6 +116,7 @@ class CCUS(BaseStream):
     def configure_parameters_update(self, inputs_dict):
         '''
         COnfigure parameters with possible update (variables that does change during the run)
+        Only the columns used by the model are unscaled, the input dataframes are not copied
         '''
         self.subelements_list = inputs_dict[GlossaryEnergy.ccs_list]
 
@@ -105,117 +125,102 @@ class CCUS(BaseStream):
         self.scaling_factor_energy_consumption = inputs_dict['scaling_factor_energy_consumption']
         for energy in self.subelements_list:
             self.sub_prices[energy] = inputs_dict[f'{energy}.{GlossaryEnergy.EnergyPricesValue}'][energy]
-            self.sub_production_dict[energy] = inputs_dict[f'{energy}.{GlossaryEnergy.EnergyProductionValue}'] * \
-                                               self.scaling_factor_energy_production
-            self.sub_consumption_dict[energy] = inputs_dict[f'{energy}.{GlossaryEnergy.EnergyConsumptionValue}'] * \
-                                                self.scaling_factor_energy_consumption
-            self.sub_consumption_woratio_dict[energy] = inputs_dict[
-                                                            f'{energy}.{GlossaryEnergy.EnergyConsumptionWithoutRatioValue}'] * \
-                                                        self.scaling_factor_energy_consumption
 
-        self.energy_prices = self.sub_prices.copy(deep=True)
+        self.energy_prices = self.sub_prices
 
         # dataframe resource demand
-        self.all_resource_demand = pd.DataFrame(
-            {GlossaryEnergy.Years: self.energy_prices[GlossaryEnergy.Years].values})
-        for elements in self.resource_list:
-            if elements in self.resource_list:
-                self.all_resource_demand[elements] = np.linspace(
-                    0, 0, len(self.all_resource_demand.index)) * 100.
+        resource_demand = {resource: np.zeros(len(self.sub_prices)) for resource in self.resource_list}
         for energy in self.subelements_list:
-            for elements in self.sub_consumption_dict[energy]:
-                if elements in self.resource_list:
-                    self.all_resource_demand[elements] = self.all_resource_demand[elements] + \
-                                                         inputs_dict[
-                                                             f'{energy}.{GlossaryEnergy.EnergyConsumptionValue}'][
-                                                             elements].values * \
+            energy_consumption = inputs_dict[f'{energy}.{GlossaryEnergy.EnergyConsumptionValue}']
+            for resource in self.resource_list:
+                if resource in energy_consumption:
+                    resource_demand[resource] = resource_demand[resource] + \
+                                                energy_consumption[resource].values * \
+                                                self.scaling_factor_energy_consumption
+        self.all_resource_demand = pd.DataFrame(
+            {GlossaryEnergy.Years: self.sub_prices[GlossaryEnergy.Years].values, **resource_demand})
+
+        self.carbon_storage_production, self.carbon_capture_production = None, None
+        self.carbon_storage_cc_consumption, self.carbon_storage_cc_consumption_woratio = None, None
+        self.solid_carbon_storage = None
+        if CarbonStorage.name in self.subelements_list:
+            storage_consumption = inputs_dict[f'{CarbonStorage.name}.{GlossaryEnergy.EnergyConsumptionValue}']
+            self.carbon_storage_production = inputs_dict[
+                                                 f'{CarbonStorage.name}.{GlossaryEnergy.EnergyProductionValue}'][
+                                                 CarbonStorage.name].values * self.scaling_factor_energy_production
+            self.carbon_storage_cc_consumption = storage_consumption[
+                                                     f'{CarbonCapture.name} ({CarbonCapture.unit})'].values * \
+                                                 self.scaling_factor_energy_consumption
+            self.carbon_storage_cc_consumption_woratio = inputs_dict[
+                                                             f'{CarbonStorage.name}.{GlossaryEnergy.EnergyConsumptionWithoutRatioValue}'][
+                                                             f'{CarbonCapture.name} ({CarbonCapture.unit})'].values * \
                                                          self.scaling_factor_energy_consumption
+            if f'{Carbon.name} (Mt)' in storage_consumption:
+                self.solid_carbon_storage = storage_consumption[f'{Carbon.name} (Mt)'].values * \
+                                            self.scaling_factor_energy_consumption
+        if CarbonCapture.name in self.subelements_list:
+            self.carbon_capture_production = inputs_dict[
+                                                 f'{CarbonCapture.name}.{GlossaryEnergy.EnergyProductionValue}'][
+                                                 CarbonCapture.name].values * self.scaling_factor_energy_production
 
         self.co2_emissions_needed_by_energy_mix = inputs_dict['co2_emissions_needed_by_energy_mix']
         self.carbon_capture_from_energy_mix = inputs_dict['carbon_capture_from_energy_mix']
-        # self.co2_emissions = inputs_dict['co2_emissions']
 
     def compute_CO2_emissions(self):
         '''
         Compute CO2 total emissions
+        The fields of the co2_emissions_state structured array are filled with vectorized operations
+        and the co2_emissions_ccus dataframe is built once from it
         '''
-        # Initialize dataframes
+        years = self.production[GlossaryEnergy.Years].values
+        cc_from_energy_mix = self.carbon_capture_from_energy_mix[f'{CarbonCapture.name} from energy mix (Gt)'].values
+        cc_needed_by_energy_mix = self.co2_emissions_needed_by_energy_mix[
+            f'{CarbonCapture.name} needed by energy mix (Gt)'].values
+        co2_for_food = self.co2_for_food[f'{CO2.name} for food (Mt)'].values
 
-        self.co2_production = pd.DataFrame({GlossaryEnergy.Years: self.production[GlossaryEnergy.Years]})
-        self.total_co2_emissions[GlossaryEnergy.Years] = self.production[GlossaryEnergy.Years]
-        self.co2_consumption = pd.DataFrame(
-            {GlossaryEnergy.Years: self.production[GlossaryEnergy.Years]})
-        self.emissions_by_energy = pd.DataFrame(
-            {GlossaryEnergy.Years: self.production[GlossaryEnergy.Years]})
-        # Do not loop over carbon capture and carbon storage which will be
-        # handled differently
+        input_arrays = [array for array in [self.carbon_storage_production, self.carbon_capture_production,
+                                            self.solid_carbon_storage, cc_from_energy_mix, cc_needed_by_energy_mix]
+                        if array is not None]
+        value_dtype = np.result_type(np.float64, *input_arrays)
+        state = np.zeros(len(years), dtype=[(field, value_dtype) for field in self.CO2_EMISSIONS_STATE_FIELDS])
 
         ''' CARBON STORAGE 
          Total carbon storage is production of carbon storage
          Solid carbon is gaseous equivalent in the production for
          solidcarbonstorage technology
         '''
-        if CarbonStorage.name in self.sub_production_dict:
-
-            self.total_co2_emissions[f'{CarbonStorage.name} (Mt)'] = self.sub_production_dict[
-                CarbonStorage.name][CarbonStorage.name].values
-            self.total_carbon_storage_by_invest = self.sub_production_dict[CarbonStorage.name][
-                                                      CarbonStorage.name].values * \
-                                                  self.sub_consumption_woratio_dict[CarbonStorage.name][
-                                                      f'{CarbonCapture.name} ({CarbonCapture.unit})'].values / \
-                                                  self.sub_consumption_dict[CarbonStorage.name][
-                                                      f'{CarbonCapture.name} ({CarbonCapture.unit})'].values
-        else:
-            self.total_co2_emissions[f'{CarbonStorage.name} (Mt)'] = 0.0
+        if self.carbon_storage_production is not None:
+            state[self.CARBON_STORAGE] = self.carbon_storage_production
+            self.total_carbon_storage_by_invest = self.carbon_storage_production * \
+                                                  self.carbon_storage_cc_consumption_woratio / \
+                                                  self.carbon_storage_cc_consumption
 
         ''' CARBON CAPTURE from CC technos       
          Total carbon capture = carbon captured from carboncapture stream +
          carbon captured from energies (can be negative if FischerTropsch needs carbon
          captured)
         '''
-        if CarbonCapture.name in self.sub_production_dict:
-
-            self.total_co2_emissions[f'{CarbonCapture.name} (Mt) from CC technos'] = self.sub_production_dict[
-                CarbonCapture.name][CarbonCapture.name].values
-        else:
-            self.total_co2_emissions[f'{CarbonCapture.name} (Mt) from CC technos'] = 0.0
+        if self.carbon_capture_production is not None:
+            state[self.CARBON_CAPTURE_FROM_CC_TECHNOS] = self.carbon_capture_production
 
         ''' Carbon captured that needs to be stored
             sum of the one from CC technos and the one directly captured 
             we delete the one needed by energy mix and potentially later the CO2 for food
         '''
-
-        self.total_co2_emissions[f'{CarbonCapture.name} to be stored (Mt)'] = self.total_co2_emissions[
-                                                                                  f'{CarbonCapture.name} (Mt) from CC technos'] + \
-                                                                              self.carbon_capture_from_energy_mix[
-                                                                                  f'{CarbonCapture.name} from energy mix (Gt)'] * 1e3 - \
-                                                                              self.co2_emissions_needed_by_energy_mix[
-                                                                                  f'{CarbonCapture.name} needed by energy mix (Gt)'] * 1e3 - \
-                                                                              self.co2_for_food[
-                                                                                  f'{CO2.name} for food (Mt)']
+        state[self.CARBON_CAPTURE_TO_BE_STORED] = state[self.CARBON_CAPTURE_FROM_CC_TECHNOS] + \
+                                                  cc_from_energy_mix * 1e3 - cc_needed_by_energy_mix * 1e3 - \
+                                                  co2_for_food
 
         '''
             Solid Carbon to be stored to limit the carbon solid storage
+            No energy of the mix produces solid carbon : the field stays at zero
         '''
-        energy_producing_solid_carbon = self.co2_production[[
-            col for col in self.co2_production if col.endswith(f'{Carbon.name} (Mt)')]]
-        energy_producing_solid_carbon_list = [key.replace(
-            f' {Carbon.name} (Mt)', '') for key in energy_producing_solid_carbon]
-        if len(energy_producing_solid_carbon_list) != 0:
-            self.total_co2_emissions[f'{Carbon.name} to be stored (Mt)'] = energy_producing_solid_carbon.sum(
-                axis=1).values
-        else:
-            self.total_co2_emissions[
-                f'{Carbon.name} to be stored (Mt)'] = 0.0
 
         '''
             Solid Carbon storage 
         '''
-        self.total_co2_emissions[f'Solid {Carbon.name} storage (Mt)'] = 0.0
-        if CarbonStorage.name in self.sub_consumption_dict:
-            if f'{Carbon.name} (Mt)' in self.sub_consumption_dict[CarbonStorage.name]:
-                self.total_co2_emissions[f'Solid {Carbon.name} storage (Mt)'] = self.sub_consumption_dict[
-                    CarbonStorage.name][f'{Carbon.name} (Mt)'].values
+        if self.solid_carbon_storage is not None:
+            state[self.SOLID_CARBON_STORAGE] = self.solid_carbon_storage
 
         '''
             The carbon stored by invest is limited by the carbon previously captured to be stored
@@ -223,23 +228,27 @@ class CCUS(BaseStream):
             Solid carbon storage is taken into account into carbon storage 
             need to delete it before using the minimum
         '''
+        co2_per_use = Carbon.data_energy_dict[GlossaryEnergy.CO2PerUse]
+        gaseous_storage_limit = np.minimum(
+            state[self.CARBON_CAPTURE_TO_BE_STORED],
+            state[self.CARBON_STORAGE] - state[self.SOLID_CARBON_STORAGE] * co2_per_use)
+        solid_storage_limit = np.minimum(state[self.SOLID_CARBON_TO_BE_STORED], state[self.SOLID_CARBON_STORAGE]) * \
+                              co2_per_use
+        state[self.CARBON_STORAGE_LIMITED_BY_CAPTURE] = gaseous_storage_limit + solid_storage_limit
 
-        self.total_co2_emissions[f'{CarbonStorage.name} Limited by capture (Mt)'] = np.minimum(
-            self.total_co2_emissions[f'{CarbonCapture.name} to be stored (Mt)'].values,
-            self.total_co2_emissions[f'{CarbonStorage.name} (Mt)'].values - self.total_co2_emissions[
-                f'Solid {Carbon.name} storage (Mt)'].values * Carbon.data_energy_dict[GlossaryEnergy.CO2PerUse]) + \
-                                                                                    np.minimum(
-                                                                                        self.total_co2_emissions[
-                                                                                            f'{Carbon.name} to be stored (Mt)'].values,
-                                                                                        self.total_co2_emissions[
-                                                                                            f'Solid {Carbon.name} storage (Mt)'].values) * \
-                                                                                    Carbon.data_energy_dict[
-                                                                                        GlossaryEnergy.CO2PerUse]
-
+        # if abs (min(a,b)-a) = 0.0 then the minimum is a else the minimum is b
+        # and the sign of abs (min(a,b)-a) is one
+        state[self.LIMIT_IS_STORAGE] = np.maximum(0.0, np.sign(np.abs(
+            gaseous_storage_limit - state[self.CARBON_CAPTURE_TO_BE_STORED])))
+        state[self.LIMIT_IS_SOLID_STORAGE] = np.maximum(0.0, np.sign(np.abs(
+            solid_storage_limit - state[self.SOLID_CARBON_TO_BE_STORED] * co2_per_use)))
+
+        self.co2_emissions_state = state
+        self.total_co2_emissions = pd.DataFrame(
+            {GlossaryEnergy.Years: years, **{column: state[column] for column in self.CO2_EMISSIONS_COLUMNS}})
         self.total_co2_emissions_Gt = pd.DataFrame(
-            {GlossaryEnergy.Years: self.production[GlossaryEnergy.Years],
-             f'{CarbonStorage.name} Limited by capture (Gt)': self.total_co2_emissions[
-                                                                  f'{CarbonStorage.name} Limited by capture (Mt)'].values / 1e3})
+            {GlossaryEnergy.Years: years,
+             f'{CarbonStorage.name} Limited by capture (Gt)': state[self.CARBON_STORAGE_LIMITED_BY_CAPTURE] / 1e3})
 
     def compute_CCS_price(self):
         '''
@@ -257,297 +266,84 @@ class CCUS(BaseStream):
         '''
 
         self.carbon_storage_constraint = np.array(
-            [- (self.total_co2_emissions[f'{CarbonStorage.name} Limited by capture (Mt)'].sum(
+            [- (self.co2_emissions_state[self.CARBON_STORAGE_LIMITED_BY_CAPTURE].sum(
             ) - self.carbonstorage_limit) / self.carbonstorage_constraint_ref])
 
-    def compute_grad_CO2_emissions(self, co2_emissions):
+    def compute_grad_CO2_emissions(self):
         '''
-        Compute CO2 total emissions
+        Compute the gradients of CO2 total emissions
+        The arrays of the co2_emissions_state computed by compute_CO2_emissions are reused
         '''
-        # Initialize dataframes
-        len_years = len(self.production[GlossaryEnergy.Years])
-
-        co2_production = pd.DataFrame({GlossaryEnergy.Years: self.production[GlossaryEnergy.Years]})
-        co2_consumption = pd.DataFrame(
-            {GlossaryEnergy.Years: self.production[GlossaryEnergy.Years]})
+        state = self.co2_emissions_state
+        len_years = len(state)
 
         dtot_CO2_emissions = {}
-        # Do not loop over carbon capture and carbon storage which will be
-        # handled differently
 
         ''' CARBON STORAGE 
          Total carbon storage is production of carbon storage
-         Solid carbon is gaseous equivalent in the production for
-         solidcarbonstorage technology
         '''
-        if CarbonStorage.name in self.sub_production_dict:
+        if self.carbon_storage_production is not None:
             dtot_CO2_emissions[
-                f'{CarbonStorage.name} (Mt) vs {CarbonStorage.name}#{CarbonStorage.name}#prod'] = np.ones(
-                len_years)
-        #             self.total_co2_emissions[f'{CarbonStorage.name} (Mt)'] = self.sub_production_dict[
-        #                 CarbonStorage.name][CarbonStorage.name].values
-        #         else:
-        #             self.total_co2_emissions[f'{CarbonStorage.name} (Mt)'] = 0.0
+                f'{self.CARBON_STORAGE} vs {CarbonStorage.name}#{CarbonStorage.name}#prod'] = np.ones(len_years)
 
         ''' CARBON CAPTURE from CC technos       
-         Total carbon capture = carbon captured from carboncapture stream +
-         carbon captured from energies (can be negative if FischerTropsch needs carbon
-         captured)
         '''
-        if CarbonCapture.name in self.sub_production_dict:
+        if self.carbon_capture_production is not None:
             dtot_CO2_emissions[
-                f'{CarbonCapture.name} (Mt) from CC technos vs {CarbonCapture.name}#{CarbonCapture.name}#prod'] = np.ones(
+                f'{self.CARBON_CAPTURE_FROM_CC_TECHNOS} vs {CarbonCapture.name}#{CarbonCapture.name}#prod'] = np.ones(
                 len_years)
-        #             self.total_co2_emissions[f'{CarbonCapture.name} (Mt) from CC technos'] = self.sub_production_dict[
-        #                 CarbonCapture.name][CarbonCapture.name].values
-        #         else:
-        #             self.total_co2_emissions[f'{CarbonCapture.name} (Mt) from CC technos'] = 0.0
-
-        ''' CARBON CAPTURE from energy mix
-        Total carbon capture from energy mix if the technology offers carbon_capture
-         Ex : upgrading biogas technology is the same as Amine Scrubbing but
-         on a different gas (biogas for upgrading biogas and flue gas for
-         Amien scrubbing)
-        '''
-        energy_producing_carbon_capture = co2_production[[
-            col for col in co2_production if col.endswith(f'{CarbonCapture.name} (Mt)')]]
-        energy_producing_carbon_capture_list = [key.replace(
-            f' {CarbonCapture.name} (Mt)', '') for key in energy_producing_carbon_capture]
-        if len(energy_producing_carbon_capture_list) != 0:
-            for energy1 in energy_producing_carbon_capture_list:
-                dtot_CO2_emissions[
-                    f'{CarbonCapture.name} from energy mix (Mt) vs {energy1}#{CarbonCapture.name} (Mt)#prod'] = np.ones(
-                    len_years)
-        #             self.total_co2_emissions[f'{CarbonCapture.name} from energy mix (Mt)'] = energy_producing_carbon_capture.sum(
-        #                 axis=1).values
-        #         else:
-        #             self.total_co2_emissions[
-        #                 f'{CarbonCapture.name} from energy mix (Mt)'] = 0.0
-
-        ''' CARBON CAPTURE needed by energy mix
-        Total carbon capture needed by energy mix if a technology needs carbon_capture
-         Ex :Sabatier process or RWGS in FischerTropsch technology 
-        '''
-        energy_needing_carbon_capture = co2_consumption[[
-            col for col in co2_consumption if col.endswith(f'{CarbonCapture.name} (Mt)')]]
-        energy_needing_carbon_capture_list = [key.replace(
-            f' {CarbonCapture.name} (Mt)', '') for key in energy_needing_carbon_capture]
-        if len(energy_needing_carbon_capture_list) != 0:
-            for energy1 in energy_needing_carbon_capture_list:
-                dtot_CO2_emissions[
-                    f'{CarbonCapture.name} needed by energy mix (Mt) vs {energy1}#{CarbonCapture.name} (Mt)#cons'] = np.ones(
-                    len_years)
-        #             self.total_co2_emissions[f'{CarbonCapture.name} needed by energy mix (Mt)'] = energy_needing_carbon_capture.sum(
-        #                 axis=1).values
-        #         else:
-        #             self.total_co2_emissions[
-        #                 f'{CarbonCapture.name} needed by energy mix (Mt)'] = 0.0
-
-        ''' CO2 from energy mix       
-         CO2 expelled by energy mix technologies during the process 
-         i.e. for machinery or tractors 
-        '''
-        energy_producing_co2 = co2_production[[
-            col for col in co2_production if col.endswith(f'{CO2.name} (Mt)')]]
-        energy_producing_co2_list = [key.replace(
-            f' {CO2.name} (Mt)', '') for key in energy_producing_co2]
-        if len(energy_producing_co2_list) != 0:
-            for energy1 in energy_producing_co2_list:
-                dtot_CO2_emissions[
-                    f'{CO2.name} from energy mix (Mt) vs {energy1}#{CO2.name} (Mt)#prod'] = np.ones(len_years)
-
-        #             self.total_co2_emissions[f'{CO2.name} from energy mix (Mt)'] = energy_producing_co2.sum(
-        #                 axis=1).values
-        #         else:
-        #             self.total_co2_emissions[
-        #                 f'{CO2.name} from energy mix (Mt)'] = 0.0
-
-        ''' CO2 removed by energy mix       
-         CO2 removed by energy mix technologies during the process 
-         i.e. biomass processes as managed wood or crop energy
-        '''
-        energy_removing_co2 = co2_consumption[[
-            col for col in co2_consumption if col.endswith(f'{CO2.name} (Mt)')]]
-        energy_removing_co2_list = [key.replace(
-            f' {CO2.name} (Mt)', '') for key in energy_removing_co2]
-        if len(energy_removing_co2_list) != 0:
-            for energy1 in energy_removing_co2_list:
-                dtot_CO2_emissions[
-                    f'{CO2.name} removed by energy mix (Mt) vs {energy1}#{CO2.name} (Mt)#cons'] = np.ones(len_years)
-        #             self.total_co2_emissions[f'{CO2.name} removed by energy mix (Mt)'] = energy_removing_co2.sum(
-        #                 axis=1).values
-        #         else:
-        #             self.total_co2_emissions[
-        #                 f'{CO2.name} removed energy mix (Mt)'] = 0.0
-
-        ''' Total C02 from Flue gas
-            sum of all production of flue gas 
-            it could be equal to carbon capture from CC technos if enough investment but not sure
-        '''
-        #         self.total_co2_emissions[f'Total {CarbonCapture.flue_gas_name} (Mt)'] = self.co2_production[[
-        # col for col in self.co2_production if
-        # col.endswith(f'{CarbonCapture.flue_gas_name} (Mt)')]].sum(axis=1)
-        for col in co2_production:
-            if col.endswith(f'{CarbonCapture.flue_gas_name} (Mt)'):
-                energy1 = col.replace(
-                    f' {CarbonCapture.flue_gas_name} (Mt)', '')
-                dtot_CO2_emissions[
-                    f'Total {CarbonCapture.flue_gas_name} (Mt) vs {energy1}#{CarbonCapture.flue_gas_name} (Mt)#prod'] = np.ones(
-                    len_years)
+
         ''' Carbon captured that needs to be stored
             sum of the one from CC technos and the one directly captured 
             we delete the one needed by energy mix and potentially later the CO2 for food
         '''
-
-        #         self.total_co2_emissions[f'{CarbonCapture.name} to be stored (Mt)'] = self.total_co2_emissions[f'{CarbonCapture.name} (Mt) from CC technos'] + \
-        #             self.total_co2_emissions[f'{CarbonCapture.name} from energy mix (Mt)'] - \
-        #             self.total_co2_emissions[f'{CarbonCapture.name} needed by energy mix (Mt)'] -\
-        #             self.total_co2_emissions[f'{CO2.name} for food (Mt)'
-
-        new_key = f'{CarbonCapture.name} to be stored (Mt)'
+        new_key = self.CARBON_CAPTURE_TO_BE_STORED
         dtot_CO2_emissions[f'{new_key} vs {CO2.name} for food (Mt)#carbon_capture'] = - np.ones(
             len_years)
         dtot_CO2_emissions[f'{new_key} vs {CarbonCapture.name} from energy mix (Mt)#carbon_capture'] = np.ones(
             len_years)
         dtot_CO2_emissions[f'{new_key} vs {CarbonCapture.name} needed by energy mix (Mt)#carbon_capture'] = - np.ones(
             len_years)
-        key_dep_tuple_list = [(f'{CarbonCapture.name} (Mt) from CC technos', 1.0),
-                              (f'{CarbonCapture.name} from energy mix (Mt)', 1.0),
-                              (f'{CarbonCapture.name} needed by energy mix (Mt)', -1.0),
-                              (f'{CO2.name} for food (Mt)', -1.0)]
+        key_dep_tuple_list = [(self.CARBON_CAPTURE_FROM_CC_TECHNOS, 1.0)]
         dtot_CO2_emissions = update_new_gradient(
             dtot_CO2_emissions, key_dep_tuple_list, new_key)
 
-        cc_to_be_stored = co2_emissions[f'{CarbonCapture.name} (Mt) from CC technos'].values + \
-                          self.carbon_capture_from_energy_mix[
-                              f'{CarbonCapture.name} from energy mix (Gt)'].values * 1e3 - \
-                          self.co2_emissions_needed_by_energy_mix[
-                              f'{CarbonCapture.name} needed by energy mix (Gt)'].values * 1e3 - \
-                          self.co2_for_food[f'{CO2.name} for food (Mt)'].values
-        # if the carbon to be stored is lower than zero that means that we need
-        # more carbon capture for energy mix than the one created by CC technos
-        # or upgrading biogas
-        if cc_to_be_stored.min() < 0:
-            cc_needed = self.co2_emissions_needed_by_energy_mix[
-                            f'{CarbonCapture.name} needed by energy mix (Gt)'].values * 1e3
-            cc_provided = co2_emissions[f'{CarbonCapture.name} (Mt) from CC technos'].values + \
-                          self.carbon_capture_from_energy_mix[
-                              f'{CarbonCapture.name} from energy mix (Gt)'].values * 1e3
-            dtot_CO2_emissions_old = dtot_CO2_emissions.copy()
-            dratio_dkey = {}
-            # The gradient is (u/v)' = (u'v -uv')/v**2 = u'/v -uv'/v**2
-            # u is the cc needed f'{CarbonCapture.name} needed by energy mix (Mt)'
-            # v is the cc provided which is the sum of f'{CarbonCapture.name}
-            # (Mt) from CC technos' and f'{CarbonCapture.name} from energy mix
-            # (Mt)'
-
-            for key, grad_cc in dtot_CO2_emissions_old.items():
-                key_co2_emissions = key.split(' vs ')[0]
-                grad_info_x = key.split(' vs ')[1]
-                if key_co2_emissions == f'{CarbonCapture.name} needed by energy mix (Mt)':
-
-                    if grad_info_x in dratio_dkey:
-                        dratio_dkey[grad_info_x] -= np.divide(cc_provided * grad_cc, cc_needed ** 2,
-                                                              out=np.zeros_like(cc_needed), where=cc_needed > 1.0e-15)
-                    else:
-                        dratio_dkey[grad_info_x] = - np.divide(cc_provided * grad_cc, cc_needed ** 2,
-                                                               out=np.zeros_like(cc_needed), where=cc_needed > 1.0e-15)
-
-                elif key_co2_emissions in [f'{CarbonCapture.name} (Mt) from CC technos',
-                                           f'{CarbonCapture.name} from energy mix (Mt)']:
-
-                    if grad_info_x in dratio_dkey:
-                        dratio_dkey[grad_info_x] += np.divide(grad_cc, cc_needed,
-                                                              out=np.zeros_like(cc_needed), where=cc_needed > 1.0e-15)
-                    else:
-                        dratio_dkey[grad_info_x] = np.divide(grad_cc, cc_needed,
-                                                             out=np.zeros_like(cc_needed), where=cc_needed > 1.0e-15)
-
-        grad_max = np.maximum(0.0, np.sign(
-            cc_to_be_stored))
+        grad_max = np.maximum(0.0, np.sign(state[self.CARBON_CAPTURE_TO_BE_STORED]))
 
         for key, value in dtot_CO2_emissions.items():
-            if key.startswith(f'{CarbonCapture.name} to be stored (Mt)'):
+            if key.startswith(self.CARBON_CAPTURE_TO_BE_STORED):
                 value *= grad_max
-        #         co2_emissions[f'{CarbonCapture.name} to be stored (Mt)'] = np.maximum(
-        # co2_emissions[f'{CarbonCapture.name} to be stored (Mt)'],
-        # 0.0)
 
-        '''
-            Solid Carbon to be stored to limit the carbon solid storage
-        '''
-        #         energy_producing_solid_carbon = self.co2_production[[
-        #             col for col in self.co2_production if col.endswith(f'{Carbon.name} (Mt)')]]
-        #         energy_producing_solid_carbon_list = [key.replace(
-        #             f' {Carbon.name} (Mt)', '') for key in energy_producing_solid_carbon]
-        #         if len(energy_producing_solid_carbon_list) != 0:
-        #             co2_emissions[f'{Carbon.name} to be stored (Mt)'] = energy_producing_solid_carbon.sum(
-        #                 axis=1).values
-        #         else:
-        #             co2_emissions[
-        #                 f'{Carbon.name} to be stored (Mt)'] = 0.0
-
-        for col in co2_production:
-            if col.endswith(f'{Carbon.name} (Mt)'):
-                energy1 = col.replace(f' {Carbon.name} (Mt)', '')
-                dtot_CO2_emissions[f'{Carbon.name} to be stored (Mt) vs {energy1}#{Carbon.name} (Mt)#prod'] = np.ones(
-                    len_years)
         '''
             Solid Carbon storage 
         '''
-
-        if CarbonStorage.name in self.sub_consumption_dict:
-            if f'{Carbon.name} (Mt)' in self.sub_consumption_dict[CarbonStorage.name]:
-                dtot_CO2_emissions[
-                    f'Solid {Carbon.name} storage (Mt) vs {CarbonStorage.name}#{Carbon.name} (Mt)#cons'] = np.ones(
-                    len_years)
-        #                 co2_emissions[f'Solid {Carbon.name} storage (Mt)'] = self.sub_consumption_dict[
-        #                     CarbonStorage.name][f'{Carbon.name} (Mt)'].values
+        if self.solid_carbon_storage is not None:
+            dtot_CO2_emissions[
+                f'{self.SOLID_CARBON_STORAGE} vs {CarbonStorage.name}#{Carbon.name} (Mt)#cons'] = np.ones(len_years)
 
         '''
             The carbon stored by invest is limited by the carbon previously captured to be stored
             for gaseous and solid carbon storage
-            Solid carbon storage is taken into account into carbon storage 
-            need to delete it before using the minimum
         '''
-        # if abs (min(a,b)-a) = 0.0 then the minimum is a else the minimum is b
-        # and the sign of abs (min(a,b)-a) is one
-        mini1 = np.minimum(
-            co2_emissions[f'{CarbonCapture.name} to be stored (Mt)'].values,
-            co2_emissions[f'{CarbonStorage.name} (Mt)'].values - co2_emissions[
-                f'Solid {Carbon.name} storage (Mt)'].values * Carbon.data_energy_dict[GlossaryEnergy.CO2PerUse])
-        limit_is_storage = np.maximum(0.0, np.sign(np.abs(
-            mini1 - co2_emissions[f'{CarbonCapture.name} to be stored (Mt)'].values)))
+        co2_per_use = Carbon.data_energy_dict[GlossaryEnergy.CO2PerUse]
+        limit_is_storage = state[self.LIMIT_IS_STORAGE]
         limit_is_to_be_stored = np.ones(len_years) - limit_is_storage
-
-        # if abs (min(a,b)-a) = 0.0 then the minimum is a else the minimum is b
-        # and the sign of abs (min(a,b)-a) is one
-        mini2 = np.minimum(
-            co2_emissions[f'{Carbon.name} to be stored (Mt)'].values,
-            co2_emissions[f'Solid {Carbon.name} storage (Mt)'].values) * Carbon.data_energy_dict[GlossaryEnergy.CO2PerUse]
-
-        limit_is_solid_storage = np.maximum(0.0, np.sign(np.abs(
-            mini2 - co2_emissions[f'{Carbon.name} to be stored (Mt)'].values * Carbon.data_energy_dict[GlossaryEnergy.CO2PerUse])))
-        limit_is_solid_to_be_stored = np.ones(
-            len_years) - limit_is_solid_storage
-        new_key = f'{CarbonStorage.name} Limited by capture (Mt)'
-        key_dep_tuple_list = [(f'{CarbonCapture.name} to be stored (Mt)', limit_is_to_be_stored),
-                              (f'{Carbon.name} to be stored (Mt)',
-                               limit_is_solid_to_be_stored * Carbon.data_energy_dict[GlossaryEnergy.CO2PerUse]),
-                              (f'{CarbonStorage.name} (Mt)', limit_is_storage),
-                              (f'Solid {Carbon.name} storage (Mt)',
-                               (-limit_is_storage + limit_is_solid_storage) * Carbon.data_energy_dict[GlossaryEnergy.CO2PerUse])]
+        limit_is_solid_storage = state[self.LIMIT_IS_SOLID_STORAGE]
+        limit_is_solid_to_be_stored = np.ones(len_years) - limit_is_solid_storage
+        new_key = self.CARBON_STORAGE_LIMITED_BY_CAPTURE
+        key_dep_tuple_list = [(self.CARBON_CAPTURE_TO_BE_STORED, limit_is_to_be_stored),
+                              (self.SOLID_CARBON_TO_BE_STORED, limit_is_solid_to_be_stored * co2_per_use),
+                              (self.CARBON_STORAGE, limit_is_storage),
+                              (self.SOLID_CARBON_STORAGE, (-limit_is_storage + limit_is_solid_storage) * co2_per_use)]
         dtot_CO2_emissions = update_new_gradient(
             dtot_CO2_emissions, key_dep_tuple_list, new_key)
 
         dtot_final_CO2_emissions = dtot_CO2_emissions.copy()
         for key, gradient in dtot_CO2_emissions.items():
 
-            if key.startswith(f'{CarbonStorage.name} Limited by capture (Mt)'):
-                new_key = key.replace(
-                    f'{CarbonStorage.name} Limited by capture (Mt)', 'Carbon storage constraint')
-                dtot_final_CO2_emissions[new_key] = - \
-                                                        gradient / self.carbonstorage_constraint_ref
+            if key.startswith(self.CARBON_STORAGE_LIMITED_BY_CAPTURE):
+                new_key = key.replace(self.CARBON_STORAGE_LIMITED_BY_CAPTURE, 'Carbon storage constraint')
+                dtot_final_CO2_emissions[new_key] = - gradient / self.carbonstorage_constraint_ref
 
         return dtot_final_CO2_emissions
 
@@ -222,13 +222,6 @@ class CCUS_Discipline(SoSWrapp):
         scaling_factor_energy_production = inputs_dict['scaling_factor_energy_production']
         scaling_factor_energy_consumption = inputs_dict['scaling_factor_energy_consumption']
 
-        sub_production_dict, sub_consumption_dict = {}, {}
-        for ccs in ccs_list:
-            sub_production_dict[ccs] = inputs_dict[f'{ccs}.{GlossaryEnergy.EnergyProductionValue}'] * \
-                                       scaling_factor_energy_production
-            sub_consumption_dict[ccs] = inputs_dict[f'{ccs}.{GlossaryEnergy.EnergyConsumptionValue}'] * \
-                                        scaling_factor_energy_consumption
-
         # -------------------------------#
         # ---Resource Demand gradients---#
         # -------------------------------#
@@ -246,8 +239,8 @@ class CCUS_Discipline(SoSWrapp):
         # --------------------------------#
 
         co2_emissions = self.get_sosdisc_outputs('co2_emissions_ccus')
-        self.ccus_model.configure_parameters_update(inputs_dict)
-        dtot_co2_emissions = self.ccus_model.compute_grad_CO2_emissions(co2_emissions)
+        # the gradients reuse the state of the model computed by run at the linearization point
+        dtot_co2_emissions = self.ccus_model.compute_grad_CO2_emissions()
 
         for key, value in dtot_co2_emissions.items():
             co2_emission_column = key.split(' vs ')[0]
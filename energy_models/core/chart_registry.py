@@ -0,0 +1,61 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+from energy_models.core.techno_type.compute_cache import compute_digest
+
+
+def compute_post_processing_digest(discipline):
+    """
+    Digest of the data read by the charts of a discipline : its inputs and outputs
+    """
+    return compute_digest(discipline.get_sosdisc_inputs(), discipline.get_sosdisc_outputs())
+
+
+class ChartRegistry:
+    """
+    Lazy registry of the post-processing charts of a discipline
+    The selected chart filters resolve to (key, factory) pairs and a factory is only called for a selected chart
+    Built charts are memoized by key until the digest of the discipline data changes
+    """
+
+    def __init__(self):
+        self.data_digest = None
+        self.charts = {}
+        self.nb_builds = 0
+
+    def get_charts(self, chart_factories, data_digest):
+        '''
+        Return the charts of the (key, factory) list in order, only the factories not memoized for data_digest are called
+        A factory returns a chart, a list of charts or None, None charts are dropped
+        '''
+        if data_digest != self.data_digest:
+            self.clear()
+            self.data_digest = data_digest
+
+        instanciated_charts = []
+        for key, factory in chart_factories:
+            if key not in self.charts:
+                self.nb_builds += 1
+                self.charts[key] = factory()
+            charts = self.charts[key]
+            if not isinstance(charts, list):
+                charts = [charts]
+            instanciated_charts.extend([chart for chart in charts if chart is not None])
+
+        return instanciated_charts
+
+    def clear(self):
+        self.charts.clear()
+        self.data_digest = None
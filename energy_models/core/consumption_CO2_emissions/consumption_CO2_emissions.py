@@ -52,12 +52,20 @@ class ConsumptionCO2Emissions(BaseStream):
         self.scaling_factor_energy_consumption = None
         self.energy_list = None
         self.ccs_list = None
+        self.element_list = None
         self.co2_per_use = None
         self.energy_production_detailed = None
+        # (element x CO2 column x year) CO2 produced by the energies and CCS streams, and mask of the columns found
+        self.co2_production = None
+        self.co2_production_mask = None
+        # (energy x CO2 column x year) CO2 consumed by the energies, and mask of the columns found
+        self.co2_consumption = None
+        self.co2_consumption_mask = None
+        # intermediates of the CO2 by use shared with the gradients
+        self.positive_net_production = None
+        self.dco2_by_use_dprod = None
         self.CO2_sources = None
         self.CO2_sinks = None
-        self.CO2_production = None
-        self.CO2_consumption = None
         self.CO2_sources_Gt = None
         self.CO2_sinks_Gt = None
 
@@ -78,6 +86,7 @@ class ConsumptionCO2Emissions(BaseStream):
     def configure_parameters_update(self, inputs_dict):
         '''
         Configure parameters with possible update (variables that does change during the run)
+        The CO2 columns of the productions and consumptions are unscaled into (element x CO2 column x year) arrays
         '''
 
         self.years = np.arange(
@@ -87,298 +96,141 @@ class ConsumptionCO2Emissions(BaseStream):
         self.scaling_factor_energy_consumption = inputs_dict['scaling_factor_energy_consumption']
         self.energy_list = inputs_dict[GlossaryEnergy.energy_list]
         self.ccs_list = inputs_dict[GlossaryEnergy.ccs_list]
+        self.element_list = self.energy_list + self.ccs_list
 
-        self.co2_per_use = pd.DataFrame(
-            {GlossaryEnergy.Years: self.years})
-        self.sub_production_dict = {}
-        self.sub_consumption_dict = {}
+        nb_years = len(self.years)
+        self.co2_per_use = np.array(
+            [inputs_dict[f'{energy}.{GlossaryEnergy.CO2PerUse}'][GlossaryEnergy.CO2PerUse].values
+             for energy in self.energy_list]).reshape(len(self.energy_list), nb_years)
 
-        for energy in self.energy_list:
-            self.co2_per_use[energy] = inputs_dict[f'{energy}.{GlossaryEnergy.CO2PerUse}'][GlossaryEnergy.CO2PerUse]
-            self.sub_production_dict[energy] = inputs_dict[f'{energy}.{GlossaryEnergy.EnergyProductionValue}'] * \
-                                               self.scaling_factor_energy_production
-            self.sub_consumption_dict[energy] = inputs_dict[f'{energy}.{GlossaryEnergy.EnergyConsumptionValue}'] * \
-                                                self.scaling_factor_energy_consumption
-
-        for energy in self.ccs_list:
-            self.sub_production_dict[energy] = inputs_dict[f'{energy}.{GlossaryEnergy.EnergyProductionValue}'] * \
-                                               self.scaling_factor_energy_production
+        self.co2_production, self.co2_production_mask = self.gather_co2_columns(
+            [inputs_dict[f'{element}.{GlossaryEnergy.EnergyProductionValue}'] for element in self.element_list],
+            self.scaling_factor_energy_production)
+        self.co2_consumption, self.co2_consumption_mask = self.gather_co2_columns(
+            [inputs_dict[f'{energy}.{GlossaryEnergy.EnergyConsumptionValue}'] for energy in self.energy_list],
+            self.scaling_factor_energy_consumption)
 
         self.energy_production_detailed = inputs_dict[GlossaryEnergy.EnergyProductionDetailedValue]
 
-    def compute_CO2_emissions(self):
-        '''
-        Compute CO2 total emissions
-        '''
-        # Initialize dataframes
-        self.CO2_sources = pd.DataFrame({GlossaryEnergy.Years: self.years})
-        self.CO2_sinks = pd.DataFrame({GlossaryEnergy.Years: self.years})
-        self.CO2_production = pd.DataFrame({GlossaryEnergy.Years: self.years})
-        self.CO2_consumption = pd.DataFrame({GlossaryEnergy.Years: self.years})
-
-        # Aggregate CO2 production and consumption columns from sub_production
-        # and sub_consumption df
-        for energy in self.energy_list:
-            # gather all production columns with a CO2 name in it
-            for col, production in self.sub_production_dict[energy].items():
-                if col in self.CO2_list:
-                    self.CO2_production[f'{energy} {col}'] = production.values
-            # gather all consumption columns with a CO2 name in it
-            for col, consumption in self.sub_consumption_dict[energy].items():
-                if col in self.CO2_list:
-                    self.CO2_consumption[f'{energy} {col}'] = consumption.values
-            # Compute the CO2 emitted during the use of the net energy
-            # If net energy is negative, CO2 by use is equals to zero
-            self.CO2_production[f'{energy} CO2 by use (Mt)'] = self.co2_per_use[energy] * np.maximum(
-                0.0, self.energy_production_detailed[f'production {energy} (TWh)'].values)
-
-        for energy in self.ccs_list:
-            for col, production in self.sub_production_dict[energy].items():
-                if col in self.CO2_list:
-                    self.CO2_production[f'{energy} {col}'] = production.values
-        ''' CO2 from energy mix    
-         CO2 expelled by energy mix technologies during the process 
-         i.e. for machinery or tractors 
+    def gather_co2_columns(self, dataframes, scaling_factor):
         '''
-        energy_producing_co2 = self.CO2_production[[
-            col for col in self.CO2_production if col.endswith(f'{CO2.name} (Mt)')]]
-        energy_producing_co2_list = [key.replace(
-            f' {CO2.name} (Mt)', '') for key in energy_producing_co2]
-        if len(energy_producing_co2_list) != 0:
-            self.CO2_sources[f'{CO2.name} from energy mix (Mt)'] = energy_producing_co2.sum(
-                axis=1).values
-        else:
-            self.CO2_sources[
-                f'{CO2.name} from energy mix (Mt)'] = 0.0
-
-        ''' CARBON CAPTURE from energy mix
-        Total carbon capture from energy mix if the technology offers carbon_capture
-         Ex : upgrading biogas technology is the same as Amine Scrubbing but
-         on a different gas (biogas for upgrading biogas and flue gas for
-         Amien scrubbing)
+        Gather the columns of CO2_list of each dataframe into a (dataframe x CO2 column x year) array
+        Missing columns are zeros and flagged False in the returned mask
         '''
-        energy_producing_carbon_capture = self.CO2_production[[
-            col for col in self.CO2_production if col.endswith(f'{CarbonCapture.name} (Mt)')]]
-        energy_producing_carbon_capture_list = [key.replace(
-            f' {CarbonCapture.name} (Mt)', '') for key in energy_producing_carbon_capture]
-        if len(energy_producing_carbon_capture_list) != 0:
-            self.CO2_sources[f'{CarbonCapture.name} from energy mix (Mt)'] = energy_producing_carbon_capture.sum(
-                axis=1).values
-        else:
-            self.CO2_sources[
-                f'{CarbonCapture.name} from energy mix (Mt)'] = 0.0
+        found_columns = [(index, column_index, dataframe[column].values * scaling_factor)
+                         for index, dataframe in enumerate(dataframes)
+                         for column_index, column in enumerate(self.CO2_list) if column in dataframe.columns]
+        # complex as soon as one of the columns is (complex step)
+        dtype = np.result_type(np.float64, *[values.dtype for _, _, values in found_columns])
+        co2_columns = np.zeros((len(dataframes), len(self.CO2_list), len(self.years)), dtype=dtype)
+        mask = np.zeros(co2_columns.shape[:2], dtype=bool)
+        for index, column_index, values in found_columns:
+            co2_columns[index, column_index] = values
+            mask[index, column_index] = True
+        return co2_columns, mask
 
-        ''' CO2 removed by energy mix
-         CO2 removed by energy mix technologies during the process 
-         i.e. biomass processes as managed wood or crop energy
+    def get_co2_column(self, co2_columns, column):
         '''
-        energy_removing_co2 = self.CO2_consumption[[
-            col for col in self.CO2_consumption if col.endswith(f'{CO2.name} (Mt)')]]
-        energy_removing_co2_list = [key.replace(
-            f' {CO2.name} (Mt)', '') for key in energy_removing_co2]
-        if len(energy_removing_co2_list) != 0:
-            self.CO2_sinks[f'{CO2.name} removed by energy mix (Mt)'] = energy_removing_co2.sum(
-                axis=1).values
-        else:
-            self.CO2_sinks[
-                f'{CO2.name} removed by energy mix (Mt)'] = 0.0
-
-        '''Total CO2 by use 
-        which is the sum of all CO2 emissions emitted by use of net energy production
+        (element x year) slice of a gathered CO2 array
         '''
-        self.CO2_sources[f'Total CO2 by use (Mt)'] = self.CO2_production[[
-            col for col in self.CO2_production if col.endswith(f'CO2 by use (Mt)')]].sum(axis=1)
+        return co2_columns[:, self.CO2_list.index(column)]
 
-        ''' Total C02 from Flue gas 
-            sum of all production of flue gas
-            it could be equal to carbon capture from CC technos if enough investment but not sure
+    def compute_CO2_emissions(self):
         '''
-        self.CO2_sources[f'Total {CarbonCapture.flue_gas_name} (Mt)'] = self.CO2_production[[
-            col for col in self.CO2_production if col.endswith(f'{CarbonCapture.flue_gas_name} (Mt)')]].sum(axis=1)
+        Compute CO2 total emissions
+        The intermediates of the CO2 by use are stored for the gradients
+        '''
+        # Compute the CO2 emitted during the use of the net energy
+        # If net energy is negative, CO2 by use is equals to zero
+        net_production = np.array(
+            [self.energy_production_detailed[f'production {energy} (TWh)'].values for energy in self.energy_list]
+        ).reshape(len(self.energy_list), len(self.years))
+        self.positive_net_production = np.maximum(0.0, net_production)
+        # Specific case when net prod is equal to zero
+        # if we increase the prod of an energy the net prod will react
+        # however if we decrease the cons it does nothing
+        self.dco2_by_use_dprod = self.co2_per_use * np.maximum(
+            0, np.sign(np.where(net_production == 0, 1, net_production)))
+        co2_by_use = self.co2_per_use * self.positive_net_production
+
+        self.CO2_sources = pd.DataFrame(
+            {GlossaryEnergy.Years: self.years,
+             # CO2 from energy mix
+             # CO2 expelled by energy mix technologies during the process
+             # i.e. for machinery or tractors
+             f'{CO2.name} from energy mix (Mt)': self.get_co2_column(
+                 self.co2_production, f'{CO2.name} (Mt)').sum(axis=0),
+             # CARBON CAPTURE from energy mix
+             # Total carbon capture from energy mix if the technology offers carbon_capture
+             # Ex : upgrading biogas technology is the same as Amine Scrubbing but
+             # on a different gas (biogas for upgrading biogas and flue gas for
+             # Amien scrubbing)
+             f'{CarbonCapture.name} from energy mix (Mt)': self.get_co2_column(
+                 self.co2_production, f'{CarbonCapture.name} (Mt)').sum(axis=0),
+             # Total CO2 by use
+             # which is the sum of all CO2 emissions emitted by use of net energy production
+             'Total CO2 by use (Mt)': co2_by_use.sum(axis=0),
+             # Total C02 from Flue gas
+             # sum of all production of flue gas
+             # it could be equal to carbon capture from CC technos if enough investment but not sure
+             f'Total {CarbonCapture.flue_gas_name} (Mt)': self.get_co2_column(
+                 self.co2_production, f'{CarbonCapture.flue_gas_name} (Mt)').sum(axis=0)})
+
+        # CO2 removed by energy mix
+        # CO2 removed by energy mix technologies during the process
+        # i.e. biomass processes as managed wood or crop energy
+        self.CO2_sinks = pd.DataFrame(
+            {GlossaryEnergy.Years: self.years,
+             f'{CO2.name} removed by energy mix (Mt)': self.get_co2_column(
+                 self.co2_consumption, f'{CO2.name} (Mt)').sum(axis=0)})
 
         # update values to Gt
         self.CO2_sources_Gt = pd.DataFrame(
-            {GlossaryEnergy.Years: self.CO2_sources[GlossaryEnergy.Years]})
+            {GlossaryEnergy.Years: self.years,
+             **{column.replace('(Mt)', '(Gt)'): self.CO2_sources[column].values / 1e3
+                for column in self.CO2_sources.columns if column != GlossaryEnergy.Years}})
         self.CO2_sinks_Gt = pd.DataFrame(
-            {GlossaryEnergy.Years: self.CO2_sinks[GlossaryEnergy.Years]})
-
-        for column_df in self.CO2_sources.columns:
-            if column_df != GlossaryEnergy.Years:
-                self.CO2_sources_Gt[column_df.replace(
-                    '(Mt)', '(Gt)')] = self.CO2_sources[column_df] / 1e3
-
-        for column_df in self.CO2_sinks.columns:
-            if column_df != GlossaryEnergy.Years:
-                self.CO2_sinks_Gt[column_df.replace(
-                    'Mt', 'Gt')] = self.CO2_sinks[column_df] / 1e3
+            {GlossaryEnergy.Years: self.years,
+             **{column.replace('Mt', 'Gt'): self.CO2_sinks[column].values / 1e3
+                for column in self.CO2_sinks.columns if column != GlossaryEnergy.Years}})
 
         return self.CO2_sources_Gt, self.CO2_sinks_Gt
 
-    # , co2_emissions):
-    def compute_grad_CO2_emissions_sources(self, net_production):
+    def get_unit_gradients(self, mask, elements, column, key_format):
         '''
-        Compute CO2 total emissions
+        Unit gradients of a sum over the elements producing (or consuming) a CO2 column
         '''
-        # Initialize dataframes
-        len_years = len(self.years)
-
-        co2_production = pd.DataFrame({GlossaryEnergy.Years: self.years})
-        co2_consumption = pd.DataFrame({GlossaryEnergy.Years: self.years})
-
-        dtot_CO2_emissions = {}
-        # Do not loop over carbon capture and carbon storage which will be
-        # handled differently
-        for energy in self.energy_list:
-
-            # gather all production columns with a CO2 name in it
-            for col, production in self.sub_production_dict[energy].items():
-                if col in self.CO2_list:
-                    co2_production[f'{energy} {col}'] = production.values
-            # gather all consumption columns with a CO2 name in it
-            for col, consumption in self.sub_consumption_dict[energy].items():
-                if col in self.CO2_list:
-                    co2_consumption[f'{energy} {col}'] = consumption.values
-
-            # Compute the CO2 emitted during the use of the net energy
-            # If net energy is negative, CO2 by use is equals to zero
-            net_prod = net_production[
-                f'production {energy} (TWh)'].values
-
-            dtot_CO2_emissions[f'Total CO2 by use (Gt) vs {energy}#co2_per_use'] = np.maximum(
-                0, net_prod)
+        column_mask = mask[:, self.CO2_list.index(column)]
+        return {key_format.format(elements[index]): np.ones(len(self.years))
+                for index in np.flatnonzero(column_mask)}
 
-            # Specific case when net prod is equal to zero
-            # if we increase the prod of an energy the net prod will react
-            # however if we decrease the cons it does nothing
-            net_prod_sign = net_prod.copy()
-            net_prod_sign[net_prod_sign == 0] = 1
-            dtot_CO2_emissions[f'Total CO2 by use (Gt) vs {energy}#prod'] = self.co2_per_use[energy].values * \
-                                                                            np.maximum(0, np.sign(net_prod_sign))
-
-        for energy in self.ccs_list:
-            for col, production in self.sub_production_dict[energy].items():
-                if col in self.CO2_list:
-                    co2_production[f'{energy} {col}'] = production.values
-
-        ''' CARBON CAPTURE from energy mix
-        Total carbon capture from energy mix if the technology offers carbon_capture
-         Ex : upgrading biogas technology is the same as Amine Scrubbing but
-         on a different gas (biogas for upgrading biogas and flue gas for
-         Amine scrubbing)
-        '''
-        energy_producing_carbon_capture = co2_production[[
-            col for col in co2_production if col.endswith(f'{CarbonCapture.name} (Mt)')]]
-        energy_producing_carbon_capture_list = [key.replace(
-            f' {CarbonCapture.name} (Mt)', '') for key in energy_producing_carbon_capture]
-        if len(energy_producing_carbon_capture_list) != 0:
-            for energy1 in energy_producing_carbon_capture_list:
-                dtot_CO2_emissions[
-                    f'{CarbonCapture.name} from energy mix (Gt) vs {energy1}#{CarbonCapture.name} (Mt)#prod'] = np.ones(
-                    len_years)
-        #             self.total_co2_emissions[f'{CarbonCapture.name} from energy mix (Mt)'] = energy_producing_carbon_capture.sum(
-        #                 axis=1).values
-        #         else:
-        #             self.total_co2_emissions[
-        #                 f'{CarbonCapture.name} from energy mix (Mt)'] = 0.0
-
-        ''' CO2 from energy mix       
-         CO2 expelled by energy mix technologies during the process 
-         i.e. for machinery or tractors 
-        '''
-        energy_producing_co2 = co2_production[[
-            col for col in co2_production if col.endswith(f'{CO2.name} (Mt)')]]
-        energy_producing_co2_list = [key.replace(
-            f' {CO2.name} (Mt)', '') for key in energy_producing_co2]
-        if len(energy_producing_co2_list) != 0:
-            for energy1 in energy_producing_co2_list:
-                dtot_CO2_emissions[
-                    f'{CO2.name} from energy mix (Gt) vs {energy1}#{CO2.name} (Mt)#prod'] = np.ones(len_years)
-
-        #             self.total_co2_emissions[f'{CO2.name} from energy mix (Mt)'] = energy_producing_co2.sum(
-        #                 axis=1).values
-        #         else:
-        #             self.total_co2_emissions[
-        #                 f'{CO2.name} from energy mix (Mt)'] = 0.0
-
-        ''' CO2 removed by energy mix       
-         CO2 removed by energy mix technologies during the process 
-         i.e. biomass processes as managed wood or crop energy
+    def compute_grad_CO2_emissions_sources(self):
         '''
-        energy_removing_co2 = co2_consumption[[
-            col for col in co2_consumption if col.endswith(f'{CO2.name} (Mt)')]]
-        energy_removing_co2_list = [key.replace(
-            f' {CO2.name} (Mt)', '') for key in energy_removing_co2]
-        if len(energy_removing_co2_list) != 0:
-            for energy1 in energy_removing_co2_list:
-                dtot_CO2_emissions[
-                    f'{CO2.name} removed by energy mix (Gt) vs {energy1}#{CO2.name} (Mt)#cons'] = np.ones(len_years)
-        #             self.total_co2_emissions[f'{CO2.name} removed by energy mix (Mt)'] = energy_removing_co2.sum(
-        #                 axis=1).values
-        #         else:
-        #             self.total_co2_emissions[
-        #                 f'{CO2.name} removed energy mix (Mt)'] = 0.0
-
-        ''' Total C02 from Flue gas
-            sum of all production of flue gas 
-            it could be equal to carbon capture from CC technos if enough investment but not sure
+        Compute CO2 total emissions gradients from the intermediates stored by compute_CO2_emissions
         '''
-        #         self.total_co2_emissions[f'Total {CarbonCapture.flue_gas_name} (Mt)'] = self.co2_production[[
-        # col for col in self.co2_production if
-        # col.endswith(f'{CarbonCapture.flue_gas_name} (Mt)')]].sum(axis=1)
-        for col in co2_production:
-            if col.endswith(f'{CarbonCapture.flue_gas_name} (Mt)'):
-                energy1 = col.replace(
-                    f' {CarbonCapture.flue_gas_name} (Mt)', '')
-                dtot_CO2_emissions[
-                    f'Total {CarbonCapture.flue_gas_name} (Gt) vs {energy1}#{CarbonCapture.flue_gas_name} (Mt)#prod'] = np.ones(
-                    len_years)
+        dtot_CO2_emissions = {}
+        for energy_index, energy in enumerate(self.energy_list):
+            dtot_CO2_emissions[f'Total CO2 by use (Gt) vs {energy}#co2_per_use'] = self.positive_net_production[
+                energy_index]
+            dtot_CO2_emissions[f'Total CO2 by use (Gt) vs {energy}#prod'] = self.dco2_by_use_dprod[energy_index]
+
+        dtot_CO2_emissions.update(self.get_unit_gradients(
+            self.co2_production_mask, self.element_list, f'{CarbonCapture.name} (Mt)',
+            f'{CarbonCapture.name} from energy mix (Gt) vs {{}}#{CarbonCapture.name} (Mt)#prod'))
+        dtot_CO2_emissions.update(self.get_unit_gradients(
+            self.co2_production_mask, self.element_list, f'{CO2.name} (Mt)',
+            f'{CO2.name} from energy mix (Gt) vs {{}}#{CO2.name} (Mt)#prod'))
+        dtot_CO2_emissions.update(self.compute_grad_CO2_emissions_sinks())
+        dtot_CO2_emissions.update(self.get_unit_gradients(
+            self.co2_production_mask, self.element_list, f'{CarbonCapture.flue_gas_name} (Mt)',
+            f'Total {CarbonCapture.flue_gas_name} (Gt) vs {{}}#{CarbonCapture.flue_gas_name} (Mt)#prod'))
 
         return dtot_CO2_emissions
 
-    # , co2_emissions):
     def compute_grad_CO2_emissions_sinks(self):
         '''
-        Compute CO2 total emissions
+        Compute CO2 total emissions gradients
         '''
-        # Initialize dataframes
-        len_years = len(self.years)
-
-        co2_production = pd.DataFrame({GlossaryEnergy.Years: self.years})
-        co2_consumption = pd.DataFrame({GlossaryEnergy.Years: self.years})
-
-        dtot_CO2_emissions = {}
-        # Do not loop over carbon capture and carbon storage which will be
-        # handled differently
-        for energy in self.energy_list:
-
-            # gather all production columns with a CO2 name in it
-            for col, production in self.sub_production_dict[energy].items():
-                if col in self.CO2_list:
-                    co2_production[f'{energy} {col}'] = production.values
-            # gather all consumption columns with a CO2 name in it
-            for col, consumption in self.sub_consumption_dict[energy].items():
-                if col in self.CO2_list:
-                    co2_consumption[f'{energy} {col}'] = consumption.values
-
-            # Compute the CO2 emitted during the use of the net energy
-            # If net energy is negative, CO2 by use is equals to zero
-
-        ''' CO2 removed by energy mix       
-         CO2 removed by energy mix technologies during the process 
-         i.e. biomass processes as managed wood or crop energy
-        '''
-        energy_removing_co2 = co2_consumption[[
-            col for col in co2_consumption if col.endswith(f'{CO2.name} (Mt)')]]
-        energy_removing_co2_list = [key.replace(
-            f' {CO2.name} (Mt)', '') for key in energy_removing_co2]
-        if len(energy_removing_co2_list) != 0:
-            for energy1 in energy_removing_co2_list:
-                dtot_CO2_emissions[
-                    f'{CO2.name} removed by energy mix (Gt) vs {energy1}#{CO2.name} (Mt)#cons'] = np.ones(len_years)
-        #             self.total_co2_emissions[f'{CO2.name} removed by energy mix (Mt)'] = energy_removing_co2.sum(
-        #                 axis=1).values
-        #         else:
-        #             self.total_co2_emissions[
-        #                 f'{CO2.name} removed energy mix (Mt)'] = 0.0
-
-        return dtot_CO2_emissions
+        return self.get_unit_gradients(
+            self.co2_consumption_mask, self.energy_list, f'{CO2.name} (Mt)',
+            f'{CO2.name} removed by energy mix (Gt) vs {{}}#{CO2.name} (Mt)#cons')
@@ -222,14 +222,12 @@ class ConsumptionCO2EmissionsDiscipline(SoSWrapp):
         scaling_factor_energy_consumption = inputs_dict['scaling_factor_energy_consumption']
         CO2_emissions_by_use_sources = outputs_dict['CO2_emissions_by_use_sources']
         CO2_emissions_by_use_sinks = outputs_dict['CO2_emissions_by_use_sinks']
-        energy_production_detailed = self.get_sosdisc_inputs(
-            GlossaryEnergy.EnergyProductionDetailedValue)
 
         # ------------------------------------#
         # -- CO2 emissions sources gradients--#
         # ------------------------------------#
-        dtot_co2_emissions_sources = self.model.compute_grad_CO2_emissions_sources(
-            energy_production_detailed)
+        # the gradients reuse the intermediates stored by the model during the run
+        dtot_co2_emissions_sources = self.model.compute_grad_CO2_emissions_sources()
 
         for key, value in dtot_co2_emissions_sources.items():
             co2_emission_column = key.split(' vs ')[0]
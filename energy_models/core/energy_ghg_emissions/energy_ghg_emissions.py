@@ -46,6 +46,11 @@ class EnergyGHGEmissions(BaseStream):
                 f'{Carbon.name} {ghg_input_unit}']
 
     GHG_TYPE_LIST = GHGEmissions.GHG_TYPE_LIST
+    # Categories of the GHG emissions accumulator : the CO2 columns of the productions,
+    # the direct emissions of a GHG by the productions ({ghg} (Mt) columns) and the emissions by use of the energies
+    EMISSIONS = 'emissions'
+    BY_USE = 'by use'
+    GHG_CATEGORY_LIST = CO2_list + [EMISSIONS, BY_USE]
 
     def __init__(self, name):
         super().__init__(name)
@@ -57,14 +62,26 @@ class EnergyGHGEmissions(BaseStream):
         self.gwp_100 = None
         self.energy_list = None
         self.ccs_list = None
-        self.ghg_per_use_dict = None
+        self.element_list = None
+        self.ghg_index = None
+        self.element_index = None
+        self.category_index = None
+        self.ghg_emission_columns = {f'{ghg} {self.ghg_input_unit}': ghg for ghg in self.GHG_TYPE_LIST}
+        self.ghg_per_use = None
         self.energy_production_detailed = None
         self.co2_emissions_needed_by_energy_mix = None
         self.co2_emissions_ccus_Gt = None
         self.CO2_sources = None
         self.CO2_sinks = None
+        # (ghg x element x category x year) accumulator of the GHG emissions and mask of its filled cells
+        self.ghg_emissions = None
+        self.ghg_emissions_mask = None
+        # (ghg, element, category) cells of the accumulator in the order of the GHG_emissions_per_energy columns
+        self.ghg_emissions_cells = None
+        # (energy x CO2 column x year) accumulator of the CO2 consumed by the energies and mask of its filled cells
+        self.co2_consumption = None
+        self.co2_consumption_mask = None
         self.ghg_production_dict = None
-        self.CO2_consumption = None
         self.ghg_sources = None
         self.ghg_total_emissions = None
         self.gwp_emissions = None
@@ -83,45 +100,82 @@ class EnergyGHGEmissions(BaseStream):
         self.gwp_20 = inputs_dict['GHG_global_warming_potential20']
         self.gwp_100 = inputs_dict['GHG_global_warming_potential100']
 
+    def configure_ghg_axes(self):
+        '''
+        Build the axes of the GHG emissions accumulator from the GHG, energy and CCS lists
+        Elements are the energies followed by the CCS streams
+        '''
+        self.element_list = self.energy_list + self.ccs_list
+        self.ghg_index = {ghg: index for index, ghg in enumerate(self.GHG_TYPE_LIST)}
+        self.element_index = {element: index for index, element in enumerate(self.element_list)}
+        self.category_index = {category: index for index, category in enumerate(self.GHG_CATEGORY_LIST)}
+
     def configure_parameters_update(self, inputs_dict):
         '''
         Configure parameters with possible update (variables that does change during the run)
+        The productions and consumptions are unscaled column by column into the accumulators
         '''
 
         self.energy_list = inputs_dict[GlossaryEnergy.energy_list]
         self.ccs_list = inputs_dict[GlossaryEnergy.ccs_list]
-
-        self.ghg_per_use_dict = {ghg: pd.DataFrame(
-            {GlossaryEnergy.Years: self.years}) for ghg in self.GHG_TYPE_LIST}
-        self.sub_production_dict = {}
-        self.sub_consumption_dict = {}
-
-        for energy in self.energy_list:
-            if energy == GlossaryEnergy.biomass_dry:
-
-                for ghg in self.GHG_TYPE_LIST:
-                    self.ghg_per_use_dict[ghg][energy] = inputs_dict[
-                        f'{AgricultureMixDiscipline.name}.{ghg}_per_use'][f'{ghg}_per_use'].values
-
-                self.sub_production_dict[energy] = inputs_dict[
-                                                       f'{AgricultureMixDiscipline.name}.{GlossaryEnergy.EnergyProductionValue}'] * \
-                                                   self.scaling_factor_energy_production
-                self.sub_consumption_dict[energy] = inputs_dict[
-                                                        f'{AgricultureMixDiscipline.name}.{GlossaryEnergy.EnergyConsumptionValue}'] * \
-                                                    self.scaling_factor_energy_consumption
-            else:
-                for ghg in self.GHG_TYPE_LIST:
-                    self.ghg_per_use_dict[ghg][energy] = inputs_dict[
-                        f'{energy}.{ghg}_per_use'][f'{ghg}_per_use'].values
-
-                self.sub_production_dict[energy] = inputs_dict[f'{energy}.{GlossaryEnergy.EnergyProductionValue}'] * \
-                                                   self.scaling_factor_energy_production
-                self.sub_consumption_dict[energy] = inputs_dict[f'{energy}.{GlossaryEnergy.EnergyConsumptionValue}'] * \
-                                                    self.scaling_factor_energy_consumption
-
-        for energy in self.ccs_list:
-            self.sub_production_dict[energy] = inputs_dict[f'{energy}.{GlossaryEnergy.EnergyProductionValue}'] * \
-                                               self.scaling_factor_energy_production
+        if self.element_list != self.energy_list + self.ccs_list:
+            self.configure_ghg_axes()
+
+        nb_ghg, nb_energies, nb_years = len(self.GHG_TYPE_LIST), len(self.energy_list), len(self.years)
+        self.ghg_per_use = np.array([[inputs_dict[f'{self.get_input_namespace(energy)}.{ghg}_per_use'][
+                                          f'{ghg}_per_use'].values for energy in self.energy_list]
+                                     for ghg in self.GHG_TYPE_LIST]).reshape(nb_ghg, nb_energies, nb_years)
+
+        co2_index = self.ghg_index['CO2']
+        by_use_index = self.category_index[self.BY_USE]
+        production_cells, production_values = [], []
+        consumption_cells, consumption_values = [], []
+        self.ghg_emissions_cells = []
+        for element_index, element in enumerate(self.element_list):
+            production = inputs_dict[f'{self.get_input_namespace(element)}.{GlossaryEnergy.EnergyProductionValue}']
+            for column in production.columns:
+                # gather all production columns with a CO2 name in it and the direct GHG emissions
+                if column in self.CO2_list:
+                    cell = (co2_index, element_index, self.category_index[column])
+                elif column in self.ghg_emission_columns:
+                    cell = (self.ghg_index[self.ghg_emission_columns[column]], element_index,
+                            self.category_index[self.EMISSIONS])
+                else:
+                    continue
+                production_cells.append(cell)
+                production_values.append(production[column].values)
+                self.ghg_emissions_cells.append(cell)
+
+            if element_index < nb_energies:
+                self.ghg_emissions_cells.extend(
+                    [(ghg_index, element_index, by_use_index) for ghg_index in range(nb_ghg)])
+                # gather all consumption columns with a CO2 name in it
+                # other green house gases are not consumed in energy mix for now
+                consumption = inputs_dict[
+                    f'{self.get_input_namespace(element)}.{GlossaryEnergy.EnergyConsumptionValue}']
+                for column in consumption.columns:
+                    if column in self.CO2_list:
+                        consumption_cells.append((element_index, self.CO2_list.index(column)))
+                        consumption_values.append(consumption[column].values)
+
+        production_values = np.array(production_values).reshape(len(production_cells), nb_years) * \
+                            self.scaling_factor_energy_production
+        consumption_values = np.array(consumption_values).reshape(len(consumption_cells), nb_years) * \
+                             self.scaling_factor_energy_consumption
+
+        self.ghg_emissions = np.zeros((nb_ghg, len(self.element_list), len(self.GHG_CATEGORY_LIST), nb_years),
+                                      dtype=np.result_type(production_values, self.ghg_per_use))
+        self.ghg_emissions_mask = np.zeros(self.ghg_emissions.shape[:3], dtype=bool)
+        if production_cells:
+            self.ghg_emissions[tuple(np.transpose(production_cells))] = production_values
+            self.ghg_emissions_mask[tuple(np.transpose(production_cells))] = True
+        self.ghg_emissions_mask[:, :nb_energies, by_use_index] = True
+
+        self.co2_consumption = np.zeros((nb_energies, len(self.CO2_list), nb_years), dtype=consumption_values.dtype)
+        self.co2_consumption_mask = np.zeros(self.co2_consumption.shape[:2], dtype=bool)
+        if consumption_cells:
+            self.co2_consumption[tuple(np.transpose(consumption_cells))] = consumption_values
+            self.co2_consumption_mask[tuple(np.transpose(consumption_cells))] = True
 
         self.energy_production_detailed = inputs_dict[GlossaryEnergy.EnergyProductionDetailedValue]
 
@@ -129,32 +183,45 @@ class EnergyGHGEmissions(BaseStream):
 
         self.co2_emissions_ccus_Gt = inputs_dict['co2_emissions_ccus_Gt']
 
-        self.init_dataframe_dict()
-
-    def init_dataframe_dict(self):
-        # Initialize dataframes
-        self.CO2_sources = pd.DataFrame({GlossaryEnergy.Years: self.years})
-        self.CO2_sinks = pd.DataFrame({GlossaryEnergy.Years: self.years})
-        self.ghg_production_dict = {ghg: pd.DataFrame(
-            {GlossaryEnergy.Years: self.years}) for ghg in self.GHG_TYPE_LIST}
-        self.CO2_consumption = pd.DataFrame({GlossaryEnergy.Years: self.years})
-        self.ghg_sources = pd.DataFrame({GlossaryEnergy.Years: self.years})
-        self.ghg_total_emissions = pd.DataFrame({GlossaryEnergy.Years: self.years})
-        self.gwp_emissions = pd.DataFrame({GlossaryEnergy.Years: self.years})
+    @staticmethod
+    def get_input_namespace(element):
+        '''
+        Biomass dry inputs are given by the agriculture mix
+        '''
+        if element == GlossaryEnergy.biomass_dry:
+            return AgricultureMixDiscipline.name
+        return element
 
-    def compute_ghg_emissions(self):
+    def get_ghg_emissions_column(self, ghg, element, category):
         '''
-        Compute GHG total emissions
+        Name of the GHG_emissions_per_energy column of a cell of the accumulator
         '''
+        if category == self.EMISSIONS:
+            return f'{element} {ghg} {self.ghg_input_unit}'
+        if category == self.BY_USE:
+            return f'{element} {ghg} by use {self.ghg_input_unit}'
+        return f'{element} {category}'
 
-        # Aggregate CO2 production and consumption columns from sub_production
-        # and sub_consumption df
-        for energy in self.energy_list:
-            self.aggregate_all_ghg_emissions_in_energy(energy)
-            self.compute_ghg_emissions_by_use(energy)
+    def has_ghg_emissions(self, ghg, element, category):
+        '''
+        True if the cell of the accumulator is filled by the inputs
+        '''
+        return bool(self.ghg_emissions_mask[self.ghg_index[ghg], self.element_index[element],
+                                            self.category_index[category]])
 
-        for ccs_name in self.ccs_list:
-            self.aggregate_all_ghg_emissions_in_energy(ccs_name)
+    def get_net_production(self, net_production):
+        '''
+        (energy x year) matrix of the net production of the energies
+        '''
+        return np.array([net_production[f'production {energy} (TWh)'].values for energy in self.energy_list]
+                        ).reshape(len(self.energy_list), len(self.years))
+
+    def compute_ghg_emissions(self):
+        '''
+        Compute GHG total emissions
+        '''
+        self.compute_ghg_emissions_by_use()
+        self.build_ghg_production_dict()
 
         self.sum_ghg_emissions_by_use()
         self.compute_other_co2_emissions()
@@ -162,133 +229,89 @@ class EnergyGHGEmissions(BaseStream):
         self.compute_total_ghg_emissions()
         self.compute_gwp()
 
+    def compute_ghg_emissions_by_use(self):
+        # Compute the CO2 emitted during the use of the net energy
+        # If net energy is negative, CO2 by use is equals to zero
+        nb_energies = len(self.energy_list)
+        self.ghg_emissions[:, :nb_energies, self.category_index[self.BY_USE]] = self.ghg_per_use * np.maximum(
+            0.0, self.get_net_production(self.energy_production_detailed))
+
+    def build_ghg_production_dict(self):
+        '''
+        GHG emissions per energy in Mt : one dataframe per GHG with a column per filled cell of the accumulator
+        '''
+        ghg_columns = {ghg: {GlossaryEnergy.Years: self.years} for ghg in self.GHG_TYPE_LIST}
+        for ghg_index, element_index, category_index in self.ghg_emissions_cells:
+            ghg = self.GHG_TYPE_LIST[ghg_index]
+            column = self.get_ghg_emissions_column(ghg, self.element_list[element_index],
+                                                   self.GHG_CATEGORY_LIST[category_index])
+            ghg_columns[ghg][column] = self.ghg_emissions[ghg_index, element_index, category_index]
+        self.ghg_production_dict = {ghg: pd.DataFrame(columns) for ghg, columns in ghg_columns.items()}
+
     def sum_ghg_emissions_by_use(self):
         '''Total CO2 by use 
         which is the sum of all CO2 emissions emitted by use of net energy production
         '''
-        for ghg in self.GHG_TYPE_LIST:
-            self.ghg_sources[f'Total {ghg} by use {self.ghg_input_unit}'] = self.ghg_production_dict[ghg][[
-                col for col in self.ghg_production_dict[ghg] if
-                col.endswith(f'{ghg} by use {self.ghg_input_unit}')]].sum(axis=1)
+        total_by_use = self.ghg_emissions[:, :, self.category_index[self.BY_USE]].sum(axis=1)
+        self.ghg_sources = pd.DataFrame(
+            {GlossaryEnergy.Years: self.years,
+             **{f'Total {ghg} by use {self.ghg_input_unit}': total_by_use[ghg_index]
+                for ghg_index, ghg in enumerate(self.GHG_TYPE_LIST)}})
 
     def compute_other_co2_emissions(self):
         ''' CO2 from energy mix    
          CO2 expelled by energy mix technologies during the process 
          i.e. for machinery or tractors 
-        '''
-        energy_producing_co2 = self.ghg_production_dict['CO2'][[
-            col for col in self.ghg_production_dict['CO2'] if col.endswith(f'{CO2.name} {self.ghg_input_unit}')]]
-        energy_producing_co2_list = [key.replace(
-            f' {CO2.name} {self.ghg_input_unit}', '') for key in energy_producing_co2]
-        if len(energy_producing_co2_list) != 0:
-            self.CO2_sources[f'{CO2.name} from energy mix {self.ghg_input_unit}'] = energy_producing_co2.sum(
-                axis=1).values
-        else:
-            self.CO2_sources[
-                f'{CO2.name} from energy mix {self.ghg_input_unit}'] = 0.0
 
-        ''' CARBON CAPTURE from energy mix
-        Total carbon capture from energy mix if the technology offers carbon_capture
+         CARBON CAPTURE from energy mix
+         Total carbon capture from energy mix if the technology offers carbon_capture
          Ex : upgrading biogas technology is the same as Amine Scrubbing but
          on a different gas (biogas for upgrading biogas and flue gas for
          Amien scrubbing)
+
+         Total C02 from Flue gas 
+            sum of all production of flue gas
+            it could be equal to carbon capture from CC technos if enough investment but not sure
         '''
-        energy_producing_carbon_capture = self.ghg_production_dict['CO2'][[
-            col for col in self.ghg_production_dict['CO2'] if
-            col.endswith(f'{CarbonCapture.name} {self.ghg_input_unit}')]]
-        energy_producing_carbon_capture_list = [key.replace(
-            f' {CarbonCapture.name} {self.ghg_input_unit}', '') for key in energy_producing_carbon_capture]
-        if len(energy_producing_carbon_capture_list) != 0:
-            self.CO2_sources[
-                f'{CarbonCapture.name} from energy mix {self.ghg_input_unit}'] = energy_producing_carbon_capture.sum(
-                axis=1).values
-        else:
-            self.CO2_sources[
-                f'{CarbonCapture.name} from energy mix {self.ghg_input_unit}'] = 0.0
+        co2_production = self.ghg_emissions[self.ghg_index['CO2']]
+        self.CO2_sources = pd.DataFrame(
+            {GlossaryEnergy.Years: self.years,
+             f'{CO2.name} from energy mix {self.ghg_input_unit}': co2_production[
+                 :, self.category_index[f'{CO2.name} {self.ghg_input_unit}']].sum(axis=0),
+             f'{CarbonCapture.name} from energy mix {self.ghg_input_unit}': co2_production[
+                 :, self.category_index[f'{CarbonCapture.name} {self.ghg_input_unit}']].sum(axis=0),
+             f'Total {CarbonCapture.flue_gas_name} {self.ghg_input_unit}': co2_production[
+                 :, self.category_index[f'{CarbonCapture.flue_gas_name} {self.ghg_input_unit}']].sum(axis=0)})
 
         ''' CO2 removed by energy mix
          CO2 removed by energy mix technologies during the process 
          i.e. biomass processes as managed wood or crop energy
         '''
-        energy_removing_co2 = self.CO2_consumption[[
-            col for col in self.CO2_consumption if col.endswith(f'{CO2.name} {self.ghg_input_unit}')]]
-        energy_removing_co2_list = [key.replace(
-            f' {CO2.name} {self.ghg_input_unit}', '') for key in energy_removing_co2]
-        if len(energy_removing_co2_list) != 0:
-            self.CO2_sinks[f'{CO2.name} removed by energy mix {self.ghg_input_unit}'] = energy_removing_co2.sum(
-                axis=1).values
-        else:
-            self.CO2_sinks[
-                f'{CO2.name} removed by energy mix {self.ghg_input_unit}'] = 0.0
-
-        ''' Total C02 from Flue gas 
-            sum of all production of flue gas
-            it could be equal to carbon capture from CC technos if enough investment but not sure
-        '''
-        self.CO2_sources[f'Total {CarbonCapture.flue_gas_name} {self.ghg_input_unit}'] = \
-        self.ghg_production_dict['CO2'][[
-            col for col in self.ghg_production_dict['CO2'] if
-            col.endswith(f'{CarbonCapture.flue_gas_name} {self.ghg_input_unit}')]].sum(axis=1)
+        self.CO2_sinks = pd.DataFrame(
+            {GlossaryEnergy.Years: self.years,
+             f'{CO2.name} removed by energy mix {self.ghg_input_unit}': self.co2_consumption[
+                 :, self.CO2_list.index(f'{CO2.name} {self.ghg_input_unit}')].sum(axis=0)})
 
     def update_emissions_in_gt(self):
-        # update values to Gt
+        # update values to Gt, the column names are kept
         self.CO2_sources_Gt = pd.DataFrame(
-            {GlossaryEnergy.Years: self.CO2_sources[GlossaryEnergy.Years]})
+            {GlossaryEnergy.Years: self.years,
+             **{column: self.CO2_sources[column].values / 1e3 for column in self.CO2_sources.columns
+                if column != GlossaryEnergy.Years}})
         self.CO2_sinks_Gt = pd.DataFrame(
-            {GlossaryEnergy.Years: self.CO2_sinks[GlossaryEnergy.Years]})
-
-        for column_df in self.CO2_sources.columns:
-            if column_df != GlossaryEnergy.Years:
-                self.CO2_sources_Gt[column_df.replace(
-                    '{self.ghg_input_unit}', '{self.ghg_output_unit}')] = self.CO2_sources[column_df] / 1e3
-
-        for column_df in self.CO2_sinks.columns:
-            if column_df != GlossaryEnergy.Years:
-                self.CO2_sinks_Gt[column_df.replace(
-                    '{self.ghg_input_unit}', '{self.ghg_output_unit}')] = self.CO2_sinks[column_df] / 1e3
+            {GlossaryEnergy.Years: self.years,
+             **{column: self.CO2_sinks[column].values / 1e3 for column in self.CO2_sinks.columns
+                if column != GlossaryEnergy.Years}})
 
         return self.CO2_sources_Gt, self.CO2_sinks_Gt
 
-    def aggregate_all_ghg_emissions_in_energy(self, energy):
-
-        if energy in self.sub_production_dict:
-            # gather all production columns with a CO2 name in it
-            for col, production in self.sub_production_dict[energy].items():
-                if col in self.CO2_list:
-                    self.ghg_production_dict['CO2'][f'{energy} {col}'] = production.values
-                else:
-                    for ghg in self.GHG_TYPE_LIST:
-                        if col == f'{ghg} {self.ghg_input_unit}':
-                            self.ghg_production_dict[ghg][f'{energy} {col}'] = production.values
-        # gather all consumption columns with a CO2 name in it
-        # other green house gases are not consumed in energy mix for now
-        if energy in self.sub_consumption_dict:
-            for col, consumption in self.sub_consumption_dict[energy].items():
-                if col in self.CO2_list:
-                    self.CO2_consumption[f'{energy} {col}'] = consumption.values
-
-    # , co2_emissions):
-
-    def compute_ghg_emissions_by_use(self, energy):
-        # Compute the CO2 emitted during the use of the net energy
-        # If net energy is negative, CO2 by use is equals to zero
-        for ghg in self.GHG_TYPE_LIST:
-            if energy in self.ghg_per_use_dict[ghg]:
-                self.ghg_production_dict[ghg][f'{energy} {ghg} by use {self.ghg_input_unit}'] = \
-                self.ghg_per_use_dict[ghg][energy] * np.maximum(
-                    0.0, self.energy_production_detailed[f'production {energy} (TWh)'].values)
-
     def compute_total_ghg_emissions(self):
         """
         Compute total GHG emissions
         """
 
-        # drop years column in new dataframe
-        co2_sources_wo_years = self.CO2_sources_Gt.drop(
-            GlossaryEnergy.Years, axis=1)
-
-        # sum all co2 sources using the wo years dataframe
-        sum_sources = co2_sources_wo_years.sum(axis=1).values
+        # sum all co2 sources
+        sum_sources = self.CO2_sources_Gt.drop(GlossaryEnergy.Years, axis=1).values.sum(axis=1)
 
         # get unique column in serie format
         limited_by_capture_wo_years = self.co2_emissions_ccus_Gt.drop(
@@ -305,204 +328,117 @@ class EnergyGHGEmissions(BaseStream):
                               self.ghg_sources[f'Total CO2 by use {self.ghg_input_unit}'].values / \
                               1e3 - sum_sinks
 
-        total_n2O_emissions = self.ghg_production_dict['N2O'].drop(
-            GlossaryEnergy.Years, axis=1).sum(axis=1).values
+        total_ghg_emissions = self.ghg_emissions.sum(axis=(1, 2))
 
-        total_ch4_emissions = self.ghg_production_dict['CH4'].drop(
-            GlossaryEnergy.Years, axis=1).sum(axis=1).values
-
-        self.ghg_total_emissions['Total CO2 emissions'] = total_CO2_emissions
-        self.ghg_total_emissions['Total N2O emissions'] = total_n2O_emissions / 1e3
-        self.ghg_total_emissions['Total CH4 emissions'] = total_ch4_emissions / 1e3
+        self.ghg_total_emissions = pd.DataFrame(
+            {GlossaryEnergy.Years: self.years,
+             'Total CO2 emissions': total_CO2_emissions,
+             'Total N2O emissions': total_ghg_emissions[self.ghg_index['N2O']] / 1e3,
+             'Total CH4 emissions': total_ghg_emissions[self.ghg_index['CH4']] / 1e3})
 
     def compute_gwp(self):
 
+        self.gwp_emissions = pd.DataFrame({GlossaryEnergy.Years: self.years})
         for ghg in self.GHG_TYPE_LIST:
             self.gwp_emissions[f'{ghg}_20'] = self.ghg_total_emissions[GlossaryCore.insertGHGTotalEmissions.format(ghg)] * self.gwp_20[ghg]
             self.gwp_emissions[f'{ghg}_100'] = self.ghg_total_emissions[GlossaryCore.insertGHGTotalEmissions.format(ghg)] * self.gwp_100[ghg]
 
+    def compute_dghg_by_use_dprod(self, net_production):
+        '''
+        (ghg x energy x year) gradient of the GHG emissions by use wrt the net production of the energies
+        Specific case when net prod is equal to zero
+        if we increase the prod of an energy the net prod will react
+        however if we decrease the cons it does nothing
+        '''
+        net_prod = self.get_net_production(net_production)
+        return self.ghg_per_use * np.maximum(0, np.sign(np.where(net_prod == 0, 1, net_prod)))
+
     def compute_grad_total_co2_emissions(self, net_production):
 
+        dghg_by_use_dprod = self.compute_dghg_by_use_dprod(net_production)
         dtot_CO2_emissions = {}
-        for energy in self.energy_list:
-            net_prod = net_production[
-                f'production {energy} (TWh)'].values
-
-            # Specific case when net prod is equal to zero
-            # if we increase the prod of an energy the net prod will react
-            # however if we decrease the cons it does nothing
-            net_prod_sign = net_prod.copy()
-            net_prod_sign[net_prod_sign == 0] = 1
-            for ghg in self.GHG_TYPE_LIST:
-                dtot_CO2_emissions[f'Total {ghg} emissions vs prod{energy}'] = self.ghg_per_use_dict[ghg][
-                                                                                   energy].values * \
-                                                                               np.maximum(0, np.sign(net_prod_sign))
+        for energy_index, energy in enumerate(self.energy_list):
+            for ghg_index, ghg in enumerate(self.GHG_TYPE_LIST):
+                dtot_CO2_emissions[f'Total {ghg} emissions vs prod{energy}'] = dghg_by_use_dprod[ghg_index,
+                                                                                                 energy_index]
         return dtot_CO2_emissions
 
+    def get_co2_emissions_gradient_elements(self, category, consumption=False):
+        '''
+        Elements producing (or consuming) the CO2 column category
+        '''
+        if consumption:
+            mask = self.co2_consumption_mask[:, self.CO2_list.index(category)]
+        else:
+            mask = self.ghg_emissions_mask[self.ghg_index['CO2'], :, self.category_index[category]]
+        return [self.element_list[index] for index in np.flatnonzero(mask)]
+
     def compute_grad_CO2_emissions_sources(self, net_production):
         '''
         Compute CO2 total emissions
         '''
-        # Initialize dataframes
         len_years = len(self.years)
-
-        co2_production = pd.DataFrame({GlossaryEnergy.Years: self.years})
-        co2_consumption = pd.DataFrame({GlossaryEnergy.Years: self.years})
+        dghg_by_use_dprod = self.compute_dghg_by_use_dprod(net_production)
+        positive_net_prod = np.maximum(0, self.get_net_production(net_production))
 
         dtot_CO2_emissions = {}
-        # Do not loop over carbon capture and carbon storage which will be
-        # handled differently
-        for energy in self.energy_list:
-
-            # gather all production columns with a CO2 name in it
-            for col, production in self.sub_production_dict[energy].items():
-                if col in self.CO2_list:
-                    co2_production[f'{energy} {col}'] = production.values
-            # gather all consumption columns with a CO2 name in it
-            for col, consumption in self.sub_consumption_dict[energy].items():
-                if col in self.CO2_list:
-                    co2_consumption[f'{energy} {col}'] = consumption.values
-
-            # Compute the CO2 emitted during the use of the net energy
-            # If net energy is negative, CO2 by use is equals to zero
-            net_prod = net_production[
-                f'production {energy} (TWh)'].values
-
-            dtot_CO2_emissions[f'Total CO2 by use (Gt) vs {energy}#co2_per_use'] = np.maximum(
-                0, net_prod)
-
-            # Specific case when net prod is equal to zero
-            # if we increase the prod of an energy the net prod will react
-            # however if we decrease the cons it does nothing
-            net_prod_sign = net_prod.copy()
-            net_prod_sign[net_prod_sign == 0] = 1
-            for ghg in self.GHG_TYPE_LIST:
-                dtot_CO2_emissions[f'Total {ghg} by use (Gt) vs {energy}#prod'] = self.ghg_per_use_dict[ghg][
-                                                                                      energy].values * \
-                                                                                  np.maximum(0, np.sign(net_prod_sign))
-
-        for energy in self.ccs_list:
-            for col, production in self.sub_production_dict[energy].items():
-                if col in self.CO2_list:
-                    co2_production[f'{energy} {col}'] = production.values
+        # Compute the CO2 emitted during the use of the net energy
+        # If net energy is negative, CO2 by use is equals to zero
+        for energy_index, energy in enumerate(self.energy_list):
+            dtot_CO2_emissions[f'Total CO2 by use (Gt) vs {energy}#co2_per_use'] = positive_net_prod[energy_index]
+            for ghg_index, ghg in enumerate(self.GHG_TYPE_LIST):
+                dtot_CO2_emissions[f'Total {ghg} by use (Gt) vs {energy}#prod'] = dghg_by_use_dprod[ghg_index,
+                                                                                                    energy_index]
+
         ''' CARBON CAPTURE from energy mix
         Total carbon capture from energy mix if the technology offers carbon_capture
          Ex : upgrading biogas technology is the same as Amine Scrubbing but
          on a different gas (biogas for upgrading biogas and flue gas for
          Amine scrubbing)
         '''
-        energy_producing_carbon_capture = co2_production[[
-            col for col in co2_production if col.endswith(f'{CarbonCapture.name} {self.ghg_input_unit}')]]
-        energy_producing_carbon_capture_list = [key.replace(
-            f' {CarbonCapture.name} {self.ghg_input_unit}', '') for key in energy_producing_carbon_capture]
-        if len(energy_producing_carbon_capture_list) != 0:
-            for energy1 in energy_producing_carbon_capture_list:
-                dtot_CO2_emissions[
-                    f'{CarbonCapture.name} from energy mix (Mt) vs {energy1}#{CarbonCapture.name} {self.ghg_input_unit}#prod'] = np.ones(
-                    len_years)
-        #             self.total_co2_emissions[f'{CarbonCapture.name} from energy mix {self.ghg_input_unit}'] = energy_producing_carbon_capture.sum(
-        #                 axis=1).values
-        #         else:
-        #             self.total_co2_emissions[
-        # f'{CarbonCapture.name} from energy mix {self.ghg_input_unit}'] = 0.0
+        for element in self.get_co2_emissions_gradient_elements(f'{CarbonCapture.name} {self.ghg_input_unit}'):
+            dtot_CO2_emissions[
+                f'{CarbonCapture.name} from energy mix (Mt) vs {element}#{CarbonCapture.name} {self.ghg_input_unit}#prod'] = np.ones(
+                len_years)
 
         ''' CO2 from energy mix       
          CO2 expelled by energy mix technologies during the process 
          i.e. for machinery or tractors 
         '''
-        energy_producing_co2 = co2_production[[
-            col for col in co2_production if col.endswith(f'{CO2.name} {self.ghg_input_unit}')]]
-        energy_producing_co2_list = [key.replace(
-            f' {CO2.name} {self.ghg_input_unit}', '') for key in energy_producing_co2]
-        if len(energy_producing_co2_list) != 0:
-            for energy1 in energy_producing_co2_list:
-                dtot_CO2_emissions[
-                    f'{CO2.name} from energy mix (Mt) vs {energy1}#{CO2.name} {self.ghg_input_unit}#prod'] = np.ones(
-                    len_years)
-
-        #             self.total_co2_emissions[f'{CO2.name} from energy mix {self.ghg_input_unit}'] = energy_producing_co2.sum(
-        #                 axis=1).values
-        #         else:
-        #             self.total_co2_emissions[
-        #                 f'{CO2.name} from energy mix {self.ghg_input_unit}'] = 0.0
+        for element in self.get_co2_emissions_gradient_elements(f'{CO2.name} {self.ghg_input_unit}'):
+            dtot_CO2_emissions[
+                f'{CO2.name} from energy mix (Mt) vs {element}#{CO2.name} {self.ghg_input_unit}#prod'] = np.ones(
+                len_years)
 
-        ''' CO2 removed by energy mix       
-         CO2 removed by energy mix technologies during the process 
-         i.e. biomass processes as managed wood or crop energy
-        '''
-        energy_removing_co2 = co2_consumption[[
-            col for col in co2_consumption if col.endswith(f'{CO2.name} {self.ghg_input_unit}')]]
-        energy_removing_co2_list = [key.replace(
-            f' {CO2.name} {self.ghg_input_unit}', '') for key in energy_removing_co2]
-        if len(energy_removing_co2_list) != 0:
-            for energy1 in energy_removing_co2_list:
-                dtot_CO2_emissions[
-                    f'{CO2.name} removed by energy mix (Mt) vs {energy1}#{CO2.name} {self.ghg_input_unit}#cons'] = np.ones(
-                    len_years)
-        #             self.total_co2_emissions[f'{CO2.name} removed by energy mix {self.ghg_input_unit}'] = energy_removing_co2.sum(
-        #                 axis=1).values
-        #         else:
-        #             self.total_co2_emissions[
-        #                 f'{CO2.name} removed energy mix {self.ghg_input_unit}'] = 0.0
+        dtot_CO2_emissions.update(self.compute_grad_CO2_emissions_sinks())
 
         ''' Total C02 from Flue gas
             sum of all production of flue gas 
             it could be equal to carbon capture from CC technos if enough investment but not sure
         '''
-        #         self.total_co2_emissions[f'Total {CarbonCapture.flue_gas_name} {self.ghg_input_unit}'] = self.co2_production[[
-        # col for col in self.co2_production if
-        # col.endswith(f'{CarbonCapture.flue_gas_name}
-        # {self.ghg_input_unit}')]].sum(axis=1)
-        for col in co2_production:
-            if col.endswith(f'{CarbonCapture.flue_gas_name} {self.ghg_input_unit}'):
-                energy1 = col.replace(
-                    f' {CarbonCapture.flue_gas_name} {self.ghg_input_unit}', '')
-                dtot_CO2_emissions[
-                    f'Total {CarbonCapture.flue_gas_name} (Mt) vs {energy1}#{CarbonCapture.flue_gas_name} {self.ghg_input_unit}#prod'] = np.ones(
-                    len_years)
+        for element in self.get_co2_emissions_gradient_elements(
+                f'{CarbonCapture.flue_gas_name} {self.ghg_input_unit}'):
+            dtot_CO2_emissions[
+                f'Total {CarbonCapture.flue_gas_name} (Mt) vs {element}#{CarbonCapture.flue_gas_name} {self.ghg_input_unit}#prod'] = np.ones(
+                len_years)
 
         return dtot_CO2_emissions
 
-    # , co2_emissions):
     def compute_grad_CO2_emissions_sinks(self):
         '''
         Compute CO2 total emissions
         '''
-        # Initialize dataframes
         len_years = len(self.years)
 
-        co2_production = pd.DataFrame({GlossaryEnergy.Years: self.years})
-        co2_consumption = pd.DataFrame({GlossaryEnergy.Years: self.years})
-
         dtot_CO2_emissions = {}
-        # Do not loop over carbon capture and carbon storage which will be
-        # handled differently
-        for energy in self.energy_list:
-
-            # gather all production columns with a CO2 name in it
-            for col, production in self.sub_production_dict[energy].items():
-                if col in self.CO2_list:
-                    co2_production[f'{energy} {col}'] = production.values
-            # gather all consumption columns with a CO2 name in it
-            for col, consumption in self.sub_consumption_dict[energy].items():
-                if col in self.CO2_list:
-                    co2_consumption[f'{energy} {col}'] = consumption.values
-
-            # Compute the CO2 emitted during the use of the net energy
-            # If net energy is negative, CO2 by use is equals to zero
 
         ''' CO2 removed by energy mix       
          CO2 removed by energy mix technologies during the process 
          i.e. biomass processes as managed wood or crop energy
         '''
-        energy_removing_co2 = co2_consumption[[
-            col for col in co2_consumption if col.endswith(f'{CO2.name} {self.ghg_input_unit}')]]
-        energy_removing_co2_list = [key.replace(
-            f' {CO2.name} {self.ghg_input_unit}', '') for key in energy_removing_co2]
-        if len(energy_removing_co2_list) != 0:
-            for energy1 in energy_removing_co2_list:
-                dtot_CO2_emissions[
-                    f'{CO2.name} removed by energy mix (Mt) vs {energy1}#{CO2.name} {self.ghg_input_unit}#cons'] = np.ones(
-                    len_years)
+        for energy in self.get_co2_emissions_gradient_elements(f'{CO2.name} {self.ghg_input_unit}', consumption=True):
+            dtot_CO2_emissions[
+                f'{CO2.name} removed by energy mix (Mt) vs {energy}#{CO2.name} {self.ghg_input_unit}#cons'] = np.ones(
+                len_years)
 
         return dtot_CO2_emissions
@@ -353,13 +353,12 @@ class EnergyGHGEmissionsDiscipline(SoSWrapp):
             ns_energy = energy
             if energy == GlossaryEnergy.biomass_dry:
                 ns_energy = AgricultureMixDiscipline.name
-            for col in self.model.sub_production_dict[energy].keys():
-                for ghg in self.model.GHG_TYPE_LIST:
-                    if col == f'{ghg} {self.model.ghg_input_unit}':
-                        self.set_partial_derivative_for_other_types(
-                            ('GHG_total_energy_emissions', GlossaryCore.insertGHGTotalEmissions.format(ghg)),
-                            (f'{ns_energy}.{GlossaryEnergy.EnergyProductionValue}', col),
-                            np.identity(len(years)))
+            for ghg in self.model.GHG_TYPE_LIST:
+                if self.model.has_ghg_emissions(ghg, energy, self.model.EMISSIONS):
+                    self.set_partial_derivative_for_other_types(
+                        ('GHG_total_energy_emissions', GlossaryCore.insertGHGTotalEmissions.format(ghg)),
+                        (f'{ns_energy}.{GlossaryEnergy.EnergyProductionValue}', f'{ghg} {self.model.ghg_input_unit}'),
+                        np.identity(len(years)))
 
         # ------------------------------------#
         # -- CO2 emissions sinks gradients--#
@@ -22,6 +22,8 @@ import pandas as pd
 
 from climateeconomics.sos_wrapping.sos_wrapping_agriculture.agriculture.agriculture_mix_disc import \
     AgricultureMixDiscipline
+from energy_models.core.energy_mix.net_production import build_net_production_incidence, compute_net_production
+from energy_models.core.exp_min import compute_exp_min
 from energy_models.core.stream_type.base_stream import BaseStream
 from energy_models.core.stream_type.carbon_models.carbon import Carbon
 from energy_models.core.stream_type.carbon_models.carbon_capture import CarbonCapture
@@ -46,7 +48,6 @@ from energy_models.core.stream_type.energy_models.solid_fuel import SolidFuel
 from energy_models.core.stream_type.energy_models.syngas import Syngas
 from energy_models.core.stream_type.resources_models.resource_glossary import ResourceGlossary
 from energy_models.glossaryenergy import GlossaryEnergy
-from sostrades_core.tools.base_functions.exp_min import compute_func_with_exp_min
 from sostrades_core.tools.cst_manager.func_manager_common import smooth_maximum
 
 
@@ -161,7 +162,9 @@ class EnergyMix(BaseStream):
         self.co2_emissions_in = None
         self.energy_capital = None
         self.consumable_energy_df = None
-        self.consumed_energy_by_ccus_sum = None
+        self.net_production_key = None
+        self.net_production_columns = None
+        self.net_production_incidence = None
         self.production = None
         self.carbon_emissions_after_use = None
         self.co2_production = None
@@ -170,6 +173,9 @@ class EnergyMix(BaseStream):
         self.co2_emissions_needed_by_energy_mix = None
         self.carbon_capture_from_energy_mix = None
         self.net_positive_consumable_energy_production = None
+        self.sub_production_dict = {}
+        self.sub_consumption_dict = {}
+        self.sub_consumption_woratio_dict = {}
         self.energy_mean_price = None
         self.energy_mean_price_objective = None
         self.energy_mean_price_objective_ref = None
@@ -233,6 +239,26 @@ class EnergyMix(BaseStream):
                 if f'{energy}.losses_percentage' in inputs_dict:
                     self.losses_percentage_dict[energy] = inputs_dict[f'{energy}.losses_percentage']
 
+        self.net_production_key = None
+        self.net_production_columns = None
+        self.net_production_incidence = None
+
+    def get_net_production_incidence(self, ccs_list):
+        '''
+        Incidence of the consumption columns of the streams on the net production
+        It is only rebuilt when the streams or the consumption columns of the streams change
+        '''
+        consumption_columns = {stream: tuple(consumption.columns) for stream, consumption in
+                               self.sub_consumption_dict.items()}
+        key = (tuple(self.energy_list), tuple(ccs_list), tuple(consumption_columns.items()))
+        if key != self.net_production_key:
+            self.net_production_key = key
+            self.net_production_columns, self.net_production_incidence = build_net_production_incidence(
+                self.energy_list, ccs_list, consumption_columns,
+                {stream: self.stream_class_dict[stream].unit for stream in consumption_columns})
+
+        return self.net_production_columns, self.net_production_incidence
+
     def configure_parameters_update(self, inputs_dict):
         '''
         Configure parameters with possible update (variables that does change during the run)
@@ -346,117 +372,50 @@ class EnergyMix(BaseStream):
         columns_to_sum = [column for column in self.production_raw if column.endswith('(TWh)')]
         self.production_raw[GlossaryEnergy.TotalProductionValue] = self.production_raw[columns_to_sum].sum(axis=1)
 
-    def compute_net_consumable_energy(self):
-        """consumable energy = Raw energy production - Energy consumed for energy production"""
-
-        # for energy in self.subelements_list:
-        #     column_name = f'{self.PRODUCTION} {energy} ({self.stream_class_dict[energy].unit})'
-        #     self.production[column_name] = pd.Series(
-        #         self.sub_production_dict[energy][energy].values)
-        #     self.production_raw[column_name] = pd.Series(
-        #         self.sub_production_dict[energy][energy].values)
-        #     for idx, consu in self.sub_consumption_dict.items():
-        #         if f'{energy} ({self.stream_class_dict[energy].unit})' in consu.columns:
-        #             self.production[column_name] -= consu[
-        #                 f'{energy} ({self.stream_class_dict[energy].unit})'].values
-        #         else:
-        #             wrong_columns = [
-        #                 column for column in consu.columns if energy in column]
-        #             if len(wrong_columns) != 0:
-        #                 logging.warning(
-        #                     f'The columns {wrong_columns} in the energy_consumption out of {idx} cannot be taken into account for an error of unity')
-
-        self.consumable_energy_df = pd.DataFrame({GlossaryEnergy.Years: self.years})
-        self.consumed_energy_by_ccus_sum = {}
-        for energy in self.energy_list:
-            # starting from raw energy production
-            column_name_energy = f'{self.PRODUCTION} {energy} ({self.stream_class_dict[energy].unit})'
-            raw_production_energy = self.production_raw[column_name_energy]
-
-            # removing consumed energy
-            consumed_energy_by_energy_list = []
-            consumed_energy_by_ccus_list = []
-            column_name_consumption = f'{energy} ({self.stream_class_dict[energy].unit})'
-            for energy_other, consu in self.sub_consumption_dict.items():
-                if column_name_consumption in consu.columns:
-                    if energy_other in self.energy_list:
-                        consumed_energy_by_energy_list.append(consu[column_name_consumption].values)
-                    else:
-                        consumed_energy_by_ccus_list.append(consu[column_name_consumption].values)
-            consumed_energy_by_energy_sum = np.sum(np.array(consumed_energy_by_energy_list), axis=0) if len(
-                consumed_energy_by_energy_list) else 0.
-            self.consumed_energy_by_ccus_sum[energy] = np.sum(np.array(consumed_energy_by_ccus_list), axis=0) if len(
-                consumed_energy_by_ccus_list) else 0.
-            # obtaining net energy production for the techno
-            column_name = f'{self.PRODUCTION} {energy} ({self.stream_class_dict[energy].unit})'
-            prod_raw_to_substract = self.compute_net_prod_of_coarse_energies(energy, column_name)
-            self.consumable_energy_df[
-                column_name_energy] = raw_production_energy - consumed_energy_by_energy_sum - prod_raw_to_substract
-
-        columns_to_sum = [column for column in self.consumable_energy_df if column.endswith('(TWh)')]
-        self.consumable_energy_df[GlossaryEnergy.TotalProductionValue] = self.consumable_energy_df[columns_to_sum].sum(
-            axis=1)
-
-        # substract a percentage of raw production into net production
-        self.consumable_energy_df[GlossaryEnergy.TotalProductionValue] -= self.production_raw[
-                                                                              GlossaryEnergy.TotalProductionValue] * \
-                                                                          self.heat_losses_percentage / 100.0
-
-    def compute_net_energy_production(self):
+    def compute_net_production(self):
         """
+        consumable energy = Raw energy production - Energy consumed for energy production
         Net energy production = Raw energy production - Energy consumed for energy production - Energy used by CCUS
+        Both are computed in one contraction of the consumptions with the incidence matrix
         """
-        self.production = deepcopy(self.consumable_energy_df)
-        # taking into account consumption of ccs technos
-        for ccs in self.ccs_list:
-            # production_column_name_ccs = f'{self.PRODUCTION} {ccs} (TWh)'
-            # if ccs in self.sub_consumption_dict:
-            #     consumption_ccs_df = self.sub_consumption_dict[ccs]
-            #     ccs_consumptions_list = []
-            #     for column in consumption_ccs_df.columns:
-            #         if column.endswith('(TWh)'):
-            #             ccs_consumptions_list.append(consumption_ccs_df[column].values)
-            #     self.production[production_column_name_ccs] = - np.sum(np.array(ccs_consumptions_list), axis=0) if len(
-            #         ccs_consumptions_list) else 0.
-
-            production_column_name_ccs = f'{self.PRODUCTION} {ccs} (Mt)'
-            if ccs in self.sub_consumption_dict:
-                consumption_ccs_df = self.sub_consumption_dict[ccs]
-                ccs_consumptions_list = []
-                for column in consumption_ccs_df.columns:
-                    if column.endswith('(Mt)'):
-                        ccs_consumptions_list.append(consumption_ccs_df[column].values)
-                self.production[production_column_name_ccs] = - np.sum(np.array(ccs_consumptions_list), axis=0) if len(
-                    ccs_consumptions_list) else 0.
-        # Delete energy used by ccs from energy production (and not only from total production)
-        for energy in self.energy_list:
-            production_column_name_energy = f'{self.PRODUCTION} {energy} (TWh)'
-            self.production[production_column_name_energy] -= self.consumed_energy_by_ccus_sum[energy]
-
-        # Net energy production = Raw energy production - Energy consumed for energy production - Energy used by CCUS
-        columns_to_sum = [column for column in self.production if column.endswith('(TWh)')]
-        self.production[GlossaryEnergy.TotalProductionValue] = self.production[columns_to_sum].sum(axis=1)
+        ccs_list = self.inputs[GlossaryEnergy.ccs_list]
+        net_production_columns, net_production_incidence = self.get_net_production_incidence(ccs_list)
+
+        consumptions_list = [self.sub_consumption_dict[stream][list(columns)].to_numpy() for stream, columns in
+                             net_production_columns.items() if len(columns) > 0]
+        consumptions = np.hstack(consumptions_list) if len(consumptions_list) > 0 else np.zeros((len(self.years), 0))
+        production_columns = [f'{self.PRODUCTION} {energy} ({self.stream_class_dict[energy].unit})' for energy in
+                              self.energy_list]
+        raw_production = self.production_raw[production_columns].to_numpy()
+        raw_to_net_losses = np.array([1.0 - self.raw_tonet_dict.get(energy, 1.0) for energy in self.energy_list])
+        consumable_production, net_production, ccs_production = compute_net_production(
+            raw_production, consumptions, net_production_incidence, raw_to_net_losses)
 
-        self.production[GlossaryEnergy.TotalProductionValue] -= self.production_raw[
-                                                                    GlossaryEnergy.TotalProductionValue] * \
-                                                                self.heat_losses_percentage / 100.0
+        # substract a percentage of raw production into net production
+        heat_losses = self.production_raw[GlossaryEnergy.TotalProductionValue].values * \
+                      self.heat_losses_percentage / 100.0
+        is_twh_column = np.array([column.endswith('(TWh)') for column in production_columns], dtype=bool)
 
+        self.consumable_energy_df = pd.DataFrame(
+            {GlossaryEnergy.Years: self.years,
+             **dict(zip(production_columns, consumable_production.T)),
+             GlossaryEnergy.TotalProductionValue: consumable_production[:, is_twh_column].sum(axis=1) - heat_losses})
 
+        # taking into account consumption of ccs technos
+        ccs_production_dict = {f'{self.PRODUCTION} {ccs} (Mt)': ccs_production[:, index]
+                               for index, ccs in enumerate(ccs_list) if ccs in self.sub_consumption_dict}
+        self.production = pd.DataFrame(
+            {GlossaryEnergy.Years: self.years,
+             **dict(zip(production_columns, net_production.T)),
+             GlossaryEnergy.TotalProductionValue: net_production[:, is_twh_column].sum(axis=1) - heat_losses,
+             **ccs_production_dict})
 
     def compute_energy_production_uncut(self):
         """maybe to delete"""
-        self.production['Total production (uncut)'] = self.production[GlossaryEnergy.TotalProductionValue].values
-        min_energy = self.minimum_energy_production
-        for year in self.production.index:
-            if self.production.at[year, GlossaryEnergy.TotalProductionValue] < min_energy:
-                # To avoid underflow : exp(-200) is considered to be the
-                # minimum value for the exp
-                production_year = max(
-                    self.production.at[year, GlossaryEnergy.TotalProductionValue], -200.0 * min_energy)
-                self.production.loc[year, GlossaryEnergy.TotalProductionValue] = min_energy / 10. * \
-                                                                                 (9 + np.exp(
-                                                                                     production_year / min_energy) * np.exp(
-                                                                                     -1))
+        total_production = self.production[GlossaryEnergy.TotalProductionValue].values
+        self.production['Total production (uncut)'] = total_production
+        self.production[GlossaryEnergy.TotalProductionValue], _ = compute_exp_min(
+            total_production, self.minimum_energy_production)
 
     def compute_net_prod_of_coarse_energies(self, energy, column_name):
         '''
@@ -746,10 +705,8 @@ class EnergyMix(BaseStream):
                 prod_raw_to_substract = self.compute_net_prod_of_coarse_energies(energy, column_name)
                 energy_production -= prod_raw_to_substract
 
-            energy_prod_limited = compute_func_with_exp_min(
-                energy_production, 1.0e-10)
-            energy_cons_limited = compute_func_with_exp_min(
-                energy_consumption, 1.0e-10)
+            energy_prod_limited, _ = compute_exp_min(energy_production, 1.0e-10)
+            energy_cons_limited, _ = compute_exp_min(energy_consumption, 1.0e-10)
 
             demand_ratio_df[f'{energy}'] = np.minimum(
                 np.maximum(energy_prod_limited / energy_cons_limited, 1E-15), 1.0) * 100.0
@@ -966,8 +923,7 @@ class EnergyMix(BaseStream):
         self.configure_parameters_update(inputs)
 
         self.compute_raw_production()
-        self.compute_net_consumable_energy()
-        self.compute_net_energy_production()
+        self.compute_net_production()
         self.compute_energy_production_uncut()
         self.compute_price_by_energy()
         self.compute_CO2_emissions()
@@ -997,6 +953,13 @@ class EnergyMix(BaseStream):
     def d_energy_mean_price_obj_d_energy_mean_price(self, d_energy_mean_price):
         return np.mean(d_energy_mean_price, axis=0) / self.energy_mean_price_objective_ref
 
+    def d_energy_mean_price_obj_d_energy_mean_price_diagonal(self, d_energy_mean_price_diagonal):
+        '''
+        Same gradient as d_energy_mean_price_obj_d_energy_mean_price for a diagonal d_energy_mean_price
+        given by its diagonal values
+        '''
+        return d_energy_mean_price_diagonal / len(d_energy_mean_price_diagonal) / self.energy_mean_price_objective_ref
+
 
 def update_new_gradient(grad_dict, key_dep_tuple_list, new_key):
     '''
@@ -25,6 +25,8 @@ from climateeconomics.core.core_witness.climateeco_discipline import ClimateEcoD
 from climateeconomics.sos_wrapping.sos_wrapping_agriculture.agriculture.agriculture_mix_disc import \
     AgricultureMixDiscipline
 from energy_models.core.energy_mix.energy_mix import EnergyMix
+from energy_models.core.energy_mix.jacobian_blocks import diagonal_to_sparse
+from energy_models.core.exp_min import compute_exp_min
 from energy_models.core.stream_type.carbon_models.carbon_capture import CarbonCapture
 from energy_models.core.stream_type.carbon_models.carbon_dioxyde import CO2
 from energy_models.core.stream_type.carbon_models.carbon_storage import CarbonStorage
@@ -43,8 +45,6 @@ from energy_models.glossaryenergy import GlossaryEnergy
 from energy_models.models.liquid_fuel.refinery.refinery_disc import RefineryDiscipline
 from energy_models.models.methane.fossil_gas.fossil_gas_disc import FossilGasDiscipline
 from sostrades_core.execution_engine.sos_wrapp import SoSWrapp
-from sostrades_core.tools.base_functions.exp_min import compute_dfunc_with_exp_min, \
-    compute_func_with_exp_min
 from sostrades_core.tools.cst_manager.func_manager_common import get_dsmooth_dvariable
 from sostrades_core.tools.post_processing.charts.chart_filter import ChartFilter
 from sostrades_core.tools.post_processing.charts.two_axes_instanciated_chart import InstanciatedSeries, \
@@ -219,6 +219,7 @@ class Energy_Mix_Discipline(SoSWrapp):
         super().__init__(sos_name, logger)
         self.energy_model = None
         self.grad_energy_mix_vs_prod_dict = None
+        self.diagonal_jacobian_blocks = {}
 
     def init_execution(self):
         inputs_dict = self.get_sosdisc_inputs()
@@ -523,7 +524,9 @@ class Energy_Mix_Discipline(SoSWrapp):
         stream_class_dict = EnergyMix.stream_class_dict
         years = np.arange(inputs_dict[GlossaryEnergy.YearStart],
                           inputs_dict[GlossaryEnergy.YearEnd] + 1)
-        identity = np.eye(len(years))
+        # all the (years x years) blocks of the energy mix are diagonal, they are stored by their diagonal
+        # (vector or scalar for a scaled identity) and converted to dense matrices once at the end
+        self.diagonal_jacobian_blocks = {}
 
         heat_losses_percentage = inputs_dict['heat_losses_percentage'] / 100.0
         primary_energy_percentage = inputs_dict['primary_energy_percentage']
@@ -557,10 +560,10 @@ class Energy_Mix_Discipline(SoSWrapp):
         # -------------------------------------------#
         for energy in inputs_dict[GlossaryEnergy.energy_list] + inputs_dict[GlossaryEnergy.ccs_list]:
             ns_energy = self.get_ns_energy(energy)
-            self.set_partial_derivative_for_other_types(
+            self.set_partial_derivative_diagonal(
                 (GlossaryEnergy.EnergyCapitalDfValue, GlossaryEnergy.Capital),
                 (f'{ns_energy}.{GlossaryEnergy.EnergyTypeCapitalDfValue}', GlossaryEnergy.Capital),
-                identity / 1e3
+                1.0 / 1e3
             )
 
         for energy in energy_list:
@@ -580,35 +583,35 @@ class Energy_Mix_Discipline(SoSWrapp):
                 dprod_objective_dprod = self.compute_denergy_production_objective_dprod(
                     dtotal_prod_denergy_prod, inputs_dict['alpha'], outputs_dict[GlossaryEnergy.EnergyProductionValue],
                     years)
-                self.set_partial_derivative_for_other_types(
+                self.set_partial_derivative_diagonal(
                     (GlossaryEnergy.EnergyProductionValue,
                      GlossaryEnergy.TotalProductionValue),
                     (f'{ns_energy}.{GlossaryEnergy.EnergyProductionValue}', energy),
                     dtotal_prod_denergy_prod)
                 target_production_constraint_ref = inputs_dict[GlossaryEnergy.TargetProductionConstraintRefValue]
-                self.set_partial_derivative_for_other_types(
+                self.set_partial_derivative_diagonal(
                     (GlossaryEnergy.TargetProductionConstraintValue,),
                     (f'{ns_energy}.{GlossaryEnergy.EnergyProductionValue}', energy),
                     - dtotal_prod_denergy_prod * 1e3 / target_production_constraint_ref)
-                self.set_partial_derivative_for_other_types(
+                self.set_partial_derivative_diagonal(
                     (GlossaryEnergy.EnergyProductionDetailedValue,
                      GlossaryEnergy.TotalProductionValue),
                     (f'{ns_energy}.{GlossaryEnergy.EnergyProductionValue}', energy),
                     dtotal_prod_denergy_prod * scaling_factor_energy_production)
-                self.set_partial_derivative_for_other_types(
+                self.set_partial_derivative_diagonal(
                     (GlossaryEnergy.EnergyProductionDetailedValue, 'Total production (uncut)'),
                     (f'{ns_energy}.{GlossaryEnergy.EnergyProductionValue}', energy),
-                    np.identity(len(years)) * scaling_factor_energy_production * (1.0 - loss_percent))
-                self.set_partial_derivative_for_other_types(
+                    scaling_factor_energy_production * (1.0 - loss_percent))
+                self.set_partial_derivative_diagonal(
                     (GlossaryEnergy.EnergyProductionDetailedValue,
                      f'production {energy} ({stream_class_dict[energy].unit})'),
                     (f'{ns_energy}.{GlossaryEnergy.EnergyProductionValue}', energy),
-                    np.identity(len(years)) * scaling_factor_energy_production * (1.0 - loss_percentage))
-                self.set_partial_derivative_for_other_types(
+                    scaling_factor_energy_production * (1.0 - loss_percentage))
+                self.set_partial_derivative_diagonal(
                     ('energy_production_brut',
                      GlossaryEnergy.TotalProductionValue),
                     (f'{ns_energy}.{GlossaryEnergy.EnergyProductionValue}', energy),
-                    scaling_factor_energy_production * np.identity(len(years)))
+                    scaling_factor_energy_production)
                 self.set_partial_derivative_for_other_types(
                     ('energy_production_objective',), (f'{ns_energy}.{GlossaryEnergy.EnergyProductionValue}', energy),
                     dprod_objective_dprod)
@@ -616,60 +619,55 @@ class Energy_Mix_Discipline(SoSWrapp):
                         f'production {self.HYDROGEN_NAME} (TWh)' in production_detailed_df.columns and\
                         f'production {GlossaryEnergy.hydrogen}.{GlossaryEnergy.liquid_hydrogen} (TWh)' in production_detailed_df.columns:
                     if energy in [self.HYDROGEN_NAME, f'{GlossaryEnergy.hydrogen}.{GlossaryEnergy.liquid_hydrogen}', self.LIQUID_FUEL_NAME]:
-                        self.set_partial_derivative_for_other_types(
+                        self.set_partial_derivative_diagonal(
                             ('primary_energies_production', 'primary_energies'),
                             (f'{ns_energy}.{GlossaryEnergy.EnergyProductionValue}', energy),
-                            (np.identity(len(years)) * (1 - loss_percentage) - primary_energy_percentage * dtotal_prod_denergy_prod) * scaling_factor_energy_production)
+                            ((1 - loss_percentage) - primary_energy_percentage * dtotal_prod_denergy_prod) * scaling_factor_energy_production)
                     else:
-                        self.set_partial_derivative_for_other_types(('primary_energies_production', 'primary_energies'),
-                                                                    (
-                                                                        f'{ns_energy}.{GlossaryEnergy.EnergyProductionValue}',
-                                                                        energy),
-                                                                    -scaling_factor_energy_production * primary_energy_percentage * dtotal_prod_denergy_prod)
+                        self.set_partial_derivative_diagonal(('primary_energies_production', 'primary_energies'),
+                                                             (
+                                                                 f'{ns_energy}.{GlossaryEnergy.EnergyProductionValue}',
+                                                                 energy),
+                                                             -scaling_factor_energy_production * primary_energy_percentage * dtotal_prod_denergy_prod)
 
                 # constraint solid_fuel + elec gradient
                 if energy in self.energy_model.energy_constraint_list:
-                    self.set_partial_derivative_for_other_types(
+                    self.set_partial_derivative_diagonal(
                         (f'{EnergyMix.CONSTRAINT_PROD_SOLID_FUEL_ELEC}', 'constraint_solid_fuel_elec'), (
                             f'{ns_energy}.{GlossaryEnergy.EnergyProductionValue}', energy),
-                        (- scaling_factor_energy_production * ((
-                                                                       1 - loss_percentage) - solid_fuel_elec_percentage * dtotal_prod_denergy_prod) / solid_fuel_elec_constraint_ref) * np.identity(
-                            len(years)))
+                        - scaling_factor_energy_production * ((
+                                                                      1 - loss_percentage) - solid_fuel_elec_percentage * dtotal_prod_denergy_prod) / solid_fuel_elec_constraint_ref)
                 else:
-                    self.set_partial_derivative_for_other_types(
+                    self.set_partial_derivative_diagonal(
                         (f'{EnergyMix.CONSTRAINT_PROD_SOLID_FUEL_ELEC}', 'constraint_solid_fuel_elec'), (
                             f'{ns_energy}.{GlossaryEnergy.EnergyProductionValue}', energy),
-                        scaling_factor_energy_production * solid_fuel_elec_percentage * dtotal_prod_denergy_prod / solid_fuel_elec_constraint_ref * np.identity(
-                            len(years)))
+                        scaling_factor_energy_production * solid_fuel_elec_percentage * dtotal_prod_denergy_prod / solid_fuel_elec_constraint_ref)
 
                 if energy == self.SYNGAS_NAME:
-                    self.set_partial_derivative_for_other_types(
+                    self.set_partial_derivative_diagonal(
                         (EnergyMix.SYNGAS_PROD_OBJECTIVE,
                          ), (f'{ns_energy}.{GlossaryEnergy.EnergyProductionValue}', energy),
                         scaling_factor_energy_production * np.sign(
-                            production_detailed_df[f'production {GlossaryEnergy.syngas} (TWh)'].values) * np.identity(
-                            len(years)) / syngas_prod_ref)
+                            production_detailed_df[f'production {GlossaryEnergy.syngas} (TWh)'].values) / syngas_prod_ref)
 
-                    self.set_partial_derivative_for_other_types(
+                    self.set_partial_derivative_diagonal(
                         (EnergyMix.SYNGAS_PROD_CONSTRAINT,
                          ), (f'{ns_energy}.{GlossaryEnergy.EnergyProductionValue}', energy),
-                        - scaling_factor_energy_production * np.identity(len(years)) / syngas_prod_ref)
+                        - scaling_factor_energy_production / syngas_prod_ref)
 
                 # constraint liquid hydrogen
 
                 if energy == f'{GlossaryEnergy.hydrogen}.{GlossaryEnergy.liquid_hydrogen}':
-                    self.set_partial_derivative_for_other_types(
+                    self.set_partial_derivative_diagonal(
                         (f'{EnergyMix.CONSTRAINT_PROD_H2_LIQUID}', 'constraint_liquid_hydrogen'), (
                             f'{ns_energy}.{GlossaryEnergy.EnergyProductionValue}', energy),
-                        (- scaling_factor_energy_production * (
-                                liquid_hydrogen_percentage - 1) / liquid_hydrogen_constraint_ref) * np.identity(
-                            len(years)))
+                        - scaling_factor_energy_production * (
+                                liquid_hydrogen_percentage - 1) / liquid_hydrogen_constraint_ref)
                 elif energy == self.GASEOUS_HYDROGEN_NAME:
-                    self.set_partial_derivative_for_other_types(
+                    self.set_partial_derivative_diagonal(
                         (f'{EnergyMix.CONSTRAINT_PROD_H2_LIQUID}', 'constraint_liquid_hydrogen'), (
-                            f'{ns_energy}.{GlossaryEnergy.EnergyProductionValue}', energy), (
-                                                                                                    - scaling_factor_energy_production * liquid_hydrogen_percentage / liquid_hydrogen_constraint_ref) * np.identity(
-                            len(years)))
+                            f'{ns_energy}.{GlossaryEnergy.EnergyProductionValue}', energy),
+                        - scaling_factor_energy_production * liquid_hydrogen_percentage / liquid_hydrogen_constraint_ref)
                 # ---- Loop on energy again to differentiate production and consumption ----#
                 for energy_input in energy_list:
                     ns_energy_input = self.get_ns_energy(energy_input)
@@ -683,35 +681,33 @@ class Energy_Mix_Discipline(SoSWrapp):
                         dprod_objective_dcons = self.compute_denergy_production_objective_dprod(
                             dtotal_prod_denergy_cons, inputs_dict['alpha'],
                             outputs_dict[GlossaryEnergy.EnergyProductionValue], years)
-                        self.set_partial_derivative_for_other_types(
+                        self.set_partial_derivative_diagonal(
                             (GlossaryEnergy.EnergyProductionValue, GlossaryEnergy.TotalProductionValue), (
                                 f'{ns_energy_input}.{GlossaryEnergy.EnergyConsumptionValue}',
                                 f'{energy} ({stream_class_dict[energy].unit})'),
                             scaling_factor_energy_consumption * dtotal_prod_denergy_cons / scaling_factor_energy_production)
-                        self.set_partial_derivative_for_other_types(
+                        self.set_partial_derivative_diagonal(
                             (GlossaryEnergy.TargetProductionConstraintValue,), (
                                 f'{ns_energy_input}.{GlossaryEnergy.EnergyConsumptionValue}',
                                 f'{energy} ({stream_class_dict[energy].unit})'),
                             - scaling_factor_energy_consumption * dtotal_prod_denergy_cons / scaling_factor_energy_production * 1e3 / target_production_constraint_ref)
-                        self.set_partial_derivative_for_other_types(
+                        self.set_partial_derivative_diagonal(
                             (GlossaryEnergy.EnergyProductionDetailedValue, GlossaryEnergy.TotalProductionValue),
                             (f'{ns_energy_input}.{GlossaryEnergy.EnergyConsumptionValue}',
                              f'{energy} ({stream_class_dict[energy].unit})'),
                             scaling_factor_energy_consumption * dtotal_prod_denergy_cons / scaling_factor_energy_production * scaling_factor_energy_production)
-                        self.set_partial_derivative_for_other_types(
+                        self.set_partial_derivative_diagonal(
                             (GlossaryEnergy.EnergyProductionDetailedValue,
                              'Total production (uncut)'),
                             (f'{ns_energy_input}.{GlossaryEnergy.EnergyConsumptionValue}',
                              f'{energy} ({stream_class_dict[energy].unit})'),
-                            -scaling_factor_energy_consumption * np.identity(
-                                len(years)) / scaling_factor_energy_production * scaling_factor_energy_production)
-                        self.set_partial_derivative_for_other_types(
+                            -scaling_factor_energy_consumption / scaling_factor_energy_production * scaling_factor_energy_production)
+                        self.set_partial_derivative_diagonal(
                             (GlossaryEnergy.EnergyProductionDetailedValue,
                              f'production {energy} ({stream_class_dict[energy].unit})'),
                             (f'{ns_energy_input}.{GlossaryEnergy.EnergyConsumptionValue}',
                              f'{energy} ({stream_class_dict[energy].unit})'),
-                            -scaling_factor_energy_consumption * np.identity(
-                                len(years)) / scaling_factor_energy_production * scaling_factor_energy_production)
+                            -scaling_factor_energy_consumption / scaling_factor_energy_production * scaling_factor_energy_production)
 
                         self.set_partial_derivative_for_other_types(
                             ('energy_production_objective',),
@@ -722,14 +718,13 @@ class Energy_Mix_Discipline(SoSWrapp):
                                 f'production {self.HYDROGEN_NAME} (TWh)' in production_detailed_df.columns and\
                                 f'production {GlossaryEnergy.hydrogen}.{GlossaryEnergy.liquid_hydrogen} (TWh)' in production_detailed_df.columns:
                             if energy in [self.HYDROGEN_NAME, f'{GlossaryEnergy.hydrogen}.{GlossaryEnergy.liquid_hydrogen}', self.LIQUID_FUEL_NAME]:
-                                self.set_partial_derivative_for_other_types(
+                                self.set_partial_derivative_diagonal(
                                     ('primary_energies_production', 'primary_energies'),
                                     (f'{ns_energy_input}.{GlossaryEnergy.EnergyConsumptionValue}', f'{energy} ({stream_class_dict[energy].unit})'),
                                     -scaling_factor_energy_consumption * (
-                                            primary_energy_percentage * dtotal_prod_denergy_cons + np.identity(
-                                        len(years))))
+                                            primary_energy_percentage * dtotal_prod_denergy_cons + 1.0))
                             else:
-                                self.set_partial_derivative_for_other_types(
+                                self.set_partial_derivative_diagonal(
                                     ('primary_energies_production', 'primary_energies'), (
                                         f'{ns_energy_input}.{GlossaryEnergy.EnergyConsumptionValue}',
                                         f'{energy} ({stream_class_dict[energy].unit})'),
@@ -737,94 +732,86 @@ class Energy_Mix_Discipline(SoSWrapp):
                         # constraint solid_fuel + elec gradient
 
                         if energy in self.energy_model.energy_constraint_list:
-                            self.set_partial_derivative_for_other_types(
+                            self.set_partial_derivative_diagonal(
                                 (f'{EnergyMix.CONSTRAINT_PROD_SOLID_FUEL_ELEC}', 'constraint_solid_fuel_elec'), (
                                     f'{ns_energy_input}.{GlossaryEnergy.EnergyConsumptionValue}',
-                                    f'{energy} ({stream_class_dict[energy].unit})'), (
-                                                                                             scaling_factor_energy_consumption * (
-                                                                                             1 + solid_fuel_elec_percentage * dtotal_prod_denergy_cons) / solid_fuel_elec_constraint_ref) * np.identity(
-                                    len(years)))
+                                    f'{energy} ({stream_class_dict[energy].unit})'),
+                                scaling_factor_energy_consumption * (
+                                        1 + solid_fuel_elec_percentage * dtotal_prod_denergy_cons) / solid_fuel_elec_constraint_ref)
                         else:
-                            self.set_partial_derivative_for_other_types(
+                            self.set_partial_derivative_diagonal(
                                 (f'{EnergyMix.CONSTRAINT_PROD_SOLID_FUEL_ELEC}', 'constraint_solid_fuel_elec'), (
                                     f'{ns_energy_input}.{GlossaryEnergy.EnergyConsumptionValue}',
                                     f'{energy} ({stream_class_dict[energy].unit})'),
-                                scaling_factor_energy_consumption * solid_fuel_elec_percentage * dtotal_prod_denergy_cons / solid_fuel_elec_constraint_ref * np.identity(
-                                    len(years)))
+                                scaling_factor_energy_consumption * solid_fuel_elec_percentage * dtotal_prod_denergy_cons / solid_fuel_elec_constraint_ref)
 
                         if energy == f'{GlossaryEnergy.hydrogen}.{GlossaryEnergy.liquid_hydrogen}':
-                            self.set_partial_derivative_for_other_types(
+                            self.set_partial_derivative_diagonal(
                                 (f'{EnergyMix.CONSTRAINT_PROD_H2_LIQUID}', 'constraint_liquid_hydrogen'), (
                                     f'{ns_energy_input}.{GlossaryEnergy.EnergyConsumptionValue}',
-                                    f'{energy} ({stream_class_dict[energy].unit})'), (
-                                                                                             scaling_factor_energy_production * (
-                                                                                             liquid_hydrogen_percentage - 1) / liquid_hydrogen_constraint_ref) * np.identity(
-                                    len(years)))
+                                    f'{energy} ({stream_class_dict[energy].unit})'),
+                                scaling_factor_energy_production * (
+                                        liquid_hydrogen_percentage - 1) / liquid_hydrogen_constraint_ref)
                         elif energy == self.GASEOUS_HYDROGEN_NAME:
-                            self.set_partial_derivative_for_other_types(
+                            self.set_partial_derivative_diagonal(
                                 (f'{EnergyMix.CONSTRAINT_PROD_H2_LIQUID}', 'constraint_liquid_hydrogen'), (
                                     f'{ns_energy_input}.{GlossaryEnergy.EnergyConsumptionValue}',
-                                    f'{energy} ({stream_class_dict[energy].unit})'), (
-                                                                                             scaling_factor_energy_production * liquid_hydrogen_percentage / liquid_hydrogen_constraint_ref) * np.identity(
-                                    len(years)))
+                                    f'{energy} ({stream_class_dict[energy].unit})'),
+                                scaling_factor_energy_production * liquid_hydrogen_percentage / liquid_hydrogen_constraint_ref)
 
                         if energy == self.SYNGAS_NAME:
-                            self.set_partial_derivative_for_other_types(
+                            self.set_partial_derivative_diagonal(
                                 (EnergyMix.SYNGAS_PROD_OBJECTIVE,), (
                                     f'{ns_energy_input}.{GlossaryEnergy.EnergyConsumptionValue}',
                                     f'{energy} ({stream_class_dict[energy].unit})'),
                                 - scaling_factor_energy_production * np.sign(
-                                    production_detailed_df[f'production {GlossaryEnergy.syngas} (TWh)'].values) * np.identity(
-                                    len(years)) / syngas_prod_ref)
+                                    production_detailed_df[f'production {GlossaryEnergy.syngas} (TWh)'].values) / syngas_prod_ref)
 
-                            self.set_partial_derivative_for_other_types(
+                            self.set_partial_derivative_diagonal(
                                 (EnergyMix.SYNGAS_PROD_CONSTRAINT,), (
                                     f'{ns_energy_input}.{GlossaryEnergy.EnergyConsumptionValue}',
                                     f'{energy} ({stream_class_dict[energy].unit})'),
-                                scaling_factor_energy_production * np.identity(len(years)) / syngas_prod_ref)
+                                scaling_factor_energy_production / syngas_prod_ref)
 
             else:
                 # CCUS
-                self.set_partial_derivative_for_other_types(
+                self.set_partial_derivative_diagonal(
                     (GlossaryEnergy.EnergyProductionDetailedValue,
                      f'production {energy} ({stream_class_dict[energy].unit})'),
                     (f'{ns_energy}.{GlossaryEnergy.EnergyProductionValue}', energy),
-                    np.identity(len(years)) * scaling_factor_energy_production)
+                    scaling_factor_energy_production)
                 # ---- Loop on energy again to differentiate production and consumption ----#
                 for energy_input in energy_list:
                     ns_energy_input = self.get_ns_energy(energy_input)
                     list_columns_energy_consumption = list(
                         inputs_dict[f'{energy_input}.{GlossaryEnergy.EnergyConsumptionValue}'].columns)
                     if f'{energy} ({stream_class_dict[energy].unit})' in list_columns_energy_consumption:
-                        self.set_partial_derivative_for_other_types(
+                        self.set_partial_derivative_diagonal(
                             (GlossaryEnergy.EnergyProductionDetailedValue,
                              f'production {energy} ({stream_class_dict[energy].unit})'),
                             (f'{ns_energy_input}.{GlossaryEnergy.EnergyConsumptionValue}',
                              f'{energy} ({stream_class_dict[energy].unit})'),
-                            -scaling_factor_energy_consumption * np.identity(
-                                len(years)) / scaling_factor_energy_production * scaling_factor_energy_production)
+                            -scaling_factor_energy_consumption / scaling_factor_energy_production * scaling_factor_energy_production)
         # -------------------------#
         # ---- Prices gradients----#
         # -------------------------#
         for energy in energy_list:
             ns_energy = self.get_ns_energy(energy)
             if energy in energies:
-                self.set_partial_derivative_for_other_types(
+                self.set_partial_derivative_diagonal(
                     ('energy_prices_after_tax',
                      energy), (f'{ns_energy}.{GlossaryEnergy.EnergyPricesValue}', energy),
-                    np.identity(len(years)))
-                self.set_partial_derivative_for_other_types(
+                    1.0)
+                self.set_partial_derivative_diagonal(
                     ('energy_prices_after_tax', energy), (GlossaryEnergy.CO2TaxesValue, GlossaryEnergy.CO2Tax),
-                    inputs_dict[f'{energy}.{GlossaryEnergy.CO2PerUse}'][GlossaryEnergy.CO2PerUse].values *
-                    np.identity(len(years)))
-                self.set_partial_derivative_for_other_types(
+                    inputs_dict[f'{energy}.{GlossaryEnergy.CO2PerUse}'][GlossaryEnergy.CO2PerUse].values)
+                self.set_partial_derivative_diagonal(
                     ('energy_prices_after_tax',
                      energy), (f'{ns_energy}.{GlossaryEnergy.CO2PerUse}', GlossaryEnergy.CO2PerUse),
-                    inputs_dict[GlossaryEnergy.CO2TaxesValue][GlossaryEnergy.CO2Tax].values *
-                    np.identity(len(years)))
-            self.set_partial_derivative_for_other_types(
+                    inputs_dict[GlossaryEnergy.CO2TaxesValue][GlossaryEnergy.CO2Tax].values)
+            self.set_partial_derivative_diagonal(
                 (GlossaryEnergy.EnergyPricesValue, energy), (f'{ns_energy}.{GlossaryEnergy.EnergyPricesValue}', energy),
-                np.identity(len(years)))
+                1.0)
 
         # -------------------------------#
         # ---Resource Demand gradients---#
@@ -837,14 +824,12 @@ class Energy_Mix_Discipline(SoSWrapp):
                 resource_wo_unit = resource.replace(
                     f" ({ResourceGlossary.UNITS['consumption']})", '')
                 if resource_wo_unit in resource_list:
-                    self.set_partial_derivative_for_other_types(('resources_demand', resource_wo_unit), (
+                    self.set_partial_derivative_diagonal(('resources_demand', resource_wo_unit), (
                         f'{ns_energy}.{GlossaryEnergy.EnergyConsumptionValue}', resource),
-                                                                scaling_factor_energy_consumption * np.identity(
-                                                                    len(years)))
-                    self.set_partial_derivative_for_other_types(('resources_demand_woratio', resource_wo_unit), (
+                                                         scaling_factor_energy_consumption)
+                    self.set_partial_derivative_diagonal(('resources_demand_woratio', resource_wo_unit), (
                         f'{ns_energy}.{GlossaryEnergy.EnergyConsumptionWithoutRatioValue}', resource),
-                                                                scaling_factor_energy_consumption * np.identity(
-                                                                    len(years)))
+                                                         scaling_factor_energy_consumption)
         # -----------------------------#
         # ---- Mean Price gradients----#
         # -----------------------------#
@@ -852,29 +837,29 @@ class Energy_Mix_Discipline(SoSWrapp):
         self.grad_energy_mix_vs_prod_dict = self.energy_model.compute_grad_element_mix_vs_prod(
             deepcopy(production_energy_net_pos), element_dict, exp_min=inputs_dict['exp_min'],
             min_prod=production_threshold)
-        dmean_price_dco2_tax = np.zeros((len(years), len(years)))
+        dmean_price_dco2_tax = np.zeros(len(years))
         for energy in energy_list:
             ns_energy = self.get_ns_energy(energy)
             if energy in energies:
                 mix_weight_energy = mix_weight[energy].values
                 dmean_price_dco2_tax += inputs_dict[f'{energy}.{GlossaryEnergy.CO2PerUse}'][GlossaryEnergy.CO2PerUse].values * \
                                         mix_weight_energy
-                d_emp = mix_weight_energy * np.identity(len(years))
-                self.set_partial_derivative_for_other_types(
+                d_emp = mix_weight_energy
+                self.set_partial_derivative_diagonal(
                     (GlossaryEnergy.EnergyMeanPriceValue, GlossaryEnergy.EnergyPriceValue),
                     (f'{ns_energy}.{GlossaryEnergy.EnergyPricesValue}', energy),
                     d_emp)
-                d_emp_obj = self.energy_model.d_energy_mean_price_obj_d_energy_mean_price(d_emp)
+                d_emp_obj = self.energy_model.d_energy_mean_price_obj_d_energy_mean_price_diagonal(d_emp)
                 self.set_partial_derivative_for_other_types(
                     (GlossaryEnergy.EnergyMeanPriceObjectiveValue,),
                     (f'{ns_energy}.{GlossaryEnergy.EnergyPricesValue}', energy),
                     d_emp_obj)
-                d_emp = inputs_dict[GlossaryEnergy.CO2TaxesValue][GlossaryEnergy.CO2Tax].values * mix_weight_energy * np.identity(len(years))
-                self.set_partial_derivative_for_other_types(
+                d_emp = inputs_dict[GlossaryEnergy.CO2TaxesValue][GlossaryEnergy.CO2Tax].values * mix_weight_energy
+                self.set_partial_derivative_diagonal(
                     (GlossaryEnergy.EnergyMeanPriceValue, GlossaryEnergy.EnergyPriceValue),
                     (f'{ns_energy}.{GlossaryEnergy.CO2PerUse}', GlossaryEnergy.CO2PerUse),
                     d_emp)
-                d_emp_obj = self.energy_model.d_energy_mean_price_obj_d_energy_mean_price(d_emp)
+                d_emp_obj = self.energy_model.d_energy_mean_price_obj_d_energy_mean_price_diagonal(d_emp)
                 self.set_partial_derivative_for_other_types(
                     (GlossaryEnergy.EnergyMeanPriceObjectiveValue,),
                     (f'{ns_energy}.{GlossaryEnergy.CO2PerUse}', GlossaryEnergy.CO2PerUse),
@@ -890,11 +875,11 @@ class Energy_Mix_Discipline(SoSWrapp):
                     loss_percentage += (1.0 -
                                         self.energy_model.raw_tonet_dict[energy])
                 d_emp = scaling_factor_energy_production * dmean_price_dprod * (1.0 - loss_percentage)
-                self.set_partial_derivative_for_other_types(
+                self.set_partial_derivative_diagonal(
                     (GlossaryEnergy.EnergyMeanPriceValue, GlossaryEnergy.EnergyPriceValue),
                     (f'{ns_energy}.{GlossaryEnergy.EnergyProductionValue}', energy),
                     d_emp)
-                d_emp_obj = self.energy_model.d_energy_mean_price_obj_d_energy_mean_price(d_emp)
+                d_emp_obj = self.energy_model.d_energy_mean_price_obj_d_energy_mean_price_diagonal(d_emp)
                 self.set_partial_derivative_for_other_types(
                     (GlossaryEnergy.EnergyMeanPriceObjectiveValue,),
                     (f'{ns_energy}.{GlossaryEnergy.EnergyProductionValue}', energy),
@@ -912,23 +897,22 @@ class Energy_Mix_Discipline(SoSWrapp):
                                                                                production_energy_net_pos,
                                                                                production_detailed_df, cons=True)
                             d_emp = scaling_factor_energy_consumption * dmean_price_dcons
-                            self.set_partial_derivative_for_other_types(
+                            self.set_partial_derivative_diagonal(
                                 (GlossaryEnergy.EnergyMeanPriceValue, GlossaryEnergy.EnergyPriceValue),
                                 (f'{ns_energy_input}.{GlossaryEnergy.EnergyConsumptionValue}',
                                  f'{energy} ({stream_class_dict[energy].unit})'),
                                 d_emp)
-                            d_emp_obj = self.energy_model.d_energy_mean_price_obj_d_energy_mean_price(d_emp)
+                            d_emp_obj = self.energy_model.d_energy_mean_price_obj_d_energy_mean_price_diagonal(d_emp)
                             self.set_partial_derivative_for_other_types(
                                 (GlossaryEnergy.EnergyMeanPriceObjectiveValue, ),
                                 (f'{ns_energy_input}.{GlossaryEnergy.EnergyConsumptionValue}',
                                  f'{energy} ({stream_class_dict[energy].unit})'),
                                 d_emp_obj)
-        d_emp = dmean_price_dco2_tax * np.identity(len(years))
-        self.set_partial_derivative_for_other_types(
+        self.set_partial_derivative_diagonal(
             (GlossaryEnergy.EnergyMeanPriceValue, GlossaryEnergy.EnergyPriceValue),
             (GlossaryEnergy.CO2TaxesValue, GlossaryEnergy.CO2Tax),
-            dmean_price_dco2_tax * np.identity(len(years)))
-        d_emp_obj = self.energy_model.d_energy_mean_price_obj_d_energy_mean_price(d_emp)
+            dmean_price_dco2_tax)
+        d_emp_obj = self.energy_model.d_energy_mean_price_obj_d_energy_mean_price_diagonal(dmean_price_dco2_tax)
         self.set_partial_derivative_for_other_types(
             (GlossaryEnergy.EnergyMeanPriceObjectiveValue, ),
             (GlossaryEnergy.CO2TaxesValue, GlossaryEnergy.CO2Tax),
@@ -961,9 +945,9 @@ class Energy_Mix_Discipline(SoSWrapp):
         for energy in energies:
             ns_energy = self.get_ns_energy(energy)
             if energy in outputs_dict[GlossaryEnergy.EnergyCO2EmissionsValue].keys():
-                self.set_partial_derivative_for_other_types(
+                self.set_partial_derivative_diagonal(
                     (GlossaryEnergy.EnergyCO2EmissionsValue, energy),
-                    (f'{ns_energy}.{GlossaryEnergy.CO2EmissionsValue}', energy), np.identity(len(years)))
+                    (f'{ns_energy}.{GlossaryEnergy.CO2EmissionsValue}', energy), 1.0)
             for energy_input in energy_list:
                 ns_energy_input = self.get_ns_energy(energy_input)
                 list_columnsenergyprod = list(
@@ -983,24 +967,22 @@ class Energy_Mix_Discipline(SoSWrapp):
                                             self.energy_model.raw_tonet_dict[energy])
                     loss_percent = heat_losses_percentage + loss_percentage
 
-                    self.set_partial_derivative_for_other_types((EnergyMix.TOTAL_PROD_MINUS_MIN_PROD_CONSTRAINT_DF,
-                                                                 EnergyMix.TOTAL_PROD_MINUS_MIN_PROD_CONSTRAINT),
-                                                                (
-                                                                f'{ns_energy_input}.{GlossaryEnergy.EnergyProductionValue}',
-                                                                energy),
-                                                                scaling_factor_energy_production * np.identity(
-                                                                    len(years)) / total_prod_minus_min_prod_constraint_ref * (
-                                                                        1.0 - loss_percent))
+                    self.set_partial_derivative_diagonal((EnergyMix.TOTAL_PROD_MINUS_MIN_PROD_CONSTRAINT_DF,
+                                                          EnergyMix.TOTAL_PROD_MINUS_MIN_PROD_CONSTRAINT),
+                                                         (
+                                                         f'{ns_energy_input}.{GlossaryEnergy.EnergyProductionValue}',
+                                                         energy),
+                                                         scaling_factor_energy_production / total_prod_minus_min_prod_constraint_ref * (
+                                                                 1.0 - loss_percent))
 
                 if True in list_index_conso:
-                    self.set_partial_derivative_for_other_types((EnergyMix.TOTAL_PROD_MINUS_MIN_PROD_CONSTRAINT_DF,
-                                                                 EnergyMix.TOTAL_PROD_MINUS_MIN_PROD_CONSTRAINT),
-                                                                (
-                                                                f'{ns_energy_input}.{GlossaryEnergy.EnergyConsumptionValue}',
-                                                                list_columns_energy_consumption[
-                                                                    list_index_conso.index(True)]),
-                                                                -scaling_factor_energy_consumption * np.identity(
-                                                                    len(years)) / total_prod_minus_min_prod_constraint_ref)
+                    self.set_partial_derivative_diagonal((EnergyMix.TOTAL_PROD_MINUS_MIN_PROD_CONSTRAINT_DF,
+                                                          EnergyMix.TOTAL_PROD_MINUS_MIN_PROD_CONSTRAINT),
+                                                         (
+                                                         f'{ns_energy_input}.{GlossaryEnergy.EnergyConsumptionValue}',
+                                                         list_columns_energy_consumption[
+                                                             list_index_conso.index(True)]),
+                                                         -scaling_factor_energy_consumption / total_prod_minus_min_prod_constraint_ref)
 
         # --------------------------------------#
         # ---- Stream Demand ratio gradients ---#
@@ -1017,14 +999,14 @@ class Energy_Mix_Discipline(SoSWrapp):
             ddemand_ratio_denergy_prod, ddemand_ratio_denergy_cons = self.compute_ddemand_ratio_denergy_production(
                 energy, sub_production_dict, sub_consumption_woratio_dict,
                 scaling_factor_energy_production, years, energy_production_brut_detailed)
-            self.set_partial_derivative_for_other_types(
+            self.set_partial_derivative_diagonal(
                 (GlossaryEnergy.AllStreamsDemandRatioValue,
                  f'{energy}'), (f'{ns_energy}.{GlossaryEnergy.EnergyProductionValue}', energy),
                 ddemand_ratio_denergy_prod)
             dobjective_dratio_energy = np.array([dobjective_dratio[ienergy + iyear * len(
                 energy_list)] for iyear in range(len(years))]).reshape((1, len(years)))
-            dobjective_dprod = np.matmul(
-                dobjective_dratio_energy, ddemand_ratio_denergy_prod)
+            # product of the row vector with the diagonal block
+            dobjective_dprod = dobjective_dratio_energy * ddemand_ratio_denergy_prod
 
             self.set_partial_derivative_for_other_types(
                 ('ratio_objective',), (f'{ns_energy}.{GlossaryEnergy.EnergyProductionValue}', energy), dobjective_dprod)
@@ -1034,12 +1016,11 @@ class Energy_Mix_Discipline(SoSWrapp):
                 list_columns_energy_consumption = list(
                     inputs_dict[f'{energy_input}.{GlossaryEnergy.EnergyConsumptionValue}'].columns)
                 if f'{energy} ({stream_class_dict[energy].unit})' in list_columns_energy_consumption:
-                    self.set_partial_derivative_for_other_types(
+                    self.set_partial_derivative_diagonal(
                         (GlossaryEnergy.AllStreamsDemandRatioValue, f'{energy}'), (
                             f'{ns_energy_input}.{GlossaryEnergy.EnergyConsumptionWithoutRatioValue}',
                             f'{energy} ({stream_class_dict[energy].unit})'), ddemand_ratio_denergy_cons)
-                    dobjective_dcons = np.matmul(
-                        dobjective_dratio_energy, ddemand_ratio_denergy_cons)
+                    dobjective_dcons = dobjective_dratio_energy * ddemand_ratio_denergy_cons
                     self.set_partial_derivative_for_other_types(
                         ('ratio_objective',), (
                             f'{ns_energy_input}.{GlossaryEnergy.EnergyConsumptionWithoutRatioValue}',
@@ -1054,10 +1035,28 @@ class Energy_Mix_Discipline(SoSWrapp):
             for key in outputs_dict['land_demand_df']:
                 if key in inputs_dict[
                     f'{energy}.{GlossaryEnergy.LandUseRequiredValue}'] and key != GlossaryEnergy.Years:
-                    self.set_partial_derivative_for_other_types(('land_demand_df', key),
-                                                                (f'{ns_energy}.{GlossaryEnergy.LandUseRequiredValue}',
-                                                                 key),
-                                                                np.identity(len(years)))
+                    self.set_partial_derivative_diagonal(('land_demand_df', key),
+                                                         (f'{ns_energy}.{GlossaryEnergy.LandUseRequiredValue}',
+                                                          key),
+                                                         1.0)
+
+        self.set_diagonal_partial_derivatives(len(years))
+
+    def set_partial_derivative_diagonal(self, y_key_column, x_key_column, diagonal):
+        '''
+        Store a diagonal (years x years) gradient block by its diagonal values
+        diagonal is a vector or a scalar for a scaled identity, a block set twice is overwritten
+        '''
+        self.diagonal_jacobian_blocks[(y_key_column, x_key_column)] = diagonal
+
+    def set_diagonal_partial_derivatives(self, nb_years):
+        '''
+        Set the stored diagonal gradient blocks as sparse matrices, no dense (years x years) block is built
+        '''
+        for (y_key_column, x_key_column), diagonal in self.diagonal_jacobian_blocks.items():
+            self.set_partial_derivative_for_other_types(y_key_column, x_key_column,
+                                                        diagonal_to_sparse(diagonal, nb_years))
+        self.diagonal_jacobian_blocks = {}
 
     def set_gradient_for_co2_emissions(self, co2_variable, co2_emissions, co2_emission_column, energy, energy_prod_info,
                                        last_part_key, value, inputs_dict, years):
@@ -1071,39 +1070,39 @@ class Energy_Mix_Discipline(SoSWrapp):
             '''
 
             if last_part_key == 'prod':
-                self.set_partial_derivative_for_other_types(
+                self.set_partial_derivative_diagonal(
                     (co2_variable,
                      co2_emission_column), (f'{ns_energy}.{GlossaryEnergy.EnergyProductionValue}', energy),
-                    np.identity(len(years)) * inputs_dict['scaling_factor_energy_production'] * value / 1.0e3)
+                    inputs_dict['scaling_factor_energy_production'] * value / 1.0e3)
             elif last_part_key == 'cons':
                 for energy_df in inputs_dict[GlossaryEnergy.energy_list]:
                     ns_energy_df = self.get_ns_energy(energy_df)
                     list_columnsenergycons = list(
                         inputs_dict[f'{energy_df}.{GlossaryEnergy.EnergyConsumptionValue}'].columns)
                     if f'{energy} (TWh)' in list_columnsenergycons:
-                        self.set_partial_derivative_for_other_types(
+                        self.set_partial_derivative_diagonal(
                             (co2_variable, co2_emission_column),
                             (f'{ns_energy_df}.{GlossaryEnergy.EnergyConsumptionValue}',
                              f'{energy} (TWh)'),
-                            np.identity(len(years)) * inputs_dict['scaling_factor_energy_consumption'] * value / 1.0e3)
+                            inputs_dict['scaling_factor_energy_consumption'] * value / 1.0e3)
             elif last_part_key == 'co2_per_use':
-                self.set_partial_derivative_for_other_types(
+                self.set_partial_derivative_diagonal(
                     (co2_variable,
                      co2_emission_column), (f'{ns_energy}.{GlossaryEnergy.CO2PerUse}', GlossaryEnergy.CO2PerUse),
-                    np.identity(len(years)) * value / 1.0e3)
+                    value / 1.0e3)
 
             else:
                 very_last_part_key = energy_prod_info.split('#')[2]
                 if very_last_part_key == 'prod':
-                    self.set_partial_derivative_for_other_types(
+                    self.set_partial_derivative_diagonal(
                         (co2_variable, co2_emission_column), (
                             f'{ns_energy}.{GlossaryEnergy.EnergyProductionValue}', last_part_key),
-                        np.identity(len(years)) * inputs_dict['scaling_factor_energy_production'] * value / 1.0e3)
+                        inputs_dict['scaling_factor_energy_production'] * value / 1.0e3)
                 elif very_last_part_key == 'cons':
-                    self.set_partial_derivative_for_other_types(
+                    self.set_partial_derivative_diagonal(
                         (co2_variable, co2_emission_column), (
                             f'{ns_energy}.{GlossaryEnergy.EnergyConsumptionValue}', last_part_key),
-                        np.identity(len(years)) * inputs_dict['scaling_factor_energy_production'] * value / 1.0e3)
+                        inputs_dict['scaling_factor_energy_production'] * value / 1.0e3)
 
     def compute_dratio_objective(self, stream_ratios, ratio_ref, energy_list):
         '''
@@ -1122,13 +1121,14 @@ class Energy_Mix_Discipline(SoSWrapp):
     def compute_denergy_production_objective_dprod(self, dtotal_production_denergy_production, alpha, prod, years):
         ''' energy_production_objective = np.asarray([(1. - alpha) * self.energy_model.production[GlossaryEnergy.TotalProductionValue][0] * delta_years
                                                   / self.energy_model.production[GlossaryEnergy.TotalProductionValue].sum(), ])
+        dtotal_production_denergy_production is the diagonal of the gradient of the total production
         '''
 
         tot_energy_production_sum = prod[GlossaryEnergy.TotalProductionValue].sum()
-        dtot_energy_production_sum = dtotal_production_denergy_production.sum(
-            axis=0)
+        dtot_energy_production_sum = dtotal_production_denergy_production
         tot_energy_production_0 = prod[GlossaryEnergy.TotalProductionValue][0]
-        dtot_energy_production_0 = dtotal_production_denergy_production[0]
+        dtot_energy_production_0 = np.zeros_like(dtotal_production_denergy_production)
+        dtot_energy_production_0[0] = dtotal_production_denergy_production[0]
 
         delta_years = (years[-1] - years[0] + 1)
 
@@ -1164,22 +1164,12 @@ class Energy_Mix_Discipline(SoSWrapp):
         Compute gradient of production[GlossaryEnergy.TotalProductionValue] by {energy}.energy_prod[{energy}] taking into account
         the exponential decrease towards the limit applied on the calculation of the total net energy production
         Inputs: minimum_energy_production, production_df
-        Outputs:dtotal_production_denergy_production
+        Outputs:dtotal_production_denergy_production, diagonal of the gradient
         '''
-        years = production_detailed_df[GlossaryEnergy.Years]
-        dtotal_production_denergy_production = np.ones(len(years))
-        dtotal_production_denergy_production *= (
-                1.0 - total_loss_percent)
-
-        total_prod = production_detailed_df['Total production (uncut)'].values
-        if total_prod.min() < min_energy:
-            # To avoid underflow : exp(-200) is considered to be the
-            # minimum value for the exp
-            total_prod[total_prod < -200.0 * min_energy] = -200.0 * min_energy
-            dtotal_production_denergy_production[total_prod < min_energy] = np.exp(
-                total_prod[total_prod < min_energy] / min_energy) * np.exp(-1) / 10.0 * (1.0 - total_loss_percent)
+        _, dtotal_production_denergy_production = compute_exp_min(
+            production_detailed_df['Total production (uncut)'].values, min_energy)
 
-        return np.identity(len(years)) * dtotal_production_denergy_production
+        return dtotal_production_denergy_production * (1.0 - total_loss_percent)
 
     def compute_ddemand_ratio_denergy_production(self, energy, sub_production_dict, sub_consumption_dict,
                                                  scaling_factor_production, years, energy_production_brut_detailed):
@@ -1190,7 +1180,7 @@ class Energy_Mix_Discipline(SoSWrapp):
         @param sub_production_dict: dictionary with the raw production for all the energies 
         @param sub_consumption_dict: dictionary with the raw consumption for all energies
         @param scaling_factor_production: float used to scale the energy production at input/output of the model
-        @return ddemand_ratio_denergy_prod, ddemand_ratio_denergy_cons: numpy.arrays, shape=(len(years),len(years)) with the gradients
+        @return ddemand_ratio_denergy_prod, ddemand_ratio_denergy_cons: numpy.arrays, shape=(len(years),) with the diagonals of the gradients
         :param years:
         :type years:
         :param energy_production_brut_detailed:
@@ -1213,18 +1203,12 @@ class Energy_Mix_Discipline(SoSWrapp):
 
         # If prod < cons, set the identity element for the given year to the
         # corresponding value
-        denergy_prod_limited = compute_dfunc_with_exp_min(
-            energy_production, 1.0e-10)
-        energy_prod_limited = compute_func_with_exp_min(
-            energy_production, 1.0e-10)
+        energy_prod_limited, denergy_prod_limited = compute_exp_min(energy_production, 1.0e-10)
 
         # If prod < cons, set the identity element for the given year to
         # the corresponding value
-        denergy_cons_limited = compute_dfunc_with_exp_min(
-            energy_consumption, 1.0e-10)
-        energy_cons_limited = compute_func_with_exp_min(
-            energy_consumption, 1.0e-10)
-        ddemand_ratio_denergy_cons = np.identity(len(years)) * 100.0 * \
+        energy_cons_limited, denergy_cons_limited = compute_exp_min(energy_consumption, 1.0e-10)
+        ddemand_ratio_denergy_cons = 100.0 * \
                                      np.where((energy_prod_limited <= energy_cons_limited) * (
                                              energy_prod_limited / energy_cons_limited > 1E-15),
                                               -scaling_factor_production * energy_prod_limited * denergy_cons_limited /
@@ -1233,7 +1217,7 @@ class Energy_Mix_Discipline(SoSWrapp):
 
         if energy in EnergyMix.raw_tonet_dict.keys():
 
-            denergy_prod_limited = np.identity(len(years)) * 100.0 * \
+            denergy_prod_limited = 100.0 * \
                                    np.where((energy_prod_limited <= energy_cons_limited) * (
                                            energy_prod_limited / energy_cons_limited > 1E-15),
                                             denergy_prod_limited * scaling_factor_production * EnergyMix.raw_tonet_dict[
@@ -1241,7 +1225,7 @@ class Energy_Mix_Discipline(SoSWrapp):
                                             energy_cons_limited,
                                             0.0)
         else:
-            denergy_prod_limited = np.identity(len(years)) * 100.0 * \
+            denergy_prod_limited = 100.0 * \
                                    np.where((energy_prod_limited <= energy_cons_limited) * (
                                            energy_prod_limited / energy_cons_limited > 1E-15),
                                             denergy_prod_limited * scaling_factor_production /
@@ -1262,7 +1246,7 @@ class Energy_Mix_Discipline(SoSWrapp):
             - production_energy_net_pos_consumable: dataframe with values
             - production_detailed_df: dataframe with values 
         Output:
-            - dmean_price_dprod
+            - dmean_price_dprod, diagonal of the gradient
         """
         mix_weight_energy = mix_weight[energy].values
         # The mix_weight_techno is zero means that the techno is negligible else we do nothing
@@ -1285,15 +1269,14 @@ class Energy_Mix_Discipline(SoSWrapp):
         # should not be zero
         gradient_sign = np.sign(production_energy_net_pos_consumable[energy].values) + (
                 production_detailed_df[f'production {energy} (TWh)'].values == 0.0)
-        years = production_detailed_df[GlossaryEnergy.Years].values
 
         dmean_price_dprod = grad_price_vs_prod * \
-                            gradient_sign * np.identity(len(years))
+                            gradient_sign
         # if dmean_price_dcons
         if cons:
             dmean_price_dprod = -grad_price_vs_prod * \
                                 np.sign(
-                                    production_energy_net_pos_consumable[energy].values) * np.identity(len(years))
+                                    production_energy_net_pos_consumable[energy].values)
         return dmean_price_dprod
 
     #
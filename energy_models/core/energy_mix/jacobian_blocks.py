@@ -0,0 +1,28 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import numpy as np
+from scipy.sparse import diags
+
+
+def diagonal_to_sparse(diagonal, nb_years):
+    """
+    Sparse (nb_years x nb_years) matrix of a diagonal gradient block, only the diagonal values are stored
+    diagonal is the vector of the diagonal values or a scalar for a scaled identity
+    The dtype of the diagonal is kept (complex step)
+    """
+    diagonal = np.asarray(diagonal)
+    dtype = np.result_type(diagonal.dtype, np.float64)
+    return diags(np.broadcast_to(diagonal, (nb_years,)).astype(dtype), format='csr')
@@ -0,0 +1,71 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import numpy as np
+
+
+def build_net_production_incidence(energy_list, ccs_list, consumption_columns, units):
+    """
+    Incidence of the consumption columns of the streams on the net production of the energy mix
+
+    :param energy_list: energies of the mix, consumed as '{energy} ({unit})' columns
+    :param ccs_list: ccs streams, their '(Mt)' consumption columns are removed from their production
+    :param consumption_columns: dict stream -> columns of its consumption dataframe
+    :param units: dict stream -> unit of the stream
+    :return: dict stream -> its consumption columns used in the net production and the incidence matrix
+             (consumption column x output) where the outputs are the energies consumed by the energies,
+             the energies consumed by the ccus streams and the consumption of the ccs streams
+    """
+    nb_energies = len(energy_list)
+    energy_index = {f'{energy} ({units[energy]})': index for index, energy in enumerate(energy_list)}
+    used_columns = {}
+    incidence_rows = []
+    for stream, columns in consumption_columns.items():
+        used_columns[stream] = []
+        for column in columns:
+            incidence_row = np.zeros(2 * nb_energies + len(ccs_list))
+            if column in energy_index:
+                incidence_row[energy_index[column] + (0 if stream in energy_list else nb_energies)] = 1.0
+            if stream in ccs_list and column.endswith('(Mt)'):
+                incidence_row[2 * nb_energies + ccs_list.index(stream)] = 1.0
+            if incidence_row.any():
+                used_columns[stream].append(column)
+                incidence_rows.append(incidence_row)
+
+    incidence = np.array(incidence_rows).reshape(len(incidence_rows), 2 * nb_energies + len(ccs_list))
+    return used_columns, incidence
+
+
+def compute_net_production(raw_production, consumptions, incidence, raw_to_net_losses):
+    """
+    Consumable and net productions of the energies and production of the ccs streams in one contraction
+
+    consumable = raw - consumed by energies - raw * (1 - raw_to_net) for coarse energies
+    net = consumable - consumed by ccus
+    ccs production = - consumption of the ccs stream
+
+    :param raw_production: (year x energy) raw production matrix
+    :param consumptions: (year x consumption column) matrix of the columns of the incidence
+    :param incidence: incidence matrix built by build_net_production_incidence
+    :param raw_to_net_losses: 1 - raw_to_net ratio of each energy (0 for energies which are not coarse)
+    :return: consumable production, net production and ccs production matrices
+    """
+    nb_energies = raw_production.shape[1]
+    consumed = consumptions @ incidence
+    consumable_production = raw_production - consumed[:, :nb_energies] - raw_production * raw_to_net_losses
+    net_production = consumable_production - consumed[:, nb_energies:2 * nb_energies]
+    ccs_production = - consumed[:, 2 * nb_energies:]
+
+    return consumable_production, net_production, ccs_production
@@ -0,0 +1,43 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import numpy as np
+
+# To avoid underflow : exp(-200) is considered to be the minimum value for the exp
+EXP_MIN_LOWER_BOUND_RATIO = -200.0
+
+
+def compute_exp_min(values, min_value, lower_bound_ratio=EXP_MIN_LOWER_BOUND_RATIO):
+    """
+    Smooth floor of values towards min_value : values below min_value are replaced by
+    min_value / 10 * (9 + exp(value / min_value - 1)) which stays above 0.9 * min_value
+    Values are clipped at lower_bound_ratio * min_value before the exponential
+    Works on arrays of any shape and is complex step safe (comparisons are made on the real part)
+
+    :return: smoothed values and their (element-wise) derivative wrt values
+    """
+    values = np.asarray(values)
+    is_below_min = np.real(values) < min_value
+    if not is_below_min.any():
+        return values, np.ones(values.shape)
+
+    lower_bound = lower_bound_ratio * min_value
+    clipped_values = np.where(np.real(values) < lower_bound, lower_bound, values)
+    exp_values = np.exp(np.where(is_below_min, clipped_values, min_value) / min_value) * np.exp(-1)
+
+    smoothed_values = np.where(is_below_min, min_value / 10.0 * (9.0 + exp_values), values)
+    dsmoothed_values = np.where(is_below_min, exp_values / 10.0, 1.0)
+
+    return smoothed_values, dsmoothed_values
@@ -20,6 +20,7 @@ from copy import deepcopy
 # DESC_OUT = energy techno output (J or Wh) + price + cost breakdown
 import pandas as pd
 
+from energy_models.core.investments.invest_distribution import align_years, compute_invest_distribution
 from energy_models.core.stream_type.energy_models.biomass_dry import BiomassDry
 from energy_models.glossaryenergy import GlossaryEnergy
 
@@ -37,6 +38,7 @@ class BaseInvest:
         self.energy_list = None
         self.column_name = None
         self.distribution_list = None
+        self.invest_distribution = None
 
     # -- Setters
 
@@ -75,20 +77,22 @@ class BaseInvest:
         return out_df
 
     def get_distributed_invest(self, base_list, output_unit):
-        norm_mix = compute_norm_mix(self.mix_df, base_list)
-
         converted_invest_df = self.get_invest_level(output_unit)
-        converted_invest_df[GlossaryEnergy.Years] = converted_invest_df[GlossaryEnergy.Years].values.real.astype(
-            int)
         self.mix_df[GlossaryEnergy.Years] = self.mix_df[GlossaryEnergy.Years].values.real.astype(
             int)
-        invest_distrib = pd.merge(self.mix_df, converted_invest_df, on=GlossaryEnergy.Years)
+        mix_years = self.mix_df[GlossaryEnergy.Years].values
+        mix_rows, invest_rows = align_years(
+            mix_years, converted_invest_df[GlossaryEnergy.Years].values.real.astype(int))
+
+        # years x techno matrix of investments, only the output dataframe is built from it
+        self.invest_distribution = compute_invest_distribution(
+            converted_invest_df[self.column_name].values[invest_rows], self.mix_df[base_list].values[mix_rows])
 
-        for energy in base_list:
-            invest_distrib[energy] *= invest_distrib[self.column_name].values / \
-                                      norm_mix.values
+        distrib_dict = dict(zip(base_list, self.invest_distribution.T))
+        invest_distrib = pd.DataFrame({energy: distrib_dict[energy] for energy in self.energy_list})
+        invest_distrib[GlossaryEnergy.Years] = mix_years[mix_rows]
 
-        return invest_distrib[self.energy_list + [GlossaryEnergy.Years]], output_unit
+        return invest_distrib, output_unit
 
     def compute_distribution_list(self, input_dict):
         self.distribution_list = []
@@ -176,10 +176,8 @@ class InvestmentsRedistributionDisicpline(SoSWrapp):
         }
 
         # add investments in all technologies (except for biomass dry to output)
-        for energy in input_dict[GlossaryEnergy.energy_list] + input_dict[GlossaryEnergy.ccs_list]:
-            if energy != BiomassDry.name:
-                for techno_name, invest_techno in self.invest_redistribution_model.investment_per_technology_dict.items():
-                    output_dict[f'{techno_name}.{GlossaryEnergy.InvestLevelValue}'] = invest_techno
+        for techno_name, invest_techno in self.invest_redistribution_model.get_investment_per_technology_dict().items():
+            output_dict[f'{techno_name}.{GlossaryEnergy.InvestLevelValue}'] = invest_techno
 
         self.store_sos_outputs_values(output_dict)
 
@@ -195,26 +193,19 @@ class InvestmentsRedistributionDisicpline(SoSWrapp):
         energy_list = inputs_dict[GlossaryEnergy.EnergyListName]
         percentage_gdp_invest_energy = inputs_dict[GlossaryEnergy.EnergyInvestPercentageGDPName][
                                            GlossaryEnergy.EnergyInvestPercentageGDPName].values / 100.  # divide by 100 as it is percentage and *1e3 as we convert to G$
-        techno_invest_percentage_df = inputs_dict[GlossaryEnergy.TechnoInvestPercentageName]
         economics_df = inputs_dict[GlossaryEnergy.EconomicsDfValue]
 
-        for energy, techno_list in self.invest_redistribution_model.techno_list_dict.items():
-            for techno in techno_list:
-                grad_inv_level_wrt_economics = percentage_gdp_invest_energy * identity * techno_invest_percentage_df[
-                    techno].values / 100.
-                grad_inv_level_wrt_gdp_perc = identity * economics_df[GlossaryEnergy.OutputNetOfDamage].values * \
-                                              techno_invest_percentage_df[
-                                                  techno].values / 100.
-
-                self.set_partial_derivative_for_other_types(
-                    (f'{energy}.{techno}.{GlossaryEnergy.InvestLevelValue}', GlossaryEnergy.InvestValue),
-                    (GlossaryEnergy.EconomicsDfValue, GlossaryEnergy.OutputNetOfDamage),
-                    grad_inv_level_wrt_economics * 1e3)
-
-                self.set_partial_derivative_for_other_types(
-                    (f'{energy}.{techno}.{GlossaryEnergy.InvestLevelValue}', GlossaryEnergy.InvestValue),
-                    (GlossaryEnergy.EnergyInvestPercentageGDPName, GlossaryEnergy.EnergyInvestPercentageGDPName),
-                    grad_inv_level_wrt_gdp_perc * 1e3 / 100.)
+        dinvest_doutput, dinvest_dpercentage = self.invest_redistribution_model.compute_dinvestment_per_technology()
+        for i, techno_name in enumerate(self.invest_redistribution_model.distribution_list):
+            self.set_partial_derivative_for_other_types(
+                (f'{techno_name}.{GlossaryEnergy.InvestLevelValue}', GlossaryEnergy.InvestValue),
+                (GlossaryEnergy.EconomicsDfValue, GlossaryEnergy.OutputNetOfDamage),
+                np.diag(dinvest_doutput[:, i]))
+
+            self.set_partial_derivative_for_other_types(
+                (f'{techno_name}.{GlossaryEnergy.InvestLevelValue}', GlossaryEnergy.InvestValue),
+                (GlossaryEnergy.EnergyInvestPercentageGDPName, GlossaryEnergy.EnergyInvestPercentageGDPName),
+                np.diag(dinvest_dpercentage[:, i]))
 
         self.set_partial_derivative_for_other_types(
             (GlossaryEnergy.EnergyInvestmentsWoTaxValue, GlossaryEnergy.EnergyInvestmentsWoTaxValue),
@@ -25,7 +25,8 @@ import pandas as pd
 from climateeconomics.core.core_witness.climateeco_discipline import ClimateEcoDiscipline
 from energy_models.core.ccus.ccus import CCUS
 from energy_models.core.energy_mix.energy_mix import EnergyMix
-from energy_models.core.investments.base_invest import compute_norm_mix
+from energy_models.core.investments.invest_distribution import compute_dinvest_distribution_dinvest, \
+    compute_dinvest_distribution_dmix
 from energy_models.core.investments.one_invest import OneInvest
 from energy_models.core.stream_type.energy_models.biomass_dry import BiomassDry
 from energy_models.glossaryenergy import GlossaryEnergy
@@ -229,15 +230,12 @@ class OneInvestDiscipline(SoSWrapp):
 
         output_dict = {'all_invest_df': all_invest_df}
 
-        for energy in input_dict[GlossaryEnergy.energy_list] + input_dict[GlossaryEnergy.ccs_list]:
-            if energy == BiomassDry.name:
-                pass
-            else:
-                for techno in input_dict[f'{energy}.{GlossaryEnergy.techno_list}']:
-                    output_dict[f'{energy}.{techno}.{GlossaryEnergy.InvestLevelValue}'] = pd.DataFrame(
-                        {GlossaryEnergy.Years: input_dict[GlossaryEnergy.EnergyInvestmentsValue][
-                            GlossaryEnergy.Years].values,
-                         GlossaryEnergy.InvestValue: all_invest_df[f'{energy}.{techno}'].values})
+        # per techno dataframes are only built here, from the years x techno matrix of the model
+        years = input_dict[GlossaryEnergy.EnergyInvestmentsValue][GlossaryEnergy.Years].values
+        for techno, invest in zip(self.one_invest_model.distribution_list,
+                                  self.one_invest_model.invest_distribution.T):
+            output_dict[f'{techno}.{GlossaryEnergy.InvestLevelValue}'] = pd.DataFrame(
+                {GlossaryEnergy.Years: years, GlossaryEnergy.InvestValue: invest})
 
         self.store_sos_outputs_values(output_dict)
 
@@ -246,37 +244,25 @@ class OneInvestDiscipline(SoSWrapp):
         inputs_dict = self.get_sosdisc_inputs()
 
         scaling_factor_energy_investment = inputs_dict['scaling_factor_energy_investment']
-        years = np.arange(inputs_dict[GlossaryEnergy.YearStart],
-                          inputs_dict[GlossaryEnergy.YearEnd] + 1)
-        norm_mix = compute_norm_mix(
-            inputs_dict[GlossaryEnergy.invest_mix], self.one_invest_model.distribution_list)
-
-        for techno in self.one_invest_model.distribution_list:
-            grad_energy = inputs_dict[GlossaryEnergy.invest_mix][techno].values / \
-                          norm_mix.values
-            self.set_partial_derivative_for_other_types(
-                (f'{techno}.{GlossaryEnergy.InvestLevelValue}', GlossaryEnergy.InvestValue),
-                (GlossaryEnergy.EnergyInvestmentsValue, GlossaryEnergy.EnergyInvestmentsValue),
-                scaling_factor_energy_investment * np.identity(len(years)) * grad_energy[:, np.newaxis])
+        distribution_list = self.one_invest_model.distribution_list
+        invest_mix = inputs_dict[GlossaryEnergy.invest_mix][distribution_list].values
+        energy_investment = inputs_dict[GlossaryEnergy.EnergyInvestmentsValue][
+                                GlossaryEnergy.EnergyInvestmentsValue].values * scaling_factor_energy_investment
 
-            grad_techno_mix = inputs_dict[GlossaryEnergy.EnergyInvestmentsValue][
-                                  GlossaryEnergy.EnergyInvestmentsValue].values * scaling_factor_energy_investment * (
-                                      norm_mix.values - inputs_dict[GlossaryEnergy.invest_mix][
-                                  techno].values) / norm_mix.values ** 2
+        dinvest_denergy_investment = compute_dinvest_distribution_dinvest(
+            invest_mix) * scaling_factor_energy_investment
+        dinvest_dinvest_mix = compute_dinvest_distribution_dmix(energy_investment, invest_mix)
+
+        for i, techno in enumerate(distribution_list):
             self.set_partial_derivative_for_other_types(
                 (f'{techno}.{GlossaryEnergy.InvestLevelValue}', GlossaryEnergy.InvestValue),
-                (GlossaryEnergy.invest_mix, techno),
-                np.identity(len(years)) * grad_techno_mix[:, np.newaxis])
-            for techno_other in self.one_invest_model.distribution_list:
-                if techno != techno_other:
-                    grad_techno_mix_other = -inputs_dict[GlossaryEnergy.EnergyInvestmentsValue][
-                        GlossaryEnergy.EnergyInvestmentsValue].values * scaling_factor_energy_investment * \
-                                            inputs_dict[GlossaryEnergy.invest_mix][techno].values / \
-                                            norm_mix.values ** 2
-                    self.set_partial_derivative_for_other_types(
-                        (f'{techno}.{GlossaryEnergy.InvestLevelValue}', GlossaryEnergy.InvestValue),
-                        (GlossaryEnergy.invest_mix, techno_other),
-                        np.identity(len(years)) * grad_techno_mix_other[:, np.newaxis])
+                (GlossaryEnergy.EnergyInvestmentsValue, GlossaryEnergy.EnergyInvestmentsValue),
+                np.diag(dinvest_denergy_investment[:, i]))
+            for j, techno_other in enumerate(distribution_list):
+                self.set_partial_derivative_for_other_types(
+                    (f'{techno}.{GlossaryEnergy.InvestLevelValue}', GlossaryEnergy.InvestValue),
+                    (GlossaryEnergy.invest_mix, techno_other),
+                    np.diag(dinvest_dinvest_mix[i, j]))
 
     def get_chart_filter_list(self):
 
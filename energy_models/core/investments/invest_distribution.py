@@ -0,0 +1,88 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import numpy as np
+import pandas as pd
+
+
+def compute_invest_distribution(invest, mix):
+    """
+    Distribute a yearly investment over technologies proportionally to an invest mix
+
+    distrib[t, k] = invest[t] * mix[t, k] / sum_j(mix[t, j])
+
+    :param invest: investment per year, shape (n_years,)
+    :param mix: invest mix, shape (n_years, n_techno)
+    :return: distributed investments, shape (n_years, n_techno)
+    """
+    norm_mix = mix.sum(axis=1)
+    return mix * (invest / norm_mix)[:, np.newaxis]
+
+
+def compute_dinvest_distribution_dinvest(mix):
+    """
+    Diagonals of the derivative of the distributed investments wrt the yearly investment
+
+    :param mix: invest mix, shape (n_years, n_techno)
+    :return: d distrib[t, k] / d invest[t], shape (n_years, n_techno)
+    """
+    return mix / mix.sum(axis=1)[:, np.newaxis]
+
+
+def compute_dinvest_distribution_dmix(invest, mix):
+    """
+    Diagonal blocks of the derivative of the distributed investments wrt the invest mix
+
+    d distrib[t, k] / d mix[t, j] = invest[t] / norm_mix[t] * (delta_kj - mix[t, k] / norm_mix[t])
+    All other derivatives are zero as years are independent from each other.
+
+    :param invest: investment per year, shape (n_years,)
+    :param mix: invest mix, shape (n_years, n_techno)
+    :return: diagonal of each (k, j) block, shape (n_techno, n_techno, n_years)
+    """
+    norm_mix = mix.sum(axis=1)
+    share = mix / norm_mix[:, np.newaxis]
+    n_techno = mix.shape[1]
+    return (np.identity(n_techno)[:, :, np.newaxis] - share.T[:, np.newaxis, :]) * (invest / norm_mix)
+
+
+def get_block_structured_jacobian(block_diagonals):
+    """
+    Assemble the full jacobian from the diagonals of its blocks
+
+    Row block k and column block j of the result is np.diag(block_diagonals[k, j]).
+    Disciplines set the blocks one by one, this full matrix is meant for checks on small cases.
+
+    :param block_diagonals: diagonal of each block, shape (n_out, n_in, n_years)
+    :return: jacobian of shape (n_out * n_years, n_in * n_years)
+    """
+    n_out, n_in, n_years = block_diagonals.shape
+    jacobian = np.zeros((n_out, n_years, n_in, n_years), dtype=block_diagonals.dtype)
+    years_index = np.arange(n_years)
+    jacobian[:, years_index, :, years_index] = block_diagonals.transpose(2, 0, 1)
+    return jacobian.reshape(n_out * n_years, n_in * n_years)
+
+
+def align_years(left_years, right_years):
+    """
+    Rows of both year arrays that match each other, in the order of left_years (as an inner merge on years)
+
+    :return: left rows and right rows, slices if both arrays are already equal
+    """
+    if np.array_equal(left_years, right_years):
+        return slice(None), slice(None)
+    left_rows = np.flatnonzero(np.isin(left_years, right_years))
+    right_rows = pd.Index(right_years).get_indexer(left_years[left_rows])
+    return left_rows, right_rows
@@ -13,8 +13,7 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 '''
-from math import isclose
-
+import numpy as np
 import pandas as pd
 
 from energy_models.core.stream_type.energy_models.biomass_dry import BiomassDry
@@ -36,7 +35,9 @@ class InvestmentsRedistribution:
         self.percentage_gdp_energy_invest = None
         self.techno_invest_percentage_df = None
         self.economics_df = None
-        self.investment_per_technology_dict = None
+        self.techno_invest_percentage = None
+        self.investment_per_technology = None
+        self.distribution_list = None
         self.energy_list = None
         self.ccs_list = None
         self.techno_list_dict = None
@@ -58,6 +59,8 @@ class InvestmentsRedistribution:
         self.ccs_list = self.inputs_dict[GlossaryEnergy.CCSListName]
         self.techno_list_dict = {energy: self.inputs_dict[f'{energy}.{GlossaryEnergy.TechnoListName}'] for energy in
                                  self.energy_list + self.ccs_list if energy != BiomassDry.name}
+        self.distribution_list = [f'{energy}.{techno}' for energy, techno_list in self.techno_list_dict.items()
+                                  for techno in techno_list]
         self.forest_investment_df = self.inputs_dict[GlossaryEnergy.ForestInvestmentValue]
 
     def compute(self):
@@ -88,26 +91,38 @@ class InvestmentsRedistribution:
         """
         # compute part of gdp that is used for investment in energy
         self.total_investments_in_energy = (
-                    self.economics_df[GlossaryEnergy.OutputNetOfDamage].values * 1e3 *  # T$ to G$
-                    self.percentage_gdp_energy_invest[
-                        GlossaryEnergy.EnergyInvestPercentageGDPName] / 100.)
+                self.economics_df[GlossaryEnergy.OutputNetOfDamage].values * 1e3 *  # T$ to G$
+                self.percentage_gdp_energy_invest[
+                    GlossaryEnergy.EnergyInvestPercentageGDPName].values / 100.)
         self.years = self.economics_df[GlossaryEnergy.Years]
-        investments_dict = {}
-        for energy, techno_list in self.techno_list_dict.items():
-            # biomassdry technologies does not come in percentages
-            if energy != BiomassDry.name:
-                for techno in techno_list:
-                    # investment in technology is total invest in energy * techno percentage
-                    investments_dict[f'{energy}.{techno}'] = (self.total_investments_in_energy *
-                                                              self.techno_invest_percentage_df[techno].values) / 100.
-
-        # create dictionnary with all dataframes of investments prepared
+
+        # investment in technology is total invest in energy * techno percentage, as a years x techno matrix
+        self.techno_invest_percentage = self.techno_invest_percentage_df[
+            [techno for techno_list in self.techno_list_dict.values() for techno in techno_list]].values
+        self.investment_per_technology = self.total_investments_in_energy[:, np.newaxis] * \
+                                         self.techno_invest_percentage / 100.
+
+    def get_investment_per_technology_dict(self):
+        """
+        Build the investment dataframe of each technology from the years x techno matrix
+        """
         # in case of witness studies, self.years has index=years whereas invests have index starting at 0
         # => Reset self.years index so that they are consistent with invests indices and fill out properly the df
-        self.investment_per_technology_dict = {
-            full_techno_name: pd.DataFrame(
-                {GlossaryEnergy.Years: self.years.reset_index(drop=True), GlossaryEnergy.InvestValue: invests
-                 }) for full_techno_name, invests in investments_dict.items()}
+        years = self.years.values
+        return {full_techno_name: pd.DataFrame({GlossaryEnergy.Years: years, GlossaryEnergy.InvestValue: invests})
+                for full_techno_name, invests in zip(self.distribution_list, self.investment_per_technology.T)}
+
+    def compute_dinvestment_per_technology(self):
+        """
+        Diagonals of the derivatives of the investment per technology wrt the output net of damage
+        and the percentage of GDP invested in energy, shape (n_years, n_techno)
+        """
+        dinvest_doutput = self.percentage_gdp_energy_invest[
+                              GlossaryEnergy.EnergyInvestPercentageGDPName].values[:, np.newaxis] / 100. * \
+                          self.techno_invest_percentage / 100. * 1e3
+        dinvest_dpercentage = self.economics_df[GlossaryEnergy.OutputNetOfDamage].values[:, np.newaxis] * \
+                              self.techno_invest_percentage / 100. * 1e3 / 100.
+        return dinvest_doutput, dinvest_dpercentage
 
     def check_data_integrity(self, inputs_dict):
         '''
@@ -133,11 +148,9 @@ class InvestmentsRedistribution:
             self.techno_invest_percentage_df.columns != 'years']
 
         # check if sum is 100% or not with accuracy of 0.001
-        all_years_equal_100 = all(
-            isclose(self.techno_invest_percentage_df[self.techno_invest_percentage_df['years'] == year][
-                        techno_percentages_col].sum(axis=1).values[0], 100., rel_tol=1e-5)
-            for year in self.techno_invest_percentage_df['years']
-        )
+        sum_percentages = self.techno_invest_percentage_df[techno_percentages_col].sum(axis=1).values
+        all_years_equal_100 = bool(np.all(
+            np.abs(sum_percentages - 100.) <= 1e-5 * np.maximum(np.abs(sum_percentages), 100.)))
         if not all_years_equal_100:
             integrity_msg_dict[GlossaryEnergy.TechnoInvestPercentageName] = ('Sum of percentages is not equal to 100%, '
                                                                              'please verify your input dataframe')
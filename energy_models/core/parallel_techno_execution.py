@@ -0,0 +1,142 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from energy_models.core.techno_type.techno_disc import TechnoDiscipline
+from energy_models.glossaryenergy import GlossaryEnergy
+
+# the parallel iterations stop when the max relative change of the couplings is below this tolerance, the process MDA
+# then converges from this point with its own tolerance
+PARALLEL_ITERATIONS_TOLERANCE = 1.0e-4
+PARALLEL_ITERATIONS_MAX_ITER = 20
+
+
+def get_scheduled_disciplines(proxy_disciplines):
+    '''
+    Split the gemseo disciplines of a process in the two stages of an iteration : the techno disciplines, which only
+    depend on stream level couplings and are independent of each other, and the other disciplines
+    (streams, energy mix, ccus...) kept in the process order
+    '''
+    techno_disciplines = []
+    other_disciplines = []
+    for proxy in proxy_disciplines:
+        mdo_discipline = proxy.mdo_discipline_wrapp.mdo_discipline
+        if isinstance(proxy.mdo_discipline_wrapp.wrapper, TechnoDiscipline):
+            techno_disciplines.append(mdo_discipline)
+        else:
+            other_disciplines.append(mdo_discipline)
+    return techno_disciplines, other_disciplines
+
+
+def get_coupling_names(disciplines):
+    '''
+    Names of the outputs of the disciplines that are inputs of one of them
+    '''
+    input_names = set()
+    for discipline in disciplines:
+        input_names.update(discipline.get_input_data_names())
+    return [name for discipline in disciplines for name in discipline.get_output_data_names() if name in input_names]
+
+
+def execute_discipline(discipline, local_data):
+    '''
+    Execute a gemseo discipline with the values of its inputs found in local_data and return its outputs
+    '''
+    discipline.execute({name: local_data[name] for name in discipline.get_input_data_names() if name in local_data})
+    return discipline.get_output_data()
+
+
+def execute_technos_then_streams(techno_disciplines, other_disciplines, local_data, executor):
+    '''
+    Execute one iteration of the process : the techno disciplines are executed concurrently by the executor on the
+    same local_data, their outputs are gathered in local_data before the other disciplines are executed sequentially
+    '''
+    # all the technos are finished before local_data is updated, they all read the data of the previous iteration
+    techno_outputs = list(executor.map(lambda discipline: execute_discipline(discipline, local_data),
+                                       techno_disciplines))
+    for outputs in techno_outputs:
+        local_data.update(outputs)
+    for discipline in other_disciplines:
+        local_data.update(execute_discipline(discipline, local_data))
+    return local_data
+
+
+def get_numeric_values(value):
+    '''
+    Float array of a coupling value (without the years of a dataframe), None for the values without numeric content
+    '''
+    if isinstance(value, pd.DataFrame):
+        return value.drop(columns=GlossaryEnergy.Years, errors='ignore').select_dtypes(include='number').to_numpy(
+            dtype=float)
+    if isinstance(value, (np.ndarray, float, int)):
+        return np.asarray(value, dtype=float)
+    return None
+
+
+def compute_coupling_residual(previous_data, local_data, coupling_names):
+    '''
+    Max relative change of the couplings between two iterations, inf if a coupling has no previous value
+    '''
+    residual = 0.
+    for name in coupling_names:
+        new_values = get_numeric_values(local_data.get(name))
+        if new_values is None:
+            continue
+        previous_values = get_numeric_values(previous_data.get(name))
+        if previous_values is None or previous_values.shape != new_values.shape:
+            return np.inf
+        residual = max(residual, np.linalg.norm(new_values - previous_values) /
+                       max(np.linalg.norm(previous_values), 1.0e-12))
+    return residual
+
+
+def run_parallel_techno_iterations(execution_engine, n_processes, max_iter=PARALLEL_ITERATIONS_MAX_ITER,
+                                   tolerance=PARALLEL_ITERATIONS_TOLERANCE):
+    '''
+    Iterate the process with the techno disciplines of each iteration executed in a pool of n_processes threads
+    (techno models spend most of their time in NumPy which releases the GIL), their results are gathered before the
+    streams and the energy mix are executed
+    The couplings are stored in the data manager so that the execution of the process MDA starts from them
+    Return the number of iterations and the last residual
+    '''
+    execution_engine.prepare_execution()
+    techno_disciplines, other_disciplines = get_scheduled_disciplines(execution_engine.factory.proxy_disciplines)
+    coupling_names = get_coupling_names(techno_disciplines + other_disciplines)
+    local_data = execution_engine.dm.get_data_dict_values()
+
+    nb_iter = 0
+    residual = np.inf
+    with ThreadPoolExecutor(max_workers=n_processes) as executor:
+        while nb_iter < max_iter and residual > tolerance:
+            previous_data = {name: local_data.get(name) for name in coupling_names}
+            execute_technos_then_streams(techno_disciplines, other_disciplines, local_data, executor)
+            residual = compute_coupling_residual(previous_data, local_data, coupling_names)
+            nb_iter += 1
+
+    execution_engine.dm.set_values_from_dict({name: local_data[name] for name in coupling_names})
+    return nb_iter, residual
+
+
+def execute_with_parallel_technos(execution_engine, n_processes):
+    '''
+    Execute the process, with the parallel techno iterations first when n_processes is greater than 1
+    '''
+    if n_processes > 1:
+        run_parallel_techno_iterations(execution_engine, n_processes)
+    execution_engine.execute()
@@ -14,11 +14,13 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 '''
-from copy import deepcopy
-
 import numpy as np
 import pandas as pd
 
+from energy_models.core.stream_type.mix_weights import apply_min_price_fallback, compute_grad_mix_weights_vs_prod, \
+    compute_mix_weights, compute_prod_matrix_wcutoff, compute_prod_matrix_with_exp_min, \
+    compute_prod_total_for_mix_weight
+from energy_models.core.stream_type.stream_columns import build_column_index, stack_element_columns
 from energy_models.glossaryenergy import GlossaryEnergy
 
 
@@ -63,10 +65,15 @@ class BaseStream:
         self.subelements_list = []
         self.total_prices = None  # energy outputs dataframe
 
-        self.sub_production_dict = {}
-        self.sub_consumption_dict = {}
-        self.sub_consumption_woratio_dict = {}
         self.sub_land_use_required_dict = {}
+        # stacked (element x year x column) arrays of the unscaled productions and consumptions of the sub elements
+        self.sub_production_array = None
+        self.sub_consumption_array = None
+        self.sub_consumption_woratio_array = None
+        self.production_column_index = {}
+        self.consumption_column_index = {}
+        self.consumption_woratio_column_index = {}
+        self.columns_key = None
 
     def reload_df(self):
         '''
@@ -105,42 +112,58 @@ class BaseStream:
         '''
         Configure before each run
         '''
+        sub_production_list, sub_consumption_list, sub_consumption_woratio_list = [], [], []
         for element in self.subelements_list:
             self.sub_prices[element] = inputs_dict[f'{element}.{GlossaryEnergy.TechnoPricesValue}'][element]
             self.sub_prices_wo_taxes[element] = inputs_dict[
                 f'{element}.{GlossaryEnergy.TechnoPricesValue}'][f'{element}_wotaxes']
-            # Unscale techno production and consumption
-            self.sub_production_dict[element] = deepcopy(
-                inputs_dict[f'{element}.{GlossaryEnergy.TechnoProductionValue}'])
-            self.sub_consumption_dict[element] = deepcopy(
-                inputs_dict[f'{element}.{GlossaryEnergy.TechnoConsumptionValue}'])
-            self.sub_consumption_woratio_dict[element] = deepcopy(
+            sub_production_list.append(inputs_dict[f'{element}.{GlossaryEnergy.TechnoProductionValue}'])
+            sub_consumption_list.append(inputs_dict[f'{element}.{GlossaryEnergy.TechnoConsumptionValue}'])
+            sub_consumption_woratio_list.append(
                 inputs_dict[f'{element}.{GlossaryEnergy.TechnoConsumptionWithoutRatioValue}'])
-            for column in self.sub_production_dict[element].columns:
-                if column == GlossaryEnergy.Years:
-                    continue
-                self.sub_production_dict[element][column] = self.sub_production_dict[element][column].values * \
-                                                            inputs_dict['scaling_factor_techno_production']
-            for column in self.sub_consumption_dict[element].columns:
-                if column == GlossaryEnergy.Years:
-                    continue
-                self.sub_consumption_dict[element][column] = self.sub_consumption_dict[element][column].values * \
-                                                             inputs_dict['scaling_factor_techno_consumption']
-                self.sub_consumption_woratio_dict[element][column] = self.sub_consumption_woratio_dict[element][
-                                                                         column].values * \
-                                                                     inputs_dict['scaling_factor_techno_consumption']
             self.sub_land_use_required_dict[element] = inputs_dict[f'{element}.{GlossaryEnergy.LandUseRequiredValue}']
 
+        self.configure_column_indexes(sub_production_list, sub_consumption_list, sub_consumption_woratio_list)
+
+        # Unscale techno production and consumption
+        self.sub_production_array = stack_element_columns(
+            sub_production_list, self.production_column_index, len(self.years),
+            inputs_dict['scaling_factor_techno_production'])
+        self.sub_consumption_array = stack_element_columns(
+            sub_consumption_list, self.consumption_column_index, len(self.years),
+            inputs_dict['scaling_factor_techno_consumption'])
+        self.sub_consumption_woratio_array = stack_element_columns(
+            sub_consumption_woratio_list, self.consumption_woratio_column_index, len(self.years),
+            inputs_dict['scaling_factor_techno_consumption'])
+
+    def configure_column_indexes(self, sub_production_list, sub_consumption_list, sub_consumption_woratio_list):
+        '''
+        Build the column indexes of the stacked production, consumption and consumption without ratio arrays
+        They are only rebuilt if the list of sub elements or their columns have changed
+        The main production column of the stream is always the first column of the production array
+        '''
+        columns_key = (tuple(self.subelements_list),
+                       tuple(tuple(df.columns) for df in sub_production_list),
+                       tuple(tuple(df.columns) for df in sub_consumption_list),
+                       tuple(tuple(df.columns) for df in sub_consumption_woratio_list))
+        if columns_key != self.columns_key:
+            self.columns_key = columns_key
+            self.production_column_index = build_column_index(
+                [df.columns for df in sub_production_list], first_columns=[f'{self.name} ({self.unit})'])
+            self.consumption_column_index = build_column_index([df.columns for df in sub_consumption_list])
+            self.consumption_woratio_column_index = build_column_index(
+                [df.columns for df in sub_consumption_woratio_list])
+
     def compute(self, inputs, exp_min=True):
         '''
         Compute all energy variables with its own technologies 
         '''
 
         _, self.consumption_woratio, _ = self.compute_production(
-            self.sub_production_dict, self.sub_consumption_woratio_dict)
+            self.sub_production_array, self.sub_consumption_woratio_array, self.consumption_woratio_column_index)
 
         self.production, self.consumption, self.production_by_techno = self.compute_production(
-            self.sub_production_dict, self.sub_consumption_dict)
+            self.sub_production_array, self.sub_consumption_array)
 
         self.compute_price(exp_min=exp_min)
 
@@ -150,54 +173,58 @@ class BaseStream:
 
         return self.total_prices, self.production, self.consumption, self.consumption_woratio, self.mix_weights
 
-    def compute_production(self, sub_production_dict, sub_consumption_dict):
+    def compute_production(self, sub_production_array, sub_consumption_array, consumption_column_index=None):
         '''
         Compute energy production by summing all energy productions
         And compute the techno_mix_weights each year
         '''
+        production_by_techno = sub_production_array[:, :, 0]
+        production, consumption = self.compute_other_consumption_production(
+            production_by_techno.sum(axis=0), sub_production_array, sub_consumption_array,
+            consumption_column_index=consumption_column_index)
 
-        # Initialize dataframe out
-        base_df = pd.DataFrame({GlossaryEnergy.Years: self.years})
-        production = base_df.copy(deep=True)
-        consumption = base_df.copy(deep=True)
-        production_by_techno = base_df.copy(deep=True)
-
-        # Loop on technologies
-        production[f'{self.name}'] = 0.
-        for element in self.subelements_list:
-            production_by_techno[f'{self.name} {element} ({self.unit})'] = sub_production_dict[
-                element][f'{self.name} ({self.unit})'].values
-            production[
-                f'{self.name}'] += production_by_techno[f'{self.name} {element} ({self.unit})'].values
+        return production, consumption, self.get_production_by_techno_df(production_by_techno)
 
-            production, consumption = self.compute_other_consumption_production(
-                element, sub_production_dict, sub_consumption_dict, production, consumption)
+    def compute_other_consumption_production(self, main_production, sub_production_array, sub_consumption_array,
+                                             factor=None, consumption_column_index=None):
+        '''
+        Compute other consumption and production by summing the stacked arrays over the sub elements
+        factor is an optional (element x year) array applied on productions and consumptions of each element
+        consumption_column_index is the column index of the consumption array, by default the one of the consumption
+        '''
+        if consumption_column_index is None:
+            consumption_column_index = self.consumption_column_index
+        if factor is not None:
+            sub_production_array = sub_production_array * factor[:, :, np.newaxis]
+            sub_consumption_array = sub_consumption_array * factor[:, :, np.newaxis]
+        # Do not count major energy production (already computed), it is the first column
+        other_production = sub_production_array[:, :, 1:].sum(axis=0)
+        total_consumption = sub_consumption_array.sum(axis=0)
+
+        production = pd.DataFrame({GlossaryEnergy.Years: self.years,
+                                   f'{self.name}': main_production,
+                                   **{column: other_production[:, position - 1]
+                                      for column, position in self.production_column_index.items() if position > 0}})
+        consumption = pd.DataFrame({GlossaryEnergy.Years: self.years,
+                                    **{column: total_consumption[:, position]
+                                       for column, position in consumption_column_index.items()}})
 
-        return production, consumption, production_by_techno
+        return production, consumption
 
-    def compute_other_consumption_production(self, element, sub_production_dict, sub_consumption_dict, production,
-                                             consumption, factor=1.0):
+    def get_production_by_techno_df(self, production_by_techno):
         '''
-        Compute other consumption and production
+        Build the production by techno dataframe from the (element x year) main production array
         '''
+        return pd.DataFrame({GlossaryEnergy.Years: self.years,
+                             **{f'{self.name} {element} ({self.unit})': production_by_techno[element_index]
+                                for element_index, element in enumerate(self.subelements_list)}})
 
-        for elem, prod in sub_production_dict[element].items():
-            # DO not count major energy production in this function (already
-            # computed)
-            if elem != f'{self.name} ({self.unit})' and elem != GlossaryEnergy.Years:
-                if elem in production:
-                    production[elem] += prod.values * factor
-                else:
-                    production[elem] = prod.values * factor
-
-        for elem, cons in sub_consumption_dict[element].items():
-            if elem != GlossaryEnergy.Years:
-                if elem in consumption:
-                    consumption[elem] += cons.values * factor
-                else:
-                    consumption[elem] = cons.values * factor
-
-        return production, consumption
+    def get_sub_production(self, element, column=None):
+        '''
+        Get the unscaled production of a sub element, by default its main production
+        '''
+        column_position = 0 if column is None else self.production_column_index[column]
+        return self.sub_production_array[self.subelements_list.index(element), :, column_position]
 
     def compute_energy_type_capital(self, inputs):
         technos = inputs[GlossaryEnergy.techno_list]
@@ -215,86 +242,55 @@ class BaseStream:
         '''
         Compute the price with all sub_prices and sub weights computed with total production 
         '''
-
-        self.total_prices[self.name] = 0.
-        self.total_prices[f'{self.name}_wotaxes'] = 0.
-
-        element_list = self.subelements_list
-        full_element_list = [
-            f'{self.name} {element} ({self.unit})' for element in element_list]
-        element_dict = dict(zip(element_list, full_element_list))
+        full_element_list = [f'{self.name} {element} ({self.unit})' for element in self.subelements_list]
+        prod_matrix = self.production_by_techno[full_element_list].to_numpy().T
+        # we compute then mix_weight with these prods minimized and use it
+        # also for co2 emissions
         if exp_min:
-            prod_element, prod_total_for_mix_weight = self.compute_prod_with_exp_min(
-                self.production_by_techno, element_dict, self.min_prod)
+            prod_matrix, _ = compute_prod_matrix_with_exp_min(prod_matrix, self.min_prod)
         else:
-            prod_element, prod_total_for_mix_weight = self.compute_prod_wcutoff(
-                self.production_by_techno, element_dict, self.min_prod)
-        for element in self.subelements_list:
-            # we compute then mix_weight with these prods minimized and use it
-            # also for co2 emissions
-            mix_weight = prod_element[element] / \
-                         prod_total_for_mix_weight
-            # Still If the element is negligible do not take into account this element
-            # It is negligible if tol = 0.1%
-            tol = 1e-3
-            mix_weight[mix_weight < tol] = 0.0
-            self.mix_weights[element] = mix_weight * 100.
-
-            self.total_prices[self.name] += self.sub_prices[element] * mix_weight
-            self.total_prices[f'{self.name}_wotaxes'] += self.sub_prices_wo_taxes[element] * mix_weight
-            self.mix_weights[element] = mix_weight * 100.
+            prod_matrix, _ = compute_prod_matrix_wcutoff(prod_matrix, self.min_prod)
+        prod_total_for_mix_weight = compute_prod_total_for_mix_weight(prod_matrix, self.min_prod, exp_min=exp_min)
+        mix_weights = compute_mix_weights(prod_matrix, prod_total_for_mix_weight)
+
+        prices = self.sub_prices[self.subelements_list].to_numpy().T
+        prices_wo_taxes = self.sub_prices_wo_taxes[self.subelements_list].to_numpy().T
+        total_prices = (prices * mix_weights).sum(axis=0)
+        total_prices_wo_taxes = (prices_wo_taxes * mix_weights).sum(axis=0)
+
         # In case all the technologies are below the threshold
         # and the cutoff is applied, assign a placeholder price
         if not exp_min:
-            for year in self.total_prices[GlossaryEnergy.Years].values:
-                if np.real(self.total_prices.loc[self.total_prices[GlossaryEnergy.Years] == year][
-                               self.name].values) == 0.0:
-                    # Get the min_price of the technos this year that are > 0.0
-                    year_techno_prices = self.sub_prices[self.subelements_list].loc[
-                        self.sub_prices[GlossaryEnergy.Years] == year]
-                    min_techno_price = min(
-                        val for val in year_techno_prices.values[0] if val > 0.0)
-                    min_techno_name = [
-                        name for name in year_techno_prices.columns if
-                        year_techno_prices[name].values == min_techno_price][0]
-                    for element in self.subelements_list:
-                        self.mix_weights.loc[self.mix_weights[GlossaryEnergy.Years] == year,
-                                             element] = 100. if element == min_techno_name else 0.0
-                    min_techno_price_wo_taxes = self.sub_prices_wo_taxes[min_techno_name]
-                    self.total_prices.loc[self.total_prices[GlossaryEnergy.Years] ==
-                                          year, self.name] = min_techno_price
-                    self.total_prices.loc[self.total_prices[GlossaryEnergy.Years] ==
-                                          year, f'{self.name}_wotaxes'] = min_techno_price_wo_taxes
+            mix_weights, total_prices, total_prices_wo_taxes = apply_min_price_fallback(
+                prices, prices_wo_taxes, mix_weights, total_prices, total_prices_wo_taxes)
+
+        self.mix_weights = pd.DataFrame({GlossaryEnergy.Years: self.years,
+                                         **dict(zip(self.subelements_list, mix_weights * 100.))})
+        self.total_prices = pd.DataFrame({GlossaryEnergy.Years: self.years,
+                                          self.name: total_prices,
+                                          f'{self.name}_wotaxes': total_prices_wo_taxes})
+
+    def get_prod_matrix(self, production_by_techno, elements_dict):
+        '''
+        Get the (element x year) production matrix from the columns of elements_dict
+        elements_dict contains {Name of the prod techno or energy: full name of the column}
+        '''
+        return production_by_techno[list(elements_dict.values())].to_numpy().T
 
     def compute_prod_wcutoff(self, production_by_techno, elements_dict, min_prod):
 
-        prod_total_for_mix_weight = np.zeros(len(self.years))
-        prod_element_dict = {}
-        for key, value in elements_dict.items():
-            prod_element_dict[key] = deepcopy(production_by_techno[
-                                                  value].values)
-            prod_element_dict[key][prod_element_dict[key]
-                                   < min_prod] = 0.0
-            prod_total_for_mix_weight = prod_total_for_mix_weight + \
-                                        prod_element_dict[key]
-        prod_total_for_mix_weight[prod_total_for_mix_weight == 0.0] = min_prod
+        prod_matrix, _ = compute_prod_matrix_wcutoff(self.get_prod_matrix(production_by_techno, elements_dict),
+                                                     min_prod)
+        prod_total_for_mix_weight = compute_prod_total_for_mix_weight(prod_matrix, min_prod, exp_min=False)
 
-        return prod_element_dict, prod_total_for_mix_weight
+        return dict(zip(elements_dict.keys(), prod_matrix)), prod_total_for_mix_weight
 
     def compute_dprod_wcutoff(self, production_by_techno, elements_dict, min_prod):
 
-        prod_element_dict = {}
-        dprod_element_dict = {}
+        _, dprod_matrix = compute_prod_matrix_wcutoff(self.get_prod_matrix(production_by_techno, elements_dict),
+                                                      min_prod)
 
-        for key, value in elements_dict.items():
-            prod_element_dict[key] = deepcopy(production_by_techno[
-                                                  value].values)
-            dprod_element_dict[key] = np.ones(
-                len(prod_element_dict[key]))
-            dprod_element_dict[key][prod_element_dict[key]
-                                    < min_prod] = 0.0
-
-        return dprod_element_dict
+        return dict(zip(elements_dict.keys(), dprod_matrix))
 
     def compute_prod_with_exp_min(self, production_by_techno, elements_dict, min_prod):
         '''
@@ -309,72 +305,41 @@ class BaseStream:
 
         elements_dict contains {Name of the prod techno or energy: full name of the column}
         '''
+        prod_matrix, _ = compute_prod_matrix_with_exp_min(self.get_prod_matrix(production_by_techno, elements_dict),
+                                                          min_prod)
+        prod_total_for_mix_weight = compute_prod_total_for_mix_weight(prod_matrix, min_prod)
 
-        prod_total_for_mix_weight = np.zeros(len(self.years))
-        prod_element_dict = {}
-        for key, value in elements_dict.items():
-            prod_element_dict[key] = deepcopy(production_by_techno[
-                                                  value].values)
-
-            if prod_element_dict[key].min() < min_prod:
-                # if some values are below min_prod
-                # We use the exp smoothing only on values below self.min_prod (np.minimum(prod_element, min_prod))
-                # Then we take the maximum to take prod_element if it is higher
-                # than min_prod
-                # To avoid underflow : exp(-200) is considered to be the
-                # minimum value for the exp
-                prod_element_dict[key][prod_element_dict[key]
-                                       < -200.0 * min_prod] = -200.0 * min_prod
-                prod_element_dict[key] = np.maximum(
-                    min_prod / 10.0 * (9.0 + np.exp(np.minimum(prod_element_dict[key], min_prod) / min_prod)
-                                       * np.exp(-1)), prod_element_dict[key])
-
-            prod_total_for_mix_weight = prod_total_for_mix_weight + \
-                                        prod_element_dict[key]
-
-        return prod_element_dict, prod_total_for_mix_weight
+        return dict(zip(elements_dict.keys(), prod_matrix)), prod_total_for_mix_weight
 
     def compute_dprod_with_exp_min(self, production_by_techno, elements_dict, min_prod):
 
-        prod_element_dict = {}
-        dprod_element_dict = {}
-
-        for key, value in elements_dict.items():
-            prod_element_dict[key] = deepcopy(production_by_techno[
-                                                  value].values)
-            dprod_element_dict[key] = np.ones(
-                len(prod_element_dict[key]))
-            if prod_element_dict[key].min() < min_prod:
-                # To avoid underflow : exp(-200) is considered to be the
-                # minimum value for the exp
-                prod_element_dict[key][prod_element_dict[key]
-                                       < -200.0 * min_prod] = -200.0 * min_prod
-                dprod_element_dict[key][prod_element_dict[key] < min_prod] = np.exp(
-                    prod_element_dict[key][prod_element_dict[key] < min_prod] / min_prod) * np.exp(-1) / 10.0
+        _, dprod_matrix = compute_prod_matrix_with_exp_min(self.get_prod_matrix(production_by_techno, elements_dict),
+                                                           min_prod)
 
-        return dprod_element_dict
+        return dict(zip(elements_dict.keys(), dprod_matrix))
 
     def compute_grad_element_mix_vs_prod(self, production_by_techno, elements_dict, exp_min=True, min_prod=1e-3):
+        '''
+        Gradient of the mix weights wrt the productions
+        grad[element] is the derivative of the mix weight of element wrt its production
+        grad[element element_other] is the derivative of the mix weight of element_other wrt the production of element
+        '''
+        prod_matrix = self.get_prod_matrix(production_by_techno, elements_dict)
         if exp_min:
-            prod_element_dict, prod_total_for_mix_weight = self.compute_prod_with_exp_min(
-                production_by_techno, elements_dict, min_prod)
-            dprod_element_dict = self.compute_dprod_with_exp_min(
-                production_by_techno, elements_dict, min_prod)
+            prod_matrix, dprod_matrix = compute_prod_matrix_with_exp_min(prod_matrix, min_prod)
         else:
-            prod_element_dict, prod_total_for_mix_weight = self.compute_prod_wcutoff(
-                production_by_techno, elements_dict, min_prod)
-            dprod_element_dict = self.compute_dprod_wcutoff(
-                production_by_techno, elements_dict, min_prod)
-        grad_element_mix_vs_prod = {}
+            prod_matrix, dprod_matrix = compute_prod_matrix_wcutoff(prod_matrix, min_prod)
+        prod_total_for_mix_weight = compute_prod_total_for_mix_weight(prod_matrix, min_prod, exp_min=exp_min)
+        grad_mix_weights_vs_prod = compute_grad_mix_weights_vs_prod(prod_matrix, dprod_matrix,
+                                                                    prod_total_for_mix_weight)
 
-        for element in elements_dict.keys():
-            grad_element_mix_vs_prod[f'{element}'] = dprod_element_dict[element] * (
-                    prod_total_for_mix_weight - prod_element_dict[element]) / prod_total_for_mix_weight ** 2
-            for element_other in elements_dict.keys():
+        grad_element_mix_vs_prod = {}
+        for element_index, element in enumerate(elements_dict.keys()):
+            grad_element_mix_vs_prod[f'{element}'] = grad_mix_weights_vs_prod[element_index, element_index]
+            for element_other_index, element_other in enumerate(elements_dict.keys()):
                 if element_other != element:
-                    grad_element_mix_vs_prod[f'{element} {element_other}'] = -dprod_element_dict[element] * \
-                                                                             prod_element_dict[element_other] / \
-                                                                             prod_total_for_mix_weight ** 2
+                    grad_element_mix_vs_prod[f'{element} {element_other}'] = grad_mix_weights_vs_prod[
+                        element_index, element_other_index]
 
         return grad_element_mix_vs_prod
 
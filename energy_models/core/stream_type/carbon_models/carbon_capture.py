@@ -18,6 +18,7 @@ limitations under the License.
 import numpy as np
 import pandas as pd
 
+from energy_models.core.exp_min import compute_exp_min
 from energy_models.core.stream_type.base_stream import BaseStream
 from energy_models.glossaryenergy import GlossaryEnergy
 
@@ -44,6 +45,8 @@ class CarbonCapture(BaseStream):
                         'calorific_value_unit': 'kWh/kg',
                         'high_calorific_value': 1.0,
                         'high_calorific_value_unit': 'kWh/kg'}
+    # Minimal ratio of non captured flue gas reached by the exponential smoothing
+    FLUE_GAS_MIN_PROD = 0.001
 
     def __init__(self, name):
         BaseStream.__init__(self, name)
@@ -73,10 +76,10 @@ class CarbonCapture(BaseStream):
         '''
 
         _, self.consumption_woratio, _, self.carbon_captured_type_woratio, self.flue_gas_percentage_woratio, self.fg_ratio_woratio = self.compute_production(
-            self.sub_production_dict, self.sub_consumption_woratio_dict)
+            self.sub_production_array, self.sub_consumption_woratio_array, self.consumption_woratio_column_index)
 
         self.production, self.consumption, self.production_by_techno, self.carbon_captured_type, self.flue_gas_percentage, self.fg_ratio = self.compute_production(
-            self.sub_production_dict, self.sub_consumption_dict)
+            self.sub_production_array, self.sub_consumption_array)
 
         self.compute_price(exp_min=exp_min)
 
@@ -86,16 +89,11 @@ class CarbonCapture(BaseStream):
 
         return self.total_prices, self.production, self.consumption, self.consumption_woratio, self.mix_weights
 
-    def compute_production(self, sub_production_dict, sub_consumption_dict):
+    def compute_production(self, sub_production_array, sub_consumption_array, consumption_column_index=None):
         '''
         Specific compute energy production where we compute carbon captured from flue gas 
         '''
 
-        # Initialize dataframe out
-        base_df = pd.DataFrame({GlossaryEnergy.Years: self.years})
-        production = base_df.copy(deep=True)
-        consumption = base_df.copy(deep=True)
-        production_by_techno = base_df.copy(deep=True)
         carbon_captured_type = pd.DataFrame({GlossaryEnergy.Years: self.years,
                                              'flue gas': 0.0,
                                              'DAC': 0.0,
@@ -103,23 +101,17 @@ class CarbonCapture(BaseStream):
         flue_gas_percentage = None
         fg_ratio = None
 
-        production[f'{self.name}'] = 0.
-        for element in self.subelements_list:
-            production_by_techno[f'{self.name} {element} ({self.unit})'] = sub_production_dict[
-                element][f'{self.name} ({self.unit})'].values
-            production[
-                f'{self.name}'] += production_by_techno[f'{self.name} {element} ({self.unit})'].values
-
-            if element.startswith('flue_gas_capture'):
-                carbon_captured_type['flue gas'] += production_by_techno[
-                    f'{self.name} {element} ({self.unit})'].values
-            else:
-                carbon_captured_type['DAC'] += production_by_techno[
-                    f'{self.name} {element} ({self.unit})'].values
+        production_by_techno = sub_production_array[:, :, 0]
+        is_flue_gas_capture = np.array([element.startswith('flue_gas_capture')
+                                        for element in self.subelements_list], dtype=bool)
+        carbon_captured_type['flue gas'] = production_by_techno[is_flue_gas_capture].sum(axis=0)
+        carbon_captured_type['DAC'] = production_by_techno[~is_flue_gas_capture].sum(axis=0)
+        main_production = production_by_techno.sum(axis=0)
 
         diff_flue_gas = self.flue_gas_production - \
                         carbon_captured_type['flue gas'].values
 
+        factor = None
         # Means that we capture more flue gas than available
         if min(diff_flue_gas.real) < 0:
             if carbon_captured_type['flue gas'].values.dtype != self.flue_gas_production.dtype:
@@ -132,44 +124,31 @@ class CarbonCapture(BaseStream):
                 fg_ratio)
             carbon_captured_type['flue gas limited'] = carbon_captured_type['flue gas'] * \
                                                        flue_gas_percentage
-            production[f'{self.name}'] = carbon_captured_type['flue gas limited'] + \
-                                         carbon_captured_type['DAC']
+            main_production = (carbon_captured_type['flue gas limited'] + carbon_captured_type['DAC']).values
+
+            # Divide the prod or the cons  if element is carbon capture
+            factor = np.where(is_flue_gas_capture[:, np.newaxis], flue_gas_percentage[np.newaxis, :], 1.0)
+            production_by_techno = production_by_techno * factor
 
         else:
             carbon_captured_type['flue gas limited'] = carbon_captured_type['flue gas']
 
-        # Divide the prod or the cons  if element is carbon capture
-        for element in self.subelements_list:
-            if element.startswith('flue_gas_capture') and min(diff_flue_gas.real) < 0:
-                factor = flue_gas_percentage
-            else:
-                factor = 1.0
-            production_by_techno[f'{self.name} {element} ({self.unit})'] = sub_production_dict[
-                                                                               element][
-                                                                               f'{self.name} ({self.unit})'].values * factor
-            production, consumption = self.compute_other_consumption_production(
-                element, sub_production_dict, sub_consumption_dict, production, consumption, factor=factor)
-        return production, consumption, production_by_techno, carbon_captured_type, flue_gas_percentage, fg_ratio
-
-    def compute_flue_gas_with_exp_min(self, fg_perc):
+        production, consumption = self.compute_other_consumption_production(
+            main_production, sub_production_array, sub_consumption_array, factor=factor,
+            consumption_column_index=consumption_column_index)
 
-        f = 1.0 - fg_perc
-        min_prod = 0.001
-        f[f < np.log(1e-30) * min_prod] = np.log(1e-30) * min_prod
+        return production, consumption, self.get_production_by_techno_df(
+            production_by_techno), carbon_captured_type, flue_gas_percentage, fg_ratio
 
-        f_limited = np.maximum(min_prod / 10.0 * (9.0 + np.exp(np.minimum(f, min_prod) / min_prod)
-                                                  * np.exp(-1)), f)
+    def compute_flue_gas_with_exp_min(self, fg_perc):
+        # The non captured flue gas ratio 1 - fg_perc is smoothed towards min_prod
+        f_limited, _ = compute_exp_min(1.0 - fg_perc, self.FLUE_GAS_MIN_PROD,
+                                       lower_bound_ratio=np.log(1e-30))
         return 1.0 - f_limited
 
     def compute_dflue_gas_with_exp_min(self, fg_ratio):
-
-        f = 1.0 - fg_ratio
-        min_prod = 0.001
-        dflue_gas = np.ones(len(fg_ratio))
-        if f.min() < min_prod:
-            f[f < np.log(1e-30) * min_prod] = np.log(1e-30) * min_prod
-            dflue_gas[f < min_prod] = np.exp(
-                f[f < min_prod] / min_prod) * np.exp(-1) / 10.0
+        _, dflue_gas = compute_exp_min(1.0 - fg_ratio, self.FLUE_GAS_MIN_PROD,
+                                       lower_bound_ratio=np.log(1e-30))
         return dflue_gas
 
     def aggregate_land_use_required(self):
@@ -224,7 +203,7 @@ class CarbonCapture(BaseStream):
             dtechno_mix(p1)/dprod2 = dtechno_mix(p1)/dprod2old*(fexpp(fg_ratio) + prod2*f'expp(fg_ratio)*dfg_ratio -p1dp1/ptot**2
 
         pbis = production_bytechno
-        prodi = self.sub_production_dict
+        prodi = self.get_sub_production(element)
         pi = prod_element_dict
         '''
         if exp_min:
@@ -255,8 +234,7 @@ class CarbonCapture(BaseStream):
             if self.flue_gas_percentage is not None:
                 if element.startswith('flue_gas_capture'):
                     # (fexpp(fg_ratio) + prod1*f'expp(fg_ratio)*dfg_ratio
-                    prodi = self.sub_production_dict[element][
-                        f'{self.name} ({self.unit})'].values
+                    prodi = self.get_sub_production(element)
                     ratio_on_old = self.flue_gas_percentage + prodi * dfluegas * dfg_ratio
 
                     grad_element_mix_vs_prod[f'{element}'] = grad_element_mix_vs_prod[f'{element}'] * ratio_on_old
@@ -276,8 +254,7 @@ class CarbonCapture(BaseStream):
                 # then  we add  -pidpj/ptot**2 for j in flue gas capture no
                 # matter if i is flue gas capture
                 if element_other.startswith('flue_gas_capture') and self.flue_gas_percentage is not None:
-                    prodj = self.sub_production_dict[element_other][
-                        f'{self.name} ({self.unit})'].values
+                    prodj = self.get_sub_production(element_other)
                     grad_element_mix_vs_prod[f'fg_prod {element}'] -= dprod_element_dict[element_other] * prodj * \
                                                                       dfluegas * dfg_ratio_dfg_prod * \
                                                                       prod_element_dict[element] / \
@@ -291,8 +268,7 @@ class CarbonCapture(BaseStream):
                     if element.startswith('flue_gas_capture') and self.flue_gas_percentage is not None:
 
                         # (fexpp(fg_ratio) + prod1*f'expp(fg_ratio)*dfg_ratio
-                        prodi = self.sub_production_dict[element][
-                            f'{self.name} ({self.unit})'].values
+                        prodi = self.get_sub_production(element)
                         ratio_on_old = self.flue_gas_percentage + prodi * dfluegas * dfg_ratio
 
                         grad_element_mix_vs_prod[f'{element} {element_other}'] = grad_element_mix_vs_prod[
@@ -301,8 +277,7 @@ class CarbonCapture(BaseStream):
                         for element_bis in elements_dict:
                             if element_bis not in [element, element_other] and element_bis.startswith(
                                     'flue_gas_capture'):
-                                prodk = self.sub_production_dict[element_bis][
-                                    f'{self.name} ({self.unit})'].values
+                                prodk = self.get_sub_production(element_bis)
                                 # dp2 = f'exp(pbis2)*prod2*dfluegas*dfg_ratio
                                 dp2 = dprod_element_dict[element_bis] * \
                                       prodk * dfg_ratio * dfluegas
@@ -316,8 +291,7 @@ class CarbonCapture(BaseStream):
                     if element_other.startswith('flue_gas_capture') and element.startswith(
                             'flue_gas_capture') and self.flue_gas_percentage is not None:
                         # for dpi/dpi
-                        prodj = self.sub_production_dict[element_other][
-                            f'{self.name} ({self.unit})'].values
+                        prodj = self.get_sub_production(element_other)
                         # dp2 = f'exp(pbis2)*prod2*dfluegas*dfg_ratio
                         dp2 = dprod_element_dict[element_other] * \
                               prodj * dfg_ratio * dfluegas
@@ -28,6 +28,7 @@ class FlueGas(BaseStream):
 
     def __init__(self, name):
         BaseStream.__init__(self, name)
+        self.sub_production_dict = {}
         self.flue_gas_ratio_dict = {}
         self.flue_gas_ratio_mean = pd.DataFrame()
 
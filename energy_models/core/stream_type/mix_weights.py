@@ -0,0 +1,102 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import numpy as np
+
+from energy_models.core.exp_min import compute_exp_min
+
+# If the mix weight of an element is below 0.1% the element is negligible
+MIX_WEIGHT_TOLERANCE = 1e-3
+
+
+def compute_prod_matrix_with_exp_min(prod_matrix, min_prod):
+    """
+    Smooth the (element x year) production matrix with an exponential function to reach min prod
+
+    :return: smoothed production matrix and its derivative wrt the production matrix
+    """
+    return compute_exp_min(np.array(prod_matrix), min_prod)
+
+
+def compute_prod_matrix_wcutoff(prod_matrix, min_prod):
+    """
+    Cut the (element x year) production matrix to zero below min prod
+
+    :return: cut production matrix and its derivative wrt the production matrix
+    """
+    is_below_min = np.real(prod_matrix) < min_prod
+    prod_matrix = np.where(is_below_min, 0.0, prod_matrix)
+    dprod_matrix = np.where(is_below_min, 0.0, 1.0)
+
+    return prod_matrix, dprod_matrix
+
+
+def compute_prod_total_for_mix_weight(prod_matrix, min_prod, exp_min=True):
+    """
+    Sum the (element x year) production matrix over elements
+    With the cutoff, years without production have a total set to min_prod to avoid a division by zero
+    """
+    prod_total_for_mix_weight = prod_matrix.sum(axis=0)
+    if not exp_min:
+        prod_total_for_mix_weight[prod_total_for_mix_weight == 0.0] = min_prod
+
+    return prod_total_for_mix_weight
+
+
+def compute_mix_weights(prod_matrix, prod_total_for_mix_weight, tol=MIX_WEIGHT_TOLERANCE):
+    """
+    Compute the (element x year) mix weights matrix, negligible elements have a zero weight
+    """
+    mix_weights = prod_matrix / prod_total_for_mix_weight
+    return np.where(np.real(mix_weights) < tol, 0.0, mix_weights)
+
+
+def apply_min_price_fallback(prices, prices_wo_taxes, mix_weights, total_prices, total_prices_wo_taxes):
+    """
+    For years where all elements are negligible (zero total price), assign the minimum positive price
+    of the elements and a full mix weight to the element having this price
+
+    :param prices: (element x year) prices matrix
+    :return: updated mix weights, total prices and total prices without taxes
+    """
+    is_fallback_year = np.real(total_prices) == 0.0
+    if not is_fallback_year.any():
+        return mix_weights, total_prices, total_prices_wo_taxes
+
+    positive_prices = np.where(np.real(prices) > 0.0, np.real(prices), np.inf)
+    # argmin returns the first element in case of equality
+    min_price_element = np.argmin(positive_prices, axis=0)
+    years_index = np.arange(prices.shape[1])
+    is_min_price_element = np.arange(prices.shape[0])[:, np.newaxis] == min_price_element[np.newaxis, :]
+
+    mix_weights = np.where(is_fallback_year, is_min_price_element.astype('float64'), mix_weights)
+    total_prices = np.where(is_fallback_year, prices[min_price_element, years_index], total_prices)
+    total_prices_wo_taxes = np.where(is_fallback_year, prices_wo_taxes[min_price_element, years_index],
+                                     total_prices_wo_taxes)
+
+    return mix_weights, total_prices, total_prices_wo_taxes
+
+
+def compute_grad_mix_weights_vs_prod(prod_matrix, dprod_matrix, prod_total_for_mix_weight):
+    """
+    Analytic gradient of the mix weights wrt the productions
+    With mix_j = p_j / sum(p) : dmix_j/dprod_i = dp_i * (delta_ij * sum(p) - p_j) / sum(p) ** 2
+
+    :return: (element x element x year) array where grad[i, j] is the derivative of mix_j wrt prod_i
+    """
+    nb_elements = prod_matrix.shape[0]
+    identity = np.eye(nb_elements)[:, :, np.newaxis]
+    return dprod_matrix[:, np.newaxis, :] * (identity * prod_total_for_mix_weight - prod_matrix[np.newaxis, :, :]) / \
+        prod_total_for_mix_weight ** 2
@@ -0,0 +1,58 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import numpy as np
+
+from energy_models.glossaryenergy import GlossaryEnergy
+
+
+def build_column_index(columns_by_element, first_columns=()):
+    """
+    Ordered union of the columns of the sub elements dataframes (years excluded)
+    first_columns are placed at the beginning of the index
+
+    :param columns_by_element: list of the columns of each sub element dataframe
+    :return: dict {column name: position in the stacked array}
+    """
+    column_index = {column: position for position, column in enumerate(first_columns)}
+    for columns in columns_by_element:
+        for column in columns:
+            if column != GlossaryEnergy.Years and column not in column_index:
+                column_index[column] = len(column_index)
+
+    return column_index
+
+
+def stack_element_columns(dataframes, column_index, nb_years, scaling_factor=1.0):
+    """
+    Stack the sub elements dataframes in a (element x year x column) array following the column index
+    Columns missing in a dataframe are filled with zeros
+
+    :param dataframes: list of sub elements dataframes
+    :param scaling_factor: factor applied on all the values
+    """
+    values_list = [dataframe.to_numpy() for dataframe in dataframes]
+    dtype = np.result_type(np.float64, *[values.dtype for values in values_list])
+    stacked_array = np.zeros((len(dataframes), nb_years, len(column_index)), dtype=dtype)
+
+    for element_index, (dataframe, values) in enumerate(zip(dataframes, values_list)):
+        source_positions, target_positions = [], []
+        for source_position, column in enumerate(dataframe.columns):
+            if column in column_index:
+                source_positions.append(source_position)
+                target_positions.append(column_index[column])
+        stacked_array[element_index][:, target_positions] = values[:, source_positions]
+
+    return stacked_array * scaling_factor
@@ -19,6 +19,7 @@ import logging
 import numpy as np
 
 from climateeconomics.core.core_witness.climateeco_discipline import ClimateEcoDiscipline
+from energy_models.core.chart_registry import ChartRegistry, compute_post_processing_digest
 from energy_models.core.stream_type.resources_models.resource_glossary import ResourceGlossary
 from energy_models.glossaryenergy import GlossaryEnergy
 from sostrades_core.execution_engine.sos_wrapp import SoSWrapp
@@ -81,6 +82,7 @@ class StreamDiscipline(SoSWrapp):
         super().__init__(sos_name=sos_name, logger=logger)
         self.grad_techno_mix_vs_prod_dict = None
         self.energy_model = None
+        self.chart_registry = ChartRegistry()
 
     def setup_sos_disciplines(self):
         dynamic_inputs = {}
@@ -396,10 +398,8 @@ class StreamDiscipline(SoSWrapp):
         # For the outputs, making a graph for block fuel vs range and blocktime vs
         # range
 
-        instanciated_charts = []
         charts = []
         price_unit_list = ['$/MWh', '$/t']
-        unit = 'TWh'
         years_list = [self.get_sosdisc_inputs(GlossaryEnergy.YearStart)]
         # Overload default value with chart filter
         if filters is not None:
@@ -411,34 +411,32 @@ class StreamDiscipline(SoSWrapp):
                 if chart_filter.filter_key == GlossaryEnergy.Years:
                     years_list = chart_filter.selected_values
 
+        # charts are only built when selected and memoized until the data of the discipline changes
+        return self.chart_registry.get_charts(self.get_chart_factories(charts, price_unit_list, years_list),
+                                              compute_post_processing_digest(self))
+
+    def get_chart_factories(self, charts, price_unit_list, years_list):
+        '''
+        (key, factory) of the selected charts in display order
+        '''
+        unit = 'TWh'
+        chart_factories = []
         if 'Energy price' in charts and '$/MWh' in price_unit_list:
-            new_chart = self.get_chart_energy_price_in_dollar_kwh()
-            if new_chart is not None:
-                instanciated_charts.append(new_chart)
+            chart_factories.append(('energy_price_in_dollar_kwh', self.get_chart_energy_price_in_dollar_kwh))
         if 'Energy price' in charts and '$/t' in price_unit_list and 'calorific_value' in self.get_sosdisc_inputs(
                 'data_fuel_dict'):
-            new_chart = self.get_chart_energy_price_in_dollar_kg()
-            if new_chart is not None:
-                instanciated_charts.append(new_chart)
+            chart_factories.append(('energy_price_in_dollar_kg', self.get_chart_energy_price_in_dollar_kg))
         if 'Consumption and production' in charts:
-            new_charts = self.get_charts_consumption_and_production()
-            for new_chart in new_charts:
-                if new_chart is not None:
-                    instanciated_charts.append(new_chart)
+            chart_factories.append(('consumption_and_production', self.get_charts_consumption_and_production))
         if 'Technology mix' in charts:
-            new_charts = self.get_chart_technology_mix(years_list)
-            for new_chart in new_charts:
-                if new_chart is not None:
-                    instanciated_charts.append(new_chart)
-            new_charts = self.get_charts_production_by_techno(unit)
-            for new_chart in new_charts:
-                if new_chart is not None:
-                    instanciated_charts.append(new_chart)
+            chart_factories.extend([(('technology_mix', tuple(years_list)),
+                                     lambda: self.get_chart_technology_mix(years_list)),
+                                    (('production_by_techno', unit),
+                                     lambda: self.get_charts_production_by_techno(unit))])
 
         if GlossaryEnergy.Capital in charts:
-            chart = self.get_capital_breakdown_by_technos()
-            instanciated_charts.append(chart)
-        return instanciated_charts
+            chart_factories.append(('capital_breakdown_by_technos', self.get_capital_breakdown_by_technos))
+        return chart_factories
 
     def get_chart_energy_price_in_dollar_kwh(self):
         energy_prices = self.get_sosdisc_outputs(GlossaryEnergy.EnergyPricesValue)
@@ -0,0 +1,104 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import numpy as np
+import pandas as pd
+
+from energy_models.glossaryenergy import GlossaryEnergy
+
+
+def compute_new_production_by_age(prod_from_invest, lifetime):
+    """
+    (years x age) matrix of the production coming from investments
+    The production started on year j has age i - j on year i and is removed when its age reaches the lifetime
+
+    :param prod_from_invest: production started each year of study (already delayed by construction),
+        leading axes are scenarios
+    :return: ages array and production matrix (scenarios x years x age if several scenarios)
+    """
+    nb_years = np.shape(prod_from_invest)[-1]
+    nb_ages = int(min(nb_years, np.ceil(lifetime)))
+    ages = np.arange(nb_ages)
+    start_year_index = np.arange(nb_years)[:, np.newaxis] - ages[np.newaxis, :]
+    prod_from_invest = np.where(np.isnan(prod_from_invest), 0.0, prod_from_invest)
+
+    new_prod_by_age = np.where(start_year_index >= 0, prod_from_invest[..., np.maximum(start_year_index, 0)], 0.0)
+
+    return ages, new_prod_by_age
+
+
+def compute_delayed_prod_from_invest(invest, capex, invest_before_ystart, construction_delay):
+    """
+    Production started each year of study from the investments made construction_delay years before
+    in TWh (M$ / ($/MWh)), investments before year start are converted with the capex of the first year
+
+    :param invest: investments per year of study, leading axes are scenarios
+    :param capex: capex per year of study with the same shape as invest
+    :param invest_before_ystart: investments of the construction_delay years before year start
+    :return: production from investments with the same shape as invest
+    """
+    invest = np.asarray(invest)
+    capex = np.asarray(capex)
+    nb_years = invest.shape[-1]
+    nb_years_before = min(construction_delay, nb_years)
+    prod_before_ystart = np.asarray(invest_before_ystart)[:nb_years_before] / capex[..., :1]
+    prod_from_invest = invest[..., :nb_years - nb_years_before] / capex[..., :nb_years - nb_years_before]
+
+    return np.concatenate((prod_before_ystart, prod_from_invest), axis=-1)
+
+
+def compute_initial_production_by_age(initial_ages, initial_distrib_prod, nb_years, lifetime):
+    """
+    (years x initial age class) matrix of the initial production getting one year older each year
+    The production of an age class is removed when its age reaches the lifetime
+
+    :return: ages matrix and production matrix
+    """
+    ages = np.asarray(initial_ages)[np.newaxis, :] + np.arange(nb_years)[:, np.newaxis]
+    initial_distrib_prod = np.where(np.isnan(initial_distrib_prod), 0.0, initial_distrib_prod)
+    initial_prod_by_age = np.where(ages < lifetime, initial_distrib_prod[np.newaxis, :], 0.0)
+
+    return ages, initial_prod_by_age
+
+
+def build_age_distrib_prod_df(years, new_ages, new_prod_by_age, initial_ages_by_year, initial_prod_by_age,
+                              prod_column):
+    """
+    Materialize the long (year, age) dataframe of the aging distribution from the matrices
+    Only non-zero productions are kept: rows coming from investments first sorted by age,
+    then rows coming from the initial distribution sorted by year
+    """
+    nb_years = len(years)
+
+    new_prod = new_prod_by_age.T
+    new_mask = new_prod != 0.0
+    new_age_index, new_year_index = np.nonzero(new_mask)
+    new_df = pd.DataFrame({GlossaryEnergy.Years: years[new_year_index],
+                           'age': new_ages[new_age_index].astype('float64'),
+                           prod_column: new_prod[new_mask]},
+                          index=new_age_index * nb_years + new_year_index - new_age_index)
+
+    initial_mask = initial_prod_by_age != 0.0
+    initial_year_index, initial_class_index = np.nonzero(initial_mask)
+    initial_df = pd.DataFrame({GlossaryEnergy.Years: years[initial_year_index],
+                               'age': initial_ages_by_year[initial_mask].astype('float64'),
+                               prod_column: initial_prod_by_age[initial_mask]},
+                              index=nb_years * nb_years + initial_year_index * initial_prod_by_age.shape[1] +
+                                    initial_class_index)
+
+    age_distrib_prod_df = pd.concat([new_df, initial_df])
+    age_distrib_prod_df['age_x_prod'] = age_distrib_prod_df['age'] * age_distrib_prod_df[prod_column]
+
+    return age_distrib_prod_df
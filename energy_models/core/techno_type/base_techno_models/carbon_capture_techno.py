@@ -17,13 +17,26 @@ limitations under the License.
 
 import numpy as np
 import scipy.interpolate as sc
-from scipy.stats import linregress
 
 from energy_models.core.stream_type.carbon_models.carbon_capture import CarbonCapture
 from energy_models.core.techno_type.techno_type import TechnoType
 from energy_models.glossaryenergy import GlossaryEnergy
 
 
+def compute_segment_slopes(x_list, y_list, values):
+    """
+    Slopes of the piecewise linear function (x_list, y_list) on the segment used for each value:
+    the segment on the left of the value, the first one below x_list[0] and the one on the right of a value
+    equal to a point of x_list (the first one for x_list[0]). Values beyond the last point have a zero slope
+    """
+    x_list = np.asarray(x_list)
+    values = np.real(values)
+    segment_slopes = np.append(np.diff(y_list) / np.diff(x_list), 0.0)
+    positions = np.maximum(np.searchsorted(x_list, values, side='left'), 1)
+    positions = positions + np.isin(values, x_list)
+    return segment_slopes[positions - 1]
+
+
 class CCTechno(TechnoType):
     energy_name = CarbonCapture.name
 
@@ -91,32 +104,16 @@ class CCTechno(TechnoType):
             co2_concentration_list = [0.035, 0.092, 0.13, 0.186, 0.44, 0.99]
             capex_capture_list = [1234, 629, 479.8, 396.8, 263.3, 117]
 
-            slopes = []
-            for fg in fg_mean_ratio:
-                co2_concentration_list_with_fg = co2_concentration_list + [fg]
-                co2_concentration_list_with_fg.sort()
-                position = co2_concentration_list_with_fg.index(fg)
-                if position == 0:
-                    position = 1
-                elif position == len(co2_concentration_list_with_fg):
-                    position = len(co2_concentration_list)
-                if fg in co2_concentration_list:
-                    position += 1
-
-                slope = linregress(
-                    co2_concentration_list[position - 1:position + 1], capex_capture_list[position - 1:position + 1])[0]
-                if np.isnan(slope):
-                    slope = 0.0
-                slopes.append(slope)
+            slopes = compute_segment_slopes(co2_concentration_list, capex_capture_list, fg_mean_ratio)
 
             capex = super().compute_capex(invest_list, data_config)
-            grad = np.array(slopes)[:, np.newaxis] * \
-                   np.array(capex)[:, np.newaxis] / 479.8
+            grad = slopes * np.array(capex) / 479.8
 
         else:
-            grad = 0.0
+            grad = np.zeros(len(fg_mean_ratio))
 
-        return np.identity(len(fg_mean_ratio)) * grad
+        # the capex of a year only depends on the flue gas ratio of the same year, the jacobian is diagonal
+        return grad
 
     @staticmethod
     def compute_electricity_variation_from_fg_ratio(fg_mean_ratio, fg_ratio_effect):
@@ -142,51 +139,19 @@ class CCTechno(TechnoType):
             co2_concentration_list = [0.035, 0.092, 0.13, 0.186, 0.44, 0.99]
             elec_demand_list = [23.2, 10.5, 8.5, 6.6, 4.5, 8.5]
 
-            slopes = []
-            for fg in fg_mean_ratio:
-                co2_concentration_list_with_fg = co2_concentration_list + [fg]
-                co2_concentration_list_with_fg.sort()
-                position = co2_concentration_list_with_fg.index(fg)
-                if position == 0:
-                    position = 1
-                elif position == len(co2_concentration_list_with_fg):
-                    position = len(co2_concentration_list)
-
-                if fg in co2_concentration_list:
-                    position += 1
-                slope = linregress(
-                    co2_concentration_list[position - 1:position + 1], elec_demand_list[position - 1:position + 1])[0]
-                if np.isnan(slope):
-                    slope = 0.0
-                slopes.append(slope)
+            slopes = compute_segment_slopes(co2_concentration_list, elec_demand_list, fg_mean_ratio)
             elec_needs = self.get_electricity_needs()
 
-            grad = np.array(slopes)[:, np.newaxis] \
-                   * elec_needs / 8.5 / self.techno_infos_dict['efficiency'] * \
-                   self.energy_prices[energy_name].values[:, np.newaxis]
+            grad = slopes * elec_needs / 8.5 / self.techno_infos_dict['efficiency'] * \
+                   self.energy_prices[energy_name].values
         else:
-            grad = 0.0
-        return np.identity(len(fg_mean_ratio)) * grad
+            grad = np.zeros(len(fg_mean_ratio))
+        return grad
 
     def compute_dprod_dfluegas(self, capex_list, invest_list, invest_before_year_start, techno_dict, dcapexdfluegas):
 
-        dprod_dcapex = self.compute_dprod_dcapex(
-            capex_list, invest_list, techno_dict, invest_before_year_start)
-
-        # dprod_dfluegas = dpprod_dpfluegas + dprod_dcapex * dcapexdfluegas
-        if 'complex128' in [dcapexdfluegas.dtype, dprod_dcapex.dtype]:
-            arr_type = 'complex128'
-        else:
-            arr_type = 'float64'
-
-        dprod_dfluegas = np.zeros(dprod_dcapex.shape, dtype=arr_type)
-
-        for line in range(dprod_dcapex.shape[0]):
-            for column in range(dprod_dcapex.shape[1]):
-                dprod_dfluegas[line, column] = np.matmul(
-                    dprod_dcapex[line, :], dcapexdfluegas[:, column])
-
-        return dprod_dfluegas
+        return self.compute_dprod_dcapex_parameter(
+            capex_list, invest_list, invest_before_year_start, techno_dict, dcapexdfluegas)
 
     def compute_dnon_usecapital_dfluegas(self, dcapex_dfluegas, dprod_dfluegas):
         '''
@@ -196,8 +161,8 @@ class CCTechno(TechnoType):
         dratiodfluegas = 0.0
         '''
 
-        dtechnocapital_dfluegas = (dcapex_dfluegas * self.production_woratio[
-            f'{self.energy_name} ({self.product_energy_unit})'].values.reshape((len(self.years), 1)) +
+        dtechnocapital_dfluegas = (np.diag(dcapex_dfluegas * self.production_woratio[
+            f'{self.energy_name} ({self.product_energy_unit})'].values) +
                                    dprod_dfluegas * self.cost_details[f'Capex_{self.name}'].values.reshape(
                     (len(self.years), 1)))
 
@@ -0,0 +1,106 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import hashlib
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def compute_digest(*values):
+    """
+    Digest of the inputs of a computation used as a cache key
+    Arrays and dataframes are hashed with their dtype, shape and raw values
+    (imaginary parts included for complex step), dicts item by item and other values with their repr
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for value in values:
+        update_digest(digest, value)
+
+    return digest.hexdigest()
+
+
+def update_digest(digest, value):
+    """
+    Update the digest with one value
+    """
+    if isinstance(value, dict):
+        digest.update(b'{')
+        for key in sorted(value, key=str):
+            digest.update(repr(key).encode())
+            update_digest(digest, value[key])
+        digest.update(b'}')
+        return
+
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        value = value.to_numpy()
+    if isinstance(value, (np.ndarray, list, tuple)):
+        value = np.ascontiguousarray(value)
+    if isinstance(value, np.ndarray) and value.dtype != object:
+        digest.update(f'{value.dtype.str}{value.shape}'.encode())
+        digest.update(value.tobytes())
+    elif isinstance(value, np.ndarray):
+        # the repr of large object arrays is truncated, their values are listed entirely
+        digest.update(repr(value.tolist()).encode())
+    else:
+        digest.update(repr(value).encode())
+    digest.update(b'|')
+
+
+class ComputeCache:
+    """
+    Bounded least recently used cache of computation outputs keyed by the digest of their inputs
+    Cached outputs are shared, they must not be modified in place by the caller
+    """
+
+    def __init__(self, max_size=1):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_compute(self, key, compute_function):
+        '''
+        Return the cached outputs for key or compute them with compute_function and store them
+        '''
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+        self.misses += 1
+        outputs = compute_function()
+        self.entries[key] = outputs
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+        return outputs
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def get_stats(self):
+        '''
+        Hit and miss statistics of the cache
+        '''
+        nb_calls = self.hits + self.misses
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / nb_calls if nb_calls > 0 else 0.0,
+                'size': len(self.entries),
+                'max_size': self.max_size}
@@ -18,6 +18,7 @@ import numpy as np
 
 from energy_models.core.stream_type.carbon_models.carbon_capture import CarbonCapture
 from energy_models.core.techno_type.techno_disc import TechnoDiscipline
+from energy_models.core.techno_type.techno_jacobian import compose_jacobians
 from energy_models.glossaryenergy import GlossaryEnergy
 from sostrades_core.tools.post_processing.charts.two_axes_instanciated_chart \
     import InstanciatedSeries, TwoAxesInstanciatedChart
@@ -91,8 +92,8 @@ class CCTechnoDiscipline(TechnoDiscipline):
                                                     <= inputs_dict[GlossaryEnergy.YearEnd]][
             GlossaryEnergy.MarginValue].values
 
-        dprice_dfluegas = (dfactory_dfluegas + delec_dflue_gas) * np.split(margin, len(margin)) / \
-                          100.0
+        # capex and electricity gradients are diagonals, the price one is built as a matrix only for the jacobian
+        dprice_dfluegas = np.diag((dfactory_dfluegas + delec_dflue_gas) * margin / 100.0)
 
         self.set_partial_derivative_for_other_types(
             (GlossaryEnergy.TechnoPricesValue, f'{self.techno_name}'),
@@ -119,14 +120,11 @@ class CCTechnoDiscipline(TechnoDiscipline):
         production, consumption = self.get_sosdisc_outputs(
             [GlossaryEnergy.TechnoProductionValue, GlossaryEnergy.TechnoConsumptionValue])
         for column in consumption:
-            dprod_column_dfluegas = dprod_dfluegas.copy()
             if column != GlossaryEnergy.Years:
                 var_cons = (consumption[column] /
                             production[f'{self.energy_name} ({self.techno_model.product_energy_unit})']).fillna(
                     0)
-                for line in range(len(consumption[column].values)):
-                    dprod_column_dfluegas[line, :] = dprod_dfluegas[line,
-                                                     :] * var_cons[line]
+                dprod_column_dfluegas = compose_jacobians(var_cons.values, dprod_dfluegas)
                 self.set_partial_derivative_for_other_types(
                     (GlossaryEnergy.TechnoConsumptionValue, column),
                     (GlossaryEnergy.FlueGasMean, GlossaryEnergy.FlueGasMean),
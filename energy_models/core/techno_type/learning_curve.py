@@ -0,0 +1,145 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import numpy as np
+
+# below 10 M$ of cumulated investments the learning rate has no influence on capex
+MIN_INVEST_SUM_FOR_LEARNING = 10.0
+# the yearly learning ratio is smoothly floored under this value
+RATIO_SMOOTH_THRESHOLD = 0.95
+
+
+def compute_learning_ratios(invest_list, invest_sum_init, expo_factor, capacity_factor_ratio=None,
+                            with_gradient=False):
+    """
+    Compute the yearly learning ratios of the capex learning curve in one vectorized pass
+
+    capex_i = capex_i-1 * ratio_i with ratio_i = ((invest_sum_i + invest_i) / invest_sum_i * cf_i / cf_0) ** (-expo_factor)
+    The ratio is smoothed with 0.9 + 0.05 * exp(ratio - 0.9) when it goes below 0.95.
+    Years where the cumulated invest is below 10 M$ (and the first year) reset the capex to its initial value,
+    their ratio is set to 1.
+
+    :param invest_list: investments per year (already maximized with exp min), leading axes are scenarios
+    :param invest_sum_init: cumulated investment before the first year (initial_production * capex_init)
+    :param expo_factor: learning curve exponent
+    :param capacity_factor_ratio: optional array of capacity_factor_i / capacity_factor_0
+    :param with_gradient: if True, also return the derivatives of the ratios
+    :return: ratios, is_learning mask, last_reset indexes and, if with_gradient, the derivative of ratio_i
+        wrt invest_i and wrt any invest_k with k < i
+    """
+    invest_list = np.asarray(invest_list)
+    nb_years = invest_list.shape[-1]
+    invest_sum = invest_sum_init + np.concatenate((np.zeros(invest_list.shape[:-1] + (1,)),
+                                                   np.cumsum(invest_list[..., :-1], axis=-1)), axis=-1)
+
+    is_learning = invest_sum.real >= MIN_INVEST_SUM_FOR_LEARNING
+    is_learning[..., 0] = False
+    # safe denominator on reset years, their values are masked afterwards
+    safe_invest_sum = np.where(is_learning, invest_sum, 1.0)
+
+    base = (safe_invest_sum + invest_list) / safe_invest_sum
+    if capacity_factor_ratio is not None:
+        base = base * capacity_factor_ratio
+    if not np.iscomplexobj(base) and np.any(base[is_learning] < 0.0):
+        # a negative base cannot be raised to a real power, switch to complex
+        base = base.astype(np.complex128)
+    ratio = np.where(is_learning, base ** (-expo_factor), 1.0)
+
+    is_smoothed = is_learning & (ratio.real < RATIO_SMOOTH_THRESHOLD)
+    smooth_factor = np.where(is_smoothed, 0.05 * np.exp(ratio - 0.9), 1.0)
+    smoothed_ratio = np.where(is_smoothed, 0.9 + 0.05 * np.exp(ratio - 0.9), ratio)
+
+    # index of the last year which has reset the capex to capex_init
+    last_reset = np.maximum.accumulate(np.where(is_learning, 0, np.arange(nb_years)), axis=-1)
+
+    if not with_gradient:
+        return smoothed_ratio, is_learning, last_reset
+
+    dratio_dinvest = np.where(is_learning,
+                              -expo_factor * ratio / (safe_invest_sum + invest_list) * smooth_factor, 0.0)
+    dratio_dinvest_before = np.where(is_learning,
+                                     expo_factor * invest_list * ratio /
+                                     (safe_invest_sum * (safe_invest_sum + invest_list)) * smooth_factor, 0.0)
+
+    return smoothed_ratio, is_learning, last_reset, dratio_dinvest, dratio_dinvest_before
+
+
+def compute_capex_learning_curve(invest_list, capex_init, invest_sum_init, expo_factor,
+                                 maximum_learning_capex_ratio=0.9, capacity_factor_ratio=None):
+    """
+    Compute the capex over the years with the learning curve using a segmented cumulative product of the ratios
+    The capex cannot decrease more than (1 - maximum_learning_capex_ratio) of capex_init
+    The investments may have leading scenario axes, the learning curve is applied on the last one
+    """
+    ratio, _, last_reset = compute_learning_ratios(
+        invest_list, invest_sum_init, expo_factor, capacity_factor_ratio)
+    ratio_cumprod = np.cumprod(ratio, axis=-1)
+    capex_year = capex_init * ratio_cumprod / np.take_along_axis(ratio_cumprod, last_reset, axis=-1)
+
+    return capex_init * (maximum_learning_capex_ratio +
+                         (1.0 - maximum_learning_capex_ratio) * capex_year / capex_init)
+
+
+def compute_dcapex_learning_curve_dinvest(invest_list, capex_init, invest_sum_init, expo_factor,
+                                          maximum_learning_capex_ratio=0.9, capacity_factor_ratio=None):
+    """
+    Compute the lower-triangular jacobian of the learning curve capex wrt investments
+
+    With capex_i = capex_i-1 * ratio_i, the recursion dcapex_i/dinvest_k = dcapex_i-1/dinvest_k * ratio_i
+    + capex_i-1 * dratio_i/dinvest_k is unrolled as
+    dcapex_i/dinvest_k = capex_i * (A_i - A_max(k, last_reset_i)) + capex_i * dratio_k/dinvest_k / ratio_k
+    where A is the cumulated sum of dratio_j/dinvest_before_j / ratio_j
+    """
+    invest_list = np.asarray(invest_list)
+    nb_years = len(invest_list)
+    ratio, is_learning, last_reset, dratio_dinvest, dratio_dinvest_before = compute_learning_ratios(
+        invest_list, invest_sum_init, expo_factor, capacity_factor_ratio, with_gradient=True)
+    ratio_cumprod = np.cumprod(ratio)
+    capex_year = capex_init * ratio_cumprod / ratio_cumprod[last_reset]
+
+    cumulated_dratio = np.cumsum(dratio_dinvest_before / ratio)
+
+    lines = np.arange(nb_years)[:, np.newaxis]
+    columns = np.arange(nb_years)[np.newaxis, :]
+    last_reset_lines = last_reset[:, np.newaxis]
+    in_segment = is_learning[:, np.newaxis] & (columns <= lines)
+
+    dcapex_dinvest = cumulated_dratio[:, np.newaxis] - cumulated_dratio[np.maximum(columns, last_reset_lines)]
+    dcapex_dinvest = dcapex_dinvest + np.where(columns > last_reset_lines, dratio_dinvest / ratio, 0.0)
+    dcapex_dinvest = np.where(in_segment, capex_year[:, np.newaxis] * dcapex_dinvest, 0.0)
+
+    return (1.0 - maximum_learning_capex_ratio) * dcapex_dinvest
+
+
+def compute_dcapex_learning_curve_dparameter(invest_list, capex_init, invest_sum_init, expo_factor,
+                                             dcapex_init, dinvest_sum_init):
+    """
+    Compute the derivative of the learning curve capex (before the maximum learning ratio is applied) wrt a scalar
+    parameter on which capex_init and the initial cumulated investment depend
+
+    With capex_i = capex_init * prod(ratio_j) on the years r_i < j <= i after the last reset r_i, the recursion
+    dcapex_i = dcapex_i-1 * ratio_i + capex_i-1 * dratio_i is unrolled with prefix products of the ratios as
+    dcapex_i = prod(ratio_j) * (dcapex_init + capex_init * sum(dratio_j / ratio_j))
+    where dratio_j = dinvest_sum_init * dratio_j/dinvest_before_j as the parameter shifts all the cumulated invests
+    """
+    ratio, _, last_reset, _, dratio_dinvest_before = compute_learning_ratios(
+        invest_list, invest_sum_init, expo_factor, with_gradient=True)
+    ratio_cumprod = np.cumprod(ratio, axis=-1)
+    cumulated_dratio = np.cumsum(dinvest_sum_init * dratio_dinvest_before / ratio, axis=-1)
+
+    segment_ratio_product = ratio_cumprod / np.take_along_axis(ratio_cumprod, last_reset, axis=-1)
+    segment_dratio_sum = cumulated_dratio - np.take_along_axis(cumulated_dratio, last_reset, axis=-1)
+
+    return segment_ratio_product * (dcapex_init + capex_init * segment_dratio_sum)
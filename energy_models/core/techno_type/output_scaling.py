@@ -0,0 +1,53 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import numpy as np
+import pandas as pd
+
+from energy_models.glossaryenergy import GlossaryEnergy
+
+
+def rescale_columns(dataframe, multiplier=1.0, divisor=1.0, columns=None):
+    """
+    New dataframe with the values of the columns multiplied by multiplier then divided by divisor
+    The (years x columns) block is extracted and rescaled at once, other columns are kept as is.
+    The input dataframe is left untouched so it can still be used as the value before rescaling.
+
+    :param multiplier: scalar or array over years broadcast on all the columns
+    :param divisor: scalar or array over years broadcast on all the columns
+    :param columns: columns to rescale, all columns but years by default
+    """
+    if columns is None:
+        columns = [column for column in dataframe.columns if column != GlossaryEnergy.Years]
+    multiplier = np.asarray(multiplier)
+    divisor = np.asarray(divisor)
+    column_values = [dataframe[column].values for column in columns]
+    dtype = np.result_type(multiplier, divisor)
+    for column_value in column_values:
+        dtype = np.promote_types(dtype, column_value.dtype)
+
+    values = np.empty((len(dataframe), len(columns)), dtype=dtype)
+    for i, column_value in enumerate(column_values):
+        values[:, i] = column_value
+    values *= multiplier.reshape(-1, 1) if multiplier.ndim == 1 else multiplier
+    values /= divisor.reshape(-1, 1) if divisor.ndim == 1 else divisor
+
+    rescaled_df = pd.DataFrame(values, index=dataframe.index, columns=columns)
+    rescaled_columns = set(columns)
+    for position, column in enumerate(dataframe.columns):
+        if column not in rescaled_columns:
+            rescaled_df.insert(position, column, dataframe[column].values)
+
+    return rescaled_df
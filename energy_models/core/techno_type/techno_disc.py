@@ -22,9 +22,11 @@ from plotly import graph_objects as go
 
 from climateeconomics.core.core_resources.resource_mix.resource_mix import ResourceMixModel
 from climateeconomics.core.core_witness.climateeco_discipline import ClimateEcoDiscipline
+from energy_models.core.chart_registry import ChartRegistry, compute_post_processing_digest
 from energy_models.core.energy_mix.energy_mix import EnergyMix
 from energy_models.core.stream_type.resources_data_disc import get_static_CO2_emissions, get_static_prices
 from energy_models.core.stream_type.resources_models.resource_glossary import ResourceGlossary
+from energy_models.core.techno_type.compute_cache import ComputeCache, compute_digest
 from energy_models.glossaryenergy import GlossaryEnergy
 from sostrades_core.execution_engine.sos_wrapp import SoSWrapp
 from sostrades_core.tools.post_processing.charts.chart_filter import ChartFilter
@@ -108,7 +110,6 @@ class TechnoDiscipline(SoSWrapp):
         GlossaryEnergy.TechnoDetailedProductionValue: {'type': 'dataframe', 'unit': 'TWh or Mt'},
         GlossaryEnergy.TechnoProductionValue: {'type': 'dataframe', 'unit': 'TWh or Mt'},
         GlossaryEnergy.TechnoProductionWithoutRatioValue: {'type': 'dataframe', 'unit': 'TWh or Mt'},
-        'age_distrib_production': {'type': 'dataframe', 'unit': 'TWh'},
         'mean_age_production': {'type': 'dataframe', 'unit': GlossaryEnergy.Years},
         GlossaryEnergy.CO2EmissionsValue: {'type': 'dataframe', 'unit': 'kg/kWh'},
         'CO2_emissions_detailed': {'type': 'dataframe', 'unit': 'kg/kWh'},
@@ -123,6 +124,8 @@ class TechnoDiscipline(SoSWrapp):
 
     techno_name = 'Fill techno name'
     energy_name = 'Fill the energy name for this techno'
+    # Number of invest jacobian blocks kept in cache, each one holds a few (years x years) matrices
+    invest_jacobian_cache_size = 4
 
     def __init__(self, sos_name, logger: logging.Logger):
         super().__init__(sos_name=sos_name, logger=logger)
@@ -138,6 +141,8 @@ class TechnoDiscipline(SoSWrapp):
         self.dprices_demissions = None
         self.grad_total = None
         self.techno_model = None
+        self.invest_jacobian_cache = ComputeCache(max_size=self.invest_jacobian_cache_size)
+        self.chart_registry = ChartRegistry()
 
     def setup_sos_disciplines(self):
         dynamic_inputs = {}
@@ -248,7 +253,6 @@ class TechnoDiscipline(SoSWrapp):
                         GlossaryEnergy.TechnoDetailedProductionValue: self.techno_model.production_detailed,
                         GlossaryEnergy.TechnoProductionValue: self.techno_model.production,
                         GlossaryEnergy.TechnoProductionWithoutRatioValue: self.techno_model.production_woratio,
-                        'age_distrib_production': self.techno_model.age_distrib_prod_df,
                         'mean_age_production': self.techno_model.mean_age_df,
                         GlossaryEnergy.CO2EmissionsValue: self.techno_model.carbon_intensity[[GlossaryEnergy.Years, self.techno_name]],
                         'CO2_emissions_detailed': self.techno_model.carbon_intensity,
@@ -264,6 +268,39 @@ class TechnoDiscipline(SoSWrapp):
 
         self.store_sos_outputs_values(outputs_dict)
 
+    def compute_invest_jacobian_blocks(self, invest_level, capex, scaling_factor_invest_level,
+                                       scaling_factor_techno_consumption):
+        '''
+        Compute the gradients of capex, production and installed power wrt invest
+        These blocks only depend on invest, capex and techno infos and are often recomputed with the same invest
+        in an optimization, they are kept in a bounded LRU cache keyed on the digest of their inputs
+        '''
+        invest = invest_level[GlossaryEnergy.InvestValue].values * scaling_factor_invest_level
+        is_before_year_end = invest_level[GlossaryEnergy.Years].values <= self.techno_model.year_end
+        invest_before_ystart = self.techno_model.invest_before_ystart[GlossaryEnergy.InvestValue].values
+        techno_infos_dict = self.techno_model.techno_infos_dict
+
+        def compute_blocks():
+            dcapex_dinvest = self.techno_model.compute_dcapex_dinvest(invest[is_before_year_end], techno_infos_dict)
+            dprod_dinvest = self.techno_model.compute_dprod_dinvest(
+                capex, invest, invest_before_ystart, techno_infos_dict, dcapex_dinvest)
+            dpower_dinvest = self.techno_model.compute_dpower_dinvest(
+                capex, invest, techno_infos_dict, dcapex_dinvest, scaling_factor_techno_consumption)
+            # the model keeps some of the intermediate gradients, used later on by the jacobian
+            model_gradients = (self.techno_model.dprod_dinvest, self.techno_model.dprod_list_dcapex_list,
+                               self.techno_model.dpower_list_dinvest_list)
+            return dcapex_dinvest, dprod_dinvest, dpower_dinvest, model_gradients
+
+        key = compute_digest(invest, is_before_year_end, capex, invest_before_ystart, techno_infos_dict,
+                             self.techno_model.initial_production, scaling_factor_techno_consumption)
+        dcapex_dinvest, dprod_dinvest, dpower_dinvest, model_gradients = \
+            self.invest_jacobian_cache.get_or_compute(key, compute_blocks)
+        self.techno_model.dprod_dinvest, self.techno_model.dprod_list_dcapex_list, \
+            self.techno_model.dpower_list_dinvest_list = model_gradients
+        self.logger.debug(f'{self.techno_name} invest jacobian cache: {self.invest_jacobian_cache.get_stats()}')
+
+        return dcapex_dinvest, dprod_dinvest, dpower_dinvest
+
     def compute_sos_jacobian(self):
 
         years = self.techno_model.years
@@ -280,10 +317,9 @@ class TechnoDiscipline(SoSWrapp):
         utilisation_ratio = inputs_dict[GlossaryEnergy.UtilisationRatioValue][
             GlossaryEnergy.UtilisationRatioValue].values
         ratio_df = self.techno_model.ratio_df
-        dcapex_dinvest = self.techno_model.compute_dcapex_dinvest(invest_level.loc[invest_level[GlossaryEnergy.Years]
-                                                                                   <= self.techno_model.year_end][
-                                                                      GlossaryEnergy.InvestValue].values * scaling_factor_invest_level,
-                                                                  self.techno_model.techno_infos_dict)
+        capex = outputs_dict[GlossaryEnergy.TechnoDetailedPricesValue][f'Capex_{self.techno_name}'].values
+        dcapex_dinvest, self.dprod_dinvest, self.dpower_dinvest = self.compute_invest_jacobian_blocks(
+            invest_level, capex, scaling_factor_invest_level, inputs_dict['scaling_factor_techno_consumption'])
 
         crf = self.techno_model.compute_capital_recovery_factor(self.techno_model.techno_infos_dict)
         dfactory_dinvest = dcapex_dinvest * (crf + self.techno_model.techno_infos_dict['Opex_percentage'])
@@ -300,17 +336,6 @@ class TechnoDiscipline(SoSWrapp):
             (GlossaryEnergy.InvestLevelValue, GlossaryEnergy.InvestValue),
             self.dprice_dinvest * scaling_factor_invest_level)
 
-        capex = outputs_dict[GlossaryEnergy.TechnoDetailedPricesValue][f'Capex_{self.techno_name}'].values
-        # Compute jacobian for enegy_type production
-        self.dprod_dinvest = self.techno_model.compute_dprod_dinvest(
-            capex, invest_level[GlossaryEnergy.InvestValue].values * scaling_factor_invest_level,
-            self.techno_model.invest_before_ystart[GlossaryEnergy.InvestValue].values,
-            self.techno_model.techno_infos_dict, dcapex_dinvest)
-
-        self.dpower_dinvest = self.techno_model.compute_dpower_dinvest(
-            capex, invest_level[GlossaryEnergy.InvestValue].values * scaling_factor_invest_level,
-            self.techno_model.techno_infos_dict, dcapex_dinvest, inputs_dict['scaling_factor_techno_consumption'])
-
         applied_ratio = outputs_dict['applied_ratio']['applied_ratio'].values
         dprod_name_dinvest = (
                                      self.dprod_dinvest.T * applied_ratio * utilisation_ratio / 100).T * scaling_factor_invest_level / scaling_factor_techno_production
@@ -695,12 +720,8 @@ class TechnoDiscipline(SoSWrapp):
         # For the outputs, making a graph for block fuel vs range and blocktime vs
         # range
 
-        instanciated_charts = []
         charts = []
         price_unit_list = ['$/MWh', '$/t']
-        inputs_dict = self.get_sosdisc_inputs()
-        data_fuel_dict = inputs_dict['data_fuel_dict']
-        technos_info_dict = inputs_dict['techno_infos_dict']
         # Overload default value with chart filter
         if filters is not None:
             for chart_filter in filters:
@@ -709,69 +730,54 @@ class TechnoDiscipline(SoSWrapp):
                 if chart_filter.filter_key == 'price_unit':
                     price_unit_list = chart_filter.selected_values
 
+        # charts are only built when selected and memoized until the data of the discipline changes
+        return self.chart_registry.get_charts(self.get_chart_factories(charts, price_unit_list),
+                                              compute_post_processing_digest(self))
+
+    def get_chart_factories(self, charts, price_unit_list):
+        '''
+        (key, factory) of the selected charts in display order
+        '''
+        inputs_dict = self.get_sosdisc_inputs()
+        data_fuel_dict = inputs_dict['data_fuel_dict']
+        technos_info_dict = inputs_dict['techno_infos_dict']
+        chart_factories = []
+
         if 'Detailed prices' in charts and '$/MWh' in price_unit_list:
-            new_chart = self.get_chart_detailed_price_in_dollar_kwh()
-            if new_chart is not None:
-                instanciated_charts.append(new_chart)
+            chart_factories.append(('detailed_price_in_dollar_kwh', self.get_chart_detailed_price_in_dollar_kwh))
 
         if 'Detailed prices' in charts \
                 and '$/t' in price_unit_list \
                 and 'calorific_value' in data_fuel_dict:
-            new_chart = self.get_chart_detailed_price_in_dollar_kg()
-            if new_chart is not None:
-                instanciated_charts.append(new_chart)
+            chart_factories.append(('detailed_price_in_dollar_kg', self.get_chart_detailed_price_in_dollar_kg))
 
         if 'Consumption and production' in charts:
-            new_chart = self.get_chart_investments()
-            if new_chart is not None:
-                instanciated_charts.append(new_chart)
-
-            new_charts = self.get_charts_consumption_and_production()
-            for new_chart in new_charts:
-                if new_chart is not None:
-                    instanciated_charts.append(new_chart)
-
-            new_chart = self.get_chart_required_land()
-            if new_chart is not None:
-                instanciated_charts.append(new_chart)
+            chart_factories.extend([('investments', self.get_chart_investments),
+                                    ('consumption_and_production', self.get_charts_consumption_and_production),
+                                    ('required_land', self.get_chart_required_land)])
 
         if 'Applied Ratio' in charts:
-            new_chart = self.get_chart_applied_ratio()
-            if new_chart is not None:
-                instanciated_charts.append(new_chart)
+            chart_factories.append(('applied_ratio', self.get_chart_applied_ratio))
 
         if GlossaryEnergy.UtilisationRatioValue in charts:
-            new_chart = self.get_utilisation_ratio_chart()
-            instanciated_charts.append(new_chart)
+            chart_factories.append(('utilisation_ratio', self.get_utilisation_ratio_chart))
 
         if 'Initial Production' in charts:
             if 'initial_production' in self.get_data_in():
-                new_chart = self.get_chart_initial_production()
-                if new_chart is not None:
-                    instanciated_charts.append(new_chart)
+                chart_factories.append(('initial_production', self.get_chart_initial_production))
 
         if 'Factory Mean Age' in charts:
-            new_chart = self.get_chart_factory_mean_age()
-            if new_chart is not None:
-                instanciated_charts.append(new_chart)
+            chart_factories.append(('factory_mean_age', self.get_chart_factory_mean_age))
 
         if 'CO2 emissions' in charts:
-            new_chart = self.get_chart_carbon_intensity_kwh()
-            if new_chart is not None:
-                instanciated_charts.append(new_chart)
+            chart_factories.append(('carbon_intensity_kwh', self.get_chart_carbon_intensity_kwh))
             if 'calorific_value' in data_fuel_dict and 'high_calorific_value' in data_fuel_dict:
-                new_chart = self.get_chart_carbon_intensity_kg()
-                if new_chart is not None:
-                    instanciated_charts.append(new_chart)
+                chart_factories.append(('carbon_intensity_kg', self.get_chart_carbon_intensity_kg))
         if 'Non-Use Capital' in charts:
-            new_chart = self.get_chart_non_use_capital()
-            if new_chart is not None:
-                instanciated_charts.append(new_chart)
+            chart_factories.append(('non_use_capital', self.get_chart_non_use_capital))
         if 'Power production' in charts:
-            new_chart = self.get_chart_power_production(technos_info_dict)
-            if new_chart is not None:
-                instanciated_charts.append(new_chart)
-        return instanciated_charts
+            chart_factories.append(('power_production', lambda: self.get_chart_power_production(technos_info_dict)))
+        return chart_factories
 
     def get_utilisation_ratio_chart(self):
         utilisation_ratio_df = self.get_sosdisc_inputs(GlossaryEnergy.UtilisationRatioValue)
@@ -1098,8 +1104,10 @@ class TechnoDiscipline(SoSWrapp):
         return new_chart
 
     def get_chart_age_distribution_production(self):
-        age_distrib_production = self.get_sosdisc_outputs(
-            'age_distrib_production')
+        # the (year, age) dataframe is only built for this chart, from the aging matrices of the last run
+        if self.techno_model is None or self.techno_model.new_prod_by_age is None:
+            return None
+        age_distrib_production = self.techno_model.get_age_distrib_prod_df()
         chart_name = f'{self.techno_name} factories age in term of TWh of {self.energy_name} production'
 
         if GlossaryEnergy.Years in age_distrib_production.columns:
@@ -0,0 +1,75 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import numpy as np
+
+
+def compute_lifetime_window(nb_years, construction_delay, lifetime):
+    """
+    Banded Toeplitz matrix of the production window of investments
+    window[line, column] = 1 if an investment made on year column produces on year line, i.e.
+    column + construction_delay <= line < column + construction_delay + lifetime
+    """
+    offset = np.arange(nb_years)[:, np.newaxis] - np.arange(nb_years)[np.newaxis, :] - construction_delay
+    return ((offset >= 0) & (offset < lifetime)).astype('float64')
+
+
+def compute_dprod_dinvest_partial(capex_list, invest_list, dinvest_exp_min, construction_delay, lifetime):
+    """
+    Partial derivative of production from invest (prod = invest / capex) wrt investments at constant capex
+    Each column is the production window of the invest scaled by dexp_min(invest)/capex,
+    set to zero for negative investments
+    """
+    is_invest_positive = np.maximum(np.sign(np.real(invest_list) + np.finfo(float).eps), 0.0)
+    column_values = dinvest_exp_min / capex_list * is_invest_positive
+
+    return compute_lifetime_window(len(capex_list), construction_delay, lifetime) * column_values
+
+
+def compute_dprod_dcapex_partial(capex_list, invest_list, invest_before_year_start, construction_delay, lifetime):
+    """
+    Partial derivative of production from invest (prod = invest / capex) wrt capex
+    Invests before year start are produced with capex[0] and are added to the first column
+    """
+    nb_years = len(capex_list)
+    dprod_dcapex = compute_lifetime_window(nb_years, construction_delay, lifetime) * \
+                   (- invest_list / capex_list ** 2)
+
+    invest_before_year_start = np.asarray(invest_before_year_start)[:nb_years]
+    if len(invest_before_year_start) > 0:
+        window_before = compute_lifetime_window(nb_years, 0, lifetime)[:, :len(invest_before_year_start)]
+        dprod_dcapex[:, 0] = dprod_dcapex[:, 0] + \
+                             window_before @ (- invest_before_year_start / capex_list[0] ** 2)
+
+    return dprod_dcapex
+
+
+def compose_jacobians(*jacobians):
+    """
+    Chain rule product of jacobians: jacobians[0] @ jacobians[1] @ ...
+    Diagonal jacobians may be given compactly as the 1D array of their diagonal, they are then applied as
+    scalings of the columns (or of the rows for the leftmost one) instead of matrix products.
+    Dense jacobians are composed with a single matrix product, complex operands give a complex result
+    """
+    composed = np.asarray(jacobians[0])
+    for jacobian in jacobians[1:]:
+        jacobian = np.asarray(jacobian)
+        if jacobian.ndim == 1:
+            composed = composed * jacobian
+        elif composed.ndim == 1:
+            composed = composed[:, np.newaxis] * jacobian
+        else:
+            composed = composed @ jacobian
+    return composed
@@ -0,0 +1,91 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import logging
+
+from energy_models.glossaryenergy import GlossaryEnergy
+
+# parameters read by the generic techno computation, they must be in every techno_infos_dict
+REQUIRED_TECHNO_INFOS = ('lifetime', 'Opex_percentage', 'efficiency')
+DEFAULT_CONSTRUCTION_DELAY = 3
+DEFAULT_FULL_LOAD_HOURS = 8760.0
+
+logger = logging.getLogger(__name__)
+
+
+class TechnoParameters:
+    """
+    Generic parameters of a techno compiled from its techno_infos_dict at configure time
+    Optional parameters are resolved to their default value (None if the feature is not used), units are normalized
+    and derived constants are precomputed so that the compute methods only read attributes
+    """
+    __slots__ = ('construction_delay', 'lifetime', 'full_load_hours', 'opex_percentage', 'decommissioning_percentage',
+                 'nb_years_amort_capex', 'capital_recovery_factor', 'efficiency', 'co2_from_production')
+
+    def __init__(self, construction_delay, lifetime, full_load_hours, opex_percentage, decommissioning_percentage,
+                 nb_years_amort_capex, capital_recovery_factor, efficiency, co2_from_production):
+        self.construction_delay = construction_delay
+        self.lifetime = lifetime
+        self.full_load_hours = full_load_hours
+        self.opex_percentage = opex_percentage
+        # None if there is no decommissioning cost
+        self.decommissioning_percentage = decommissioning_percentage
+        # None if the factory cost is not amortized
+        self.nb_years_amort_capex = nb_years_amort_capex
+        self.capital_recovery_factor = capital_recovery_factor
+        # efficiency for each year of study
+        self.efficiency = efficiency
+        # scope 1 CO2 emissions in kg/kWh, None if computed with the theoretical CO2 production
+        self.co2_from_production = co2_from_production
+
+
+def check_techno_infos_dict(techno_name, techno_infos_dict):
+    """
+    Raise if a parameter needed by the generic techno computation is missing in the techno_infos_dict
+    """
+    missing_infos = [info for info in REQUIRED_TECHNO_INFOS if info not in techno_infos_dict]
+    if missing_infos:
+        raise Exception(f'The techno_infos_dict of {techno_name} misses the parameters {missing_infos}')
+
+
+def get_construction_delay(techno_name, techno_infos_dict):
+    """
+    Construction delay of the techno, the default one is used if not set in the techno_infos_dict
+    """
+    if GlossaryEnergy.ConstructionDelay in techno_infos_dict:
+        return techno_infos_dict[GlossaryEnergy.ConstructionDelay]
+    # the parameters are compiled at each configure, the default is only traced at debug level
+    logger.debug(
+        f'The construction_delay data is not set for {techno_name} : default = {DEFAULT_CONSTRUCTION_DELAY} years')
+    return DEFAULT_CONSTRUCTION_DELAY
+
+
+def compute_co2_from_production(techno_name, techno_infos_dict, data_energy_dict):
+    """
+    Scope 1 CO2 emissions of the techno in kg/kWh from the CO2_from_production of the techno_infos_dict,
+    None if not set (the theoretical CO2 production of the techno is then used)
+    """
+    if 'CO2_from_production' not in techno_infos_dict:
+        return None
+    co2_from_production = techno_infos_dict['CO2_from_production']
+    if co2_from_production == 0.0:
+        return 0.0
+    co2_from_production_unit = techno_infos_dict.get('CO2_from_production_unit')
+    if co2_from_production_unit == 'kg/kg':
+        return co2_from_production / data_energy_dict['high_calorific_value']
+    if co2_from_production_unit == 'kg/kWh':
+        return co2_from_production
+    raise Exception(
+        f'The CO2_from_production_unit {co2_from_production_unit} of {techno_name} is not handled (kg/kg or kg/kWh)')
@@ -23,14 +23,30 @@ import pandas as pd
 
 from climateeconomics.core.core_resources.resource_mix.resource_mix import ResourceMixModel
 from energy_models.core.energy_mix.energy_mix import EnergyMix
+from energy_models.core.exp_min import compute_exp_min
+from energy_models.core.techno_type.aging_distribution import build_age_distrib_prod_df, \
+    compute_delayed_prod_from_invest, compute_initial_production_by_age, compute_new_production_by_age
+from energy_models.core.techno_type.compute_cache import ComputeCache, compute_digest
+from energy_models.core.techno_type.learning_curve import compute_capex_learning_curve, \
+    compute_dcapex_learning_curve_dinvest
+from energy_models.core.techno_type.output_scaling import rescale_columns
+from energy_models.core.techno_type.techno_parameters import DEFAULT_FULL_LOAD_HOURS, TechnoParameters, \
+    check_techno_infos_dict, compute_co2_from_production, get_construction_delay
+from energy_models.core.techno_type.techno_jacobian import compose_jacobians, compute_dprod_dcapex_partial, \
+    compute_dprod_dinvest_partial
 from energy_models.glossaryenergy import GlossaryEnergy
-from sostrades_core.tools.base_functions.exp_min import compute_dfunc_with_exp_min, compute_func_with_exp_min
 from sostrades_core.tools.cst_manager.func_manager_common import cons_smooth_maximum_vect, \
     get_dcons_smooth_dvariable_vect
 from sostrades_core.tools.cst_manager.func_manager_common import smooth_maximum_vect, get_dsmooth_dvariable_vect
 from sostrades_core.tools.cst_manager.func_manager_common import soft_maximum_vect, get_dsoft_maximum_vect
 
 
+# methods of the price stage, a techno overriding one of them has its own price dependency to the scenario inputs
+TECHNO_PRICE_STAGES = ('compute_price', 'compute_other_primary_energy_costs', 'compute_specifif_costs_of_technos',
+                       'compute_cost_of_resources_usage', 'compute_cost_of_other_energies_usage',
+                       'compute_sum_all_costs', 'compute_co2_tax')
+
+
 class TechnoType:
     """
     Class for energy production technology type
@@ -87,6 +103,12 @@ class TechnoType:
         self.initial_production = None
         self.age_distrib_prod_df = None
         self.initial_age_distrib = None
+        self.new_prod_ages = None
+        self.new_prod_by_age = None
+        self.initial_prod_ages = None
+        self.initial_prod_by_age = None
+        self.age_x_prod_by_year = None
+        self.aging_distribution_key = None
 
         self.resources_price = None
         self.resources_CO2_emissions = None
@@ -96,6 +118,7 @@ class TechnoType:
         self.mass_unit = 'Mt'
         self.capital_recovery_factor = None
         self.nb_years_amort_capex = 10
+        self.techno_parameters = None
         self.scaling_factor_invest_level = None
         self.scaling_factor_techno_production = None
         self.scaling_factor_techno_consumption = None
@@ -110,6 +133,7 @@ class TechnoType:
         self.techno_capital = None
         self.applied_ratio = None
         self.installed_power = None
+        self.prod_from_invest = None
         self.utilisation_ratio = None
 
         self.production_woratio = None
@@ -117,6 +141,11 @@ class TechnoType:
         self.land_use_woratio = None
         self.construction_resource_list = ['copper_resource']
 
+        # invest driven stages are only recomputed when their specific inputs change
+        # (during an MDA most iterations only change prices and CO2 taxes)
+        self.learning_curve_cache = ComputeCache()
+        self.aging_distribution_cache = ComputeCache()
+
     def init_dataframes(self):
         """Init dataframes with years"""
         self.years = np.arange(self.year_start, self.year_end + 1)
@@ -164,6 +193,7 @@ class TechnoType:
                                     self.scaling_factor_invest_level
 
         self.configure_energy_data(inputs_dict)
+        self.compile_techno_parameters()
 
         self.configure_transport_data(
             inputs_dict[GlossaryEnergy.TransportCostValue], inputs_dict[GlossaryEnergy.TransportMarginValue])
@@ -224,6 +254,25 @@ class TechnoType:
         self.utilisation_ratio = inputs_dict[GlossaryEnergy.UtilisationRatioValue][
             GlossaryEnergy.UtilisationRatioValue].values
         self.techno_infos_dict = inputs_dict['techno_infos_dict']
+        self.compile_techno_parameters()
+
+    def compile_techno_parameters(self):
+        '''
+        Validate the techno_infos_dict and compile it into the techno parameters record read by the compute methods
+        Energy data must be configured beforehand to normalize the CO2 emissions units
+        '''
+        check_techno_infos_dict(self.name, self.techno_infos_dict)
+        self.techno_parameters = TechnoParameters(
+            construction_delay=get_construction_delay(self.name, self.techno_infos_dict),
+            lifetime=self.techno_infos_dict['lifetime'],
+            full_load_hours=self.techno_infos_dict.get('full_load_hours', DEFAULT_FULL_LOAD_HOURS),
+            opex_percentage=self.techno_infos_dict['Opex_percentage'],
+            decommissioning_percentage=self.techno_infos_dict.get('decommissioning_percentage'),
+            nb_years_amort_capex=self.techno_infos_dict.get('nb_years_amort_capex'),
+            capital_recovery_factor=self.compute_capital_recovery_factor(self.techno_infos_dict),
+            efficiency=self.compute_efficiency_evolution(),
+            co2_from_production=compute_co2_from_production(self.name, self.techno_infos_dict,
+                                                            self.data_energy_dict))
 
     def configure_energy_data(self, inputs_dict):
         '''
@@ -321,22 +370,14 @@ class TechnoType:
         # assumption that a linear correlation is at work (ratio on prod == ratio on col)
         # there may be special cases that need to be handled differently
         # (quadratic correlation or other)
-        for col in self.production_detailed.columns:
-            if col != GlossaryEnergy.Years:
-                self.production_detailed[col] = self.production_detailed[col].values * \
-                                                ratio_values
-        for col in self.consumption_detailed.columns:
-            if col not in [GlossaryEnergy.Years] + [f'{resource} (Mt)' for resource in self.construction_resource_list]:
-                self.consumption_detailed[col] = self.consumption_detailed[col].values * \
-                                                 ratio_values
-            elif col in [f'{resource} (Mt)' for resource in self.construction_resource_list]:
-                ratio_construction_values = 1
-                self.consumption_detailed[col] = self.consumption_detailed[col].values * \
-                                                 ratio_construction_values
-        for col in self.land_use.columns:
-            if col != GlossaryEnergy.Years:
-                self.land_use[col] = self.land_use[col].values * \
-                                     ratio_values
+        # construction resources are not limited by the ratio
+        construction_columns = [f'{resource} (Mt)' for resource in self.construction_resource_list]
+        self.production_detailed = rescale_columns(self.production_detailed, multiplier=ratio_values)
+        self.consumption_detailed = rescale_columns(
+            self.consumption_detailed, multiplier=ratio_values,
+            columns=[col for col in self.consumption_detailed.columns
+                     if col not in [GlossaryEnergy.Years] + construction_columns])
+        self.land_use = rescale_columns(self.land_use, multiplier=ratio_values)
         # Pass this dataframe as model variable
         self.applied_ratio = pd.DataFrame({GlossaryEnergy.Years: self.years,
                                            'min_ratio_name': min_ratio_name,
@@ -402,13 +443,13 @@ class TechnoType:
                                               <= self.cost_details[GlossaryEnergy.Years].max()][
             GlossaryEnergy.InvestValue].values
         # Maximize with smooth exponential
-        self.cost_details[GlossaryEnergy.InvestValue] = compute_func_with_exp_min(
+        self.cost_details[GlossaryEnergy.InvestValue], _ = compute_exp_min(
             invest_inputs, self.min_value_invest)
 
         self.cost_details[f'Capex_{self.name}'] = self.compute_capex(
             self.cost_details[GlossaryEnergy.InvestValue].values, self.techno_infos_dict)
 
-        self.capital_recovery_factor = self.compute_capital_recovery_factor(self.techno_infos_dict)
+        self.capital_recovery_factor = self.techno_parameters.capital_recovery_factor
 
         self.compute_efficiency()
 
@@ -422,12 +463,11 @@ class TechnoType:
         # self.cost_details[GlossaryEnergy.CO2TaxesValue] = self.cost_details[f'Capex_{self.name}'] * self.crf
 
         self.cost_details[f'{self.name}_factory'] = self.cost_details[f'Capex_{self.name}'] * \
-                                                    (self.capital_recovery_factor + self.techno_infos_dict['Opex_percentage'])
+                                                    (self.capital_recovery_factor + self.techno_parameters.opex_percentage)
 
-        if 'decommissioning_percentage' in self.techno_infos_dict:
+        if self.techno_parameters.decommissioning_percentage is not None:
             self.cost_details[f'{self.name}_factory_decommissioning'] = self.cost_details[f'Capex_{self.name}'] * \
-                                                                        self.techno_infos_dict[
-                                                                            'decommissioning_percentage']
+                                                                        self.techno_parameters.decommissioning_percentage
             self.cost_details[f'{self.name}_factory'] += self.cost_details[f'{self.name}_factory_decommissioning']
 
         # Compute and add transport
@@ -450,8 +490,8 @@ class TechnoType:
         self.compute_carbon_emissions()
         self.compute_co2_tax()
 
-        if 'nb_years_amort_capex' in self.techno_infos_dict:
-            self.nb_years_amort_capex = self.techno_infos_dict['nb_years_amort_capex']
+        if self.techno_parameters.nb_years_amort_capex is not None:
+            self.nb_years_amort_capex = self.techno_parameters.nb_years_amort_capex
 
             # pylint: disable=no-member
             len_y = max(self.cost_details[GlossaryEnergy.Years]) + \
@@ -484,7 +524,7 @@ class TechnoType:
 
         # Running OPEX in ($/MWh)
         self.cost_details['OPEX_Part'] = self.cost_details[f'Capex_{self.name}'] * \
-                                         (self.techno_infos_dict['Opex_percentage']) + \
+                                         (self.techno_parameters.opex_percentage) + \
                                          self.cost_details['transport'] + self.cost_details['energy_costs']
         # CO2 Tax in ($/MWh)
         self.cost_details['CO2Tax_Part'] = self.cost_details[self.name] - \
@@ -543,179 +583,70 @@ class TechnoType:
         Compute Capital expenditures (immobilisations)
         depending on the demand on the technology
         """
-        expo_factor = self.compute_expo_factor(data_config)
         capex_init = self.check_capex_unity(data_config)
-        if expo_factor != 0.0:
-            capacity_factor_list = None
-            if 'capacity_factor_at_year_end' in data_config \
-                    and 'capacity_factor' in data_config:
-                capacity_factor_list = np.linspace(data_config['capacity_factor'],
-                                                   data_config['capacity_factor_at_year_end'],
-                                                   len(invest_list))
-
-            capex_calc_list = []
-            invest_sum = self.initial_production * capex_init
-            capex_year = capex_init
-
-            for i, invest in enumerate(invest_list):
-
-                # below 1M$ investments has no influence on learning rate for capex
-                # decrease
-                if invest_sum.real < 10.0 or i == 0.0:
-                    capex_year = capex_init
-                    # first capex calculation
-                else:
-                    np.seterr('raise')
-                    if capacity_factor_list is not None:
-                        try:
-                            ratio_invest = ((invest_sum + invest) / invest_sum *
-                                            (capacity_factor_list[i] / data_config['capacity_factor'])) \
-                                           ** (-expo_factor)
-
-                        except:
-                            raise Exception(
-                                f'invest is {invest} and invest sum {invest_sum} on techno {self.name}')
-
-                    else:
-                        np.seterr('raise')
-                        try:
-                            # try to calculate capex_year "normally"
-                            ratio_invest = ((invest_sum + invest) /
-                                            invest_sum) ** (-expo_factor)
-
-                            pass
-
-                        except FloatingPointError:
-                            # set invest as a complex to calculate capex_year as a
-                            # complex
-                            ratio_invest = ((invest_sum + np.complex128(invest)) /
-                                            invest_sum) ** (-expo_factor)
-
-                            pass
-                        np.seterr('warn')
-
-                    # Check that the ratio is always above 0.95 but no strict threshold for
-                    # optim is equal to 0.92 when tends to zero:
-                    if ratio_invest.real < 0.95:
-                        ratio_invest = 0.9 + \
-                                       0.05 * np.exp(ratio_invest - 0.9)
-                    capex_year = capex_year * ratio_invest
-
-                capex_calc_list.append(capex_year)
-                invest_sum += invest
-
-            if 'maximum_learning_capex_ratio' in data_config:
-                maximum_learning_capex_ratio = data_config['maximum_learning_capex_ratio']
-            else:
-                # if maximum learning_capex_ratio is not specified, the learning
-                # rate on capex ratio cannot decrease the initial capex mor ethan
-                # 10%
-                maximum_learning_capex_ratio = 0.9
 
-            capex_calc_list = capex_init * (maximum_learning_capex_ratio + (
-                    1.0 - maximum_learning_capex_ratio) * np.array(capex_calc_list) / capex_init)
+        return self.compute_capex_with_learning_curve(invest_list, data_config, capex_init)
+
+    def compute_capex_with_learning_curve(self, invest_list, data_config, capex_init):
+        """
+        Apply the learning curve on capex_init for the given investments
+        Investments may be a (scenarios x years) array, see compute_scenarios
+        """
+        expo_factor = self.compute_expo_factor(data_config)
+        if expo_factor != 0.0:
+            maximum_learning_capex_ratio = self.get_maximum_learning_capex_ratio(data_config)
+            capacity_factor_ratio = self.get_capacity_factor_ratio(data_config, np.shape(invest_list)[-1])
+            key = compute_digest(invest_list, capex_init, self.initial_production, expo_factor,
+                                 maximum_learning_capex_ratio, capacity_factor_ratio)
+            capex_calc_list = self.learning_curve_cache.get_or_compute(
+                key, lambda: compute_capex_learning_curve(
+                    invest_list, capex_init, self.initial_production * capex_init, expo_factor,
+                    maximum_learning_capex_ratio=maximum_learning_capex_ratio,
+                    capacity_factor_ratio=capacity_factor_ratio))
         else:
-            capex_calc_list = capex_init * np.ones(len(invest_list))
+            capex_calc_list = capex_init * np.ones(np.shape(invest_list))
 
         return capex_calc_list.tolist()
 
     def compute_dcapex_dinvest(self, invest_list, data_config):
         """
-        Compute Capital expenditures (immobilisations)
-        depending on the demand on the technology
+        Compute the gradient of Capital expenditures (immobilisations)
+        wrt investments
         """
-        progress_ratio = 1.0 - data_config['learning_rate']
-
-        capacity_factor_list = None
-        if 'capacity_factor_at_year_end' in data_config \
-                and 'capacity_factor' in data_config:
-            capacity_factor_list = np.linspace(data_config['capacity_factor'],
-                                               data_config['capacity_factor_at_year_end'],
-                                               len(invest_list))
-
-        expo_factor = -np.log(progress_ratio) / np.log(2.0)
-
+        expo_factor = self.compute_expo_factor(data_config)
         capex_init = self.check_capex_unity(data_config)
 
-        invest_sum = self.initial_production * capex_init
-        dcapex_year_dinvest_list = []
-        capex_year = capex_init
-
-        if 'complex128' in [invest_list.dtype]:
-            arr_type = 'complex128'
-        else:
-            arr_type = 'float64'
-        dcapex_calc_list_dinvest_list = np.zeros(
-            (len(invest_list), len(invest_list)), dtype=arr_type)
+        invest_list_2, dinvest_func = compute_exp_min(invest_list, self.min_value_invest)
 
-        invest_list_2 = compute_func_with_exp_min(
-            invest_list, self.min_value_invest)
-        dinvest_func = compute_dfunc_with_exp_min(
-            invest_list, self.min_value_invest)
+        dcapex_calc_list_dinvest_list = compute_dcapex_learning_curve_dinvest(
+            invest_list_2, capex_init, self.initial_production * capex_init, expo_factor,
+            maximum_learning_capex_ratio=self.get_maximum_learning_capex_ratio(data_config),
+            capacity_factor_ratio=self.get_capacity_factor_ratio(data_config, len(invest_list)))
 
-        for i, invest in enumerate(invest_list_2):
-
-            # first capex calculation
-            if invest_sum.real < 10.0 or i == 0.0:
-                capex_year = capex_init
-                dcapex_year_dinvest_list = np.zeros(i + 1)
-            else:
-                if capacity_factor_list is not None:
-                    ratio_capa = (
-                            capacity_factor_list[i] / data_config['capacity_factor'])
-                    ratio_invest = ((invest_sum + invest) / invest_sum *
-                                    ratio_capa) \
-                                   ** (-expo_factor)
-                else:
-
-                    ratio_invest = ((invest_sum + invest) /
-                                    invest_sum) ** (-expo_factor)
-
-                #                     # capexi = capex_i-1 * ratio
-                # dcapexi = dcapex_i-1*ratio + dratio*capex
-
-                dratio_invest_i_dinvest_i = -expo_factor * \
-                                            ratio_invest / (invest_sum + invest)
-                # dratioinvesti wrt invest i minus one
-                dratio_invest_i_dinvest_i_m1 = expo_factor * invest * \
-                                               ratio_invest / \
-                                               (invest_sum * (invest_sum + invest))
-
-                if ratio_invest.real < 0.95:
-                    dratio_invest_i_dinvest_i = 0.05 * \
-                                                np.exp(ratio_invest - 0.9) * dratio_invest_i_dinvest_i
-
-                    dratio_invest_i_dinvest_i_m1 = 0.05 * \
-                                                   np.exp(ratio_invest - 0.9) * \
-                                                   dratio_invest_i_dinvest_i_m1
-
-                    ratio_invest = 0.9 + 0.05 * np.exp(ratio_invest - 0.9)
-
-                capex_i_m1 = capex_year
-                dcapex_i_dinvest_i = capex_i_m1 * dratio_invest_i_dinvest_i
-
-                dcapex_i_dinvest_i_m1 = [dcapex_i_dinvest_i_old * ratio_invest +
-                                         capex_i_m1 * dratio_invest_i_dinvest_i_m1 for dcapex_i_dinvest_i_old
-                                         in dcapex_year_dinvest_list]
-
-                dcapex_year_dinvest_list = np.append(
-                    dcapex_i_dinvest_i_m1, [dcapex_i_dinvest_i])
-
-                dcapex_calc_list_dinvest_list[i,
-                :i + 1] = dcapex_year_dinvest_list
-
-                capex_year = capex_year * ratio_invest
-            #
-            invest_sum += invest
+        # Multiplication line by column and not line by line
+        return dcapex_calc_list_dinvest_list * dinvest_func
 
+    @staticmethod
+    def get_maximum_learning_capex_ratio(data_config):
+        """
+        If maximum learning_capex_ratio is not specified, the learning
+        rate on capex ratio cannot decrease the initial capex more than 10%
+        """
         if 'maximum_learning_capex_ratio' in data_config:
-            maximum_learning_capex_ratio = data_config['maximum_learning_capex_ratio']
-        else:
-            maximum_learning_capex_ratio = 0.9
-        # Reshape the gradient to get a multiplication line by column and not
-        # line by line
-        return (1.0 - maximum_learning_capex_ratio) * dcapex_calc_list_dinvest_list * dinvest_func.reshape(
-            len(invest_list))
+            return data_config['maximum_learning_capex_ratio']
+        return 0.9
+
+    @staticmethod
+    def get_capacity_factor_ratio(data_config, nb_years):
+        """
+        Linear evolution of the capacity factor relative to its initial value, None if not evolving
+        """
+        if 'capacity_factor_at_year_end' in data_config \
+                and 'capacity_factor' in data_config:
+            return np.linspace(data_config['capacity_factor'],
+                               data_config['capacity_factor_at_year_end'],
+                               nb_years) / data_config['capacity_factor']
+        return None
 
     def grad_price_vs_energy_price(self):
 
@@ -934,6 +865,12 @@ class TechnoType:
         return fuel_need
 
     def compute_efficiency(self):
+        # Efficiency evolving in time or not, compiled with the techno parameters
+        efficiency = self.techno_parameters.efficiency
+        self.cost_details['efficiency'] = efficiency
+        return efficiency
+
+    def compute_efficiency_evolution(self):
         # Compute efficiency evolving in time or not
         if 'techno_evo_time' in self.techno_infos_dict and self.techno_infos_dict['techno_evo_eff'] == 'yes':
             middle_evolution_year = self.techno_infos_dict['techno_evo_time']
@@ -953,7 +890,6 @@ class TechnoType:
         else:
             efficiency = self.techno_infos_dict['efficiency'] * np.ones_like(self.years)
 
-        self.cost_details['efficiency'] = efficiency
         return efficiency
 
     def sigmoid_function(self, x, eff_max, eff_ini, l, slope):
@@ -1003,17 +939,11 @@ class TechnoType:
         self.carbon_intensity[self.name] = self.carbon_intensity['production'] + self.carbon_intensity['Scope 2']
 
     def compute_scope_1_emissions(self):
-        if 'CO2_from_production' not in self.techno_infos_dict:
+        if self.techno_parameters.co2_from_production is None:
             self.carbon_intensity['production'] = self.get_theoretical_co2_prod(
                 unit='kg/kWh')
-        elif self.techno_infos_dict['CO2_from_production'] == 0.0:
-            self.carbon_intensity['production'] = 0.0
         else:
-            if self.techno_infos_dict['CO2_from_production_unit'] == 'kg/kg':
-                self.carbon_intensity['production'] = self.techno_infos_dict['CO2_from_production'] / \
-                                                      self.data_energy_dict['high_calorific_value']
-            elif self.techno_infos_dict['CO2_from_production_unit'] == 'kg/kWh':
-                self.carbon_intensity['production'] = self.techno_infos_dict['CO2_from_production']
+            self.carbon_intensity['production'] = self.techno_parameters.co2_from_production
 
     def compute_scope_2_emissions(self):
         """Computes the Scope 2 CO2 emissions : due to resources and energies usage"""
@@ -1072,53 +1002,31 @@ class TechnoType:
         # Finally compute the production by summing all aged production for
         # each year
 
-        age_distrib_prod_sum = self.age_distrib_prod_df.groupby([GlossaryEnergy.Years], as_index=False).agg(
-            {f'distrib_prod ({self.product_energy_unit})': 'sum'}
-        )
         if f'{self.energy_name} ({self.product_energy_unit})' in self.production_detailed:
             del self.production_detailed[f'{self.energy_name} ({self.product_energy_unit})']
 
-        self.production_detailed = pd.merge(self.production_detailed, age_distrib_prod_sum, how='left',
-                                            on=GlossaryEnergy.Years).rename(
-            columns={
-                f'distrib_prod ({self.product_energy_unit})': f'{self.energy_name} ({self.product_energy_unit})'}).fillna(
-            0.0)
+        self.production_detailed[f'{self.energy_name} ({self.product_energy_unit})'] = \
+            self.new_prod_by_age.sum(axis=1) + self.initial_prod_by_age.sum(axis=1)
 
     def compute_primary_installed_power(self):
-
-        if GlossaryEnergy.ConstructionDelay in self.techno_infos_dict:
-            construction_delay = self.techno_infos_dict[GlossaryEnergy.ConstructionDelay]
-        else:
-            print(
-                f'The construction_delay data is not set for {self.name} : default = 3 years  ')
-            construction_delay = 3
-
-        if 'full_load_hours' in self.techno_infos_dict:
-            full_load_hours = self.techno_infos_dict['full_load_hours']
-        else:
-            # print(
-            #     f'The full_load_hours data is not set for {self.name} : default = 8760.0 hours, full year hours  ')
-            full_load_hours = 8760.0
-
-        production_from_invest = self.compute_prod_from_invest(
-            construction_delay=construction_delay)
+        '''
+        Compute the installed, new and removed power (MW) from the production from investments
+        computed by the aging distribution step
+        '''
+        full_load_hours = self.techno_parameters.full_load_hours
 
         # Conversion from TWh to MW
-        self.installed_power['new_power_production'] = production_from_invest.loc[production_from_invest[
-                                                                                      GlossaryEnergy.Years] == self.years, 'prod_from_invest'].values / full_load_hours * 1000
-        self.installed_power['total_installed_power'] = self.production_detailed[
-                                                            f'{self.energy_name} ({self.product_energy_unit})'] / full_load_hours * 1000
-        self.installed_power['removed_power_production'] = np.zeros(len(self.years))
-
-        power_production_dict = self.installed_power.to_dict()
-
-        for year in self.years[1:]:
-            power_production_dict['removed_power_production'][year - power_production_dict[GlossaryEnergy.Years][0]] = \
-                power_production_dict['total_installed_power'][
-                    year - 1 - power_production_dict[GlossaryEnergy.Years][0]] \
-                - power_production_dict['total_installed_power'][year - power_production_dict[GlossaryEnergy.Years][0]] \
-                + power_production_dict['new_power_production'][year - power_production_dict[GlossaryEnergy.Years][0]]
-        self.installed_power = pd.DataFrame.from_dict(power_production_dict)
+        new_power_production = self.prod_from_invest / full_load_hours * 1000
+        total_installed_power = self.production_detailed[
+                                    f'{self.energy_name} ({self.product_energy_unit})'].values / full_load_hours * 1000
+        # the power removed a year is what was installed the year before and is not anymore in spite of new power
+        removed_power_production = np.zeros_like(total_installed_power)
+        removed_power_production[1:] = total_installed_power[:-1] - total_installed_power[1:] + \
+                                       new_power_production[1:]
+
+        self.installed_power['new_power_production'] = new_power_production
+        self.installed_power['total_installed_power'] = total_installed_power
+        self.installed_power['removed_power_production'] = removed_power_production
 
     def compute_dprod_dinvest(self, capex_list, invest_list, invest_before_year_start, techno_dict,
                               dcapex_list_dinvest_list):
@@ -1128,54 +1036,22 @@ class TechnoType:
         with dcapexdinvest already computed for detailed prices
         '''
         nb_years = len(capex_list)
+        invest_list = invest_list[:nb_years]
+        _, dinvest_exp_min = compute_exp_min(invest_list, self.min_value_invest)
 
-        if 'complex128' in [capex_list.dtype, invest_list.dtype, invest_before_year_start.dtype,
-                            dcapex_list_dinvest_list.dtype]:
-            arr_type = 'complex128'
-        else:
-            arr_type = 'float64'
-        dprod_list_dinvest_list = np.zeros(
-            (nb_years, nb_years), dtype=arr_type)
-        # We fill this jacobian column by column because it is the same element
-        # in the entire column
-        for i in range(nb_years):
-            dpprod_dpinvest = compute_dfunc_with_exp_min(np.array([invest_list[i]]), self.min_value_invest)[0][0] / \
-                              capex_list[i]
-            len_non_zeros = min(max(0, nb_years -
-                                    techno_dict[GlossaryEnergy.ConstructionDelay] - i),
-                                techno_dict['lifetime'])
-            first_len_zeros = min(
-                i + techno_dict[GlossaryEnergy.ConstructionDelay], nb_years)
-            last_len_zeros = max(0, nb_years -
-                                 len_non_zeros - first_len_zeros)
-            # For prod in each column there is lifetime times the same value which is dpprod_dpinvest
-            # This value is delayed in time (means delayed in lines for
-            # jacobian by construction _delay)
-            # Each column is then composed of [0,0,0... (dp/dx,dp/dx)*lifetime,
-            # 0,0,0]
-            is_invest_negative = max(
-                np.sign(invest_list[i] + np.finfo(float).eps), 0.0)
-            dprod_list_dinvest_list[:, i] = np.hstack((np.zeros(first_len_zeros),
-                                                       np.ones(
-                                                           len_non_zeros) * dpprod_dpinvest * is_invest_negative,
-                                                       np.zeros(last_len_zeros)))
+        # For prod in each column there is lifetime times the same value which is dpprod_dpinvest
+        # This value is delayed in time (means delayed in lines for
+        # jacobian by construction _delay)
+        dprod_list_dinvest_list = compute_dprod_dinvest_partial(
+            capex_list, invest_list, dinvest_exp_min,
+            techno_dict[GlossaryEnergy.ConstructionDelay], techno_dict['lifetime'])
 
         dprod_list_dcapex_list = self.compute_dprod_dcapex(
             capex_list, invest_list, techno_dict, invest_before_year_start)
 
-        dinvest_exp_min = compute_dfunc_with_exp_min(
-            invest_list, self.min_value_invest)
-
-        dcapex_list_dinvest_list_withexp = dcapex_list_dinvest_list * dinvest_exp_min
-        dprod_dinvest = np.zeros(
-            (nb_years, nb_years), dtype=arr_type)
         # dprod_dinvest= dpprod_dpinvest + dprod_dcapex*dcapex_dinvest
-        for line in range(nb_years):
-            for column in range(nb_years):
-                dprod_dinvest[line, column] = dprod_list_dinvest_list[line, column] + \
-                                              np.matmul(
-                                                  dprod_list_dcapex_list[line, :],
-                                                  dcapex_list_dinvest_list_withexp[:, column])
+        dprod_dinvest = dprod_list_dinvest_list + \
+                        dprod_list_dcapex_list @ (dcapex_list_dinvest_list * dinvest_exp_min[:, np.newaxis])
 
         self.dprod_dinvest = dprod_dinvest
 
@@ -1186,67 +1062,53 @@ class TechnoType:
         Compute the derivative of production over capex 
         '''
         nb_years = len(capex_list)
-        dprod_list_dcapex_list = np.zeros(
-            (nb_years, nb_years))
-        if 'complex128' in [capex_list.dtype, invest_list.dtype, invest_before_year_start.dtype]:
-            dprod_list_dcapex_list = np.zeros(
-                (nb_years, nb_years), dtype='complex128')
-        for i in range(nb_years):
-            len_non_zeros = min(max(0, nb_years -
-                                    techno_dict[GlossaryEnergy.ConstructionDelay] - i),
-                                techno_dict['lifetime'])
-            first_len_zeros = min(
-                i + techno_dict[GlossaryEnergy.ConstructionDelay], nb_years)
-            last_len_zeros = max(0, nb_years -
-                                 len_non_zeros - first_len_zeros)
-            # Same for capex
-            dpprod_dpcapex = - invest_list[i] / capex_list[i] ** 2
-
-            dprod_list_dcapex_list[:, i] = np.hstack((np.zeros(first_len_zeros),
-                                                      np.ones(
-                                                          len_non_zeros) * dpprod_dpcapex,
-                                                      np.zeros(last_len_zeros)))
         # but the capex[0] is used for invest before
-        # year_start then we need to add it to the first column
-        dpprod_dpcapex0_list = [- invest / capex_list[0]
-                                ** 2 for invest in invest_before_year_start]
-
-        for index, dpprod_dpcapex0 in enumerate(dpprod_dpcapex0_list):
-            len_non_zeros = min(
-                techno_dict['lifetime'], nb_years - index)
-            dprod_list_dcapex_list[:, 0] += np.hstack((np.zeros(index),
-                                                       np.ones(
-                                                           len_non_zeros) * dpprod_dpcapex0,
-                                                       np.zeros(nb_years - index - len_non_zeros)))
+        # year_start then it is added to the first column
+        dprod_list_dcapex_list = compute_dprod_dcapex_partial(
+            capex_list, invest_list[:nb_years], invest_before_year_start,
+            techno_dict[GlossaryEnergy.ConstructionDelay], techno_dict['lifetime'])
 
         self.dprod_list_dcapex_list = dprod_list_dcapex_list
 
         return dprod_list_dcapex_list
 
+    def compute_dprod_dcapex_parameter(self, capex_list, invest_list, invest_before_year_start, techno_dict,
+                                       dcapex_dparameter):
+        '''
+        Compute the derivative of production over a parameter of the capex (flue gas ratio, syngas ratio...)
+        dprod_dparameter = dprod_dcapex @ dcapex_dparameter
+        '''
+        dprod_dcapex = self.compute_dprod_dcapex(
+            capex_list, invest_list, techno_dict, invest_before_year_start)
+
+        return compose_jacobians(dprod_dcapex, dcapex_dparameter)
+
     def compute_dpower_dinvest(self, capex_list, invest_list, techno_dict, dcapex_dinvest,
                                scaling_factor_techno_consumption):
         nb_years = len(capex_list)
-        dpower_list_dinvest_list = np.zeros(
-            (nb_years, nb_years))
-
         delay = techno_dict[GlossaryEnergy.ConstructionDelay]
-        # power = cste * invest / capex ie dpower_d_invest = cste * (Id/capex - invest * dcapex_dinvest / capex**2)
-        for i in range(delay, nb_years):
-            if capex_list[i - delay] != 0:
-                if 'full_load_hours' not in self.techno_infos_dict:
-                    full_load_hours = 8760
-                else:
-                    full_load_hours = self.techno_infos_dict['full_load_hours']
-                # cste * Id / capex
-                dpower_list_dinvest_list[i, i - delay] += 1000 / full_load_hours / capex_list[
-                    i - delay] * scaling_factor_techno_consumption
-                # cste * invest * dcapex_dinvest / capex ** 2
-                dpower_list_dinvest_list[i, :] -= 1000 / full_load_hours * invest_list[i - delay] * \
-                                                  dcapex_dinvest[i - delay, :] / capex_list[
-                                                      i - delay] ** 2 * scaling_factor_techno_consumption
-        self.dpower_list_dinvest_list = np.multiply(dpower_list_dinvest_list,
-                                                    compute_dfunc_with_exp_min(np.array(invest_list),
-                                                                               self.min_value_invest).T)
+        full_load_hours = self.techno_parameters.full_load_hours
+        invest_list = np.asarray(invest_list)[:nb_years]
+
+        dpower_list_dinvest_list = np.zeros(
+            (nb_years, nb_years), dtype=np.result_type(capex_list, invest_list, dcapex_dinvest))
+        if delay < nb_years:
+            # power = cste * invest / capex ie dpower_d_invest = cste * (Id/capex - invest * dcapex_dinvest / capex**2)
+            capex_delayed = capex_list[:nb_years - delay]
+            is_capex_non_zero = capex_delayed != 0
+            safe_capex_delayed = np.where(is_capex_non_zero, capex_delayed, 1.0)
+            cste = 1000 / full_load_hours * scaling_factor_techno_consumption
+            lines = np.arange(delay, nb_years)
+            # cste * Id / capex
+            dpower_list_dinvest_list[lines, lines - delay] += np.where(
+                is_capex_non_zero, cste / safe_capex_delayed, 0.0)
+            # cste * invest * dcapex_dinvest / capex ** 2
+            dpower_list_dinvest_list[lines, :] -= np.where(
+                is_capex_non_zero, cste * invest_list[:nb_years - delay] / safe_capex_delayed ** 2, 0.0)[:, np.newaxis] * \
+                                                  dcapex_dinvest[:nb_years - delay, :]
+
+        _, dinvest_exp_min = compute_exp_min(invest_list, self.min_value_invest)
+        self.dpower_list_dinvest_list = np.multiply(dpower_list_dinvest_list, dinvest_exp_min)
 
         return self.dpower_list_dinvest_list
 
@@ -1313,69 +1175,55 @@ class TechnoType:
         Compute the aging distribution production of primary energy for years of study
         Start with the initial distribution and add a year on the age each year 
         Add also the yearly production regarding the investment
-        All productions older than the lifetime are removed from the dataframe  
+        All productions older than the lifetime are removed from the distribution
+        The distribution is stored as (years x age) matrices, the dataframe is built on demand
+        with get_age_distrib_prod_df
+        '''
+        construction_delay = self.techno_parameters.construction_delay
+        lifetime = self.techno_parameters.lifetime
+        key = compute_digest(self.years, self.cost_details[GlossaryEnergy.InvestValue].values,
+                             self.cost_details[f'Capex_{self.name}'].values,
+                             self.invest_before_ystart[GlossaryEnergy.InvestValue].values, construction_delay,
+                             lifetime, self.initial_production, self.initial_age_distrib['age'].values,
+                             self.initial_age_distrib['distrib'].values)
+        aging_distribution = self.aging_distribution_cache.get_or_compute(
+            key, lambda: self.compute_aging_matrices(construction_delay, lifetime))
+        self.prod_from_invest, self.new_prod_ages, self.new_prod_by_age, self.initial_prod_ages, \
+            self.initial_prod_by_age, self.age_x_prod_by_year = aging_distribution
+        # the aging dataframe is only rebuilt if the distribution has changed
+        if key != self.aging_distribution_key:
+            self.aging_distribution_key = key
+            self.age_distrib_prod_df = None
+
+    def compute_aging_matrices(self, construction_delay, lifetime):
+        '''
+        Compute the production from investments started each year, the (years x age) matrices of the production
+        from investments and of the initial production and the sum of age x production for each year
         '''
-        # To break the object link with initial distrib
-        aging_distrib_year_df = pd.DataFrame(
-            {'age': self.initial_age_distrib['age'].values})
-        aging_distrib_year_df[f'distrib_prod ({self.product_energy_unit})'] = self.initial_age_distrib['distrib'] * \
-                                                                              self.initial_production / 100.0
-
-        if GlossaryEnergy.ConstructionDelay in self.techno_infos_dict:
-            construction_delay = self.techno_infos_dict[GlossaryEnergy.ConstructionDelay]
-        else:
-            print(
-                f'The construction_delay data is not set for {self.name} : default = 3 years  ')
-            construction_delay = 3
-
         production_from_invest = self.compute_prod_from_invest(
             construction_delay=construction_delay)
+        prod_from_invest = production_from_invest['prod_from_invest'].values
 
-        # get the whole dataframe for new production with one line for each
-        # year at each age
-        # concatenate tuple to get correct df to mimic the old year loop
-        len_years = len(self.years)
-        range_years = np.arange(
-            self.year_start, self.year_end + len_years)
-
-        year_array = np.concatenate(
-            tuple(range_years[i:i + len_years] for i in range(len_years)))
-        age_array = np.concatenate(tuple(np.ones(
-            len_years) * (len_years - i) for i in range(len_years, 0, -1)))
-        prod_array = production_from_invest['prod_from_invest'].values.tolist(
-        ) * len_years
-
-        new_prod_aged = pd.DataFrame({GlossaryEnergy.Years: year_array, 'age': age_array,
-                                      f'distrib_prod ({self.product_energy_unit})': prod_array})
-
-        # get the whole dataframe for old production with one line for each
-        # year at each age
-        year_array = np.array([[year] * len(aging_distrib_year_df)
-                               for year in self.years]).flatten()
-        age_values = aging_distrib_year_df['age'].values
-        age_array = np.concatenate(tuple(
-            age_values + i for i in range(len_years)))
-        prod_array = aging_distrib_year_df[f'distrib_prod ({self.product_energy_unit})'].values.tolist(
-        ) * len_years
-
-        old_prod_aged = pd.DataFrame({GlossaryEnergy.Years: year_array, 'age': age_array,
-                                      f'distrib_prod ({self.product_energy_unit})': prod_array})
-
-        # Concat the two created df
-        self.age_distrib_prod_df = pd.concat(
-            [new_prod_aged, old_prod_aged], ignore_index=True)
-
-        self.age_distrib_prod_df = self.age_distrib_prod_df.loc[
-            # Suppress all lines where age is higher than lifetime
-            (self.age_distrib_prod_df['age'] <
-             self.techno_infos_dict['lifetime'])
-            # Suppress all lines where age is higher than lifetime
-            & (self.age_distrib_prod_df[GlossaryEnergy.Years] < self.year_end + 1)
-            # Fill Nan with zeros and suppress all zeros
-            & (self.age_distrib_prod_df[f'distrib_prod ({self.product_energy_unit})'] != 0.0)
-            ]
-        # Fill Nan with zeros
-        self.age_distrib_prod_df.fillna(0.0, inplace=True)
+        new_prod_ages, new_prod_by_age = compute_new_production_by_age(prod_from_invest, lifetime)
+
+        initial_distrib_prod = self.initial_age_distrib['distrib'].values * self.initial_production / 100.0
+        initial_prod_ages, initial_prod_by_age = compute_initial_production_by_age(
+            self.initial_age_distrib['age'].values, initial_distrib_prod, len(self.years), lifetime)
+
+        age_x_prod_by_year = new_prod_by_age @ new_prod_ages + (initial_prod_by_age * initial_prod_ages).sum(axis=1)
+
+        return prod_from_invest, new_prod_ages, new_prod_by_age, initial_prod_ages, initial_prod_by_age, \
+            age_x_prod_by_year
+
+    def get_age_distrib_prod_df(self):
+        '''
+        Build the aging distribution dataframe (one line per year and age) from the aging matrices
+        '''
+        if self.age_distrib_prod_df is None:
+            self.age_distrib_prod_df = build_age_distrib_prod_df(
+                self.years, self.new_prod_ages, self.new_prod_by_age, self.initial_prod_ages,
+                self.initial_prod_by_age, f'distrib_prod ({self.product_energy_unit})')
+        return self.age_distrib_prod_df
 
     def compute_dlanduse_dinvest(self):
         """
@@ -1437,12 +1285,8 @@ class TechnoType:
 
         mean_age_df = pd.DataFrame({GlossaryEnergy.Years: self.years})
 
-        self.age_distrib_prod_df['age_x_prod'] = self.age_distrib_prod_df['age'] * \
-                                                 self.age_distrib_prod_df[f'distrib_prod ({self.product_energy_unit})']
-
-        mean_age_df['mean age'] = self.age_distrib_prod_df.groupby(
-            [GlossaryEnergy.Years], as_index=False).agg({'age_x_prod': 'sum'})['age_x_prod'] / self.production_woratio[
-                                      f'{self.energy_name} ({self.product_energy_unit})']
+        mean_age_df['mean age'] = self.age_x_prod_by_year / self.production_woratio[
+            f'{self.energy_name} ({self.product_energy_unit})'].values
         mean_age_df.replace([np.inf, -np.inf], np.nan, inplace=True)
         mean_age_df.fillna(0.0, inplace=True)
 
@@ -1506,29 +1350,187 @@ class TechnoType:
 
         self.rescale_outputs()
 
+    def compute_scenarios(self, invest_levels, energy_prices=None, resources_prices=None, co2_taxes=None):
+        '''
+        Evaluate several scenarios of investments, energy and resources prices and CO2 taxes in one vectorized pass
+        The techno must have been computed on a reference scenario beforehand : needs, efficiency, transport, margin,
+        utilisation ratio and applied resources ratios of the reference are used for all scenarios.
+        Prices are batched for the technos with the generic price stage (see has_generic_price_stage), the other
+        technos compute their own price on each scenario.
+        Consumptions and by-products are affine in the main production (see compute_specific_flows).
+        Construction resources consumption, land use and capital are not computed.
+
+        :param invest_levels: (scenarios x years) investments, in the unit of the invest_level input
+        :param energy_prices: optional dict energy -> (scenarios x years) prices, reference prices for missing energies
+        :param resources_prices: optional dict resource -> (scenarios x years) prices,
+            reference prices for missing resources
+        :param co2_taxes: optional (scenarios x years) CO2 taxes, reference CO2 taxes otherwise
+        :return: dict with the stacked (scenarios x years) arrays : cost details (capex, price with and without taxes,
+            CO2 taxes) and production and consumption (by column as in production_detailed and consumption_detailed)
+            and CO2 emissions in Mt
+        '''
+        invest_levels = np.atleast_2d(invest_levels) * self.scaling_factor_invest_level
+        nb_scenarios, nb_years = invest_levels.shape
+        energy_prices = energy_prices or {}
+        resources_prices = resources_prices or {}
+        if co2_taxes is None:
+            co2_taxes = self.CO2_taxes[GlossaryEnergy.CO2Tax].loc[
+                self.CO2_taxes[GlossaryEnergy.Years] <= self.year_end].values
+
+        # -- prices
+        if self.has_generic_price_stage():
+            cost_details, carbon_intensity = self.compute_batched_prices(
+                invest_levels, energy_prices, resources_prices, co2_taxes)
+        else:
+            cost_details, carbon_intensity = self.compute_prices_by_scenario(
+                invest_levels, energy_prices, resources_prices, np.broadcast_to(co2_taxes, invest_levels.shape))
+        invest = cost_details[GlossaryEnergy.InvestValue]
+        capex = cost_details[f'Capex_{self.name}']
+
+        # -- production and consumption
+        prod_from_invest = compute_delayed_prod_from_invest(
+            invest, capex, self.invest_before_ystart[GlossaryEnergy.InvestValue].values,
+            self.techno_parameters.construction_delay)
+        _, new_prod_by_age = compute_new_production_by_age(prod_from_invest, self.techno_parameters.lifetime)
+        main_production = new_prod_by_age.sum(axis=-1) + self.initial_prod_by_age.sum(axis=1)
+
+        # same ratios as apply_utilisation_ratio and apply_resources_ratios
+        applied_ratio = self.applied_ratio['applied_ratio'].values
+        construction_columns = [f'{resource} (Mt)' for resource in self.construction_resource_list]
+        specific_production, specific_consumption = self.compute_specific_flows()
+        production = {column: (offset + slope * main_production) * self.utilisation_ratio / 100. * applied_ratio
+                      for column, (offset, slope) in specific_production.items()}
+        consumption = {column: (offset + slope * main_production) * self.utilisation_ratio / 100. *
+                               (1.0 if column in construction_columns else applied_ratio)
+                       for column, (offset, slope) in specific_consumption.items()}
+
+        main_column = f'{self.energy_name} ({self.product_energy_unit})'
+        shape = (nb_scenarios, nb_years)
+        return {'cost_details': {column: np.broadcast_to(values, shape) for column, values in cost_details.items()},
+                'production': {column: np.broadcast_to(values, shape) for column, values in production.items()},
+                'consumption': {column: np.broadcast_to(values, shape) for column, values in consumption.items()},
+                # kg/kWh x TWh = Mt
+                'CO2_emissions': carbon_intensity * production[main_column]}
+
+    def has_generic_price_stage(self):
+        '''
+        True if the price of the techno depends on the scenario inputs only through the generic price stage :
+        capex of the investments, needs times energy and resources prices and CO2 taxes times carbon intensity.
+        Technos with their own price computation (specific costs of technos, compute_price) depend on the prices
+        in their own way
+        '''
+        return all(getattr(type(self), method) is getattr(TechnoType, method) for method in TECHNO_PRICE_STAGES)
+
+    def compute_batched_prices(self, invest_levels, energy_prices, resources_prices, co2_taxes):
+        '''
+        Price stage of compute_price on (scenarios x years) inputs, needs, specific costs and carbon intensity
+        of the reference are used for all scenarios
+
+        :return: dict of the (scenarios x years) cost details and the carbon intensity of the techno
+        '''
+        invest, _ = compute_exp_min(invest_levels, self.min_value_invest)
+        capex = np.asarray(self.compute_capex(invest, self.techno_infos_dict))
+
+        factory_cost = capex * (self.capital_recovery_factor + self.techno_parameters.opex_percentage)
+        if self.techno_parameters.decommissioning_percentage is not None:
+            factory_cost = factory_cost + capex * self.techno_parameters.decommissioning_percentage
+
+        cost_of_resources_usage = sum(self.cost_details[f'{resource}_needs'].values *
+                                      resources_prices.get(resource, self.resources_prices[resource].values)
+                                      for resource in self.resources_used_for_production)
+        cost_of_energies_usage = sum(self.cost_details[f'{energy}_needs'].values *
+                                     energy_prices.get(energy, self.energy_prices[energy].values)
+                                     for energy in self.energies_used_for_production)
+        energy_costs = cost_of_resources_usage + cost_of_energies_usage + \
+                       self.specific_costs.drop(GlossaryEnergy.Years, axis=1).values.sum(axis=1)
+
+        margin = self.margin.loc[self.margin[GlossaryEnergy.Years] <= self.year_end][GlossaryEnergy.MarginValue].values
+        price = (factory_cost + self.cost_details['transport'].values + energy_costs) * margin / 100.0
+
+        co2_taxes_factory = co2_taxes * self.carbon_intensity[self.name].clip(0).values
+        price = price + co2_taxes_factory
+
+        return {GlossaryEnergy.InvestValue: invest,
+                f'Capex_{self.name}': capex,
+                self.name: price,
+                f'{self.name}_wotaxes': price - co2_taxes_factory,
+                'CO2_taxes_factory': co2_taxes_factory}, self.carbon_intensity[self.name].values
+
+    def compute_prices_by_scenario(self, invest_levels, energy_prices, resources_prices, co2_taxes):
+        '''
+        Price of the techno on each scenario computed with its own compute_price on a copy of the techno
+        (see copy_for_flows) whose investments, prices and CO2 taxes are the ones of the scenario
+
+        :return: dict of the (scenarios x years) cost details and the (scenarios x years) carbon intensity
+        '''
+        cost_details_columns = [GlossaryEnergy.InvestValue, f'Capex_{self.name}', self.name, f'{self.name}_wotaxes',
+                                'CO2_taxes_factory']
+        cost_details = {column: [] for column in cost_details_columns}
+        carbon_intensity = []
+        for scenario, invest_level in enumerate(invest_levels):
+            scenario_model = self.copy_for_flows()
+            scenario_model.invest_level = pd.DataFrame(
+                {GlossaryEnergy.Years: self.years, GlossaryEnergy.InvestValue: invest_level})
+            for energy, prices in energy_prices.items():
+                scenario_model.energy_prices[energy] = prices[scenario]
+            for resource, prices in resources_prices.items():
+                scenario_model.resources_prices[resource] = prices[scenario]
+            scenario_model.CO2_taxes = pd.DataFrame(
+                {GlossaryEnergy.Years: self.years, GlossaryEnergy.CO2Tax: co2_taxes[scenario]})
+            scenario_model.compute_price()
+            for column in cost_details_columns:
+                cost_details[column].append(scenario_model.cost_details[column].values)
+            carbon_intensity.append(scenario_model.carbon_intensity[self.name].values)
+
+        return {column: np.vstack(values) for column, values in cost_details.items()}, np.vstack(carbon_intensity)
+
+    def compute_specific_flows(self):
+        '''
+        Production and consumption columns as affine functions of the main production of the techno
+        They are computed with the techno's own methods on a production of one and two units, on a copy of the techno
+        whose dataframes, dicts and arrays are copied so that the techno itself is left untouched
+
+        :return: dicts column -> (offset, slope) arrays for production and consumption
+        '''
+        main_column = f'{self.energy_name} ({self.product_energy_unit})'
+        flows = []
+        for unit_production in [1.0, 2.0]:
+            flows_model = self.copy_for_flows()
+            flows_model.production_detailed = pd.DataFrame(
+                {GlossaryEnergy.Years: self.years, main_column: np.full(len(self.years), unit_production)})
+            flows_model.consumption_detailed = pd.DataFrame({GlossaryEnergy.Years: self.years})
+            flows_model.compute_resource_consumption()
+            flows_model.compute_energies_consumption()
+            flows_model.compute_production()
+            flows.append((flows_model.production_detailed, flows_model.consumption_detailed))
+
+        specific_flows = []
+        for flows_one, flows_two in zip(*flows):
+            specific_flows.append(
+                {column: (2.0 * flows_one[column].values - flows_two[column].values,
+                          flows_two[column].values - flows_one[column].values)
+                 for column in flows_one.columns if column != GlossaryEnergy.Years})
+
+        return specific_flows
+
+    def copy_for_flows(self):
+        '''
+        Copy of the techno that can be computed without modifying the techno: the attributes that the compute methods
+        may modify in place (dataframes, dicts and arrays) are copied, the other ones are shared
+        '''
+        flows_model = copy(self)
+        for name, value in vars(self).items():
+            if isinstance(value, (pd.DataFrame, dict, np.ndarray)):
+                setattr(flows_model, name, value.copy())
+        return flows_model
+
     def rescale_outputs(self):
-        self.production = copy(self.production_detailed)
-        self.consumption = copy(self.consumption_detailed)
-
-        for column in self.consumption_detailed.columns:
-            if column == GlossaryEnergy.Years:
-                continue
-            self.consumption[column] = self.consumption[column].values / self.scaling_factor_techno_consumption
-        for column in self.production_detailed.columns:
-            if column == GlossaryEnergy.Years:
-                continue
-            self.production[column] = self.production[column].values / self.scaling_factor_techno_production
-
-        for column in self.consumption_woratio.columns:
-            if column == GlossaryEnergy.Years:
-                continue
-            self.consumption_woratio[column] = self.consumption_woratio[
-                                                   column].values / self.scaling_factor_techno_consumption
-        for column in self.production_woratio.columns:
-            if column == GlossaryEnergy.Years:
-                continue
-            self.production_woratio[column] = self.production_woratio[
-                                                  column].values / self.scaling_factor_techno_production
+        self.production = rescale_columns(self.production_detailed, divisor=self.scaling_factor_techno_production)
+        self.consumption = rescale_columns(self.consumption_detailed, divisor=self.scaling_factor_techno_consumption)
+        self.production_woratio = rescale_columns(self.production_woratio,
+                                                  divisor=self.scaling_factor_techno_production)
+        self.consumption_woratio = rescale_columns(self.consumption_woratio,
+                                                   divisor=self.scaling_factor_techno_consumption)
 
     def apply_utilisation_ratio(self):
         """
@@ -1536,15 +1538,10 @@ class TechnoType:
         - consumption
         - production
         """
-        for column in self.consumption_detailed.columns:
-            if column == GlossaryEnergy.Years:
-                continue
-            self.consumption_detailed[column] = self.consumption_detailed[column].values * self.utilisation_ratio / 100.
-
-        for column in self.production_detailed.columns:
-            if column == GlossaryEnergy.Years:
-                continue
-            self.production_detailed[column] = self.production_detailed[column].values * self.utilisation_ratio / 100.
+        self.consumption_detailed = rescale_columns(self.consumption_detailed, multiplier=self.utilisation_ratio,
+                                                    divisor=100.)
+        self.production_detailed = rescale_columns(self.production_detailed, multiplier=self.utilisation_ratio,
+                                                   divisor=100.)
 
     def store_consumption_and_production_and_landuse_wo_ratios(self):
         """
@@ -1552,10 +1549,11 @@ class TechnoType:
         - production
         - consumption
         - land use
+        Ratios and scaling factors are applied on new dataframes so no copy is needed
         """
-        self.production_woratio = copy(self.production_detailed)
-        self.consumption_woratio = copy(self.consumption_detailed)
-        self.land_use_woratio = copy(self.land_use)
+        self.production_woratio = self.production_detailed
+        self.consumption_woratio = self.consumption_detailed
+        self.land_use_woratio = self.land_use
 
     def d_non_use_capital_d_utilisation_ratio(self):
         techno_capital = self.techno_capital[GlossaryEnergy.Capital].values
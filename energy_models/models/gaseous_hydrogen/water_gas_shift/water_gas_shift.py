@@ -17,6 +17,7 @@ limitations under the License.
 
 import numpy as np
 
+from energy_models.core.exp_min import compute_exp_min
 from energy_models.core.stream_type.carbon_models.carbon_capture import CarbonCapture
 from energy_models.core.stream_type.carbon_models.carbon_dioxyde import CO2
 from energy_models.core.stream_type.carbon_models.carbon_monoxyde import CO
@@ -31,7 +32,6 @@ from energy_models.core.stream_type.resources_models.resource_glossary import Re
 from energy_models.core.stream_type.resources_models.water import Water
 from energy_models.core.techno_type.base_techno_models.gaseous_hydrogen_techno import GaseousHydrogenTechno
 from energy_models.glossaryenergy import GlossaryEnergy
-from sostrades_core.tools.base_functions.exp_min import compute_dfunc_with_exp_min
 
 
 class WGS(GaseousHydrogenTechno):
@@ -514,27 +514,12 @@ class WGS(GaseousHydrogenTechno):
 
     def compute_dprod_dfluegas(self, capex_list, invest_list, invest_before_year_start, techno_dict, dcapexdfluegas):
 
-        # dpprod_dpfluegas = np.zeros(dcapexdfluegas.shape())
+        _, dinvest_exp_min = compute_exp_min(invest_list, 1e-12)
 
-        dprod_dcapex = self.compute_dprod_dcapex(
-            capex_list, invest_list, techno_dict, invest_before_year_start)
+        dcapexdfluegas *= dinvest_exp_min[:, np.newaxis]
 
-        if 'complex128' in [dprod_dcapex.dtype]:
-            arr_type = 'complex128'
-        else:
-            arr_type = 'float64'
-
-        # dprod_dfluegas = dpprod_dpfluegas + dprod_dcapex * dcapexdfluegas
-        dprod_dfluegas = np.zeros(dprod_dcapex.shape, dtype=arr_type)
-        dinvest_exp_min = compute_dfunc_with_exp_min(invest_list, 1e-12)
-
-        dcapexdfluegas *= dinvest_exp_min
-        for line in range(dprod_dcapex.shape[0]):
-            for column in range(dprod_dcapex.shape[1]):
-                dprod_dfluegas[line, column] = np.matmul(
-                    dprod_dcapex[line, :], dcapexdfluegas[:, column])
-
-        return dprod_dfluegas
+        return self.compute_dprod_dcapex_parameter(
+            capex_list, invest_list, invest_before_year_start, techno_dict, dcapexdfluegas)
 
     def compute_production(self):
         co2_prod = self.get_theoretical_co2_prod()
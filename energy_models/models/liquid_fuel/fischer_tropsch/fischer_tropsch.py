@@ -14,8 +14,6 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 '''
-from functools import reduce
-from operator import mul
 
 import numpy as np
 import pandas as pd
@@ -31,6 +29,7 @@ from energy_models.core.stream_type.energy_models.syngas import compute_molar_ma
 from energy_models.core.stream_type.resources_models.resource_glossary import ResourceGlossary
 from energy_models.core.stream_type.resources_models.water import Water
 from energy_models.core.techno_type.base_techno_models.liquid_fuel_techno import LiquidFuelTechno
+from energy_models.core.techno_type.learning_curve import compute_dcapex_learning_curve_dparameter
 from energy_models.glossaryenergy import GlossaryEnergy
 from energy_models.models.gaseous_hydrogen.water_gas_shift.water_gas_shift import WGS
 from energy_models.models.gaseous_hydrogen.water_gas_shift.water_gas_shift_disc import WaterGasShiftDiscipline
@@ -767,25 +766,12 @@ class FischerTropsch(LiquidFuelTechno):
 
     def compute_dcapex_dsyngas_ratio(self):
 
-        invest_sum = 0.0
-        capex_year = 0.0
         capex_init = self.check_capex_unity(
             self.techno_infos_dict)
 
         expo_factor = self.compute_expo_factor(
             self.techno_infos_dict)
 
-        if 'complex128' in [type(self.initial_production), type(capex_init),
-                            self.cost_details[GlossaryEnergy.InvestValue].values.dtype]:
-            arr_type = 'complex128'
-        else:
-            arr_type = 'float64'
-
-        capex_grad = np.zeros(
-            (len(self.years), len(self.years)), dtype=arr_type)
-
-        dqlist = []
-        qlist = []
         self.slope_capex = 0.0
 
         if 'maximum_learning_capex_ratio' in self.techno_infos_dict:
@@ -800,63 +786,22 @@ class FischerTropsch(LiquidFuelTechno):
                 f'invest is negative {min(invest_list.real)} on techno {self.name}')
             invest_list = np.maximum(0.0, invest_list)
 
-        for i, invest in enumerate(invest_list):
-
-            if i == 0.0:
-                capex_year = capex_init
-                capex_grad[0][0] = 1000 * self.slope_capex
-                invest_sum = self.initial_production * capex_init
-            else:
-                dinvest_sum = self.initial_production * self.slope_capex
-                q = ((invest_sum + invest) / invest_sum) ** (-expo_factor)
-                qlist.append(q)
-                dq = -expo_factor * ((invest_sum + invest) / invest_sum) ** (-expo_factor -
-                                                                             1.0) * (
-                                 -dinvest_sum * invest / (invest_sum * invest_sum))
-                dqlist.append(dq)
-
-                q_product = reduce(mul, qlist)
-
-                qlistmod = []
-                for k in range(0, i):
-                    qlistmod.extend([qlist[:k] + qlist[k + 1:]])
-
-                if qlistmod == [[]]:
-                    productlist = [0]
-                else:
-                    productlist = [reduce(mul, ql) for ql in qlistmod]
-                prod_mul = sum([a * b for a, b in zip(productlist, dqlist)])
-                capex_year = capex_year * q
-                capex_grad[i][0] = capex_grad[0][0] * \
-                                   q_product + capex_init * prod_mul
-            invest_sum += invest
+        dcapex_init = 1000 * self.slope_capex
+        dcapex_year = compute_dcapex_learning_curve_dparameter(
+            invest_list, capex_init, self.initial_production * capex_init, expo_factor,
+            dcapex_init=dcapex_init, dinvest_sum_init=self.initial_production * self.slope_capex)
 
         # dcapex = maximum_learning_capex_ratio*dcapex_init + (1.0 - maximum_learning_capex_ratio)*dcapex
-        capex_grad = maximum_learning_capex_ratio * capex_grad[0][0] * np.insert(
-            np.zeros((len(self.years), len(self.years) - 1)), 0, np.ones(len(self.years)), axis=1) + \
-                     (1.0 - maximum_learning_capex_ratio) * capex_grad
+        # only the first column is filled as the syngas ratio is the one of the first year
+        capex_grad = np.zeros((len(self.years), len(self.years)), dtype=dcapex_year.dtype)
+        capex_grad[:, 0] = maximum_learning_capex_ratio * dcapex_init + \
+                           (1.0 - maximum_learning_capex_ratio) * dcapex_year
         return capex_grad
 
     def compute_dprod_dfluegas(self, capex_list, invest_list, invest_before_year_start, techno_dict, dcapexdfluegas):
 
-        # dpprod_dpfluegas = np.zeros(dcapexdfluegas.shape())
-
-        dprod_dcapex = self.compute_dprod_dcapex(
-            capex_list, invest_list, techno_dict, invest_before_year_start)
-
-        if 'complex128' in [dprod_dcapex.dtype]:
-            arr_type = 'complex128'
-        else:
-            arr_type = 'float64'
-
-        # dprod_dfluegas = dpprod_dpfluegas + dprod_dcapex * dcapexdfluegas
-        dprod_dfluegas = np.zeros(dprod_dcapex.shape, dtype=arr_type)
-        for line in range(dprod_dcapex.shape[0]):
-            for column in range(dprod_dcapex.shape[1]):
-                dprod_dfluegas[line, column] = np.matmul(
-                    dprod_dcapex[line, :], dcapexdfluegas[:, column])
-
-        return dprod_dfluegas
+        return self.compute_dprod_dcapex_parameter(
+            capex_list, invest_list, invest_before_year_start, techno_dict, dcapexdfluegas)
 
     def grad_techno_producion_vs_syngas_ratio(self, capex, invest, invest_before_ystart, techno_infos_dict):
         '''
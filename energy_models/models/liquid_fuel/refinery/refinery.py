@@ -17,14 +17,16 @@ limitations under the License.
 import numpy as np
 import pandas as pd
 
+from energy_models.core.exp_min import compute_exp_min
 from energy_models.core.stream_type.carbon_models.carbon_capture import CarbonCapture
 from energy_models.core.stream_type.energy_models.electricity import Electricity
 from energy_models.core.stream_type.energy_models.gaseous_hydrogen import GaseousHydrogen
 from energy_models.core.stream_type.energy_models.methane import Methane
 from energy_models.core.stream_type.resources_models.resource_glossary import ResourceGlossary
 from energy_models.core.techno_type.base_techno_models.liquid_fuel_techno import LiquidFuelTechno
+from energy_models.core.techno_type.techno_jacobian import compute_dprod_dcapex_partial, \
+    compute_dprod_dinvest_partial
 from energy_models.glossaryenergy import GlossaryEnergy
-from sostrades_core.tools.base_functions.exp_min import compute_dfunc_with_exp_min
 
 
 class Refinery(LiquidFuelTechno):
@@ -127,54 +129,19 @@ class Refinery(LiquidFuelTechno):
         with dcapexdinvest already computed for detailed prices
         '''
         nb_years = len(capex_list)
+        invest_list = invest_list[:nb_years]
+        _, dinvest_exp_min = compute_exp_min(invest_list, self.min_value_invest)
 
-        if 'complex128' in [capex_list.dtype, invest_list.dtype, invest_before_year_start.dtype,
-                            dcapex_list_dinvest_list.dtype]:
-            arr_type = 'complex128'
-        else:
-            arr_type = 'float64'
-        dprod_list_dinvest_list = np.zeros(
-            (nb_years, nb_years), dtype=arr_type)
-        # We fill this jacobian column by column because it is the same element
-        # in the entire column
-        for i in range(nb_years):
-            dpprod_dpinvest = compute_dfunc_with_exp_min(np.array([invest_list[i]]), self.min_value_invest)[0][0] / \
-                              (capex_list[i] + self.oil_extraction_capex)
-            len_non_zeros = min(max(0, nb_years -
-                                    techno_dict[GlossaryEnergy.ConstructionDelay] - i),
-                                techno_dict['lifetime'])
-            first_len_zeros = min(
-                i + techno_dict[GlossaryEnergy.ConstructionDelay], nb_years)
-            last_len_zeros = max(0, nb_years -
-                                 len_non_zeros - first_len_zeros)
-            # For prod in each column there is lifetime times the same value which is dpprod_dpinvest
-            # This value is delayed in time (means delayed in lines for
-            # jacobian by construction _delay)
-            # Each column is then composed of [0,0,0... (dp/dx,dp/dx)*lifetime,
-            # 0,0,0]
-            is_invest_negative = max(
-                np.sign(invest_list[i] + np.finfo(float).eps), 0.0)
-            dprod_list_dinvest_list[:, i] = np.hstack((np.zeros(first_len_zeros),
-                                                       np.ones(
-                                                           len_non_zeros) * dpprod_dpinvest * is_invest_negative,
-                                                       np.zeros(last_len_zeros)))
+        dprod_list_dinvest_list = compute_dprod_dinvest_partial(
+            capex_list + self.oil_extraction_capex, invest_list, dinvest_exp_min,
+            techno_dict[GlossaryEnergy.ConstructionDelay], techno_dict['lifetime'])
 
         dprod_list_dcapex_list = self.compute_dprod_dcapex(
             capex_list, invest_list, techno_dict, invest_before_year_start)
 
-        dinvest_exp_min = compute_dfunc_with_exp_min(
-            invest_list, self.min_value_invest)
-
-        dcapex_list_dinvest_list_withexp = dcapex_list_dinvest_list * dinvest_exp_min
-        dprod_dinvest = np.zeros(
-            (nb_years, nb_years), dtype=arr_type)
         # dprod_dinvest= dpprod_dpinvest + dprod_dcapex*dcapex_dinvest
-        for line in range(nb_years):
-            for column in range(nb_years):
-                dprod_dinvest[line, column] = dprod_list_dinvest_list[line, column] + \
-                                              np.matmul(
-                                                  dprod_list_dcapex_list[line, :],
-                                                  dcapex_list_dinvest_list_withexp[:, column])
+        dprod_dinvest = dprod_list_dinvest_list + \
+                        dprod_list_dcapex_list @ (dcapex_list_dinvest_list * dinvest_exp_min[:, np.newaxis])
 
         self.dprod_dinvest = dprod_dinvest
 
@@ -185,39 +152,9 @@ class Refinery(LiquidFuelTechno):
         Overwrite the dprod_dcapex derivative to take the added oil extraction capex into account
         '''
         nb_years = len(capex_list)
-        dprod_list_dcapex_list = np.zeros(
-            (nb_years, nb_years))
-        if 'complex128' in [capex_list.dtype, invest_list.dtype, invest_before_year_start.dtype]:
-            dprod_list_dcapex_list = np.zeros(
-                (nb_years, nb_years), dtype='complex128')
-        for i in range(nb_years):
-            len_non_zeros = min(max(0, nb_years -
-                                    techno_dict[GlossaryEnergy.ConstructionDelay] - i),
-                                techno_dict['lifetime'])
-            first_len_zeros = min(
-                i + techno_dict[GlossaryEnergy.ConstructionDelay], nb_years)
-            last_len_zeros = max(0, nb_years -
-                                 len_non_zeros - first_len_zeros)
-            # Same for capex
-            dpprod_dpcapex = - \
-                                 invest_list[i] / (capex_list[i] + self.oil_extraction_capex) ** 2
-
-            dprod_list_dcapex_list[:, i] = np.hstack((np.zeros(first_len_zeros),
-                                                      np.ones(
-                                                          len_non_zeros) * dpprod_dpcapex,
-                                                      np.zeros(last_len_zeros)))
-        # but the capex[0] is used for invest before
-        # year_start then we need to add it to the first column
-        dpprod_dpcapex0_list = [- invest / (capex_list[0] + self.oil_extraction_capex)
-                                ** 2 for invest in invest_before_year_start]
-
-        for index, dpprod_dpcapex0 in enumerate(dpprod_dpcapex0_list):
-            len_non_zeros = min(
-                techno_dict['lifetime'], nb_years - index)
-            dprod_list_dcapex_list[:, 0] += np.hstack((np.zeros(index),
-                                                       np.ones(
-                                                           len_non_zeros) * dpprod_dpcapex0,
-                                                       np.zeros(nb_years - index - len_non_zeros)))
+        dprod_list_dcapex_list = compute_dprod_dcapex_partial(
+            capex_list + self.oil_extraction_capex, invest_list[:nb_years], invest_before_year_start,
+            techno_dict[GlossaryEnergy.ConstructionDelay], techno_dict['lifetime'])
 
         self.dprod_list_dcapex_list = dprod_list_dcapex_list
 
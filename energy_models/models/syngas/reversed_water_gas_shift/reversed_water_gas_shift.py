@@ -29,6 +29,7 @@ from energy_models.core.stream_type.energy_models.syngas import compute_molar_ma
 from energy_models.core.stream_type.resources_models.resource_glossary import ResourceGlossary
 from energy_models.core.stream_type.resources_models.water import Water
 from energy_models.core.techno_type.base_techno_models.syngas_techno import SyngasTechno
+from energy_models.core.techno_type.learning_curve import compute_dcapex_learning_curve_dparameter
 from energy_models.glossaryenergy import GlossaryEnergy
 
 
@@ -118,51 +119,17 @@ class RWGS(SyngasTechno):
         capex_init = self.check_capex_unity(
             self.techno_infos_dict)
 
-        if 'complex128' in [type(self.initial_production), type(self.slope_capex), capex_init.dtype,
-                            self.cost_details[GlossaryEnergy.InvestValue].values.dtype]:
-            arr_type = 'complex128'
-        else:
-            arr_type = 'float64'
-        capex_grad = np.zeros(
-            (len(self.years), len(self.years)), dtype=arr_type)
-
         expo_factor = self.compute_expo_factor(
             self.techno_infos_dict)
 
-        dqlist = []
-        qlist = []
-        invest_sum = self.initial_production * capex_init
-        dinvest_sum = -1.0 * self.initial_production * self.slope_capex
-        capex_year = capex_init
-        capex_grad[0][0] = -self.slope_capex
         invest_list = self.cost_details[GlossaryEnergy.InvestValue].values
         if min(invest_list.real) < 0:
             invest_list = np.maximum(0.0, invest_list)
-        for i, invest in enumerate(invest_list):
-
-            if invest_sum.real < 10.0 or i == 0.0:
-                capex_year = capex_init
-                capex_grad[i][0] = - self.slope_capex
-
-            else:
-
-                q = ((invest_sum + invest) / invest_sum) ** (-expo_factor)
 
-                #                 dq = -expo_factor * ((invest_sum + invest) / invest_sum) ** (-expo_factor -
-                # 1.0) * (-dinvest_sum * invest / (invest_sum * invest_sum))
-                dq = dinvest_sum * expo_factor * invest * \
-                     q / (invest_sum * (invest_sum + invest))
-                if q.real < 0.95:
-                    dq = 0.05 * np.exp(q - 0.9) * dq
-                    q = 0.9 + 0.05 * np.exp(q - 0.9)
-
-                dqlist.append(dq)
-                qlist.append(q)
-
-                capex_grad[i][0] = q * capex_grad[i - 1][0] + dq * capex_year
-
-                capex_year = capex_year * q
-            invest_sum += invest
+        # capex_init = slope_capex * (needed_syngas_ratio - syngas_ratio) + b
+        dcapex_year = compute_dcapex_learning_curve_dparameter(
+            invest_list, capex_init, self.initial_production * capex_init, expo_factor,
+            dcapex_init=-self.slope_capex, dinvest_sum_init=-1.0 * self.initial_production * self.slope_capex)
 
         if 'maximum_learning_capex_ratio' in self.techno_infos_dict:
             maximum_learning_capex_ratio = self.techno_infos_dict['maximum_learning_capex_ratio']
@@ -170,30 +137,17 @@ class RWGS(SyngasTechno):
             maximum_learning_capex_ratio = 0.9
 
         # dcapex = maximum_learning_capex_ratio*dcapex_init + (1.0 - maximum_learning_capex_ratio)*dcapex
-        capex_grad = maximum_learning_capex_ratio * capex_grad[0][0] * np.insert(
-            np.zeros((len(self.years), len(self.years) - 1)), 0, np.ones(len(self.years)), axis=1) + \
-                     (1.0 - maximum_learning_capex_ratio) * capex_grad
+        # only the first column is filled as the syngas ratio is the one of the first year
+        capex_grad = np.zeros((len(self.years), len(self.years)), dtype=dcapex_year.dtype)
+        capex_grad[:, 0] = maximum_learning_capex_ratio * -self.slope_capex + \
+                           (1.0 - maximum_learning_capex_ratio) * dcapex_year
         return capex_grad
 
     def compute_dprod_dsyngas_ratio(self, capex_list, invest_list, invest_before_year_start, techno_dict,
                                     dcapexdsyngas):
 
-        # dpprod_dpfluegas = np.zeros(dcapexdfluegas.shape())
-
-        dprod_dcapex = self.compute_dprod_dcapex(
-            capex_list, invest_list, techno_dict, invest_before_year_start)
-        # dprod_dfluegas = dpprod_dpfluegas + dprod_dcapex * dcapexdfluegas
-        if 'complex128' in [capex_list.dtype, invest_list.dtype, invest_before_year_start.dtype, dcapexdsyngas.dtype]:
-            arr_type = 'complex128'
-        else:
-            arr_type = 'float64'
-        dprod_dfluegas = np.zeros(dprod_dcapex.shape, dtype=arr_type)
-        for line in range(dprod_dcapex.shape[0]):
-            for column in range(dprod_dcapex.shape[1]):
-                dprod_dfluegas[line, column] = np.matmul(
-                    dprod_dcapex[line, :], dcapexdsyngas[:, column])
-
-        return dprod_dfluegas
+        return self.compute_dprod_dcapex_parameter(
+            capex_list, invest_list, invest_before_year_start, techno_dict, dcapexdsyngas)
 
     def compute_drwgs_dsyngas_ratio(self):
 
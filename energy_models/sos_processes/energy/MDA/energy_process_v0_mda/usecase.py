@@ -17,6 +17,7 @@ limitations under the License.
 
 from energy_models.core.energy_process_builder import INVEST_DISCIPLINE_DEFAULT
 from energy_models.core.energy_study_manager import DEFAULT_TECHNO_DICT
+from energy_models.core.parallel_techno_execution import run_parallel_techno_iterations
 from energy_models.glossaryenergy import GlossaryEnergy
 from energy_models.sos_processes.energy.MDA.energy_process_v0.usecase import Study as Study_v0
 from sostrades_core.execution_engine.func_manager.func_manager_disc import FunctionManagerDisc
@@ -44,8 +45,13 @@ class Study(StudyManager):
             energy_invest_input_in_abs_value=True,
             execution_engine=None,
             main_study: bool = True,
+            n_processes: int = 1,
     ):
         self.main_study = main_study
+        # with more than one process, the run starts with iterations where the techno disciplines are executed in
+        # parallel threads before the streams, and the disciplines of each Newton iteration of the MDA are executed
+        # in parallel threads
+        self.n_processes = n_processes
         self.year_start = year_start
         self.year_end = year_end
         self.time_step = time_step
@@ -98,7 +104,7 @@ class Study(StudyManager):
             f'{self.study_name}.epsilon0': 1.0,
             f'{self.study_name}.max_mda_iter': 50,
             f'{self.study_name}.tolerance': 1.0e-7,
-            f'{self.study_name}.n_processes': 1,
+            f'{self.study_name}.n_processes': self.n_processes,
             f'{self.study_name}.linearization_mode': 'adjoint',
             f'{self.study_name}.sub_mda_class': 'GSPureNewtonMDA',
         }
@@ -106,6 +112,11 @@ class Study(StudyManager):
 
         return values_dict_list
 
+    def run(self, *args, **kwargs):
+        if self.n_processes > 1:
+            run_parallel_techno_iterations(self.execution_engine, self.n_processes)
+        return super().run(*args, **kwargs)
+
     def specific_check_inputs(self):
         """
         Specific check of years column
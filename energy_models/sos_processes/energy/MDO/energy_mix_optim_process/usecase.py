@@ -14,6 +14,7 @@ limitations under the License.
 
 '''
 from energy_models.core.energy_study_manager import DEFAULT_TECHNO_DICT
+from energy_models.glossaryenergy import GlossaryEnergy
 from energy_models.sos_processes.energy.MDA.energy_mix_optim_sub_process.usecase import Study as subStudy
 from sostrades_core.execution_engine.func_manager.func_manager_disc import FunctionManagerDisc
 from sostrades_core.study_manager.study_manager import StudyManager
@@ -27,7 +28,9 @@ class Study(StudyManager):
             file_path=__file__,
             execution_engine=None,
             run_usecase=False,
-            use_utilisation_ratio: bool = False
+            use_utilisation_ratio: bool = False,
+            year_start=GlossaryEnergy.YearStartDefault,
+            year_end=GlossaryEnergy.YearEndDefault,
     ):
         super().__init__(
             file_path=file_path,
@@ -37,9 +40,12 @@ class Study(StudyManager):
         self.optim_name = 'MDO'
         self.techno_dict = DEFAULT_TECHNO_DICT
         self.use_utilisation_ratio = use_utilisation_ratio
+        self.year_start = year_start
+        self.year_end = year_end
 
     def setup_usecase(self, study_folder_path=None):
-        data_usecase = subStudy(techno_dict=self.techno_dict, use_utilisation_ratio=self.use_utilisation_ratio)
+        data_usecase = subStudy(year_start=self.year_start, year_end=self.year_end, techno_dict=self.techno_dict,
+                                use_utilisation_ratio=self.use_utilisation_ratio)
         data_usecase.study_name = f'{self.study_name}.{self.optim_name}'
         data = data_usecase.setup_usecase()
 
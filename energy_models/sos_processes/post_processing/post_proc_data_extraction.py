@@ -0,0 +1,236 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+from weakref import WeakKeyDictionary
+
+import numpy as np
+import pandas as pd
+
+from energy_models.core.techno_type.compute_cache import compute_digest
+from energy_models.glossaryenergy import GlossaryEnergy
+
+# full names of the data manager values the techno tables of each execution engine are built from by
+# (namespace, kind), collected once per execution engine
+_techno_sources = WeakKeyDictionary()
+# techno tables of each execution engine by (namespace, kind) with the digest of the values they were built from,
+# the tables of an execution engine are released with it
+_techno_tables = WeakKeyDictionary()
+
+
+def get_techno_sources(execution_engine, namespace, kind, collect_function):
+    '''
+    Return the sources of a techno table collected by collect_function : the full names of its values and the
+    technology lists they were collected for, collected again only if one of these lists has changed
+    '''
+    engine_sources = _techno_sources.setdefault(execution_engine, {})
+    key = (namespace, kind)
+    sources = engine_sources.get(key)
+    if sources is None or any(execution_engine.dm.get_value(list_name) != list_value
+                              for list_name, list_value in sources['lists'].items()):
+        sources = collect_function()
+        engine_sources[key] = sources
+    return sources
+
+
+def get_cached_techno_table(execution_engine, namespace, kind, source_values, build_function):
+    '''
+    Return the techno table built from source_values, built again only if the digest of the source values
+    differs from the one of the cached table (values modified in place included)
+    '''
+    engine_tables = _techno_tables.setdefault(execution_engine, {})
+    key = (namespace, kind)
+    digest = compute_digest(*source_values)
+    entry = engine_tables.get(key)
+    if entry is not None and entry[0] == digest:
+        return entry[1]
+
+    techno_table = build_function()
+    engine_tables[key] = (digest, techno_table)
+    return techno_table
+
+
+def clear_techno_tables():
+    _techno_sources.clear()
+    _techno_tables.clear()
+
+
+def get_CO2_per_use(data_fuel_dict, nb_years):
+    '''
+    CO2 emitted by the use of the energy in kg/kWh
+    '''
+    CO2_per_use = np.zeros(nb_years)
+    if GlossaryEnergy.CO2PerUse in data_fuel_dict and 'high_calorific_value' in data_fuel_dict:
+        if data_fuel_dict['CO2_per_use_unit'] == 'kg/kg':
+            CO2_per_use = np.ones(nb_years) * data_fuel_dict[GlossaryEnergy.CO2PerUse] / data_fuel_dict[
+                'high_calorific_value']
+        elif data_fuel_dict['CO2_per_use_unit'] == 'kg/kWh':
+            CO2_per_use = np.ones(nb_years) * data_fuel_dict[GlossaryEnergy.CO2PerUse]
+    return CO2_per_use
+
+
+def get_stream_techno_table(execution_engine, namespace):
+    '''
+    Columnar table of the techno outputs of the stream discipline at namespace, one row per (techno, year)
+    All the techno data are read from the data manager by their full names, collected once per execution engine,
+    the table is cached until the digest of their values changes
+    Columns are energy, techno, years, production (TWh), invest, CO2_from_production, CO2_per_use,
+    CO2_after_use (kg/kWh), price_per_kWh, price_per_kWh_wotaxes, the detailed price parts and
+    the CO2_from_{emission}_consumption of each emission type of the technos
+    '''
+    dm = execution_engine.dm
+
+    def collect_stream_sources():
+        energy_disc = dm.get_disciplines_with_name(namespace)[0]
+        techno_list_name = energy_disc.get_input_var_full_name(GlossaryEnergy.techno_list)
+        names = [techno_list_name] + [energy_disc.get_input_var_full_name(name) for name in [
+            GlossaryEnergy.YearStart, GlossaryEnergy.YearEnd, GlossaryEnergy.CO2TaxesValue]]
+        techno_list = dm.get_value(techno_list_name)
+        for techno in techno_list:
+            techno_disc = dm.get_disciplines_with_name(f'{namespace}.{techno}')[0]
+            names += [techno_disc.get_input_var_full_name(name) for name in [
+                'scaling_factor_techno_production', GlossaryEnergy.InvestLevelValue, 'scaling_factor_invest_level',
+                'data_fuel_dict']]
+            names += [techno_disc.get_output_var_full_name(name) for name in [
+                GlossaryEnergy.TechnoProductionValue, 'CO2_emissions_detailed', GlossaryEnergy.TechnoPricesValue,
+                GlossaryEnergy.TechnoDetailedPricesValue]]
+        return {'energy': energy_disc.mdo_discipline_wrapp.wrapper.energy_name, 'names': names,
+                'lists': {techno_list_name: techno_list}}
+
+    sources = get_techno_sources(execution_engine, namespace, 'stream', collect_stream_sources)
+    energy = sources['energy']
+    source_values = [dm.get_value(name) for name in sources['names']]
+    techno_list, year_start, year_end, CO2_taxes = source_values[:4]
+    nb_techno_values = 8
+    techno_values = [source_values[i:i + nb_techno_values]
+                     for i in range(4, len(source_values), nb_techno_values)]
+
+    def build_techno_table():
+        years = np.arange(year_start, year_end + 1)
+        # Gather all the possible emission types
+        other_emission_type = []
+        for techno, values in zip(techno_list, techno_values):
+            scaling_factor_techno_production, invest_level, scaling_factor_invest_level, data_fuel_dict, \
+                techno_production, carbon_emissions, techno_prices, techno_detailed_prices = values
+            other_emission_type += [col for col in carbon_emissions.columns if col not in [
+                GlossaryEnergy.Years, 'production', techno] and col not in other_emission_type]
+
+        columns = {name: [] for name in ['energy', 'techno', GlossaryEnergy.Years, 'production',
+                                         GlossaryEnergy.InvestValue, 'CO2_from_production', GlossaryEnergy.CO2PerUse,
+                                         'CO2_after_use', 'price_per_kWh', 'price_per_kWh_wotaxes', 'price',
+                                         'CAPEX_Part', 'OPEX_Part', 'CO2Tax_Part', GlossaryEnergy.CO2Tax]}
+        columns.update({f'CO2_from_{other_emission}_consumption': [] for other_emission in other_emission_type})
+        for techno, values in zip(techno_list, techno_values):
+            scaling_factor_techno_production, invest_level, scaling_factor_invest_level, data_fuel_dict, \
+                techno_production, carbon_emissions, techno_prices, techno_detailed_prices = values
+            CO2_per_use = get_CO2_per_use(data_fuel_dict, len(carbon_emissions[GlossaryEnergy.Years]))
+            columns['energy'].append(np.full(len(years), energy, dtype=object))
+            columns['techno'].append(np.full(len(years), techno, dtype=object))
+            columns[GlossaryEnergy.Years].append(years)
+            columns['production'].append(
+                techno_production[f'{energy} (TWh)'].values * scaling_factor_techno_production)
+            columns[GlossaryEnergy.InvestValue].append(
+                invest_level[GlossaryEnergy.InvestValue].values * scaling_factor_invest_level)
+            columns['CO2_from_production'].append(carbon_emissions['production'].values)
+            columns[GlossaryEnergy.CO2PerUse].append(CO2_per_use)
+            columns['CO2_after_use'].append(CO2_per_use + carbon_emissions[techno].values)
+            columns['price_per_kWh'].append(techno_prices[techno].values)
+            columns['price_per_kWh_wotaxes'].append(techno_prices[f'{techno}_wotaxes'].values)
+            columns['price'].append(techno_detailed_prices[techno].values)
+            for price_part in ['CAPEX_Part', 'OPEX_Part', 'CO2Tax_Part']:
+                columns[price_part].append(techno_detailed_prices[price_part].values)
+            columns[GlossaryEnergy.CO2Tax].append(CO2_taxes[GlossaryEnergy.CO2Tax].values)
+            for other_emission in other_emission_type:
+                columns[f'CO2_from_{other_emission}_consumption'].append(
+                    carbon_emissions[other_emission].values if other_emission in carbon_emissions
+                    else np.zeros(len(years)))
+
+        return pd.DataFrame({name: np.concatenate(values) if values else [] for name, values in columns.items()})
+
+    return get_cached_techno_table(execution_engine, namespace, 'stream', source_values, build_techno_table)
+
+
+def get_energy_mix_techno_table(execution_engine, namespace):
+    '''
+    Columnar table of the techno prices and productions of the energies of the energy mix at namespace,
+    one row per (techno, year), biomass dry excepted
+    All the techno data are read from the data manager by their full names, collected once per execution engine,
+    the table is cached until the digest of their values changes
+    Columns are energy, techno, years, production (TWh) and the detailed price parts
+    '''
+    dm = execution_engine.dm
+
+    def collect_energy_mix_sources():
+        energy_list_name = dm.get_disciplines_with_name(namespace)[0].get_input_var_full_name(
+            GlossaryEnergy.energy_list)
+        lists = {energy_list_name: dm.get_value(energy_list_name)}
+        energy_names = []
+        for energy in lists[energy_list_name]:
+            if GlossaryEnergy.biomass_dry in energy:
+                continue
+            techno_list_name = f'{namespace}.{energy}.technologies_list'
+            lists[techno_list_name] = dm.get_value(techno_list_name)
+            energy_names.append((energy, techno_list_name, f'{namespace}.{energy}.energy_production_detailed',
+                                 [f'{namespace}.{energy}.{techno}.techno_detailed_prices'
+                                  for techno in lists[techno_list_name]]))
+        return {'energy_names': energy_names, 'lists': lists}
+
+    sources = get_techno_sources(execution_engine, namespace, 'energy_mix', collect_energy_mix_sources)
+    energy_values = [(energy, dm.get_value(techno_list_name), dm.get_value(production_name),
+                      [dm.get_value(prices_name) for prices_name in prices_names])
+                     for energy, techno_list_name, production_name, prices_names in sources['energy_names']]
+    source_values = [value for energy, techno_list, production, prices in energy_values
+                     for value in [techno_list, production] + prices]
+
+    def build_techno_table():
+        columns = {name: [] for name in ['energy', 'techno', GlossaryEnergy.Years, 'production', 'price',
+                                         'CAPEX_Part', 'OPEX_Part', 'CO2Tax_Part']}
+        for energy, techno_list, energy_production, techno_detailed_prices in energy_values:
+            production_columns = {col.replace(energy, '').replace('(TWh)', '').strip(): col
+                                  for col in energy_production.columns if col != GlossaryEnergy.Years}
+            for techno, price_details in zip(techno_list, techno_detailed_prices):
+                years = price_details[GlossaryEnergy.Years].values
+                production = pd.Series(energy_production[production_columns[techno]].values,
+                                       index=energy_production[GlossaryEnergy.Years].values)
+                columns['energy'].append(np.full(len(years), energy, dtype=object))
+                columns['techno'].append(np.full(len(years), techno, dtype=object))
+                columns[GlossaryEnergy.Years].append(years)
+                columns['production'].append(production.reindex(years).values)
+                columns['price'].append(price_details[techno].values)
+                for price_part in ['CAPEX_Part', 'OPEX_Part', 'CO2Tax_Part']:
+                    columns[price_part].append(price_details[price_part].values)
+
+        return pd.DataFrame({name: np.concatenate(values) if values else [] for name, values in columns.items()})
+
+    return get_cached_techno_table(execution_engine, namespace, 'energy_mix', source_values, build_techno_table)
+
+
+def get_techno_table_at_year(techno_table, year):
+    '''
+    Rows of the techno table at year, one per techno in the table order
+    '''
+    return techno_table[techno_table[GlossaryEnergy.Years] == year]
+
+
+def get_techno_multilevel_df(techno_table, columns):
+    '''
+    Dataframe indexed by (energy, techno) with the years arrays of the columns of the techno table in its cells
+    '''
+    technos = techno_table[['energy', 'techno']].drop_duplicates()
+    nb_technos = len(technos)
+    multilevel_df = pd.DataFrame(
+        {column: list(techno_table[column].values.reshape(nb_technos, -1)) if nb_technos > 0 else []
+         for column in columns},
+        index=pd.MultiIndex.from_frame(technos, names=['energy', 'techno']), dtype=object)
+    return multilevel_df
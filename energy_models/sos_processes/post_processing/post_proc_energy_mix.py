@@ -15,7 +15,8 @@ limitations under the License.
 '''
 from plotly import figure_factory as ff
 
-from energy_models.glossaryenergy import GlossaryEnergy
+from energy_models.sos_processes.post_processing.post_proc_data_extraction import get_energy_mix_techno_table, \
+    get_techno_table_at_year
 from sostrades_core.tools.post_processing.charts.chart_filter import ChartFilter
 from sostrades_core.tools.post_processing.plotly_native_charts.instantiated_plotly_native_chart import \
     InstantiatedPlotlyNativeChart
@@ -53,36 +54,15 @@ def get_figures_table(table, title):
     return new_chart
 
 
-def get_techno_comparision_data(execution_engine, namespace, year):
+def get_techno_comparision_data(execution_engine, namespace, year, techno_table=None):
     '''
     Extracting Capex, Opex, CO2_Tax and total price from data manager for all technologies in the techno list
     '''
 
     table_list = []
-    disc = execution_engine.dm.get_disciplines_with_name(namespace)
-    disc_input = disc[0].get_sosdisc_inputs()
-    energy_list = disc_input[GlossaryEnergy.energy_list]
-
-    techno_list = []
-    EnergyDict = {}
-    techno_production_dict = {}
-    for energ in energy_list:
-        var_f_name = f"{namespace}.{energ}.technologies_list"
-        var_energyproduction_name = f"{namespace}.{energ}.energy_production_detailed"
-
-        if GlossaryEnergy.biomass_dry not in var_f_name:
-            EnergyDict[f"{energ}"] = {}
-            loc_techno_list = execution_engine.dm.get_value(var_f_name)
-            result = [f"{energ}." + direction for direction in loc_techno_list]
-            techno_list.extend(result)
-            EnergyDict[f"{energ}"]['TechnoName'] = loc_techno_list
-            loc_energyproduction_df = execution_engine.dm.get_value(var_energyproduction_name)
-            production_filtereddata = loc_energyproduction_df[loc_energyproduction_df[GlossaryEnergy.Years] == year]
-            for col in production_filtereddata.columns:
-                if col != GlossaryEnergy.Years:
-                    production_techno_name = col.replace(energ, '').replace('(TWh)', '').strip()
-                    prod_value = production_filtereddata[col].iloc[0]
-                    techno_production_dict[production_techno_name] = prod_value
+    if techno_table is None:
+        techno_table = get_energy_mix_techno_table(execution_engine, namespace)
+    techno_data = get_techno_table_at_year(techno_table, year)
 
     capex_list = []
     opex_list = []
@@ -96,7 +76,7 @@ def get_techno_comparision_data(execution_engine, namespace, year):
     average_CO2tax_list = []
     average_energy_costs_List = []
 
-    for energyname in EnergyDict.keys():
+    for energyname, energy_data in techno_data.groupby('energy', sort=False):
         total_stream_production = 0
         capex_average_price = 0
         opex_average_price = 0
@@ -104,21 +84,16 @@ def get_techno_comparision_data(execution_engine, namespace, year):
         energy_average_price = 0
         energy_name_list.append(energyname)
 
-        for techno in EnergyDict[energyname]['TechnoName']:
-            techno_prices_f_name = f"{namespace}.{energyname}.{techno}.techno_detailed_prices"  # "energy_detailed_techno_prices" for Hydrogen and Fuel
-            price_details = execution_engine.dm.get_value(techno_prices_f_name)
+        for techno, capex_price, opex_price, CO2tax_price, price, production in zip(
+                energy_data['techno'], energy_data['CAPEX_Part'], energy_data['OPEX_Part'],
+                energy_data['CO2Tax_Part'], energy_data['price'], energy_data['production']):
             techno_name_list.append(techno)
-            filtereddata = price_details[price_details[GlossaryEnergy.Years] == year]
-            capex_price = filtereddata['CAPEX_Part'].iloc[0]
-            opex_price = filtereddata['OPEX_Part'].iloc[0]
-            CO2tax_price = filtereddata['CO2Tax_Part'].iloc[0]
-            price = filtereddata[techno].iloc[0]
-
-            total_stream_production = total_stream_production + techno_production_dict[techno]
-            capex_average_price = capex_average_price + capex_price * techno_production_dict[techno]
-            opex_average_price = opex_average_price + opex_price * techno_production_dict[techno]
-            CO2tax_average_price = CO2tax_average_price + CO2tax_price * techno_production_dict[techno]
-            energy_average_price = energy_average_price + price * techno_production_dict[techno]
+
+            total_stream_production = total_stream_production + production
+            capex_average_price = capex_average_price + capex_price * production
+            opex_average_price = opex_average_price + opex_price * production
+            CO2tax_average_price = CO2tax_average_price + CO2tax_price * production
+            energy_average_price = energy_average_price + price * production
 
             capex_price_percentage = capex_price * 100 / price
             opex_price_percentage = opex_price * 100 / price
@@ -197,8 +172,10 @@ def post_processings(execution_engine, namespace, filters):
         absolute_value_table = []
         average_value_table = []
         if f'{energy} Figures table' in graphs_list:  #
+            # all the techno data of the tables are extracted once
+            techno_table = get_energy_mix_techno_table(execution_engine, namespace)
             for year in YEAR_COMPARISON:
-                new_table = get_techno_comparision_data(execution_engine, namespace, year)
+                new_table = get_techno_comparision_data(execution_engine, namespace, year, techno_table=techno_table)
                 # new_table = get_figures_table(price_comparision_table_data, str(year))
                 absolute_value_table.append(new_table[0])
                 average_value_table.append(new_table[1])
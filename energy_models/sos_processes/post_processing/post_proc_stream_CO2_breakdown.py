@@ -21,6 +21,8 @@ from plotly import figure_factory as ff
 from plotly import graph_objects as go
 
 from energy_models.glossaryenergy import GlossaryEnergy
+from energy_models.sos_processes.post_processing.post_proc_data_extraction import get_stream_techno_table, \
+    get_techno_multilevel_df, get_techno_table_at_year
 from sostrades_core.tools.post_processing.charts.chart_filter import ChartFilter
 from sostrades_core.tools.post_processing.plotly_native_charts.instantiated_plotly_native_chart import \
     InstantiatedPlotlyNativeChart
@@ -61,27 +63,25 @@ def get_figures_table(table, title):
     return new_chart
 
 
-def get_comparision_data(execution_engine, namespace, year):
+def get_comparision_data(execution_engine, namespace, year, techno_table=None):
     '''
     Extracting Capex, Opex, CO2_Tax and total price from data manager for all technologies in the techno list
     '''
-
-    var_f_name = f"{namespace}.technologies_list"
-    techno_list = execution_engine.dm.get_value(var_f_name)
+    if techno_table is None:
+        techno_table = get_stream_techno_table(execution_engine, namespace)
+    techno_data = get_techno_table_at_year(techno_table, year)
+    techno_list = list(techno_table['techno'].unique())
 
     capex_list = []
     opex_list = []
     CO2tax_list = []
     energy_costs_List = []
     for techno in techno_list:
-        techno_prices_f_name = f"{namespace}.{techno}.techno_detailed_prices"  # "energy_detailed_techno_prices" for Hydrogen and Fuel
-        price_details = execution_engine.dm.get_value(techno_prices_f_name)
-
-        filtereddata = price_details[price_details[GlossaryEnergy.Years] == year]  # Filtering data for a year of 2023
+        filtereddata = techno_data[techno_data['techno'] == techno]  # Filtering data for a year of 2023
         capex_price = filtereddata['CAPEX_Part'].iloc[0]
         opex_price = filtereddata['OPEX_Part'].iloc[0]
         CO2tax_price = filtereddata['CO2Tax_Part'].iloc[0]
-        price = filtereddata[techno].iloc[0]
+        price = filtereddata['price'].iloc[0]
 
         capex_price_percentage = capex_price * 100 / price
         opex_price_percentage = opex_price * 100 / price
@@ -121,35 +121,39 @@ def post_processings(execution_engine, namespace, filters):
     # ----
 
     energy = execution_engine.dm.get_disciplines_with_name(namespace)[0].mdo_discipline_wrapp.wrapper.energy_name
+    # all the techno data of the charts are extracted once
+    techno_table = get_stream_techno_table(execution_engine, namespace)
     if f'{energy} Figures table' in graphs_list:
         for year in YEAR_COMPARISON:
-            new_table = get_comparision_data(execution_engine, namespace, year)
+            new_table = get_comparision_data(execution_engine, namespace, year, techno_table=techno_table)
             # new_table = get_figures_table(price_comparision_table_data, str(year))
             instanciated_charts.append(new_table)
 
     if f'{energy} CO2 intensity' in graphs_list:
         chart_name = f'{energy} CO2 intensity summary'
         new_chart = get_chart_green_technologies(
-            execution_engine, namespace, energy_name=energy, chart_name=chart_name)
+            execution_engine, namespace, energy_name=energy, chart_name=chart_name, techno_table=techno_table)
         if new_chart is not None:
             instanciated_charts.append(new_chart)
 
         chart_name = f'{energy} CO2 intensity by years'
         new_chart = get_chart_green_technologies(
-            execution_engine, namespace, energy_name=energy, chart_name=chart_name, summary=False)
+            execution_engine, namespace, energy_name=energy, chart_name=chart_name, summary=False,
+            techno_table=techno_table)
         if new_chart is not None:
             instanciated_charts.append(new_chart)
     # ---
     if f'{energy} CO2 breakdown sankey' in graphs_list:
         chart_name = f'{energy} CO2 breakdown sankey summary'
         new_chart = get_chart_Energy_CO2_breakdown_sankey(
-            execution_engine, namespace, energy_name=energy, chart_name=chart_name)
+            execution_engine, namespace, energy_name=energy, chart_name=chart_name, techno_table=techno_table)
         if new_chart is not None:
             instanciated_charts.append(new_chart)
 
         chart_name = f'{energy} CO2 breakdown sankey by years'
         new_chart = get_chart_Energy_CO2_breakdown_sankey(
-            execution_engine, namespace, energy_name=energy, chart_name=chart_name, summary=False)
+            execution_engine, namespace, energy_name=energy, chart_name=chart_name, summary=False,
+            techno_table=techno_table)
         if new_chart is not None:
             instanciated_charts.append(new_chart)
 
@@ -157,21 +161,26 @@ def post_processings(execution_engine, namespace, filters):
 
 
 def get_chart_green_technologies(execution_engine, namespace, energy_name, chart_name='Technologies CO2 intensity',
-                                 summary=True):
+                                 summary=True, techno_table=None):
     '''! Function to create the green_techno/_energy scatter chart
     @param execution_engine: Execution engine object from which the data is gathered
     @param namespace: String containing the namespace to access the data
     @param chart_name:String, title of the post_proc
     @param energy_name:String, name of the energy that the technologies produce
     @param summary:Boolean, switch from summary (True) to detailed by years via sliders (False)
+    @param techno_table: DataFrame, techno table of the namespace, extracted if None
 
     @return new_chart: InstantiatedPlotlyNativeChart Scatter plot
     '''
 
     # Prepare data
+    if techno_table is None:
+        techno_table = get_stream_techno_table(execution_engine, namespace)
     multilevel_df, years = get_multilevel_df(
         execution_engine, namespace, columns=['price_per_kWh', 'price_per_kWh_wotaxes',
-                                              'CO2_per_kWh', 'production', GlossaryEnergy.InvestValue])
+                                              'CO2_per_kWh', 'production', GlossaryEnergy.InvestValue],
+        techno_table=techno_table)
+    CO2_taxes = techno_table[GlossaryEnergy.CO2Tax].values[:len(years)]
     # Create Figure
     fig = go.Figure()
     # Get min and max CO2 emissions for colorscale and max of production for
@@ -188,10 +197,7 @@ def get_chart_green_technologies(execution_engine, namespace, energy_name, chart
         # Create a graph to aggregate the informations on all years
         price_per_kWh, price_per_kWh_wotaxes, CO2_per_kWh, label, production, invest, total_CO2 = [
         ], [], [], [], [], [], []
-        energy_disc = execution_engine.dm.get_disciplines_with_name(namespace)[
-            0]
-        CO2_taxes, CO2_taxes_array = energy_disc.get_sosdisc_inputs(GlossaryEnergy.CO2TaxesValue)[
-            GlossaryEnergy.CO2Tax].values, []
+        CO2_taxes_array = []
         for i, row in multilevel_df.iterrows():
             # skip techno that do not produce the selected energy
             if i[0] != energy_name:
@@ -238,10 +244,7 @@ def get_chart_green_technologies(execution_engine, namespace, energy_name, chart
             ################
             price_per_kWh, price_per_kWh_wotaxes, CO2_per_kWh, label, production, invest, total_CO2 = [
             ], [], [], [], [], [], []
-            energy_disc = execution_engine.dm.get_disciplines_with_name(namespace)[
-                0]
-            CO2_taxes, CO2_taxes_array = energy_disc.get_sosdisc_inputs(GlossaryEnergy.CO2TaxesValue)[
-                GlossaryEnergy.CO2Tax].values, []
+            CO2_taxes_array = []
             for i, row in multilevel_df.iterrows():
                 # skip techno that do not produce the selected energy
                 if i[0] != energy_name:
@@ -308,74 +311,27 @@ def get_chart_green_technologies(execution_engine, namespace, energy_name, chart
     return new_chart
 
 
-def get_multilevel_df(execution_engine, namespace, columns=None):
+def get_multilevel_df(execution_engine, namespace, columns=None, techno_table=None):
     '''! Function to create the dataframe with all the data necessary for the graphs in a multilevel [energy, technologies]
     @param execution_engine: Current execution engine object, from which the data is extracted
     @param namespace: Namespace at which the data can be accessed
+    @param techno_table: DataFrame, techno table of the namespace, extracted if None
 
     @return multilevel_df: Dataframe
     :param columns:
     :type columns:
     '''
+    if techno_table is None:
+        techno_table = get_stream_techno_table(execution_engine, namespace)
     # Construct a DataFrame to organize the data on two levels: energy and
-    # techno
-    idx = pd.MultiIndex.from_tuples([], names=['energy', 'techno'])
-    multilevel_df = pd.DataFrame(
-        index=idx,
-        columns=['production', GlossaryEnergy.InvestValue, 'CO2_per_kWh', 'price_per_kWh', 'price_per_kWh_wotaxes'])
-    energy_list = [execution_engine.dm.get_disciplines_with_name(namespace)[
-                       0].mdo_discipline_wrapp.wrapper.energy_name]
-    for energy in energy_list:
-        energy_disc = execution_engine.dm.get_disciplines_with_name(
-            f'{namespace}')[0]
-        techno_list = energy_disc.get_sosdisc_inputs(GlossaryEnergy.techno_list)
-        for techno in techno_list:
-            techno_disc = execution_engine.dm.get_disciplines_with_name(
-                f'{namespace}.{techno}')[0]
-            production_techno = techno_disc.get_sosdisc_outputs(
-                GlossaryEnergy.TechnoProductionValue)[f'{energy} (TWh)'].values * \
-                                techno_disc.get_sosdisc_inputs(
-                                    'scaling_factor_techno_production')
-            invest_techno = techno_disc.get_sosdisc_inputs(GlossaryEnergy.InvestLevelValue)[
-                                GlossaryEnergy.InvestValue].values * \
-                            techno_disc.get_sosdisc_inputs('scaling_factor_invest_level')
-            # Calculate total CO2 emissions
-            data_fuel_dict = techno_disc.get_sosdisc_inputs('data_fuel_dict')
-            carbon_emissions = techno_disc.get_sosdisc_outputs(
-                'CO2_emissions_detailed')
-            CO2_per_use = np.zeros(
-                len(carbon_emissions[GlossaryEnergy.Years]))
-            if GlossaryEnergy.CO2PerUse in data_fuel_dict and 'high_calorific_value' in data_fuel_dict:
-                if data_fuel_dict['CO2_per_use_unit'] == 'kg/kg':
-                    CO2_per_use = np.ones(
-                        len(carbon_emissions[GlossaryEnergy.Years])) * data_fuel_dict[GlossaryEnergy.CO2PerUse] / data_fuel_dict[
-                                      'high_calorific_value']
-                elif data_fuel_dict['CO2_per_use_unit'] == 'kg/kWh':
-                    CO2_per_use = np.ones(
-                        len(carbon_emissions[GlossaryEnergy.Years])) * data_fuel_dict[GlossaryEnergy.CO2PerUse]
-            for emission_type in carbon_emissions:
-                if emission_type == techno:
-                    total_carbon_emissions = CO2_per_use + \
-                                             carbon_emissions[techno].values
-            CO2_per_kWh_techno = total_carbon_emissions
-            # Data for scatter plot
-            price_per_kWh_techno = techno_disc.get_sosdisc_outputs(GlossaryEnergy.TechnoPricesValue)[
-                f'{techno}'].values
-            price_per_kWh_wotaxes_techno = techno_disc.get_sosdisc_outputs(GlossaryEnergy.TechnoPricesValue)[
-                f'{techno}_wotaxes'].values
-            idx = pd.MultiIndex.from_tuples(
-                [(f'{energy}', f'{techno}')], names=['energy', 'techno'])
-            columns_techno = ['energy', 'technology',
-                              'production', GlossaryEnergy.InvestValue,
-                              'CO2_per_kWh', 'price_per_kWh',
-                              'price_per_kWh_wotaxes']
-            techno_df = pd.DataFrame([(energy, techno, production_techno, invest_techno, CO2_per_kWh_techno,
-                                       price_per_kWh_techno, price_per_kWh_wotaxes_techno)],
-                                     index=idx, columns=columns_techno)
-            multilevel_df = pd.concat([multilevel_df, techno_df])
-
-    years = np.arange(energy_disc.get_sosdisc_inputs(
-        GlossaryEnergy.YearStart), energy_disc.get_sosdisc_inputs(GlossaryEnergy.YearEnd) + 1, 1)
+    # techno, CO2 per kWh is the CO2 after use
+    multilevel_df = get_techno_multilevel_df(
+        techno_table.rename(columns={'CO2_after_use': 'CO2_per_kWh'}),
+        ['production', GlossaryEnergy.InvestValue, 'CO2_per_kWh', 'price_per_kWh', 'price_per_kWh_wotaxes'])
+    multilevel_df['energy'] = multilevel_df.index.get_level_values('energy')
+    multilevel_df['technology'] = multilevel_df.index.get_level_values('techno')
+
+    years = np.unique(techno_table[GlossaryEnergy.Years].values)
 
     # If columns is not None, return a subset of multilevel_df with selected
     # columns
@@ -385,7 +341,8 @@ def get_multilevel_df(execution_engine, namespace, columns=None):
     return multilevel_df, years
 
 
-def get_chart_Energy_CO2_breakdown_sankey(execution_engine, namespace, chart_name, energy_name, summary=True):
+def get_chart_Energy_CO2_breakdown_sankey(execution_engine, namespace, chart_name, energy_name, summary=True,
+                                          techno_table=None):
     '''! Function to create the CO2 breakdown Sankey diagram
     @param execution_engine: Execution engine object from which the data is gathered
     @param namespace: String containing the namespace to access the data
@@ -395,11 +352,13 @@ def get_chart_Energy_CO2_breakdown_sankey(execution_engine, namespace, chart_nam
     @return new_chart: InstantiatedPlotlyNativeChart a Sankey Diagram
     :param summary:
     :type summary:
+    :param techno_table: techno table of the namespace, extracted if None
+    :type techno_table: DataFrame
     '''
 
     # Prepare data
     multilevel_df, years = get_CO2_breakdown_multilevel_df(
-        execution_engine, namespace)
+        execution_engine, namespace, techno_table=techno_table)
     technologies_list = list(multilevel_df.loc[energy_name].index.values)
     other_emission_type = [col for col in multilevel_df.columns if col not in [
         'energy', 'technology', 'production', 'CO2_from_production', GlossaryEnergy.CO2PerUse, 'CO2_after_use']]
@@ -637,87 +596,25 @@ def get_chart_Energy_CO2_breakdown_sankey(execution_engine, namespace, chart_nam
     return new_chart
 
 
-def get_CO2_breakdown_multilevel_df(execution_engine, namespace):
+def get_CO2_breakdown_multilevel_df(execution_engine, namespace, techno_table=None):
     '''! Function to create the dataframe with all the data necessary for the CO2 breakdown graphs in a multilevel [energy, technologies]
     @param execution_engine: Current execution engine object, from which the data is extracted
     @param namespace: Namespace at which the data can be accessed
+    @param techno_table: DataFrame, techno table of the namespace, extracted if None
 
     @return multilevel_df: Dataframe
     '''
+    if techno_table is None:
+        techno_table = get_stream_techno_table(execution_engine, namespace)
 
-    energy_disc = execution_engine.dm.get_disciplines_with_name(namespace)[0].mdo_discipline_wrapp.wrapper
-    energy_list = [energy_disc.energy_name]
-
-    years = np.arange(energy_disc.get_sosdisc_inputs(
-        GlossaryEnergy.YearStart), energy_disc.get_sosdisc_inputs(GlossaryEnergy.YearEnd) + 1, 1)
+    years = np.unique(techno_table[GlossaryEnergy.Years].values)
     # Construct a DataFrame to organize the data on two levels: energy and
-    # techno
-    idx = pd.MultiIndex.from_tuples([], names=['energy', 'techno'])
+    # techno with all the possible emission types
     columns = ['production', 'CO2_from_production',
                GlossaryEnergy.CO2PerUse, 'CO2_after_use']
-    # Gather all the possible emission types
-    other_emission_type = []
-    for energy in energy_list:
-        techno_list = energy_disc.get_sosdisc_inputs(GlossaryEnergy.techno_list)
-        for techno in techno_list:
-            techno_disc = execution_engine.dm.get_disciplines_with_name(
-                f'{namespace}.{techno}')[0]
-            carbon_emissions = techno_disc.get_sosdisc_outputs(
-                'CO2_emissions_detailed')
-            other_emission_type += [col for col in carbon_emissions.columns if col not in [
-                GlossaryEnergy.Years, 'production', techno]]
-    other_emission_type = list(set(other_emission_type))
-    columns += [f'CO2_from_{other_emission}_consumption' for other_emission in other_emission_type]
-    multilevel_df = pd.DataFrame(
-        index=idx,
-        columns=columns)
-    for energy in energy_list:
-        energy_disc = execution_engine.dm.get_disciplines_with_name(
-            f'{namespace}')[0]
-        techno_list = energy_disc.get_sosdisc_inputs(GlossaryEnergy.techno_list)
-        for techno in techno_list:
-            techno_disc = execution_engine.dm.get_disciplines_with_name(
-                f'{namespace}.{techno}')[0]
-            production_techno = techno_disc.get_sosdisc_outputs(
-                GlossaryEnergy.TechnoProductionValue)[f'{energy} (TWh)'].values * \
-                                techno_disc.get_sosdisc_inputs(
-                                    'scaling_factor_techno_production')
-            # Calculate total CO2 emissions
-            data_fuel_dict = techno_disc.get_sosdisc_inputs('data_fuel_dict')
-            carbon_emissions = techno_disc.get_sosdisc_outputs(
-                'CO2_emissions_detailed')
-            CO2_per_use = np.zeros(
-                len(carbon_emissions[GlossaryEnergy.Years]))
-            if GlossaryEnergy.CO2PerUse in data_fuel_dict and 'high_calorific_value' in data_fuel_dict:
-                if data_fuel_dict['CO2_per_use_unit'] == 'kg/kg':
-                    CO2_per_use = np.ones(
-                        len(carbon_emissions[GlossaryEnergy.Years])) * data_fuel_dict[GlossaryEnergy.CO2PerUse] / data_fuel_dict[
-                                      'high_calorific_value']
-                elif data_fuel_dict['CO2_per_use_unit'] == 'kg/kWh':
-                    CO2_per_use = np.ones(
-                        len(carbon_emissions[GlossaryEnergy.Years])) * data_fuel_dict[GlossaryEnergy.CO2PerUse]
-            CO2_from_other_consumption = dict(
-                zip([f'CO2_from_{other_emission}_consumption' for other_emission in other_emission_type],
-                    [np.zeros(len(years)) for _ in other_emission_type]))
-            for emission_type in carbon_emissions:
-                if emission_type == GlossaryEnergy.Years:
-                    continue
-                elif emission_type == 'production':
-                    CO2_from_production = carbon_emissions[emission_type].values
-                elif emission_type == techno:
-                    total_carbon_emissions = CO2_per_use + \
-                                             carbon_emissions[techno].values
-                else:
-                    CO2_from_other_consumption[f'CO2_from_{emission_type}_consumption'] = carbon_emissions[
-                        emission_type].values
-            CO2_after_use = total_carbon_emissions
-            idx = pd.MultiIndex.from_tuples(
-                [(f'{energy}', f'{techno}')], names=['energy', 'techno'])
-            columns_techno = ['energy', 'technology', 'production', 'CO2_from_production',
-                              GlossaryEnergy.CO2PerUse, 'CO2_after_use'] + list(CO2_from_other_consumption.keys())
-            techno_df = pd.DataFrame([[energy, techno, production_techno, CO2_from_production, CO2_per_use,
-                                       CO2_after_use] + list(CO2_from_other_consumption.values())],
-                                     index=idx, columns=columns_techno)
-            multilevel_df = pd.concat([multilevel_df, techno_df])
+    columns += [col for col in techno_table.columns if col.startswith('CO2_from_') and col.endswith('_consumption')]
+    multilevel_df = get_techno_multilevel_df(techno_table, columns)
+    multilevel_df['energy'] = multilevel_df.index.get_level_values('energy')
+    multilevel_df['technology'] = multilevel_df.index.get_level_values('techno')
 
     return multilevel_df, years
@@ -14,16 +14,13 @@ WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 See the License for the specific language governing permissions and
 limitations under the License.
 '''
-import cProfile
-import pstats
+import os
 import unittest
-from io import StringIO
-from pathlib import Path
 from shutil import rmtree
-from time import sleep
+from tempfile import mkdtemp
 
-from energy_models.sos_processes.energy.MDA.energy_process_v0_mda.usecase import Study
-from sostrades_core.execution_engine.execution_engine import ExecutionEngine
+from energy_models.tests.performances.energy_model_benchmark import DEFAULT_BASELINE_FILE, check_benchmarks, \
+    read_benchmarks, run_benchmarks, write_benchmarks
 
 
 class TestModelPerfo(unittest.TestCase):
@@ -35,61 +32,32 @@ class TestModelPerfo(unittest.TestCase):
         '''
         Initialize third data needed for testing
         '''
-        self.dirs_to_del = []
-        self.namespace = 'MyCase'
-        self.study_name = f'{self.namespace}'
+        self.output_dir = mkdtemp()
 
     def tearDown(self):
+        rmtree(self.output_dir, ignore_errors=True)
 
-        for dir_to_del in self.dirs_to_del:
-            sleep(0.5)
-            if Path(dir_to_del).is_dir():
-                rmtree(dir_to_del)
-        sleep(0.5)
+    def test_01_benchmark_energy_process(self):
+        results = run_benchmarks(year_ends=[2050], usecases=['energy_process_v0_mda'], nb_repeats=1,
+                                 n_processes_list=[1, 2])
 
-    def test_01_multi_scenario_perfos_execute(self):
+        benchmark_kinds = {name.split('/')[1] for name in results['benchmarks']}
+        self.assertSetEqual(benchmark_kinds, {'usecase', 'techno_compute', 'stream_compute', 'energy_mix_compute',
+                                              'jacobian', 'post_processing', 'post_processing_memoized',
+                                              'process_build', 'process_configure', 'parallel_usecase'})
+        for result in results['benchmarks'].values():
+            self.assertGreater(result['time'], 0.)
+            self.assertGreaterEqual(result['peak_memory'], 0.)
 
-        self.name = 'Test'
-        self.ee = ExecutionEngine(self.name)
-        repo = 'energy_models.sos_processes.energy.MDA'
-        builder = self.ee.factory.get_builder_from_process(
-            repo, 'energy_process_v0_mda')
+        output_file = os.path.join(self.output_dir, 'energy_models_benchmark.json')
+        write_benchmarks(results, output_file)
+        self.assertDictEqual(read_benchmarks(output_file)['benchmarks'], results['benchmarks'])
 
-        self.ee.factory.set_builders_to_coupling_builder(builder)
-        self.ee.configure()
-        usecase = Study(execution_engine=self.ee)
-        usecase.study_name = self.name
-        values_dict = usecase.setup_usecase()
-
-        full_values_dict = {}
-        for dict_v in values_dict:
-            full_values_dict.update(dict_v)
-
-        self.ee.load_study_from_input_dict(full_values_dict)
-
-        profil = cProfile.Profile()
-        profil.enable()
-        self.ee.execute()
-        profil.disable()
-        result = StringIO()
-
-        ps = pstats.Stats(profil, stream=result)
-        ps.sort_stats('cumulative')
-        ps.print_stats(1000)
-        result = result.getvalue()
-        # chop the string into a csv-like buffer
-        result = 'ncalls' + result.split('ncalls')[-1]
-        result = '\n'.join([','.join(line.rstrip().split(None, 5))
-                            for line in result.split('\n')])
-
-
-#
-#         with open(join(dirname(__file__), 'performances', 'energy_models_perfos.csv'), 'w+') as f:
-#             #f = open(result.rsplit('.')[0] + '.csv', 'w')
-#             f.write(result)
-#             f.close()
+        check_benchmarks(results, read_benchmarks(DEFAULT_BASELINE_FILE))
 
 
 if '__main__' == __name__:
     cls = TestModelPerfo()
-    cls.test_01_multi_scenario_perfos_execute()
+    cls.setUp()
+    cls.test_01_benchmark_energy_process()
+    cls.tearDown()
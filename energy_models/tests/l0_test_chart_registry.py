@@ -0,0 +1,100 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from energy_models.core.chart_registry import ChartRegistry, compute_post_processing_digest
+
+
+class FakeDiscipline:
+    """
+    Discipline exposing inputs and outputs as the post-processing reads them
+    """
+
+    def __init__(self, inputs_dict, outputs_dict):
+        self.inputs_dict = inputs_dict
+        self.outputs_dict = outputs_dict
+
+    def get_sosdisc_inputs(self):
+        return self.inputs_dict
+
+    def get_sosdisc_outputs(self):
+        return self.outputs_dict
+
+
+class ChartRegistryTestCase(unittest.TestCase):
+    """
+    Lazy chart registry test class
+    """
+
+    def setUp(self):
+        '''
+        Initialize third data needed for testing
+        '''
+        years = np.arange(2020, 2051)
+        self.discipline = FakeDiscipline(
+            {'year_start': 2020, 'invest_level': pd.DataFrame({'years': years, 'invest': np.linspace(1., 2., 31)})},
+            {'techno_prices': pd.DataFrame({'years': years, 'price': np.linspace(50., 80., 31)})})
+        self.built_charts = []
+
+    def get_chart_factory(self, chart_name):
+        def build_chart():
+            self.built_charts.append(chart_name)
+            return chart_name
+
+        return chart_name, build_chart
+
+    def test_01_lazy_and_memoized_charts(self):
+        registry = ChartRegistry()
+        price_factory = self.get_chart_factory('price')
+        production_factory = self.get_chart_factory('production')
+
+        # only the selected charts are built
+        charts = registry.get_charts([price_factory], compute_post_processing_digest(self.discipline))
+        self.assertListEqual(charts, ['price'])
+        self.assertListEqual(self.built_charts, ['price'])
+
+        # already built charts are memoized, the order of the factories is kept
+        charts = registry.get_charts([production_factory, price_factory],
+                                     compute_post_processing_digest(self.discipline))
+        self.assertListEqual(charts, ['production', 'price'])
+        self.assertListEqual(self.built_charts, ['price', 'production'])
+
+        # lists of charts are flattened and None charts dropped
+        charts = registry.get_charts([('several', lambda: ['a', None, 'b']), ('none', lambda: None)],
+                                     compute_post_processing_digest(self.discipline))
+        self.assertListEqual(charts, ['a', 'b'])
+        self.assertEqual(registry.nb_builds, 4)
+
+    def test_02_memo_invalidated_by_data(self):
+        registry = ChartRegistry()
+        price_factory = self.get_chart_factory('price')
+        registry.get_charts([price_factory], compute_post_processing_digest(self.discipline))
+
+        self.discipline.outputs_dict['techno_prices'].loc[10, 'price'] += 1.
+        registry.get_charts([price_factory], compute_post_processing_digest(self.discipline))
+        self.assertListEqual(self.built_charts, ['price', 'price'])
+
+        self.discipline.inputs_dict['year_start'] = 2021
+        registry.get_charts([price_factory], compute_post_processing_digest(self.discipline))
+        registry.get_charts([price_factory], compute_post_processing_digest(self.discipline))
+        self.assertListEqual(self.built_charts, ['price', 'price', 'price'])
+
+
+if '__main__' == __name__:
+    unittest.main()
@@ -21,6 +21,7 @@ from os.path import join, dirname
 import numpy as np
 import pandas as pd
 
+from energy_models.core.consumption_CO2_emissions.consumption_CO2_emissions import ConsumptionCO2Emissions
 from energy_models.core.energy_mix.energy_mix import EnergyMix
 from energy_models.glossaryenergy import GlossaryEnergy
 from sostrades_core.execution_engine.execution_engine import ExecutionEngine
@@ -65,6 +66,11 @@ class CO2EmissionsDiscTestCase(unittest.TestCase):
         self.scaling_factor_energy_consumption = 1000.0
         self.energy_production_detailed = streams_outputs_dict[GlossaryEnergy.EnergyProductionDetailedValue]
 
+        # outputs and gradients of the model before the CO2 columns were gathered into structured arrays
+        with open(join(dirname(__file__), 'data_tests/consumption_CO2_emissions_baseline_values.pkl'),
+                  'rb') as pkl_file:
+            self.baseline_values = pickle.load(pkl_file)
+
     def tearDown(self):
         pass
 
@@ -118,6 +124,39 @@ class CO2EmissionsDiscTestCase(unittest.TestCase):
 #        for graph in graph_list:
 #            graph.to_plotly().show()
 
+    def test_02_CO2_emissions_model_vs_baseline(self):
+        inputs_dict = {
+            GlossaryEnergy.YearStart: self.year_start,
+            GlossaryEnergy.YearEnd: self.year_end,
+            GlossaryEnergy.energy_list: self.energy_list,
+            GlossaryEnergy.ccs_list: self.ccs_list,
+            'scaling_factor_energy_production': self.scaling_factor_energy_production,
+            'scaling_factor_energy_consumption': self.scaling_factor_energy_consumption,
+            GlossaryEnergy.EnergyProductionDetailedValue: self.energy_production_detailed,
+        }
+        for energy in self.energy_list:
+            inputs_dict[f'{energy}.{GlossaryEnergy.CO2PerUse}'] = self.CO2_per_use[energy]
+            inputs_dict[f'{energy}.{GlossaryEnergy.EnergyProductionValue}'] = self.energy_production[energy]
+            inputs_dict[f'{energy}.{GlossaryEnergy.EnergyConsumptionValue}'] = self.energy_consumption[energy]
+        for energy in self.ccs_list:
+            inputs_dict[f'{energy}.{GlossaryEnergy.EnergyProductionValue}'] = self.energy_production[energy]
+
+        # same sequence as the discipline run
+        model = ConsumptionCO2Emissions('ConsumptionCO2Emissions')
+        model.configure_parameters(inputs_dict)
+        model.configure_parameters_update(inputs_dict)
+        CO2_sources, CO2_sinks = model.compute_CO2_emissions()
+        for output_name, output in [('CO2_emissions_by_use_sources', CO2_sources),
+                                    ('CO2_emissions_by_use_sinks', CO2_sinks)]:
+            pd.testing.assert_frame_equal(output, self.baseline_values['outputs'][output_name], rtol=1e-12)
+
+        for gradient_name, gradients in [('gradients_sources', model.compute_grad_CO2_emissions_sources()),
+                                         ('gradients_sinks', model.compute_grad_CO2_emissions_sinks())]:
+            baseline_gradients = self.baseline_values[gradient_name]
+            self.assertListEqual(list(gradients.keys()), list(baseline_gradients.keys()))
+            for key, baseline_gradient in baseline_gradients.items():
+                np.testing.assert_allclose(gradients[key], baseline_gradient, rtol=1e-12, err_msg=key)
+
 
 if '__main__' == __name__:
     cls = CO2EmissionsDiscTestCase()
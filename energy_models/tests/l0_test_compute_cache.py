@@ -0,0 +1,84 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from energy_models.core.techno_type.compute_cache import ComputeCache, compute_digest
+
+
+class ComputeCacheTestCase(unittest.TestCase):
+    """
+    Compute cache test class
+    """
+
+    def setUp(self):
+        '''
+        Initialize third data needed for testing
+        '''
+        self.invest = np.linspace(10., 100., 31)
+        self.nb_computations = 0
+
+    def compute_square(self, values):
+        self.nb_computations += 1
+        return values ** 2
+
+    def test_01_digest(self):
+        key = compute_digest(self.invest, 3, {'lifetime': 20})
+        self.assertEqual(key, compute_digest(self.invest.copy(), 3, {'lifetime': 20}))
+        self.assertEqual(key, compute_digest(pd.Series(self.invest), 3, {'lifetime': 20}))
+        self.assertNotEqual(key, compute_digest(self.invest, 4, {'lifetime': 20}))
+
+        # dicts are hashed item by item, whatever the insertion order and with all the array values
+        techno_infos_dict = {'lifetime': 20, 'capex': np.linspace(1., 2., 2000)}
+        self.assertEqual(compute_digest(techno_infos_dict),
+                         compute_digest({'capex': techno_infos_dict['capex'].copy(), 'lifetime': 20}))
+        modified_capex = techno_infos_dict['capex'].copy()
+        modified_capex[1000] += 1.
+        self.assertNotEqual(compute_digest(techno_infos_dict),
+                            compute_digest({'lifetime': 20, 'capex': modified_capex}))
+
+        # large object arrays are hashed with all their values
+        names = np.array([f'techno_{i}' for i in range(2000)], dtype=object)
+        modified_names = names.copy()
+        modified_names[1000] = 'other_techno'
+        self.assertNotEqual(compute_digest(names), compute_digest(modified_names))
+
+        # a complex step perturbation changes the key
+        complex_invest = self.invest.astype(np.complex128)
+        complex_invest[3] += 1j * 1e-30
+        self.assertNotEqual(compute_digest(self.invest.astype(np.complex128)), compute_digest(complex_invest))
+
+    def test_02_lru_cache(self):
+        cache = ComputeCache(max_size=2)
+        invest_list = [self.invest, 2. * self.invest, 3. * self.invest]
+        for invest in [invest_list[0], invest_list[0], invest_list[1], invest_list[0], invest_list[2],
+                       invest_list[0]]:
+            result = cache.get_or_compute(compute_digest(invest), lambda: self.compute_square(invest))
+            np.testing.assert_array_equal(result, invest ** 2)
+
+        # invest_list[1] is the least recently used entry and has been removed when invest_list[2] was added
+        self.assertEqual(self.nb_computations, 3)
+        stats = cache.get_stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['size']), (3, 3, 2))
+
+        cache.get_or_compute(compute_digest(invest_list[1]), lambda: self.compute_square(invest_list[1]))
+        self.assertEqual(self.nb_computations, 4)
+
+
+if '__main__' == __name__:
+    unittest.main()
@@ -21,6 +21,7 @@ from os.path import join, dirname
 import numpy as np
 import pandas as pd
 
+from energy_models.core.ccus.ccus import CCUS
 from energy_models.core.energy_mix.energy_mix import EnergyMix
 from energy_models.glossaryenergy import GlossaryEnergy
 from sostrades_core.execution_engine.execution_engine import ExecutionEngine
@@ -84,6 +85,18 @@ class CCUSDiscTestCase(unittest.TestCase):
         self.carbon_capture_from_energy_mix = pd.DataFrame(
             data={GlossaryEnergy.Years: years, 'carbon_capture from energy mix (Gt)': 1e-15})
 
+        # outputs and CO2 emissions gradients of the model before the CO2 emissions were computed on a structured array
+        with open(join(dirname(__file__), 'data_tests/ccus_baseline_values.pkl'), 'rb') as pkl_file:
+            self.baseline_values = pickle.load(pkl_file)
+
+    def check_outputs_vs_baseline(self, outputs_dict):
+        for output_name, baseline_value in self.baseline_values['outputs'].items():
+            if isinstance(baseline_value, pd.DataFrame):
+                pd.testing.assert_frame_equal(outputs_dict[output_name].reset_index(drop=True),
+                                              baseline_value.reset_index(drop=True), rtol=1e-12)
+            else:
+                np.testing.assert_allclose(outputs_dict[output_name], baseline_value, rtol=1e-12)
+
     def tearDown(self):
         pass
 
@@ -145,6 +158,8 @@ class CCUSDiscTestCase(unittest.TestCase):
 
         disc = self.ee.dm.get_disciplines_with_name(
             f'{self.name}.{self.model_name}')[0]
+        self.check_outputs_vs_baseline({output_name: disc.get_sosdisc_outputs(output_name)
+                                        for output_name in self.baseline_values['outputs']})
         filters = disc.get_chart_filter_list()
         graph_list = disc.get_post_processing_list(filters)
 
@@ -152,6 +167,46 @@ class CCUSDiscTestCase(unittest.TestCase):
 #        for graph in graph_list:
 #            graph.to_plotly().show()
 
+    def test_02_CCUS_model_vs_baseline(self):
+        inputs_dict = {
+            GlossaryEnergy.YearStart: self.year_start,
+            GlossaryEnergy.YearEnd: self.year_end,
+            GlossaryEnergy.ccs_list: [GlossaryEnergy.carbon_capture, GlossaryEnergy.carbon_storage],
+            'scaling_factor_energy_production': self.scaling_factor_energy_production,
+            'scaling_factor_energy_consumption': self.scaling_factor_energy_consumption,
+            'carbonstorage_limit': 12e6,
+            'carbonstorage_constraint_ref': 12e6,
+            'carbon_capture_from_energy_mix': self.carbon_capture_from_energy_mix,
+            'co2_emissions_needed_by_energy_mix': self.co2_emissions_needed_by_energy_mix,
+        }
+        for energy in [GlossaryEnergy.carbon_capture, GlossaryEnergy.carbon_storage]:
+            inputs_dict[f'{energy}.{GlossaryEnergy.EnergyProductionValue}'] = self.energy_production[energy]
+            inputs_dict[f'{energy}.{GlossaryEnergy.EnergyConsumptionValue}'] = self.energy_consumption[energy]
+            inputs_dict[f'{energy}.{GlossaryEnergy.EnergyPricesValue}'] = self.energy_prices[energy]
+            inputs_dict[f'{energy}.{GlossaryEnergy.EnergyConsumptionWithoutRatioValue}'] = \
+                self.energy_consumption_woratio[energy]
+
+        # same sequence as the discipline run
+        ccus_model = CCUS(GlossaryEnergy.CCUS)
+        ccus_model.configure_parameters(inputs_dict)
+        ccus_model.configure_parameters_update(inputs_dict)
+        ccus_model.compute_CO2_emissions()
+        ccus_model.compute_CCS_price()
+        ccus_model.compute_carbon_storage_constraint()
+        self.check_outputs_vs_baseline({
+            'co2_emissions_ccus': ccus_model.total_co2_emissions,
+            'carbon_storage_by_invest': ccus_model.total_carbon_storage_by_invest,
+            'co2_emissions_ccus_Gt': ccus_model.total_co2_emissions_Gt,
+            'CCS_price': ccus_model.CCS_price,
+            EnergyMix.CARBON_STORAGE_CONSTRAINT: ccus_model.carbon_storage_constraint,
+        })
+
+        # the gradients reuse the state computed by the run
+        dtot_co2_emissions = ccus_model.compute_grad_CO2_emissions()
+        self.assertListEqual(list(dtot_co2_emissions.keys()), list(self.baseline_values['gradients'].keys()))
+        for key, baseline_gradient in self.baseline_values['gradients'].items():
+            np.testing.assert_allclose(dtot_co2_emissions[key], baseline_gradient, rtol=1e-12, err_msg=key)
+
 
 if '__main__' == __name__:
     cls = CCUSDiscTestCase()
@@ -23,6 +23,7 @@ import pandas as pd
 
 from climateeconomics.sos_wrapping.sos_wrapping_agriculture.agriculture.agriculture_mix_disc import \
     AgricultureMixDiscipline
+from energy_models.core.energy_ghg_emissions.energy_ghg_emissions import EnergyGHGEmissions
 from energy_models.core.energy_mix.energy_mix import EnergyMix
 from energy_models.glossaryenergy import GlossaryEnergy
 from sostrades_core.execution_engine.execution_engine import ExecutionEngine
@@ -85,6 +86,10 @@ class GHGEnergyEmissionsDiscTestCase(unittest.TestCase):
                                                                     0.001, 0.3, len(self.years))
                                                                 })
 
+        # outputs and gradients of the model before the GHG emissions were accumulated in a structured array
+        with open(join(dirname(__file__), 'data_tests/energy_ghg_emissions_baseline_values.pkl'), 'rb') as pkl_file:
+            self.baseline_values = pickle.load(pkl_file)
+
     def tearDown(self):
         pass
 
@@ -159,6 +164,56 @@ class GHGEnergyEmissionsDiscTestCase(unittest.TestCase):
 #         for graph in graph_list:
 #             graph.to_plotly().show()
 
+    def test_02_ghgenergy_model_vs_baseline(self):
+        inputs_dict = {
+            GlossaryEnergy.YearStart: self.year_start,
+            GlossaryEnergy.YearEnd: self.year_end,
+            GlossaryEnergy.energy_list: self.energy_list,
+            GlossaryEnergy.ccs_list: self.ccs_list,
+            'scaling_factor_energy_production': self.scaling_factor_energy_production,
+            'scaling_factor_energy_consumption': self.scaling_factor_energy_consumption,
+            GlossaryEnergy.EnergyProductionDetailedValue: self.energy_production_detailed,
+            'GHG_global_warming_potential20': {'CO2': 1.0, 'CH4': 85.0, 'N2O': 290.0},
+            'GHG_global_warming_potential100': {'CO2': 1.0, 'CH4': 28.0, 'N2O': 265.0},
+            'co2_emissions_ccus_Gt': self.co2_emissions_ccus_Gt,
+            'co2_emissions_needed_by_energy_mix': self.co2_emissions_needed_by_energy_mix,
+        }
+        for energy in self.energy_list:
+            inputs_dict[f'{energy}.{GlossaryEnergy.CO2PerUse}'] = self.CO2_per_use[energy]
+            inputs_dict[f'{energy}.{GlossaryEnergy.CH4PerUse}'] = self.CH4_per_use[energy]
+            inputs_dict[f'{energy}.{GlossaryEnergy.N2OPerUse}'] = self.N2O_per_use[energy]
+            inputs_dict[f'{energy}.{GlossaryEnergy.EnergyProductionValue}'] = self.energy_production[energy]
+            inputs_dict[f'{energy}.{GlossaryEnergy.EnergyConsumptionValue}'] = self.energy_consumption[energy]
+        for energy in self.ccs_list:
+            inputs_dict[f'{energy}.{GlossaryEnergy.EnergyProductionValue}'] = self.energy_production[energy]
+
+        # same sequence as the discipline run
+        model = EnergyGHGEmissions('GHGEnergyEmissions')
+        model.configure_parameters(inputs_dict)
+        model.configure_parameters_update(inputs_dict)
+        model.compute_ghg_emissions()
+
+        # same columns in the same order and same sums as the per column implementation
+        baseline_outputs = self.baseline_values['outputs']
+        for output_name, output in [('GHG_total_energy_emissions', model.ghg_total_emissions),
+                                    ('CO2_emissions_sources', model.CO2_sources_Gt),
+                                    ('CO2_emissions_sinks', model.CO2_sinks_Gt),
+                                    ('GWP_emissions', model.gwp_emissions)]:
+            pd.testing.assert_frame_equal(output, baseline_outputs[output_name], rtol=1e-12)
+        self.assertListEqual(list(model.ghg_production_dict.keys()),
+                             list(baseline_outputs['GHG_emissions_per_energy'].keys()))
+        for ghg, ghg_production in baseline_outputs['GHG_emissions_per_energy'].items():
+            pd.testing.assert_frame_equal(model.ghg_production_dict[ghg], ghg_production, rtol=1e-12)
+
+        for gradient_name, gradients in [
+            ('gradients_sources', model.compute_grad_CO2_emissions_sources(self.energy_production_detailed)),
+            ('gradients_total', model.compute_grad_total_co2_emissions(self.energy_production_detailed)),
+            ('gradients_sinks', model.compute_grad_CO2_emissions_sinks())]:
+            baseline_gradients = self.baseline_values[gradient_name]
+            self.assertListEqual(list(gradients.keys()), list(baseline_gradients.keys()))
+            for key, baseline_gradient in baseline_gradients.items():
+                np.testing.assert_allclose(gradients[key], baseline_gradient, rtol=1e-12, err_msg=key)
+
 
 if '__main__' == __name__:
     cls = GHGEnergyEmissionsDiscTestCase()
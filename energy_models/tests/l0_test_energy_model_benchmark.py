@@ -0,0 +1,74 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import unittest
+
+import numpy as np
+
+from energy_models.tests.performances.energy_model_benchmark import compare_benchmarks, measure
+
+
+class EnergyModelBenchmarkTestCase(unittest.TestCase):
+    """
+    Benchmark suite tools test class
+    """
+
+    def setUp(self):
+        '''
+        Initialize third data needed for testing
+        '''
+        self.baseline = {'benchmarks': {'2050/techno_compute/Hydrogen.GaseousHydrogen.PEM':
+                                            {'time': 0.010, 'peak_memory': 2.0},
+                                        '2050/jacobian/Hydrogen.GaseousHydrogen.PEM':
+                                            {'time': 0.0001, 'peak_memory': 2.0},
+                                        '2050/usecase/energy_process_v0_mda':
+                                            {'time': 50.0, 'peak_memory': 500.0}}}
+
+    def test_01_measure(self):
+        nb_setups = []
+        result = measure(lambda values: np.cumsum(values), nb_repeats=3,
+                         setup=lambda: nb_setups.append(1) or (np.ones(100000),))
+
+        # one setup per timed call and one for the traced call
+        self.assertEqual(len(nb_setups), 4)
+        self.assertEqual(result['nb_repeats'], 3)
+        self.assertGreaterEqual(result['time'], result['min_time'])
+        # the cumsum output array is traced
+        self.assertGreaterEqual(result['peak_memory'], 0.8)
+
+        self.assertNotIn('peak_memory', measure(lambda: None, nb_repeats=1, trace_memory=False))
+
+    def test_02_compare_benchmarks(self):
+        results = {'benchmarks': {'2050/techno_compute/Hydrogen.GaseousHydrogen.PEM':
+                                      {'time': 0.015, 'peak_memory': 2.1},
+                                  # above tolerance but below the noise floor
+                                  '2050/jacobian/Hydrogen.GaseousHydrogen.PEM':
+                                      {'time': 0.0005, 'peak_memory': 2.0},
+                                  '2050/usecase/energy_process_v0_mda':
+                                      {'time': 51.0, 'peak_memory': 800.0},
+                                  '2100/usecase/energy_process_v0_mda':
+                                      {'time': 100.0, 'peak_memory': 800.0}}}
+
+        regressions = compare_benchmarks(results, self.baseline, tolerance=0.2)
+        self.assertListEqual([(regression['name'], regression['metric']) for regression in regressions],
+                             [('2050/techno_compute/Hydrogen.GaseousHydrogen.PEM', 'time'),
+                              ('2050/usecase/energy_process_v0_mda', 'peak_memory')])
+        self.assertAlmostEqual(regressions[0]['ratio'], 1.5)
+
+        self.assertListEqual(compare_benchmarks(results, self.baseline, tolerance=1.0), [])
+
+
+if '__main__' == __name__:
+    unittest.main()
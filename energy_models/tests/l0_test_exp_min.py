@@ -0,0 +1,81 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import unittest
+
+import numpy as np
+
+from energy_models.core.exp_min import compute_exp_min
+
+
+class ExpMinTestCase(unittest.TestCase):
+    """
+    Vectorized exponential smooth floor test class
+    """
+
+    def setUp(self):
+        '''
+        Initialize third data needed for testing
+        '''
+        self.min_value = 1.0e-3
+        self.values = np.array([-1.0, -0.5, -1.0e-3, 0.0, 5.0e-4, 1.0e-3 - 1.0e-9, 1.0e-3, 2.0e-3, 10.0])
+
+    def compute_exp_min_loop(self, values, min_value, lower_bound_ratio=-200.0):
+        '''
+        Value by value reference of the smooth floor
+        '''
+        smoothed_values = []
+        for value in values:
+            if value < min_value:
+                value = max(value, lower_bound_ratio * min_value)
+                value = min_value / 10. * (9. + np.exp(value / min_value) * np.exp(-1))
+            smoothed_values.append(value)
+        return np.array(smoothed_values)
+
+    def test_01_exp_min_vs_loop(self):
+        for lower_bound_ratio in [-200.0, np.log(1e-30)]:
+            smoothed_values, _ = compute_exp_min(self.values, self.min_value, lower_bound_ratio)
+            np.testing.assert_allclose(smoothed_values,
+                                       self.compute_exp_min_loop(self.values, self.min_value, lower_bound_ratio),
+                                       rtol=1e-14)
+            # the floor is smooth and never goes below 0.9 * min_value
+            self.assertTrue((smoothed_values >= 0.9 * self.min_value).all())
+
+    def test_02_derivative_vs_complex_step(self):
+        step = 1e-30
+        # values below the lower bound are clipped, their derivative is not checked
+        values = self.values[self.values > -200.0 * self.min_value]
+        _, dsmoothed_values = compute_exp_min(values, self.min_value)
+        smoothed_values, _ = compute_exp_min(values + 1j * step, self.min_value)
+        np.testing.assert_allclose(dsmoothed_values, smoothed_values.imag / step, rtol=1e-10)
+
+    def test_03_no_smoothing_above_min_value(self):
+        values = np.linspace(1.0, 2.0, 5)
+        smoothed_values, dsmoothed_values = compute_exp_min(values, self.min_value)
+        np.testing.assert_array_equal(smoothed_values, values)
+        np.testing.assert_array_equal(dsmoothed_values, np.ones(5))
+
+    def test_04_matrix(self):
+        matrix = np.vstack([self.values, self.values[::-1], np.ones(len(self.values))])
+        smoothed_matrix, dsmoothed_matrix = compute_exp_min(matrix, self.min_value)
+        self.assertTupleEqual(smoothed_matrix.shape, matrix.shape)
+        for line, values in enumerate(matrix):
+            smoothed_values, dsmoothed_values = compute_exp_min(values, self.min_value)
+            np.testing.assert_array_equal(smoothed_matrix[line], smoothed_values)
+            np.testing.assert_array_equal(dsmoothed_matrix[line], dsmoothed_values)
+
+
+if '__main__' == __name__:
+    unittest.main()
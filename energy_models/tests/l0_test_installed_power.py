@@ -0,0 +1,95 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import pickle
+import unittest
+from os.path import join, dirname
+
+import numpy as np
+import pandas as pd
+
+from energy_models.glossaryenergy import GlossaryEnergy
+from energy_models.models.electricity.nuclear.nuclear import Nuclear
+from energy_models.models.electricity.solar_pv.solar_pv import SolarPv
+
+
+def build_electricity_techno(techno_class, full_load_hours=None, dtype=float):
+    '''
+    Electricity techno model with its aging distribution computed from a fixed investment trajectory
+    '''
+    techno_model = techno_class(techno_class.__name__)
+    techno_model.year_start = 2020
+    techno_model.year_end = 2100
+    techno_model.init_dataframes()
+    nb_years = len(techno_model.years)
+    techno_model.techno_infos_dict = {GlossaryEnergy.ConstructionDelay: 3, 'lifetime': 25, 'Opex_percentage': 0.03,
+                                      'WACC': 0.07, 'efficiency': 0.4, 'copper_needs': 1100.}
+    if full_load_hours is not None:
+        techno_model.techno_infos_dict['full_load_hours'] = full_load_hours
+    techno_model.data_energy_dict = {}
+    techno_model.compile_techno_parameters()
+    techno_model.initial_production = 50.
+    techno_model.initial_age_distrib = pd.DataFrame({'age': np.arange(1, 21), 'distrib': np.full(20, 5.)})
+    techno_model.invest_before_ystart = pd.DataFrame({GlossaryEnergy.InvestValue: [1., 2., 3.]})
+    techno_model.cost_details[GlossaryEnergy.InvestValue] = np.linspace(10., 100., nb_years).astype(dtype)
+    techno_model.cost_details[f'Capex_{techno_model.name}'] = np.linspace(900., 600., nb_years)
+    techno_model.compute_primary_energy_production()
+    return techno_model
+
+
+class InstalledPowerTestCase(unittest.TestCase):
+    """
+    Installed power of the electricity technos test class
+    """
+
+    def setUp(self):
+        '''
+        Initialize third data needed for testing
+        '''
+        # installed power and copper consumption of the technos before the installed power was computed
+        # from the production from investments of the aging distribution step
+        with open(join(dirname(__file__), 'data_tests/installed_power_baseline_values.pkl'), 'rb') as pkl_file:
+            self.baseline_values = pickle.load(pkl_file)
+
+    def test_01_installed_power_vs_baseline(self):
+        for techno_class in [SolarPv, Nuclear]:
+            for full_load_hours in [None, 2000.]:
+                techno_model = build_electricity_techno(techno_class, full_load_hours)
+                techno_model.compute_primary_installed_power()
+                techno_model.compute_consumption_and_installed_power()
+
+                baseline_values = self.baseline_values[(techno_class.__name__, full_load_hours)]
+                pd.testing.assert_frame_equal(techno_model.installed_power, baseline_values['installed_power'],
+                                              rtol=1e-13)
+                copper_column = f'{techno_model.COPPER_RESOURCE_NAME} ({techno_model.mass_unit})'
+                np.testing.assert_allclose(techno_model.consumption_detailed[copper_column].values,
+                                           baseline_values['copper_consumption'], rtol=1e-13)
+
+    def test_02_complex_installed_power(self):
+        techno_model = build_electricity_techno(SolarPv, dtype=complex)
+        techno_model.cost_details.loc[7, GlossaryEnergy.InvestValue] += 1e-30j
+        techno_model.compute_primary_energy_production()
+        techno_model.compute_primary_installed_power()
+
+        # the complex step perturbation goes through the new and removed power
+        self.assertTrue(techno_model.installed_power['new_power_production'].values.imag.any())
+        self.assertTrue(techno_model.installed_power['removed_power_production'].values.imag.any())
+        np.testing.assert_allclose(techno_model.installed_power['new_power_production'].values.real,
+                                   self.baseline_values[('SolarPv', None)]['installed_power'][
+                                       'new_power_production'].values, rtol=1e-13)
+
+
+if '__main__' == __name__:
+    unittest.main()
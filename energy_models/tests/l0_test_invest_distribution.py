@@ -0,0 +1,68 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import unittest
+
+import numpy as np
+
+from energy_models.core.investments.invest_distribution import compute_dinvest_distribution_dinvest, \
+    compute_dinvest_distribution_dmix, compute_invest_distribution, get_block_structured_jacobian
+
+
+class InvestDistributionTestCase(unittest.TestCase):
+    """
+    Array based investment distribution test class
+    """
+
+    def setUp(self):
+        '''
+        Initialize third data needed for testing
+        '''
+        rng = np.random.default_rng(42)
+        self.nb_years = 6
+        self.nb_technos = 4
+        self.invest = np.linspace(100., 300., self.nb_years)
+        self.mix = rng.random((self.nb_years, self.nb_technos))
+
+    def test_01_distribution_vs_loop(self):
+        invest_distribution = compute_invest_distribution(self.invest, self.mix)
+        for year in range(self.nb_years):
+            for techno in range(self.nb_technos):
+                self.assertAlmostEqual(invest_distribution[year, techno],
+                                       self.invest[year] * self.mix[year, techno] / sum(self.mix[year]))
+        np.testing.assert_allclose(invest_distribution.sum(axis=1), self.invest, rtol=1e-12)
+
+    def test_02_jacobian_vs_complex_step(self):
+        step = 1e-30
+        dinvest = np.zeros((self.nb_technos, 1, self.nb_years))
+        dinvest[:, 0, :] = compute_dinvest_distribution_dinvest(self.mix).T
+        jac_invest = get_block_structured_jacobian(dinvest)
+        jac_mix = get_block_structured_jacobian(compute_dinvest_distribution_dmix(self.invest, self.mix))
+
+        for year in range(self.nb_years):
+            invest = self.invest.astype(np.complex128)
+            invest[year] += 1j * step
+            distribution = compute_invest_distribution(invest, self.mix)
+            np.testing.assert_allclose(jac_invest[:, year], distribution.imag.T.flatten() / step, rtol=1e-12)
+            for techno in range(self.nb_technos):
+                mix = self.mix.astype(np.complex128)
+                mix[year, techno] += 1j * step
+                distribution = compute_invest_distribution(self.invest, mix)
+                np.testing.assert_allclose(jac_mix[:, techno * self.nb_years + year],
+                                           distribution.imag.T.flatten() / step, rtol=1e-10, atol=1e-12)
+
+
+if '__main__' == __name__:
+    unittest.main()
@@ -0,0 +1,55 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import unittest
+
+import numpy as np
+from scipy.sparse import issparse
+
+from energy_models.core.energy_mix.jacobian_blocks import diagonal_to_sparse
+
+
+class JacobianBlocksTestCase(unittest.TestCase):
+    """
+    Diagonal gradient blocks test class
+    """
+
+    def setUp(self):
+        '''
+        Initialize third data needed for testing
+        '''
+        self.nb_years = 31
+        self.values = np.linspace(1., 2., self.nb_years)
+
+    def test_01_diagonal_to_sparse(self):
+        sparse_block = diagonal_to_sparse(self.values, self.nb_years)
+        self.assertTrue(issparse(sparse_block))
+        # only the diagonal is stored
+        self.assertEqual(sparse_block.nnz, self.nb_years)
+        np.testing.assert_array_equal(sparse_block.toarray(), self.values * np.identity(self.nb_years))
+        # a scalar diagonal is a scaled identity
+        np.testing.assert_array_equal(diagonal_to_sparse(1e3 * 0.95, self.nb_years).toarray(),
+                                      np.identity(self.nb_years) * 1e3 * 0.95)
+
+        # complex step values are kept
+        complex_values = self.values.astype(np.complex128)
+        complex_values[3] += 1j * 1e-30
+        sparse_block = diagonal_to_sparse(complex_values, self.nb_years)
+        self.assertEqual(sparse_block.dtype, np.complex128)
+        self.assertEqual(sparse_block[3, 3].imag, 1e-30)
+
+
+if '__main__' == __name__:
+    unittest.main()
@@ -0,0 +1,116 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import unittest
+
+import numpy as np
+
+from energy_models.core.techno_type.learning_curve import compute_capex_learning_curve, \
+    compute_dcapex_learning_curve_dinvest, compute_dcapex_learning_curve_dparameter
+
+
+class LearningCurveTestCase(unittest.TestCase):
+    """
+    Vectorized capex learning curve test class
+    """
+
+    def setUp(self):
+        '''
+        Initialize third data needed for testing
+        '''
+        self.capex_init = 700.
+        self.expo_factor = -np.log(1. - 0.2) / np.log(2.)
+        self.maximum_learning_capex_ratio = 0.8
+        self.invest_list = np.concatenate((1.e-3 * np.ones(5), np.linspace(50., 600., 26)))
+        self.capacity_factor_ratio = np.linspace(1., 1.2, len(self.invest_list))
+
+    def compute_capex_loop(self, invest_list, invest_sum_init, capacity_factor_ratio=None):
+        '''
+        Year by year reference of the learning curve
+        '''
+        capex_list = []
+        invest_sum = invest_sum_init
+        capex_year = self.capex_init
+        for i, invest in enumerate(invest_list):
+            if invest_sum.real < 10.0 or i == 0:
+                capex_year = self.capex_init
+            else:
+                ratio_invest = (invest_sum + invest) / invest_sum
+                if capacity_factor_ratio is not None:
+                    ratio_invest = ratio_invest * capacity_factor_ratio[i]
+                ratio_invest = ratio_invest ** (-self.expo_factor)
+                if ratio_invest.real < 0.95:
+                    ratio_invest = 0.9 + 0.05 * np.exp(ratio_invest - 0.9)
+                capex_year = capex_year * ratio_invest
+            capex_list.append(capex_year)
+            invest_sum += invest
+
+        return self.capex_init * (self.maximum_learning_capex_ratio + (
+                1.0 - self.maximum_learning_capex_ratio) * np.array(capex_list) / self.capex_init)
+
+    def test_01_capex_vs_loop(self):
+        for invest_sum_init in [0., 5., 1000.]:
+            for capacity_factor_ratio in [None, self.capacity_factor_ratio]:
+                capex = compute_capex_learning_curve(self.invest_list, self.capex_init, invest_sum_init,
+                                                     self.expo_factor, self.maximum_learning_capex_ratio,
+                                                     capacity_factor_ratio)
+                capex_ref = self.compute_capex_loop(self.invest_list, invest_sum_init, capacity_factor_ratio)
+                np.testing.assert_allclose(capex, capex_ref, rtol=1e-12)
+
+    def test_02_dcapex_dinvest_vs_complex_step(self):
+        step = 1e-30
+        for invest_sum_init in [0., 1000.]:
+            for capacity_factor_ratio in [None, self.capacity_factor_ratio]:
+                dcapex_dinvest = compute_dcapex_learning_curve_dinvest(
+                    self.invest_list, self.capex_init, invest_sum_init, self.expo_factor,
+                    self.maximum_learning_capex_ratio, capacity_factor_ratio)
+                for k in range(len(self.invest_list)):
+                    invest_list = self.invest_list.astype(np.complex128)
+                    invest_list[k] += 1j * step
+                    capex = compute_capex_learning_curve(invest_list, self.capex_init, invest_sum_init,
+                                                         self.expo_factor, self.maximum_learning_capex_ratio,
+                                                         capacity_factor_ratio)
+                    np.testing.assert_allclose(dcapex_dinvest[:, k], capex.imag / step, rtol=1e-8, atol=1e-12)
+
+    def test_03_capex_scenarios(self):
+        invest_scenarios = np.vstack([self.invest_list, self.invest_list[::-1], 1.e-3 * np.ones(len(self.invest_list))])
+        for invest_sum_init in [0., 1000.]:
+            capex = compute_capex_learning_curve(invest_scenarios, self.capex_init, invest_sum_init,
+                                                 self.expo_factor, self.maximum_learning_capex_ratio,
+                                                 self.capacity_factor_ratio)
+            self.assertTupleEqual(capex.shape, invest_scenarios.shape)
+            for scenario, invest_list in enumerate(invest_scenarios):
+                np.testing.assert_array_equal(capex[scenario], compute_capex_learning_curve(
+                    invest_list, self.capex_init, invest_sum_init, self.expo_factor,
+                    self.maximum_learning_capex_ratio, self.capacity_factor_ratio))
+
+    def test_04_dcapex_dparameter_vs_complex_step(self):
+        # capex_init = capex_init_0 + dcapex_init * x and invest_sum_init = invest_sum_init_0 + dinvest_sum_init * x
+        step = 1e-30
+        dcapex_init = -3.
+        for invest_sum_init in [5., 1000.]:
+            dinvest_sum_init = invest_sum_init / self.capex_init * dcapex_init
+            dcapex = compute_dcapex_learning_curve_dparameter(self.invest_list, self.capex_init, invest_sum_init,
+                                                              self.expo_factor, dcapex_init, dinvest_sum_init)
+            capex = compute_capex_learning_curve(self.invest_list, self.capex_init + 1j * step * dcapex_init,
+                                                 invest_sum_init + 1j * step * dinvest_sum_init, self.expo_factor,
+                                                 self.maximum_learning_capex_ratio)
+            np.testing.assert_allclose(self.maximum_learning_capex_ratio * dcapex_init +
+                                       (1. - self.maximum_learning_capex_ratio) * dcapex,
+                                       capex.imag / step, rtol=1e-8, atol=1e-12)
+
+
+if '__main__' == __name__:
+    unittest.main()
@@ -0,0 +1,76 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import unittest
+
+import numpy as np
+
+from energy_models.core.stream_type.mix_weights import apply_min_price_fallback, \
+    compute_grad_mix_weights_vs_prod, compute_mix_weights, compute_prod_matrix_wcutoff, \
+    compute_prod_matrix_with_exp_min, compute_prod_total_for_mix_weight
+
+
+class MixWeightsTestCase(unittest.TestCase):
+    """
+    Vectorized mix weights and pricing test class
+    """
+
+    def setUp(self):
+        '''
+        Initialize third data needed for testing
+        '''
+        self.min_prod = 1e-3
+        self.prod_matrix = np.array([[10., 5., 1e-4, 0., 3.],
+                                     [2., 1e-4, 1e-4, 0., 4.],
+                                     [1., 2., -1., 0., 1e-2]])
+        self.prices = np.array([[50., 60., 70., 80., 90.],
+                                [40., 55., 65., 30., 85.],
+                                [45., 50., 60., 30., 95.]])
+
+    def compute_mix_weights_wo_tol(self, prod_matrix):
+        prod_matrix, _ = compute_prod_matrix_with_exp_min(prod_matrix, self.min_prod)
+        return prod_matrix / compute_prod_total_for_mix_weight(prod_matrix, self.min_prod)
+
+    def test_01_grad_mix_weights_vs_complex_step(self):
+        step = 1e-30
+        prod_matrix, dprod_matrix = compute_prod_matrix_with_exp_min(self.prod_matrix, self.min_prod)
+        grad = compute_grad_mix_weights_vs_prod(prod_matrix, dprod_matrix,
+                                                compute_prod_total_for_mix_weight(prod_matrix, self.min_prod))
+        for element in range(self.prod_matrix.shape[0]):
+            complex_prod_matrix = self.prod_matrix.astype(np.complex128)
+            complex_prod_matrix[element] += 1j * step
+            mix_weights = self.compute_mix_weights_wo_tol(complex_prod_matrix)
+            np.testing.assert_allclose(grad[element], mix_weights.imag / step, rtol=1e-8, atol=1e-14)
+
+    def test_02_cutoff_min_price_fallback(self):
+        prod_matrix, dprod_matrix = compute_prod_matrix_wcutoff(self.prod_matrix, self.min_prod)
+        np.testing.assert_array_equal(dprod_matrix, np.where(self.prod_matrix < self.min_prod, 0., 1.))
+        prod_total = compute_prod_total_for_mix_weight(prod_matrix, self.min_prod, exp_min=False)
+        self.assertEqual(prod_total[3], self.min_prod)
+
+        mix_weights = compute_mix_weights(prod_matrix, prod_total)
+        total_prices = (self.prices * mix_weights).sum(axis=0)
+        mix_weights, total_prices, total_prices_wo_taxes = apply_min_price_fallback(
+            self.prices, 0.5 * self.prices, mix_weights, total_prices, total_prices)
+
+        # no production on year 3 : the cheapest techno (first one in case of equality) takes all the mix
+        np.testing.assert_array_equal(mix_weights[:, 3], [0., 1., 0.])
+        self.assertEqual(total_prices[3], 30.)
+        self.assertEqual(total_prices_wo_taxes[3], 15.)
+        np.testing.assert_allclose(mix_weights.sum(axis=0), 1.)
+
+
+if '__main__' == __name__:
+    unittest.main()
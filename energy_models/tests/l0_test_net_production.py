@@ -0,0 +1,126 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from energy_models.core.energy_mix.energy_mix import EnergyMix
+from energy_models.core.energy_mix.net_production import build_net_production_incidence, compute_net_production
+from energy_models.glossaryenergy import GlossaryEnergy
+
+
+class NetProductionTestCase(unittest.TestCase):
+    """
+    Net production kernel of the energy mix test class
+    """
+
+    def setUp(self):
+        '''
+        Initialize third data needed for testing
+        '''
+        self.nb_years = 31
+        self.energy_list = ['methane', 'electricity', 'fossil']
+        self.ccs_list = ['carbon_capture', 'carbon_storage']
+        self.units = {'methane': 'TWh', 'electricity': 'TWh', 'fossil': 'TWh', 'carbon_capture': 'Mt',
+                      'carbon_storage': 'Mt'}
+        self.raw_to_net = {'fossil': 0.9}
+        rng = np.random.default_rng(0)
+        self.raw_production = rng.uniform(50., 100., (self.nb_years, len(self.energy_list)))
+        consumption_columns = {'methane': ['years', 'electricity (TWh)', 'water_resource (Mt)'],
+                               'electricity': ['years', 'methane (TWh)', 'electricity (TWh)'],
+                               'fossil': ['years'],
+                               'carbon_capture': ['years', 'electricity (TWh)', 'methane (TWh)', 'carbon_capture (Mt)'],
+                               'carbon_storage': ['years', 'carbon_capture (Mt)']}
+        self.consumptions = {stream: pd.DataFrame(rng.uniform(0., 10., (self.nb_years, len(columns))),
+                                                  columns=columns) for stream, columns in consumption_columns.items()}
+
+    def compute_net_production_loop(self):
+        '''
+        Energy by energy reference of the net production
+        '''
+        consumable_production = self.raw_production.copy()
+        net_production = self.raw_production.copy()
+        for index, energy in enumerate(self.energy_list):
+            consumable_production[:, index] *= self.raw_to_net.get(energy, 1.0)
+            for stream, consumption in self.consumptions.items():
+                if f'{energy} (TWh)' in consumption.columns:
+                    net_production[:, index] -= consumption[f'{energy} (TWh)'].values
+                    if stream in self.energy_list:
+                        consumable_production[:, index] -= consumption[f'{energy} (TWh)'].values
+            net_production[:, index] -= self.raw_production[:, index] * (1.0 - self.raw_to_net.get(energy, 1.0))
+        ccs_production = np.array([-self.consumptions[ccs].filter(like='(Mt)').sum(axis=1).values
+                                   for ccs in self.ccs_list]).T
+
+        return consumable_production, net_production, ccs_production
+
+    def test_01_net_production_vs_loop(self):
+        used_columns, incidence = build_net_production_incidence(
+            self.energy_list, self.ccs_list,
+            {stream: list(consumption.columns) for stream, consumption in self.consumptions.items()}, self.units)
+
+        # only the consumed energies and the ccs consumptions in Mt are kept
+        self.assertListEqual(used_columns['methane'], ['electricity (TWh)'])
+        self.assertListEqual(used_columns['fossil'], [])
+        self.assertListEqual(used_columns['carbon_capture'],
+                             ['electricity (TWh)', 'methane (TWh)', 'carbon_capture (Mt)'])
+        self.assertTupleEqual(incidence.shape, (7, 2 * len(self.energy_list) + len(self.ccs_list)))
+
+        consumptions = np.hstack([self.consumptions[stream][columns].to_numpy()
+                                  for stream, columns in used_columns.items() if len(columns) > 0])
+        raw_to_net_losses = np.array([1.0 - self.raw_to_net.get(energy, 1.0) for energy in self.energy_list])
+        results = compute_net_production(self.raw_production, consumptions, incidence, raw_to_net_losses)
+        for result, result_ref in zip(results, self.compute_net_production_loop()):
+            np.testing.assert_allclose(result, result_ref, rtol=1e-12)
+
+    def test_02_energy_mix_consumption_columns_change(self):
+        energy_mix = EnergyMix('EnergyMix')
+        energy_mix.energy_list = ['methane', 'electricity']
+        energy_mix.inputs = {GlossaryEnergy.ccs_list: ['carbon_capture']}
+        energy_mix.years = np.arange(self.nb_years)
+        energy_mix.heat_losses_percentage = 0.0
+        energy_mix.production_raw = pd.DataFrame(
+            {'production methane (TWh)': self.raw_production[:, 0],
+             'production electricity (TWh)': self.raw_production[:, 1],
+             GlossaryEnergy.TotalProductionValue: self.raw_production[:, :2].sum(axis=1)})
+        raw_to_net = [energy_mix.raw_tonet_dict.get(energy, 1.0) for energy in energy_mix.energy_list]
+
+        # the consumption columns of the streams change between the two computations
+        for consumption_columns in [{'methane': ['years', 'electricity (TWh)'],
+                                     'electricity': ['years'],
+                                     'carbon_capture': ['years', 'carbon_capture (Mt)']},
+                                    {'methane': ['years', 'electricity (TWh)', 'methane (TWh)'],
+                                     'electricity': ['years', 'methane (TWh)'],
+                                     'carbon_capture': ['years', 'electricity (TWh)', 'carbon_capture (Mt)']}]:
+            energy_mix.sub_consumption_dict = {
+                stream: pd.DataFrame({column: self.consumptions['carbon_capture'][
+                    'electricity (TWh)'].values * (index + 1) for index, column in enumerate(columns)})
+                for stream, columns in consumption_columns.items()}
+            energy_mix.compute_net_production()
+
+            for index, energy in enumerate(energy_mix.energy_list):
+                net_production_ref = self.raw_production[:, index] * raw_to_net[index] - sum(
+                    consumption[f'{energy} (TWh)'].values for consumption in energy_mix.sub_consumption_dict.values()
+                    if f'{energy} (TWh)' in consumption)
+                np.testing.assert_allclose(energy_mix.production[f'production {energy} (TWh)'].values,
+                                           net_production_ref, rtol=1e-12)
+            np.testing.assert_allclose(energy_mix.production['production carbon_capture (Mt)'].values,
+                                       -energy_mix.sub_consumption_dict['carbon_capture'][
+                                           'carbon_capture (Mt)'].values, rtol=1e-12)
+
+
+if '__main__' == __name__:
+    unittest.main()
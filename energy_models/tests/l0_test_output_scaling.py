@@ -0,0 +1,64 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from energy_models.core.techno_type.output_scaling import rescale_columns
+from energy_models.glossaryenergy import GlossaryEnergy
+
+
+class OutputScalingTestCase(unittest.TestCase):
+    """
+    Block rescaling of techno outputs test class
+    """
+
+    def setUp(self):
+        '''
+        Initialize third data needed for testing
+        '''
+        self.years = np.arange(GlossaryEnergy.YearStartDefault, GlossaryEnergy.YearEndDefault + 1)
+        nb_years = len(self.years)
+        self.ratio = np.linspace(0.5, 1., nb_years)
+        self.consumption = pd.DataFrame({GlossaryEnergy.Years: self.years,
+                                         'electricity (TWh)': np.linspace(1., 2., nb_years),
+                                         'copper_resource (Mt)': np.linspace(3., 4., nb_years),
+                                         'water_resource (Mt)': np.linspace(5., 6., nb_years)})
+
+    def test_01_rescale_columns_vs_column_loop(self):
+        consumption_ref = self.consumption.copy()
+        for column in ['electricity (TWh)', 'water_resource (Mt)']:
+            consumption_ref[column] = consumption_ref[column].values * self.ratio / 100.
+
+        consumption = rescale_columns(self.consumption, multiplier=self.ratio, divisor=100.,
+                                      columns=['electricity (TWh)', 'water_resource (Mt)'])
+        pd.testing.assert_frame_equal(consumption, consumption_ref, check_exact=True)
+
+        # the input dataframe is left untouched
+        self.assertEqual(self.consumption['electricity (TWh)'].values[-1], 2.)
+
+    def test_02_rescale_columns_complex(self):
+        multiplier = self.ratio + 1j * 1e-30
+        consumption = rescale_columns(self.consumption, multiplier=multiplier)
+        self.assertListEqual(list(consumption.columns), list(self.consumption.columns))
+        np.testing.assert_array_equal(consumption[GlossaryEnergy.Years].values, self.years)
+        np.testing.assert_allclose(consumption['copper_resource (Mt)'].values.imag,
+                                   self.consumption['copper_resource (Mt)'].values * 1e-30)
+
+
+if '__main__' == __name__:
+    unittest.main()
@@ -0,0 +1,136 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from energy_models.core.parallel_techno_execution import compute_coupling_residual, execute_technos_then_streams, \
+    get_coupling_names, get_scheduled_disciplines
+from energy_models.core.techno_type.techno_disc import TechnoDiscipline
+from energy_models.glossaryenergy import GlossaryEnergy
+
+
+class FakeDiscipline:
+    """
+    Discipline with the gemseo execution interface used by the parallel techno execution
+    """
+
+    def __init__(self, name, input_names, compute_outputs, execution_log):
+        self.name = name
+        self.input_names = input_names
+        self.compute_outputs = compute_outputs
+        self.execution_log = execution_log
+        self.input_data = None
+        self.output_data = {}
+
+    def get_input_data_names(self):
+        return self.input_names
+
+    def get_output_data_names(self):
+        return list(self.compute_outputs({name: 0. for name in self.input_names}).keys())
+
+    def execute(self, input_data):
+        self.input_data = dict(input_data)
+        self.output_data = self.compute_outputs(self.input_data)
+        self.execution_log.append((self.name, threading.get_ident()))
+
+    def get_output_data(self):
+        return self.output_data
+
+
+class ParallelTechnoExecutionTestCase(unittest.TestCase):
+    """
+    Parallel execution of the techno disciplines test class
+    """
+
+    def setUp(self):
+        '''
+        Initialize third data needed for testing
+        '''
+        self.execution_log = []
+        # two technos producing a stream whose price depends on the productions, the production of each techno
+        # decreases with the price
+        self.technos = [
+            FakeDiscipline('TechnoA', ['price'], lambda data: {'production_a': 10. / (1. + data['price'])},
+                           self.execution_log),
+            FakeDiscipline('TechnoB', ['price'], lambda data: {'production_b': 5. / (1. + data['price'])},
+                           self.execution_log)]
+        self.stream = FakeDiscipline('Stream', ['production_a', 'production_b'],
+                                     lambda data: {'price': 0.1 * (data['production_a'] + data['production_b'])},
+                                     self.execution_log)
+
+    def test_01_get_scheduled_disciplines(self):
+        techno_wrapper = TechnoDiscipline.__new__(TechnoDiscipline)
+        proxies = [SimpleNamespace(mdo_discipline_wrapp=SimpleNamespace(wrapper=wrapper, mdo_discipline=discipline))
+                   for wrapper, discipline in [(object(), self.stream), (techno_wrapper, self.technos[0]),
+                                               (techno_wrapper, self.technos[1])]]
+
+        techno_disciplines, other_disciplines = get_scheduled_disciplines(proxies)
+        self.assertListEqual(techno_disciplines, self.technos)
+        self.assertListEqual(other_disciplines, [self.stream])
+        self.assertListEqual(get_coupling_names(self.technos + [self.stream]),
+                             ['production_a', 'production_b', 'price'])
+
+    def test_02_technos_executed_before_streams(self):
+        local_data = {'price': 1.}
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            execute_technos_then_streams(self.technos, [self.stream], local_data, executor)
+
+        # the technos are executed first, on the price of the previous iteration
+        self.assertSetEqual({name for name, _ in self.execution_log[:2]}, {'TechnoA', 'TechnoB'})
+        self.assertEqual(self.execution_log[2][0], 'Stream')
+        self.assertEqual(self.technos[0].input_data['price'], 1.)
+        self.assertEqual(self.technos[1].input_data['price'], 1.)
+        # the stream is executed once all the techno outputs are gathered
+        self.assertDictEqual(self.stream.input_data, {'production_a': 5., 'production_b': 2.5})
+        self.assertAlmostEqual(local_data['price'], 0.75)
+
+    def test_03_parallel_iterations_converge_to_the_sequential_fixed_point(self):
+        coupling_names = get_coupling_names(self.technos + [self.stream])
+        local_data = {'price': 1.}
+        residual = np.inf
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            for _ in range(50):
+                previous_data = {name: local_data.get(name) for name in coupling_names}
+                execute_technos_then_streams(self.technos, [self.stream], local_data, executor)
+                residual = compute_coupling_residual(previous_data, local_data, coupling_names)
+                if residual < 1e-12:
+                    break
+        self.assertLess(residual, 1e-12)
+
+        # the fixed point of price = 1.5 / (1 + price)
+        self.assertAlmostEqual(local_data['price'], (-1. + np.sqrt(7.)) / 2., places=10)
+
+    def test_04_coupling_residual(self):
+        previous_data = {'prices': pd.DataFrame({GlossaryEnergy.Years: [2020, 2021], 'price': [1., 2.]}),
+                         'ratio': np.ones(2)}
+        local_data = {'prices': pd.DataFrame({GlossaryEnergy.Years: [2020, 2021], 'price': [1., 2.2]}),
+                      'ratio': np.ones(2),
+                      'name': 'not a coupling value'}
+
+        expected_residual = 0.2 / np.linalg.norm([1., 2.])
+        self.assertAlmostEqual(compute_coupling_residual(previous_data, local_data, ['prices', 'ratio', 'name']),
+                               expected_residual)
+        # a coupling without previous value is not converged
+        self.assertEqual(compute_coupling_residual({}, local_data, ['ratio']), np.inf)
+
+
+if '__main__' == __name__:
+    unittest.main()
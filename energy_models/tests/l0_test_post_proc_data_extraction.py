@@ -0,0 +1,214 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import gc
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from energy_models.glossaryenergy import GlossaryEnergy
+from energy_models.sos_processes.post_processing.post_proc_data_extraction import _techno_sources, \
+    _techno_tables, clear_techno_tables, get_energy_mix_techno_table, get_stream_techno_table, \
+    get_techno_multilevel_df, get_techno_table_at_year
+
+
+class FakeDataManager:
+    """
+    Data manager counting the values read and the disciplines searched by the post-processing
+    """
+
+    def __init__(self, values, disciplines):
+        self.values = values
+        self.disciplines = disciplines
+        self.nb_reads = 0
+        self.nb_searches = 0
+
+    def get_value(self, full_name):
+        self.nb_reads += 1
+        return self.values[full_name]
+
+    def get_disciplines_with_name(self, full_name):
+        self.nb_searches += 1
+        return [self.disciplines[full_name]]
+
+
+class FakeDiscipline:
+
+    def __init__(self, full_name, energy_name=None):
+        self.full_name = full_name
+        self.mdo_discipline_wrapp = SimpleNamespace(wrapper=SimpleNamespace(energy_name=energy_name))
+
+    def get_input_var_full_name(self, var_name):
+        return f'{self.full_name}.{var_name}'
+
+    def get_output_var_full_name(self, var_name):
+        return f'{self.full_name}.{var_name}'
+
+
+class FakeExecutionEngine:
+
+    def __init__(self, dm):
+        self.dm = dm
+
+
+class PostProcDataExtractionTestCase(unittest.TestCase):
+    """
+    Bulk extraction of the techno data of the post-processing test class
+    """
+
+    def setUp(self):
+        '''
+        Initialize third data needed for testing
+        '''
+        clear_techno_tables()
+        self.years = np.arange(2020, 2051)
+        self.namespace = 'Test.EnergyMix'
+        self.techno_list = ['Methanation', 'FossilGas']
+        values = {f'{self.namespace}.methane.technologies_list': self.techno_list,
+                  f'{self.namespace}.methane.energy_production_detailed': pd.DataFrame(
+                      {GlossaryEnergy.Years: self.years,
+                       'methane Methanation (TWh)': np.linspace(1., 2., len(self.years)),
+                       'methane FossilGas (TWh)': np.linspace(10., 5., len(self.years))})}
+        for techno in self.techno_list:
+            values[f'{self.namespace}.methane.{techno}.techno_detailed_prices'] = pd.DataFrame(
+                {GlossaryEnergy.Years: self.years, techno: np.linspace(60., 80., len(self.years)),
+                 'CAPEX_Part': 20., 'OPEX_Part': 30., 'CO2Tax_Part': np.linspace(10., 30., len(self.years))})
+        values[f'{self.namespace}.{GlossaryEnergy.energy_list}'] = ['methane', GlossaryEnergy.biomass_dry]
+        disciplines = {self.namespace: FakeDiscipline(self.namespace)}
+        self.add_stream_disciplines(values, disciplines)
+        self.execution_engine = FakeExecutionEngine(FakeDataManager(values, disciplines))
+
+    def add_stream_disciplines(self, values, disciplines):
+        '''
+        Stream discipline of methane and its techno disciplines, only Methanation consumes CO2
+        '''
+        nb_years = len(self.years)
+        stream_name = f'{self.namespace}.methane'
+        disciplines[stream_name] = FakeDiscipline(stream_name, energy_name='methane')
+        values.update({f'{stream_name}.{GlossaryEnergy.techno_list}': self.techno_list,
+                       f'{stream_name}.{GlossaryEnergy.YearStart}': self.years[0],
+                       f'{stream_name}.{GlossaryEnergy.YearEnd}': self.years[-1],
+                       f'{stream_name}.{GlossaryEnergy.CO2TaxesValue}': pd.DataFrame(
+                           {GlossaryEnergy.Years: self.years,
+                            GlossaryEnergy.CO2Tax: np.linspace(50., 100., nb_years)})})
+        for i, techno in enumerate(self.techno_list):
+            carbon_emissions = pd.DataFrame({GlossaryEnergy.Years: self.years, techno: 0.1 * (i + 1),
+                                             'production': 0.05 * (i + 1)})
+            if techno == 'Methanation':
+                carbon_emissions['carbon_capture'] = -0.2
+            techno_name = f'{stream_name}.{techno}'
+            disciplines[techno_name] = FakeDiscipline(techno_name)
+            techno_values = {
+                'scaling_factor_techno_production': 1e3, 'scaling_factor_invest_level': 1e3,
+                GlossaryEnergy.InvestLevelValue: pd.DataFrame({GlossaryEnergy.Years: self.years,
+                                                               GlossaryEnergy.InvestValue: float(i + 1)}),
+                'data_fuel_dict': {GlossaryEnergy.CO2PerUse: 0.5, 'CO2_per_use_unit': 'kg/kWh',
+                                   'high_calorific_value': 15.},
+                GlossaryEnergy.TechnoProductionValue: pd.DataFrame({GlossaryEnergy.Years: self.years,
+                                                                    'methane (TWh)': float(i + 1)}),
+                'CO2_emissions_detailed': carbon_emissions,
+                GlossaryEnergy.TechnoPricesValue: pd.DataFrame({GlossaryEnergy.Years: self.years,
+                                                                techno: 70. + i, f'{techno}_wotaxes': 60. + i}),
+                # the detailed prices of the techno are the ones read by the energy mix
+                GlossaryEnergy.TechnoDetailedPricesValue: values[f'{techno_name}.techno_detailed_prices']}
+            values.update({f'{techno_name}.{name}': value for name, value in techno_values.items()})
+
+    def test_01_energy_mix_techno_table(self):
+        techno_table = get_energy_mix_techno_table(self.execution_engine, self.namespace)
+        self.assertEqual(len(techno_table), len(self.techno_list) * len(self.years))
+        # biomass dry is not read
+        self.assertNotIn(f'{self.namespace}.{GlossaryEnergy.biomass_dry}.technologies_list',
+                         _techno_sources[self.execution_engine][(self.namespace, 'energy_mix')]['lists'])
+
+        techno_data = get_techno_table_at_year(techno_table, 2030)
+        self.assertListEqual(list(techno_data['techno']), self.techno_list)
+        np.testing.assert_allclose(techno_data['production'].values, [1. + 10. / 30., 10. - 50. / 30.])
+        np.testing.assert_allclose(techno_data['price'].values, [60. + 200. / 30., 60. + 200. / 30.])
+
+    def test_02_cached_techno_table(self):
+        techno_table = get_energy_mix_techno_table(self.execution_engine, self.namespace)
+        nb_searches = self.execution_engine.dm.nb_searches
+        self.assertIs(get_energy_mix_techno_table(self.execution_engine, self.namespace), techno_table)
+        # the sources are collected once, the values are read by their full names
+        self.assertEqual(self.execution_engine.dm.nb_searches, nb_searches)
+
+        # a value modified in place in the data manager rebuilds the table
+        prices = self.execution_engine.dm.values[f'{self.namespace}.methane.FossilGas.techno_detailed_prices']
+        prices['FossilGas'] += 1.
+        modified_techno_table = get_energy_mix_techno_table(self.execution_engine, self.namespace)
+        self.assertIsNot(modified_techno_table, techno_table)
+        np.testing.assert_allclose(get_techno_table_at_year(modified_techno_table, 2020)['price'].values, [60., 61.])
+        techno_table = modified_techno_table
+
+        # a new value in the data manager rebuilds the table
+        production_name = f'{self.namespace}.methane.energy_production_detailed'
+        production = self.execution_engine.dm.values[production_name].copy()
+        production['methane FossilGas (TWh)'] *= 2.
+        self.execution_engine.dm.values[production_name] = production
+        new_techno_table = get_energy_mix_techno_table(self.execution_engine, self.namespace)
+        self.assertIsNot(new_techno_table, techno_table)
+        np.testing.assert_allclose(get_techno_table_at_year(new_techno_table, 2020)['production'].values, [1., 20.])
+
+        # the tables are attached to the execution engine and released with it
+        self.assertIn(self.execution_engine, _techno_tables)
+        del self.execution_engine, techno_table, modified_techno_table, new_techno_table
+        gc.collect()
+        self.assertEqual(len(_techno_tables), 0)
+        self.assertEqual(len(_techno_sources), 0)
+
+    def test_03_stream_techno_table(self):
+        techno_table = get_stream_techno_table(self.execution_engine, f'{self.namespace}.methane')
+        self.assertEqual(len(techno_table), len(self.techno_list) * len(self.years))
+        self.assertIn('CO2_from_carbon_capture_consumption', techno_table.columns)
+
+        techno_data = get_techno_table_at_year(techno_table, 2030)
+        self.assertListEqual(list(techno_data['energy']), ['methane', 'methane'])
+        self.assertListEqual(list(techno_data['techno']), self.techno_list)
+        np.testing.assert_allclose(techno_data['production'].values, [1e3, 2e3])
+        np.testing.assert_allclose(techno_data[GlossaryEnergy.InvestValue].values, [1e3, 2e3])
+        np.testing.assert_allclose(techno_data['CO2_from_production'].values, [0.05, 0.1])
+        np.testing.assert_allclose(techno_data['CO2_after_use'].values, [0.6, 0.7])
+        np.testing.assert_allclose(techno_data['price_per_kWh_wotaxes'].values, [60., 61.])
+        np.testing.assert_allclose(techno_data['OPEX_Part'].values, [30., 30.])
+        np.testing.assert_allclose(techno_data[GlossaryEnergy.CO2Tax].values, [50. + 50. / 3., 50. + 50. / 3.])
+        # emission types missing for a techno are filled with zeros
+        np.testing.assert_allclose(techno_data['CO2_from_carbon_capture_consumption'].values, [-0.2, 0.])
+
+        self.assertIs(get_stream_techno_table(self.execution_engine, f'{self.namespace}.methane'), techno_table)
+
+        # the sources are collected again when the techno list changes
+        self.execution_engine.dm.values[f'{self.namespace}.methane.{GlossaryEnergy.techno_list}'] = ['FossilGas']
+        techno_table = get_stream_techno_table(self.execution_engine, f'{self.namespace}.methane')
+        self.assertListEqual(list(get_techno_table_at_year(techno_table, 2030)['techno']), ['FossilGas'])
+        self.assertNotIn('CO2_from_carbon_capture_consumption', techno_table.columns)
+
+    def test_04_techno_multilevel_df(self):
+        techno_table = get_stream_techno_table(self.execution_engine, f'{self.namespace}.methane')
+        multilevel_df = get_techno_multilevel_df(techno_table, ['price_per_kWh', 'production'])
+        self.assertListEqual(list(multilevel_df.index), [('methane', techno) for techno in self.techno_list])
+        self.assertListEqual(list(multilevel_df.columns), ['price_per_kWh', 'production'])
+        for i, techno in enumerate(self.techno_list):
+            price_per_kWh, production = multilevel_df.loc[('methane', techno)]
+            np.testing.assert_allclose(price_per_kWh, np.full(len(self.years), 70. + i))
+            np.testing.assert_allclose(production, np.full(len(self.years), 1e3 * (i + 1)))
+
+        empty_multilevel_df = get_techno_multilevel_df(techno_table.iloc[:0], ['price_per_kWh'])
+        self.assertEqual(len(empty_multilevel_df), 0)
+
+
+if '__main__' == __name__:
+    unittest.main()
@@ -0,0 +1,98 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from energy_models.core.stream_type.base_stream import BaseStream
+from energy_models.core.stream_type.stream_columns import build_column_index, stack_element_columns
+from energy_models.glossaryenergy import GlossaryEnergy
+
+
+class StreamColumnsTestCase(unittest.TestCase):
+    """
+    Columnar stream aggregation test class
+    """
+
+    def setUp(self):
+        '''
+        Initialize third data needed for testing
+        '''
+        self.years = np.arange(2020, 2031)
+        nb_years = len(self.years)
+        self.dataframes = [
+            pd.DataFrame({GlossaryEnergy.Years: self.years,
+                          'methane (TWh)': np.linspace(1., 2., nb_years),
+                          'CO2 from Flue Gas (Mt)': np.linspace(0., 1., nb_years)}),
+            pd.DataFrame({GlossaryEnergy.Years: self.years,
+                          'hydrogen (TWh)': np.linspace(3., 4., nb_years),
+                          'methane (TWh)': np.linspace(5., 6., nb_years)})]
+
+    def test_01_column_index(self):
+        column_index = build_column_index([df.columns for df in self.dataframes],
+                                          first_columns=['hydrogen (TWh)'])
+        self.assertListEqual(list(column_index.keys()),
+                             ['hydrogen (TWh)', 'methane (TWh)', 'CO2 from Flue Gas (Mt)'])
+        self.assertListEqual(list(column_index.values()), [0, 1, 2])
+
+    def test_02_stacked_sum_vs_dataframes(self):
+        column_index = build_column_index([df.columns for df in self.dataframes])
+        stacked_array = stack_element_columns(self.dataframes, column_index, len(self.years), scaling_factor=10.)
+        self.assertTupleEqual(stacked_array.shape, (2, len(self.years), 3))
+
+        total = stacked_array.sum(axis=0)
+        for column, position in column_index.items():
+            expected = sum(df[column].values * 10. for df in self.dataframes if column in df)
+            np.testing.assert_array_equal(total[:, position], expected)
+
+        # complex values are kept for complex step
+        self.dataframes[0]['methane (TWh)'] = self.dataframes[0]['methane (TWh)'].values + 1j
+        stacked_array = stack_element_columns(self.dataframes, column_index, len(self.years))
+        np.testing.assert_array_equal(stacked_array[0, :, column_index['methane (TWh)']].imag, 1.)
+
+    def test_03_stream_consumptions_columns(self):
+        stream = BaseStream('methane')
+        stream.unit = 'TWh'
+        stream.subelements_list = ['Methanation', 'FossilGas']
+        inputs_dict = {GlossaryEnergy.YearStart: self.years[0], GlossaryEnergy.YearEnd: self.years[-1],
+                       'scaling_factor_techno_production': 1., 'scaling_factor_techno_consumption': 1.}
+        for techno, production in zip(stream.subelements_list, self.dataframes):
+            inputs_dict.update({
+                f'{techno}.{GlossaryEnergy.TechnoPricesValue}': pd.DataFrame(
+                    {GlossaryEnergy.Years: self.years, techno: 70., f'{techno}_wotaxes': 60.}),
+                f'{techno}.{GlossaryEnergy.TechnoProductionValue}': production,
+                f'{techno}.{GlossaryEnergy.TechnoConsumptionValue}': pd.DataFrame(
+                    {GlossaryEnergy.Years: self.years, 'electricity (TWh)': 1., 'water (Mt)': 2.}),
+                f'{techno}.{GlossaryEnergy.TechnoConsumptionWithoutRatioValue}': pd.DataFrame(
+                    {GlossaryEnergy.Years: self.years, 'electricity (TWh)': 1.5}),
+                f'{techno}.{GlossaryEnergy.LandUseRequiredValue}': pd.DataFrame(
+                    {GlossaryEnergy.Years: self.years, f'{techno} (Gha)': 0.})})
+        stream.configure(inputs_dict)
+
+        # each consumption is indexed by its own columns
+        self.assertListEqual(list(stream.consumption_column_index.keys()), ['electricity (TWh)', 'water (Mt)'])
+        self.assertListEqual(list(stream.consumption_woratio_column_index.keys()), ['electricity (TWh)'])
+        _, consumption, _ = stream.compute_production(stream.sub_production_array, stream.sub_consumption_array)
+        _, consumption_woratio, _ = stream.compute_production(
+            stream.sub_production_array, stream.sub_consumption_woratio_array, stream.consumption_woratio_column_index)
+        np.testing.assert_array_equal(consumption['water (Mt)'].values, 4.)
+        self.assertListEqual(list(consumption_woratio.columns), [GlossaryEnergy.Years, 'electricity (TWh)'])
+        np.testing.assert_array_equal(consumption_woratio['electricity (TWh)'].values, 3.)
+
+
+if '__main__' == __name__:
+    unittest.main()
@@ -0,0 +1,90 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import unittest
+
+import numpy as np
+
+from energy_models.core.techno_type.techno_jacobian import compose_jacobians, \
+    compute_dprod_dcapex_partial, compute_lifetime_window
+
+
+class TechnoJacobianTestCase(unittest.TestCase):
+    """
+    Structured techno jacobians test class
+    """
+
+    def setUp(self):
+        '''
+        Initialize third data needed for testing
+        '''
+        self.nb_years = 31
+        self.construction_delay = 3
+        self.lifetime = 20
+        self.capex_list = np.linspace(800., 600., self.nb_years)
+        self.invest_list = np.linspace(10., 200., self.nb_years)
+        self.invest_before_year_start = np.array([5., 8., 12.])
+
+    def compute_prod_from_invest(self, capex_list):
+        '''
+        Year by year reference of the production from invest over the lifetime window
+        '''
+        prod = np.zeros(self.nb_years, dtype=capex_list.dtype)
+        for year in range(self.nb_years):
+            for invest_year in range(year - self.lifetime + 1, year + 1):
+                if 0 <= invest_year - self.construction_delay:
+                    prod[year] += self.invest_list[invest_year - self.construction_delay] / \
+                                  capex_list[invest_year - self.construction_delay]
+                elif 0 <= invest_year < self.construction_delay:
+                    prod[year] += self.invest_before_year_start[invest_year] / capex_list[0]
+        return prod
+
+    def test_01_lifetime_window(self):
+        window = compute_lifetime_window(self.nb_years, self.construction_delay, self.lifetime)
+        for column in range(self.nb_years):
+            expected = np.zeros(self.nb_years)
+            expected[column + self.construction_delay:column + self.construction_delay + self.lifetime] = 1.
+            np.testing.assert_array_equal(window[:, column], expected)
+
+        # without construction delay and with a lifetime longer than the study, the window is lower triangular
+        window = compute_lifetime_window(self.nb_years, 0, self.nb_years + 10)
+        np.testing.assert_array_equal(window, np.tril(np.ones((self.nb_years, self.nb_years))))
+
+    def test_02_dprod_dcapex_vs_complex_step(self):
+        step = 1e-30
+        dprod_dcapex = compute_dprod_dcapex_partial(self.capex_list, self.invest_list, self.invest_before_year_start,
+                                                    self.construction_delay, self.lifetime)
+        for column in range(self.nb_years):
+            capex_list = self.capex_list.astype(np.complex128)
+            capex_list[column] += 1j * step
+            prod = self.compute_prod_from_invest(capex_list)
+            np.testing.assert_allclose(dprod_dcapex[:, column], prod.imag / step, rtol=1e-10, atol=1e-16)
+
+    def test_03_compose_jacobians(self):
+        dprod_dcapex = compute_dprod_dcapex_partial(self.capex_list, self.invest_list, self.invest_before_year_start,
+                                                    self.construction_delay, self.lifetime)
+        dcapex_dparameter = np.linspace(-2., 3., self.nb_years) + 1j * np.linspace(0., 1., self.nb_years)
+        dcons_dprod = np.linspace(0.5, 1.5, self.nb_years)
+
+        np.testing.assert_allclose(compose_jacobians(dprod_dcapex, np.diag(dcapex_dparameter)),
+                                   dprod_dcapex @ np.diag(dcapex_dparameter), rtol=1e-14)
+        np.testing.assert_allclose(compose_jacobians(dprod_dcapex, dcapex_dparameter),
+                                   dprod_dcapex @ np.diag(dcapex_dparameter), rtol=1e-14)
+        np.testing.assert_allclose(compose_jacobians(dcons_dprod, dprod_dcapex, dcapex_dparameter),
+                                   np.diag(dcons_dprod) @ dprod_dcapex @ np.diag(dcapex_dparameter), rtol=1e-14)
+
+
+if '__main__' == __name__:
+    unittest.main()
@@ -0,0 +1,65 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import unittest
+
+from energy_models.core.techno_type.techno_parameters import TechnoParameters, check_techno_infos_dict, \
+    compute_co2_from_production, get_construction_delay
+from energy_models.glossaryenergy import GlossaryEnergy
+
+
+class TechnoParametersTestCase(unittest.TestCase):
+    """
+    Compiled techno parameters test class
+    """
+
+    def setUp(self):
+        '''
+        Initialize third data needed for testing
+        '''
+        self.techno_infos_dict = {'lifetime': 20, 'Opex_percentage': 0.03, 'efficiency': 0.7,
+                                  'CO2_from_production': 0.5, 'CO2_from_production_unit': 'kg/kg'}
+        self.data_energy_dict = {'high_calorific_value': 20.}
+
+    def test_01_check_techno_infos_dict(self):
+        check_techno_infos_dict('techno', self.techno_infos_dict)
+        del self.techno_infos_dict['Opex_percentage']
+        with self.assertRaises(Exception):
+            check_techno_infos_dict('techno', self.techno_infos_dict)
+
+    def test_02_defaults_and_units(self):
+        with self.assertLogs('energy_models.core.techno_type.techno_parameters', level='DEBUG'):
+            self.assertEqual(get_construction_delay('techno', self.techno_infos_dict), 3)
+        self.techno_infos_dict[GlossaryEnergy.ConstructionDelay] = 5
+        self.assertEqual(get_construction_delay('techno', self.techno_infos_dict), 5)
+
+        self.assertEqual(compute_co2_from_production('techno', self.techno_infos_dict, self.data_energy_dict), 0.025)
+        self.techno_infos_dict['CO2_from_production_unit'] = 'kg/kWh'
+        self.assertEqual(compute_co2_from_production('techno', self.techno_infos_dict, self.data_energy_dict), 0.5)
+        self.techno_infos_dict['CO2_from_production_unit'] = 'g/kWh'
+        with self.assertRaises(Exception):
+            compute_co2_from_production('techno', self.techno_infos_dict, self.data_energy_dict)
+        del self.techno_infos_dict['CO2_from_production']
+        self.assertIsNone(compute_co2_from_production('techno', self.techno_infos_dict, self.data_energy_dict))
+
+    def test_03_record_slots(self):
+        techno_parameters = TechnoParameters(3, 20, 8760.0, 0.03, None, None, 0.1, [0.7], 0.0)
+        self.assertEqual(techno_parameters.full_load_hours, 8760.0)
+        with self.assertRaises(AttributeError):
+            techno_parameters.unknown_parameter = 1.0
+
+
+if '__main__' == __name__:
+    unittest.main()
@@ -0,0 +1,159 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from energy_models.core.stream_type.resources_models.resource_glossary import ResourceGlossary
+from energy_models.glossaryenergy import GlossaryEnergy
+from sostrades_core.execution_engine.execution_engine import ExecutionEngine
+
+
+class TechnoScenariosTestCase(unittest.TestCase):
+    """
+    Batched multi-scenario evaluation of a techno test class
+    """
+
+    def setUp(self):
+        '''
+        Initialize third data needed for testing
+        '''
+        self.name = 'Test'
+        self.years = np.arange(GlossaryEnergy.YearStartDefault, GlossaryEnergy.YearEndDefault + 1)
+        nb_years = len(self.years)
+        self.invest_scenarios = np.vstack([np.linspace(0.3, 0.6, nb_years), np.linspace(0.8, 0.1, nb_years)])
+        self.elec_price_scenarios = np.vstack([np.full(nb_years, 60.0), np.linspace(60.0, 120.0, nb_years)])
+        self.syngas_price_scenarios = np.vstack([np.full(nb_years, 34.0), np.linspace(50.0, 20.0, nb_years)])
+        self.co2_taxes_scenarios = np.vstack([np.linspace(20.0, 200.0, nb_years), np.linspace(50.0, 10.0, nb_years)])
+
+        self.resources_prices = pd.DataFrame({GlossaryEnergy.Years: self.years,
+                                              ResourceGlossary.WaterResource: 0.0,
+                                              ResourceGlossary.PlatinumResource: 32825887})
+        self.margin = pd.DataFrame(
+            {GlossaryEnergy.Years: self.years, GlossaryEnergy.MarginValue: np.ones(nb_years) * 110.0})
+        self.transport = pd.DataFrame(
+            {GlossaryEnergy.Years: self.years, 'transport': np.ones(nb_years) * 500.0})
+
+    def run_techno_discipline(self, model_name, mod_path, energy_price_scenarios, scenario, other_inputs):
+        '''
+        Execute the techno discipline on one scenario and return its model
+        '''
+        ee = ExecutionEngine(self.name)
+        ns_dict = {namespace: self.name for namespace in
+                   ['ns_public', 'ns_energy', 'ns_energy_study', 'ns_hydrogen', 'ns_syngas', 'ns_liquid_fuel',
+                    'ns_flue_gas', 'ns_electricity', 'ns_carbon_capture', 'ns_resource']}
+        ee.ns_manager.add_ns_def(ns_dict)
+
+        builder = ee.factory.get_builder_from_module(model_name, mod_path)
+        ee.factory.set_builders_to_coupling_builder(builder)
+        ee.configure()
+
+        inputs_dict = {f'{self.name}.{GlossaryEnergy.YearEnd}': GlossaryEnergy.YearEndDefault,
+                       f'{self.name}.{GlossaryEnergy.EnergyPricesValue}': pd.DataFrame(
+                           {GlossaryEnergy.Years: self.years,
+                            **{energy: prices[scenario] for energy, prices in energy_price_scenarios.items()}}),
+                       f'{self.name}.{GlossaryEnergy.EnergyCO2EmissionsValue}': pd.DataFrame(
+                           {GlossaryEnergy.Years: self.years, **{energy: 0.1 for energy in energy_price_scenarios}}),
+                       f'{self.name}.{model_name}.{GlossaryEnergy.InvestLevelValue}': pd.DataFrame(
+                           {GlossaryEnergy.Years: self.years,
+                            GlossaryEnergy.InvestValue: self.invest_scenarios[scenario]}),
+                       f'{self.name}.{GlossaryEnergy.CO2TaxesValue}': pd.DataFrame(
+                           {GlossaryEnergy.Years: self.years,
+                            GlossaryEnergy.CO2Tax: self.co2_taxes_scenarios[scenario]}),
+                       f'{self.name}.{GlossaryEnergy.TransportMarginValue}': self.margin,
+                       f'{self.name}.{GlossaryEnergy.TransportCostValue}': self.transport,
+                       f'{self.name}.{model_name}.{GlossaryEnergy.MarginValue}': self.margin}
+        inputs_dict.update({f'{self.name}.{key}': value for key, value in other_inputs.items()})
+        ee.load_study_from_input_dict(inputs_dict)
+        ee.execute()
+
+        disc = ee.dm.get_disciplines_with_name(f'{self.name}.{model_name}')[0]
+        return disc.mdo_discipline_wrapp.wrapper.techno_model
+
+    def check_scenarios_vs_single_runs(self, model_name, mod_path, energy_price_scenarios, other_inputs=None):
+        '''
+        Compare the batched evaluation of the scenarios around the first one to a full run of each scenario
+        '''
+        other_inputs = other_inputs or {}
+        techno_model = self.run_techno_discipline(model_name, mod_path, energy_price_scenarios, 0, other_inputs)
+        reference_outputs = {name: getattr(techno_model, name).copy()
+                             for name in ['cost_details', 'production_detailed', 'consumption_detailed']}
+        scenarios = techno_model.compute_scenarios(
+            self.invest_scenarios, energy_prices=energy_price_scenarios, co2_taxes=self.co2_taxes_scenarios)
+
+        for scenario in range(len(self.invest_scenarios)):
+            single_model = self.run_techno_discipline(model_name, mod_path, energy_price_scenarios, scenario,
+                                                      other_inputs)
+            for column, values in scenarios['cost_details'].items():
+                np.testing.assert_allclose(values[scenario], single_model.cost_details[column].values, rtol=1e-12)
+            for column, values in scenarios['production'].items():
+                np.testing.assert_allclose(values[scenario], single_model.production_detailed[column].values,
+                                           rtol=1e-12)
+            for column, values in scenarios['consumption'].items():
+                np.testing.assert_allclose(values[scenario], single_model.consumption_detailed[column].values,
+                                           rtol=1e-12)
+
+        # the reference computation is left untouched
+        np.testing.assert_allclose(scenarios['cost_details'][techno_model.name][0],
+                                   techno_model.cost_details[techno_model.name].values,
+                                   rtol=1e-12)
+        for name, reference_output in reference_outputs.items():
+            pd.testing.assert_frame_equal(getattr(techno_model, name), reference_output)
+
+        return techno_model
+
+    def test_01_scenarios_vs_single_runs(self):
+        techno_model = self.check_scenarios_vs_single_runs(
+            'PEM',
+            'energy_models.models.gaseous_hydrogen.electrolysis.pem.electrolysis_pem_disc.ElectrolysisPEMDiscipline',
+            {GlossaryEnergy.electricity: self.elec_price_scenarios},
+            {GlossaryEnergy.ResourcesPriceValue: self.resources_prices})
+        self.assertTrue(techno_model.has_generic_price_stage())
+
+    def test_02_fischer_tropsch_scenarios(self):
+        # the price of the syngas transformation (RWGS or WGS) depends on the energy prices of each scenario
+        for syngas_ratio in [50.0, 200.0]:
+            techno_model = self.check_scenarios_vs_single_runs(
+                'FischerTropsch',
+                'energy_models.models.liquid_fuel.fischer_tropsch.fischer_tropsch_disc.FischerTropschDiscipline',
+                {GlossaryEnergy.electricity: self.elec_price_scenarios,
+                 GlossaryEnergy.syngas: self.syngas_price_scenarios},
+                {'syngas_ratio': np.full(len(self.years), syngas_ratio)})
+            self.assertFalse(techno_model.has_generic_price_stage())
+
+    def test_03_water_gas_shift_scenarios(self):
+        self.check_scenarios_vs_single_runs(
+            'WGS',
+            'energy_models.models.gaseous_hydrogen.water_gas_shift.water_gas_shift_disc.WaterGasShiftDiscipline',
+            {GlossaryEnergy.electricity: self.elec_price_scenarios,
+             GlossaryEnergy.syngas: self.syngas_price_scenarios},
+            {'syngas_ratio': np.linspace(70.0, 90.0, len(self.years))})
+
+    def test_04_flue_gas_capture_scenarios(self):
+        # capex and electricity needs depend on the flue gas ratio
+        self.check_scenarios_vs_single_runs(
+            'Flue_gas_capture.CalciumLooping',
+            'energy_models.models.carbon_capture.flue_gas_capture.calcium_looping.calcium_looping_disc.'
+            'CalciumLoopingDiscipline',
+            {GlossaryEnergy.electricity: self.elec_price_scenarios},
+            {GlossaryEnergy.FlueGasMean: pd.DataFrame({GlossaryEnergy.Years: self.years,
+                                                       GlossaryEnergy.FlueGasMean: np.linspace(0.1, 0.3,
+                                                                                               len(self.years))})})
+
+
+if '__main__' == __name__:
+    unittest.main()
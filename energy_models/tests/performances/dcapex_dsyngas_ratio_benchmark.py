@@ -0,0 +1,90 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import argparse
+import json
+import sys
+from functools import reduce
+from operator import mul
+
+import numpy as np
+
+from energy_models.core.techno_type.learning_curve import compute_dcapex_learning_curve_dparameter
+from energy_models.tests.performances.energy_model_benchmark import measure
+
+DEFAULT_NB_YEARS = [30, 80, 150]
+
+
+def compute_dcapex_leave_one_out(invest_list, capex_init, invest_sum_init, expo_factor, dcapex_init,
+                                 dinvest_sum_init):
+    '''
+    Former FischerTropsch.compute_dcapex_dsyngas_ratio loop: the derivative of the product of the learning ratios
+    is the sum of the leave-one-out products, each one reduced from a new list
+    '''
+    dcapex = np.zeros(len(invest_list), dtype=np.result_type(invest_list, capex_init, dcapex_init))
+    dcapex[0] = dcapex_init
+    qlist = []
+    dqlist = []
+    invest_sum = invest_sum_init
+    for i, invest in enumerate(invest_list):
+        if i > 0:
+            q = ((invest_sum + invest) / invest_sum) ** (-expo_factor)
+            qlist.append(q)
+            dqlist.append(-expo_factor * ((invest_sum + invest) / invest_sum) ** (-expo_factor - 1.0) * (
+                    -dinvest_sum_init * invest / (invest_sum * invest_sum)))
+            q_product = reduce(mul, qlist)
+            productlist = [reduce(mul, qlist[:k] + qlist[k + 1:], 1.0) for k in range(i)]
+            prod_mul = sum([a * b for a, b in zip(productlist, dqlist)])
+            dcapex[i] = dcapex_init * q_product + capex_init * prod_mul
+        invest_sum += invest
+    return dcapex
+
+
+def run_benchmarks(nb_years_list=None, nb_repeats=5):
+    '''
+    Time the leave-one-out loop and the prefix product derivative of the learning curve capex
+    wrt the syngas ratio for each horizon, on investments high enough to never reset the learning curve
+    '''
+    nb_years_list = DEFAULT_NB_YEARS if nb_years_list is None else nb_years_list
+    capex_init = 700.
+    expo_factor = -np.log(1. - 0.2) / np.log(2.)
+    benchmarks = {}
+    for nb_years in nb_years_list:
+        invest_list = np.linspace(50., 600., nb_years)
+        args = (invest_list, capex_init, 1000., expo_factor, -3., -3. * 1000. / capex_init)
+        loop_result = measure(lambda: compute_dcapex_leave_one_out(*args), nb_repeats=nb_repeats,
+                              trace_memory=False)
+        vectorized_result = measure(lambda: compute_dcapex_learning_curve_dparameter(*args), nb_repeats=nb_repeats,
+                                    trace_memory=False)
+        benchmarks[f'{nb_years}/leave_one_out'] = loop_result
+        benchmarks[f'{nb_years}/prefix_product'] = dict(vectorized_result,
+                                                        speedup=loop_result['time'] / vectorized_result['time'],
+                                                        max_relative_error=float(np.max(np.abs(
+                                                            compute_dcapex_leave_one_out(*args) /
+                                                            compute_dcapex_learning_curve_dparameter(*args) - 1.))))
+    return benchmarks
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Micro-benchmark of the learning curve capex derivative')
+    parser.add_argument('--nb-years', type=int, nargs='+', default=DEFAULT_NB_YEARS, help='benchmarked horizons')
+    parser.add_argument('--repeats', type=int, default=5, help='number of timed calls of each implementation')
+    options = parser.parse_args(args)
+    print(json.dumps(run_benchmarks(options.nb_years, options.repeats), indent=2, sort_keys=True))
+    return 0
+
+
+if '__main__' == __name__:
+    sys.exit(main())
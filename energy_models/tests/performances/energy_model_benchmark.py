@@ -0,0 +1,410 @@
+'''
+Copyright 2024 Capgemini
+
+Licensed under the Apache License, Version 2.0 (the "License");
+you may not use this file except in compliance with the License.
+You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing, software
+distributed under the License is distributed on an "AS IS" BASIS,
+WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+See the License for the specific language governing permissions and
+limitations under the License.
+'''
+import argparse
+import json
+import os
+import platform
+import time
+import tracemalloc
+from datetime import datetime
+from os.path import dirname, join
+
+import numpy as np
+
+from energy_models.core.energy_mix.energy_mix_disc import Energy_Mix_Discipline
+from energy_models.core.parallel_techno_execution import execute_with_parallel_technos
+from energy_models.core.stream_type.stream_disc import StreamDiscipline
+from energy_models.core.techno_type.techno_disc import TechnoDiscipline
+from energy_models.glossaryenergy import GlossaryEnergy
+from sostrades_core.execution_engine.execution_engine import ExecutionEngine
+
+BENCHMARK_VERSION = 1
+DEFAULT_BASELINE_FILE = join(dirname(__file__), 'energy_models_benchmark.json')
+DEFAULT_YEAR_ENDS = [2050, 2100]
+USECASES = ['energy_process_v0_mda', 'energy_mix_optim_process']
+# usecase executed with the techno disciplines in parallel threads for the wall-clock scaling benchmarks
+PARALLEL_USECASE = 'energy_process_v0_mda'
+# durations below this floor (in seconds) are too noisy to be flagged as regressions
+TIME_NOISE_FLOOR = 1e-3
+# memory increases below this floor (in MB) are not flagged as regressions
+MEMORY_NOISE_FLOOR = 0.5
+
+
+def measure(function, nb_repeats=3, setup=None, trace_memory=True):
+    '''
+    Time nb_repeats calls of function and trace the peak memory of one more call
+    setup is called before each call (not timed) and its output is passed to function
+    Timings and memory are measured on separate calls as tracemalloc slows down the execution
+    '''
+    times = []
+    for _ in range(nb_repeats):
+        args = setup() if setup is not None else ()
+        start_time = time.perf_counter()
+        function(*args)
+        times.append(time.perf_counter() - start_time)
+
+    result = {'time': float(np.median(times)),
+              'min_time': float(np.min(times)),
+              'nb_repeats': nb_repeats}
+
+    if trace_memory:
+        args = setup() if setup is not None else ()
+        tracemalloc.start()
+        try:
+            function(*args)
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        result['peak_memory'] = peak_memory / 1.0e6
+
+    return result
+
+
+def get_process_repository(usecase_name):
+    if usecase_name == 'energy_process_v0_mda':
+        return 'energy_models.sos_processes.energy.MDA'
+    if usecase_name == 'energy_mix_optim_process':
+        return 'energy_models.sos_processes.energy.MDO'
+    raise ValueError(f'Unknown benchmark usecase {usecase_name}, possible values are {USECASES}')
+
+
+def build_process(usecase_name, study_name='Benchmark'):
+    '''
+    Build the process of one of the energy usecases in a new execution engine, without configuring it
+    '''
+    ee = ExecutionEngine(study_name)
+    builder = ee.factory.get_builder_from_process(get_process_repository(usecase_name), usecase_name)
+    ee.factory.set_builders_to_coupling_builder(builder)
+    return ee
+
+
+def measure_process_startup(usecase_name, nb_repeats=3, trace_memory=True, study_name='Benchmark'):
+    '''
+    Measure the build of the process of a usecase and the configuration of the built process
+    Discipline modules are imported by the first build only, the min time of a cold interpreter is the
+    one with the imports
+    '''
+    build_result = measure(lambda: build_process(usecase_name, study_name), nb_repeats=nb_repeats,
+                           trace_memory=trace_memory)
+    configure_result = measure(lambda ee: ee.configure(), nb_repeats=nb_repeats, trace_memory=trace_memory,
+                               setup=lambda: (build_process(usecase_name, study_name),))
+    return build_result, configure_result
+
+
+def get_default_n_processes_list():
+    '''
+    Numbers of processes of the wall-clock scaling benchmarks : 1, 2, 4 and all the cores of the machine
+    '''
+    nb_cores = os.cpu_count() or 1
+    return sorted(n_processes for n_processes in {1, 2, 4, nb_cores} if n_processes <= nb_cores)
+
+
+def build_usecase(usecase_name, year_end, mdo_max_iter=2, study_name='Benchmark', n_processes=1):
+    '''
+    Build and load the study of one of the energy usecases on the [YearStartDefault, year_end] horizon
+    n_processes is the number of processes of the energy_process_v0_mda execution
+    '''
+    ee = build_process(usecase_name, study_name)
+    ee.configure()
+    if usecase_name == 'energy_process_v0_mda':
+        from energy_models.sos_processes.energy.MDA.energy_process_v0_mda.usecase import Study
+        usecase = Study(execution_engine=ee, year_start=GlossaryEnergy.YearStartDefault, year_end=year_end,
+                        n_processes=n_processes)
+    elif usecase_name == 'energy_mix_optim_process':
+        from energy_models.sos_processes.energy.MDO.energy_mix_optim_process.usecase import Study
+        usecase = Study(execution_engine=ee, year_start=GlossaryEnergy.YearStartDefault, year_end=year_end)
+    else:
+        raise ValueError(f'Unknown benchmark usecase {usecase_name}, possible values are {USECASES}')
+
+    usecase.study_name = study_name
+    values_dict = {}
+    for dict_v in usecase.setup_usecase():
+        values_dict.update(dict_v)
+    if usecase_name == 'energy_mix_optim_process':
+        values_dict[f'{study_name}.{usecase.optim_name}.max_iter'] = mdo_max_iter
+    ee.load_study_from_input_dict(values_dict)
+
+    return ee
+
+
+def get_discipline_benchmarks(proxy):
+    '''
+    Return the (kind, function, setup) of the model compute benchmark of a discipline,
+    None if the discipline is not a techno, a stream or the energy mix
+    '''
+    wrapper = proxy.mdo_discipline_wrapp.wrapper
+    inputs_dict = proxy.get_sosdisc_inputs()
+
+    if isinstance(wrapper, TechnoDiscipline):
+        def setup_techno():
+            # the learning curve and the aging distribution of the technos are cached,
+            # each call must start from empty caches
+            wrapper.techno_model.learning_curve_cache.clear()
+            wrapper.techno_model.aging_distribution_cache.clear()
+            return ()
+
+        return 'techno_compute', lambda: wrapper.techno_model.compute(inputs_dict), setup_techno
+
+    if isinstance(wrapper, StreamDiscipline):
+        def compute_stream():
+            wrapper.energy_model.configure(inputs_dict)
+            wrapper.energy_model.compute(inputs_dict, exp_min=inputs_dict['exp_min'])
+
+        return 'stream_compute', compute_stream, None
+
+    if isinstance(wrapper, Energy_Mix_Discipline):
+        def setup_energy_mix():
+            energy_mix_inputs = dict(inputs_dict)
+            wrapper.update_biomass_dry_name(inputs_dict, energy_mix_inputs)
+            return (energy_mix_inputs,)
+
+        return 'energy_mix_compute', wrapper.energy_model.compute, setup_energy_mix
+
+    return None
+
+
+def measure_jacobian(proxy, nb_repeats=3, trace_memory=True):
+    '''
+    Measure the computation of all the jacobians of a discipline at its last executed state
+    The discipline cache is disabled during the measure so that the jacobian is really computed at each call
+    '''
+    mdo_discipline = proxy.mdo_discipline_wrapp.mdo_discipline
+    wrapper = proxy.mdo_discipline_wrapp.wrapper
+    cache = mdo_discipline.cache
+
+    def setup_jacobian():
+        # the invest jacobian blocks of the technos are cached, each call must start from an empty cache
+        if isinstance(wrapper, TechnoDiscipline):
+            wrapper.invest_jacobian_cache.clear()
+        return ()
+
+    mdo_discipline.cache = None
+    try:
+        return measure(lambda: mdo_discipline.linearize(compute_all_jacobians=True, execute=False),
+                       nb_repeats=nb_repeats, setup=setup_jacobian, trace_memory=trace_memory)
+    finally:
+        mdo_discipline.cache = cache
+
+
+def measure_post_processing(proxy, nb_repeats=3, trace_memory=True, memoized=False):
+    '''
+    Measure the generation of all the charts of a discipline with its default filters
+    Memoized charts are cleared before each call unless memoized is True
+    '''
+    wrapper = proxy.mdo_discipline_wrapp.wrapper
+    chart_registry = getattr(wrapper, 'chart_registry', None)
+
+    def setup_post_processing():
+        if chart_registry is not None and not memoized:
+            chart_registry.clear()
+        return ()
+
+    return measure(lambda: proxy.get_post_processing_list(proxy.get_chart_filter_list()),
+                   nb_repeats=nb_repeats, setup=setup_post_processing, trace_memory=trace_memory)
+
+
+def measure_parallel_scaling(year_end, n_processes_list, trace_memory=True, study_name='Benchmark'):
+    '''
+    Measure the execution of the energy_process_v0_mda usecase with its techno disciplines executed in parallel
+    threads for each number of processes of n_processes_list
+    Each result stores its number of processes and its speed-up with respect to the first one of the list
+    '''
+    results = {}
+    for n_processes in n_processes_list:
+        results[n_processes] = dict(
+            measure(lambda ee, n_processes=n_processes: execute_with_parallel_technos(ee, n_processes),
+                    nb_repeats=1, trace_memory=trace_memory,
+                    setup=lambda n_processes=n_processes: (
+                        build_usecase(PARALLEL_USECASE, year_end, study_name=study_name, n_processes=n_processes),)),
+            n_processes=n_processes)
+    reference_time = results[n_processes_list[0]]['time']
+    for result in results.values():
+        result['speed_up'] = reference_time / result['time']
+    return results
+
+
+def get_discipline_name(proxy, study_name):
+    return proxy.get_disc_full_name().replace(f'{study_name}.', '', 1)
+
+
+def run_benchmarks(year_ends=None, usecases=None, nb_repeats=3, mdo_max_iter=2, trace_memory=True,
+                   with_jacobians=True, with_post_processing=True, n_processes_list=None):
+    '''
+    Run the benchmark suite for each horizon of year_ends and return the results in a json serializable dict
+    Model benchmarks are run on the converged state of the energy_process_v0_mda usecase
+    Each benchmark is named {year_end}/{kind}/{discipline or usecase} and stores its median time in seconds,
+    its min time and its peak traced memory in MB
+    Post-processing benchmarks build all the charts of a discipline, from scratch and from memoized charts
+    Process build and configure benchmarks are named startup/{kind}/{usecase}
+    Wall-clock scaling benchmarks of the energy_process_v0_mda usecase with its techno disciplines executed in
+    parallel are named {year_end}/parallel_usecase/{n_processes}_processes, an empty n_processes_list disables them
+    '''
+    year_ends = DEFAULT_YEAR_ENDS if year_ends is None else year_ends
+    usecases = USECASES if usecases is None else usecases
+    n_processes_list = get_default_n_processes_list() if n_processes_list is None else n_processes_list
+    study_name = 'Benchmark'
+    benchmarks = {}
+
+    # the process startup does not depend on the horizon, it is measured once per usecase
+    for usecase_name in usecases:
+        build_result, configure_result = measure_process_startup(usecase_name, nb_repeats=nb_repeats,
+                                                                 trace_memory=trace_memory, study_name=study_name)
+        benchmarks[f'startup/process_build/{usecase_name}'] = build_result
+        benchmarks[f'startup/process_configure/{usecase_name}'] = configure_result
+
+    for year_end in year_ends:
+        for usecase_name in usecases:
+            benchmarks[f'{year_end}/usecase/{usecase_name}'] = measure(
+                lambda ee: ee.execute(), nb_repeats=1, trace_memory=trace_memory,
+                setup=lambda: (build_usecase(usecase_name, year_end, mdo_max_iter, study_name),))
+
+        if n_processes_list:
+            for n_processes, result in measure_parallel_scaling(year_end, n_processes_list, trace_memory=trace_memory,
+                                                                study_name=study_name).items():
+                benchmarks[f'{year_end}/parallel_usecase/{n_processes}_processes'] = result
+
+        ee = build_usecase('energy_process_v0_mda', year_end, study_name=study_name)
+        ee.execute()
+        for proxy in ee.factory.proxy_disciplines:
+            discipline_name = get_discipline_name(proxy, study_name)
+            wrapper_class = proxy.mdo_discipline_wrapp.wrapper.__class__.__name__
+            discipline_benchmarks = get_discipline_benchmarks(proxy)
+            if discipline_benchmarks is not None:
+                kind, function, setup = discipline_benchmarks
+                benchmarks[f'{year_end}/{kind}/{discipline_name}'] = dict(
+                    measure(function, nb_repeats=nb_repeats, setup=setup, trace_memory=trace_memory),
+                    discipline_class=wrapper_class)
+            if with_jacobians:
+                benchmarks[f'{year_end}/jacobian/{discipline_name}'] = dict(
+                    measure_jacobian(proxy, nb_repeats=nb_repeats, trace_memory=trace_memory),
+                    discipline_class=wrapper_class)
+            if with_post_processing:
+                benchmarks[f'{year_end}/post_processing/{discipline_name}'] = dict(
+                    measure_post_processing(proxy, nb_repeats=nb_repeats, trace_memory=trace_memory),
+                    discipline_class=wrapper_class)
+                if hasattr(proxy.mdo_discipline_wrapp.wrapper, 'chart_registry'):
+                    benchmarks[f'{year_end}/post_processing_memoized/{discipline_name}'] = dict(
+                        measure_post_processing(proxy, nb_repeats=nb_repeats, trace_memory=trace_memory,
+                                                memoized=True),
+                        discipline_class=wrapper_class)
+
+    return {'metadata': {'version': BENCHMARK_VERSION,
+                         'date': datetime.now().isoformat(timespec='seconds'),
+                         'python': platform.python_version(),
+                         'numpy': np.__version__,
+                         'platform': platform.platform(),
+                         'year_ends': list(year_ends),
+                         'nb_repeats': nb_repeats,
+                         'n_processes_list': list(n_processes_list)},
+            'benchmarks': benchmarks}
+
+
+def compare_benchmarks(results, baseline, tolerance=0.2):
+    '''
+    Compare benchmark results to a baseline and return the regressions
+    A benchmark regresses when its time or peak memory exceeds the baseline one by more than tolerance
+    (relative) and by more than the noise floor (absolute)
+    Benchmarks missing in one of the two files are ignored, see get_missing_benchmarks
+    '''
+    regressions = []
+    for name, result in results['benchmarks'].items():
+        baseline_result = baseline['benchmarks'].get(name)
+        if baseline_result is None:
+            continue
+        for metric, noise_floor in [('time', TIME_NOISE_FLOOR), ('peak_memory', MEMORY_NOISE_FLOOR)]:
+            if metric not in result or metric not in baseline_result:
+                continue
+            current_value = result[metric]
+            baseline_value = baseline_result[metric]
+            if current_value > baseline_value * (1.0 + tolerance) and current_value - baseline_value > noise_floor:
+                regressions.append({'name': name,
+                                    'metric': metric,
+                                    'baseline': baseline_value,
+                                    'current': current_value,
+                                    'ratio': current_value / baseline_value if baseline_value > 0 else np.inf})
+
+    return regressions
+
+
+def get_missing_benchmarks(results, baseline):
+    '''
+    Names of the benchmark results that have no baseline
+    '''
+    return [name for name in results['benchmarks'] if name not in baseline['benchmarks']]
+
+
+def check_benchmarks(results, baseline, tolerance=0.2):
+    '''
+    Raise an exception if a benchmark regresses with respect to the baseline or has no baseline
+    '''
+    errors = [f"{regression['name']} {regression['metric']}: {regression['baseline']:.4g} -> "
+              f"{regression['current']:.4g} (x{regression['ratio']:.2f})"
+              for regression in compare_benchmarks(results, baseline, tolerance)]
+    errors.extend(f'{name}: no baseline' for name in get_missing_benchmarks(results, baseline))
+    if errors:
+        raise Exception('Benchmark regressions, update the baseline with --update-baseline if they are expected:\n' +
+                        '\n'.join(errors))
+
+
+def write_benchmarks(results, file_path):
+    with open(file_path, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+
+def read_benchmarks(file_path):
+    with open(file_path) as f:
+        return json.load(f)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Benchmark suite of the energy models')
+    parser.add_argument('--year-ends', type=int, nargs='+', default=DEFAULT_YEAR_ENDS,
+                        help='end years of the benchmarked horizons')
+    parser.add_argument('--usecases', nargs='*', default=USECASES, choices=USECASES,
+                        help='usecases executed entirely')
+    parser.add_argument('--repeats', type=int, default=3, help='number of timed calls of each model benchmark')
+    parser.add_argument('--mdo-max-iter', type=int, default=2,
+                        help='max number of iterations of the energy_mix_optim_process optimization')
+    parser.add_argument('--no-memory', action='store_true', help='do not trace the peak memory')
+    parser.add_argument('--no-jacobians', action='store_true', help='do not benchmark the jacobians')
+    parser.add_argument('--no-post-processing', action='store_true', help='do not benchmark the post-processing')
+    parser.add_argument('--n-processes', type=int, nargs='*', default=None,
+                        help='numbers of processes of the parallel techno executions (default: 1, 2, 4 and all cores, '
+                             'none to disable them)')
+    parser.add_argument('--output', default=None, help='json file where the results are written')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE_FILE,
+                        help='json baseline the results are compared with, the run fails on regressions')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='write the results in the baseline file instead of comparing them')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='relative tolerance of the comparison')
+    options = parser.parse_args(args)
+
+    results = run_benchmarks(year_ends=options.year_ends, usecases=options.usecases, nb_repeats=options.repeats,
+                             mdo_max_iter=options.mdo_max_iter, trace_memory=not options.no_memory,
+                             with_jacobians=not options.no_jacobians,
+                             with_post_processing=not options.no_post_processing,
+                             n_processes_list=options.n_processes)
+    if options.output is not None:
+        write_benchmarks(results, options.output)
+
+    if options.update_baseline:
+        write_benchmarks(results, options.baseline)
+    else:
+        check_benchmarks(results, read_benchmarks(options.baseline), options.tolerance)
+
+
+if '__main__' == __name__:
+    main()